@@ -2,9 +2,11 @@
 """
 RED TEAM Inbox Processor - LaunchAgent entry point
 
-Monitors bridge/inbox/redteam/ and processes adversarial review requests
+Monitors bridge/inbox/redteam/ and processes adversarial review requests.
+Runs one pass by default; --watch keeps the processor resident.
 """
 
+import argparse
 import asyncio
 import json
 import logging
@@ -23,7 +25,9 @@ pyrit_path = (
     / "bridge-adapter"
 )
 sys.path.insert(0, str(pyrit_path))
+sys.path.insert(0, str(project_root / "bridge" / "registry"))
 
+from bridge_client import AsyncBridgeClient  # noqa: E402
 from pyrit_bridge_adapter import PyRITBridgeAdapter  # noqa: E402
 from pyrit_production_adapter import PyRITProductionAdapter  # noqa: E402
 
@@ -39,8 +43,8 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-async def process_inbox() -> None:
-    """Process all messages in RED TEAM inbox"""
+async def process_inbox(watch: bool = False) -> None:
+    """Process messages in RED TEAM inbox (continuously if watch is set)"""
     try:
         # Initialize adapter
         bridge_path = Path("~/infrastructure/agent-bridge/bridge").expanduser()
@@ -49,52 +53,42 @@ async def process_inbox() -> None:
             fallback_on_error=True,
             max_retries=3,
         )
+        parser = PyRITBridgeAdapter(adapter.bridge_root, adapter.agent_name)
+        client = AsyncBridgeClient(adapter.bridge_root)
 
-        inbox_path = adapter.inbox
-
-        # Get all unprocessed messages
-        messages = list(inbox_path.glob("*.md"))
-
-        if not messages:
-            logger.info("No messages in inbox")
-            return
-
-        logger.info("Processing %d message(s)", len(messages))
-
-        for msg_file in messages:
+        processed = 0
+        async for msg in client.subscribe(adapter.agent_name, once=not watch):
             try:
-                logger.info("Processing: %s", msg_file.name)
+                logger.info("Processing: %s", msg.path.name)
 
                 # Parse message
-                parser = PyRITBridgeAdapter(adapter.bridge_root, adapter.agent_name)
-                msg = parser.parse_bridge_message(msg_file)
+                parsed = await asyncio.to_thread(parser.parse_bridge_message, msg.path)
 
                 # Run adversarial challenge with retry
                 challenge = await adapter.run_adversarial_challenge_with_retry(
-                    proposal=msg.content,
+                    proposal=parsed.content,
                     strategy="crescendo",
                     max_turns=5,
                 )
 
                 # Format response
                 response_content = parser.format_challenge_as_bridge_message(
-                    challenge, msg
+                    challenge, parsed
                 )
 
-                # Save to outbox
+                # Save to outbox and detailed results
                 response_file = adapter.outbox / f"{challenge.challenge_id}.md"
-                response_file.write_text(response_content)
-
-                # Save detailed results
                 results_file = adapter.results_dir / f"{challenge.challenge_id}.json"
-                results_file.write_text(json.dumps(asdict(challenge), indent=2))
+                await asyncio.to_thread(response_file.write_text, response_content)
+                await asyncio.to_thread(
+                    results_file.write_text, json.dumps(asdict(challenge), indent=2)
+                )
 
                 # Archive processed message
-                archive_dir = adapter.bridge_root / "archive" / adapter.agent_name
-                archive_dir.mkdir(parents=True, exist_ok=True)
-                msg_file.rename(archive_dir / msg_file.name)
+                await msg.ack()
+                processed += 1
 
-                logger.info("✓ Processed: %s", msg_file.name)
+                logger.info("✓ Processed: %s", msg.path.name)
                 logger.info("  Challenge ID: %s", challenge.challenge_id)
                 logger.info(
                     "  Vulnerabilities: %d",
@@ -103,8 +97,12 @@ async def process_inbox() -> None:
                 logger.info("  Risk Score: %.2f", challenge.overall_score)
 
             except Exception:
-                logger.exception("Failed to process %s", msg_file.name)
-                # Don't archive failed messages - retry on next run
+                logger.exception("Failed to process %s", msg.path.name)
+                # Don't archive failed messages - retry later
+                await msg.nack()
+
+        if processed == 0 and not watch:
+            logger.info("No messages in inbox")
 
     except Exception:
         logger.exception("Inbox processing failed")
@@ -112,4 +110,11 @@ async def process_inbox() -> None:
 
 
 if __name__ == "__main__":
-    asyncio.run(process_inbox())
+    arg_parser = argparse.ArgumentParser(description="RED TEAM inbox processor")
+    arg_parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Stay resident and process messages as they arrive",
+    )
+    args = arg_parser.parse_args()
+    asyncio.run(process_inbox(watch=args.watch))
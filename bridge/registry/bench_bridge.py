@@ -0,0 +1,387 @@
+#!/usr/bin/env python3
+"""
+Bridge Benchmark
+Synthetic load against a throwaway bridge tree.
+
+Provisions a temporary bridge, has N agents send M messages each at a
+configured priority mix and rate, drains every inbox, and reports
+throughput, latency percentiles, on-disk sizes and memory use.
+
+    python3 bench_bridge.py --agents 4 --messages 2500 --json > bench.json
+    python3 bench_bridge.py --messages 100 --mix CRITICAL=10,NORMAL=90 --rate 200
+    python3 bench_bridge.py --messages 20 --scripts   # also time the shell path
+
+The Python path goes through MessageValidator/BridgeRegistry for sends,
+one process per sending agent, and AsyncBridgeClient for receives.
+--scripts additionally runs bridge-send.sh, bridge-process-queue.sh and
+bridge-receive.sh against the same kind of tree (they read BRIDGE_ROOT from the environment).
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from bridge_client import AsyncBridgeClient
+from bridge_registry import BridgeRegistry, Priority
+from lifecycle_trace import summarize
+from message_validator import MessageValidator
+
+
+DEFAULT_MIX = "CRITICAL=5,HIGH=15,NORMAL=70,INFO=10"
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent.parent / "scripts"
+
+
+def parse_mix(spec: str) -> Dict[Priority, float]:
+    """
+    Parse a priority mix like "CRITICAL=5,NORMAL=95" into weights.
+
+    Raises:
+        ValueError: On unknown priorities or non-positive totals
+    """
+    weights: Dict[Priority, float] = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        try:
+            weights[Priority(name.strip().upper())] = float(weight)
+        except ValueError:
+            raise ValueError(f"Invalid priority mix entry '{part}'") from None
+    if sum(weights.values()) <= 0:
+        raise ValueError("Priority mix weights must sum to more than zero")
+    return weights
+
+
+def agent_names(count: int) -> List[str]:
+    return [f"agent{i:02d}" for i in range(count)]
+
+
+def provision(root: Path, agents: List[str]) -> Path:
+    """Create an empty bridge tree with the given agents registered"""
+    for sub in ("queue/pending", "queue/processing", "archive", "registry"):
+        (root / sub).mkdir(parents=True, exist_ok=True)
+    for agent in agents:
+        (root / "inbox" / agent).mkdir(parents=True, exist_ok=True)
+    (root / "registry" / "agents.json").write_text(json.dumps({
+        "active_agents": {agent: {"registered": datetime.now().isoformat()} for agent in agents}
+    }, indent=2))
+    (root / "registry" / "queue_stats.json").write_text(
+        json.dumps({"messages_sent": 0, "messages_processed": 0, "last_queue_number": 0})
+    )
+    return root
+
+
+def pace(start: float, i: int, rate: float):
+    """Sleep until message i is due at the configured rate"""
+    if rate > 0:
+        delay = start + i / rate - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+
+
+def plan(agents: List[str], messages: int, mix: Dict[Priority, float], seed: int) -> List[tuple]:
+    """(sender, recipient, priority) for every message, round-robin senders"""
+    rng = random.Random(seed)
+    priorities = rng.choices(list(mix), weights=list(mix.values()), k=len(agents) * messages)
+    sends = []
+    for i, priority in enumerate(priorities):
+        sender = agents[i % len(agents)]
+        recipient = agents[(i + 1) % len(agents)] if len(agents) > 1 else sender
+        sends.append((sender, recipient, priority))
+    return sends
+
+
+def send_batch(bridge: Path, sender: str, batch: List[tuple], rate: float) -> Dict:
+    """
+    Send one agent's share of the plan (runs in a worker process).
+
+    Each sender has its own BridgeRegistry, so concurrent senders contend
+    on the registry lock the way separate agents do. Send times are wall
+    clock so the parent can compare them with receive times.
+    """
+    registry = BridgeRegistry(bridge)
+    validator = MessageValidator(registry)
+
+    send_latency: List[float] = []
+    sent_at: Dict[str, float] = {}
+    failures = 0
+    started = time.time()
+    start = time.perf_counter()
+    for n, (i, recipient, priority) in enumerate(batch):
+        pace(start, n, rate)
+        sent = time.time()
+        t0 = time.perf_counter()
+        ok, _, path = validator.create_message(
+            sender, recipient, f"bench {i}", f"Synthetic load message {i}", priority
+        )
+        send_latency.append(time.perf_counter() - t0)
+        if ok:
+            sent_at[path.name] = sent
+        else:
+            failures += 1
+    return {"send_latency": send_latency, "sent_at": sent_at, "failures": failures,
+            "started": started, "finished": time.time()}
+
+
+def run_python(bridge: Path, agents: List[str], sends: List[tuple], rate: float, queries: int) -> Dict:
+    """Send through MessageValidator (one process per sender), drain with AsyncBridgeClient"""
+    batches: Dict[str, List[tuple]] = {}
+    for i, (sender, recipient, priority) in enumerate(sends):
+        batches.setdefault(sender, []).append((i, recipient, priority))
+
+    # The target rate is for the whole run, so each sender gets its share
+    sender_rate = rate / len(batches) if batches else 0.0
+    with ProcessPoolExecutor(max_workers=max(len(batches), 1)) as pool:
+        results = list(pool.map(
+            send_batch, [bridge] * len(batches), list(batches), list(batches.values()),
+            [sender_rate] * len(batches),
+        ))
+
+    send_latency: List[float] = [t for r in results for t in r["send_latency"]]
+    sent_at: Dict[str, float] = {name: t for r in results for name, t in r["sent_at"].items()}
+    failures = sum(r["failures"] for r in results)
+    send_elapsed = (
+        max(r["finished"] for r in results) - min(r["started"] for r in results) if results else 0.0
+    )
+
+    registry = BridgeRegistry(bridge)
+
+    receive_latency: List[float] = []
+    end_to_end: List[float] = []
+
+    async def drain():
+        client = AsyncBridgeClient(bridge, registry=registry)
+        for agent in agents:
+            async for msg in client.subscribe(agent, once=True):
+                t0 = time.perf_counter()
+                await msg.ack()
+                receive_latency.append(time.perf_counter() - t0)
+                if msg.path.name in sent_at:
+                    end_to_end.append(time.time() - sent_at[msg.path.name])
+
+    start = time.perf_counter()
+    asyncio.run(drain())
+    receive_elapsed = time.perf_counter() - start
+
+    query_latency: Dict[str, List[float]] = {"get_stats": [], "get_pending_messages": []}
+    for i in range(queries):
+        t0 = time.perf_counter()
+        registry.get_stats()
+        query_latency["get_stats"].append(time.perf_counter() - t0)
+        t0 = time.perf_counter()
+        registry.get_pending_messages(agents[i % len(agents)])
+        query_latency["get_pending_messages"].append(time.perf_counter() - t0)
+
+    return {
+        "sent": len(sent_at),
+        "send_failures": failures,
+        "received": len(receive_latency),
+        "throughput_msgs_per_s": {
+            "send": round(len(sent_at) / send_elapsed, 2) if send_elapsed else 0.0,
+            "receive": round(len(receive_latency) / receive_elapsed, 2) if receive_elapsed else 0.0,
+        },
+        "latency": {
+            "send": summarize(send_latency),
+            "receive_ack": summarize(receive_latency),
+            "end_to_end": summarize(end_to_end),
+            **{name: summarize(samples) for name, samples in query_latency.items()},
+        },
+    }
+
+
+def run_scripts(bridge: Path, agents: List[str], sends: List[tuple]) -> Dict:
+    """Time bridge-send.sh / bridge-process-queue.sh / bridge-receive.sh"""
+    missing = [tool for tool in ("bash", "jq", "uuidgen") if shutil.which(tool) is None]
+    if missing:
+        return {"skipped": f"missing tools: {', '.join(missing)}"}
+
+    env = {**os.environ, "BRIDGE_ROOT": str(bridge)}
+
+    def run(script: str, *args: str) -> float:
+        t0 = time.perf_counter()
+        subprocess.run(["bash", str(SCRIPTS_DIR / script), *args], env=env,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        return time.perf_counter() - t0
+
+    send_latency = [
+        run("bridge-send.sh", sender, recipient, priority.value, f"bench {i}")
+        for i, (sender, recipient, priority) in enumerate(sends)
+    ]
+    dispatch = run("bridge-process-queue.sh")
+
+    receive_latency: List[float] = []
+    for agent in agents:
+        inbox = bridge / "inbox" / agent
+        while any(inbox.glob("*.md")):
+            receive_latency.append(run("bridge-receive.sh", agent))
+
+    total = sum(send_latency) + dispatch + sum(receive_latency)
+    return {
+        "sent": len(send_latency),
+        "received": len(receive_latency),
+        "throughput_msgs_per_s": round(len(receive_latency) / total, 2) if total else 0.0,
+        "latency": {
+            "send": summarize(send_latency),
+            "dispatch_batch": summarize([dispatch]),
+            "receive": summarize(receive_latency),
+        },
+    }
+
+
+def file_sizes(bridge: Path) -> Dict[str, int]:
+    """Bytes used by registry artefacts and message directories"""
+    def size(path: Path) -> int:
+        if path.is_file():
+            return path.stat().st_size
+        if path.is_dir():
+            return sum(p.stat().st_size for p in path.rglob("*") if p.is_file())
+        return 0
+
+    registry = bridge / "registry"
+    return {
+        "registry_json": size(registry / "registry.json"),
+        "journal": size(registry / "journal.jsonl"),
+        "registry_snapshot": size(registry / "registry.snapshot"),
+        "cold_tier": size(registry / "cold"),
+        "inbox_index": size(registry / "inbox_index"),
+        "traces": size(registry / "traces"),
+        "inbox": size(bridge / "inbox"),
+        "archive": size(bridge / "archive"),
+    }
+
+
+def max_rss_bytes() -> int:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS, kilobytes on Linux
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+def benchmark(agents: int = 4,
+              messages: int = 100,
+              mix: str = DEFAULT_MIX,
+              rate: float = 0.0,
+              seed: int = 0,
+              queries: int = 100,
+              scripts: bool = False,
+              trace_memory: bool = False,
+              keep: Optional[Path] = None) -> Dict:
+    """
+    Run one benchmark and return the report dict.
+
+    Args:
+        agents: Number of agents (each sends to the next, round-robin)
+        messages: Messages sent per agent
+        mix: Priority weights, e.g. "CRITICAL=5,HIGH=15,NORMAL=70,INFO=10"
+        rate: Target send rate in messages/second (0 = unthrottled)
+        seed: Seed for the priority draw
+        queries: Registry query samples taken after the run
+        scripts: Also benchmark the shell scripts
+        trace_memory: Report tracemalloc peak (slows the run)
+        keep: Provision here and leave the tree behind instead of a temp dir
+    """
+    names = agent_names(agents)
+    weights = parse_mix(mix)
+    sends = plan(names, messages, weights, seed)
+
+    root = Path(keep) if keep else Path(tempfile.mkdtemp(prefix="bridge-bench-"))
+    try:
+        bridge = provision(root / "python", names)
+        if trace_memory:
+            tracemalloc.start()
+        python_result = run_python(bridge, names, sends, rate, queries)
+        memory = {"max_rss_bytes": max_rss_bytes()}
+        if trace_memory:
+            memory["tracemalloc_peak_bytes"] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+        report = {
+            "timestamp": datetime.now().isoformat(),
+            "host": {"python": platform.python_version(), "platform": platform.platform()},
+            "config": {"agents": agents, "messages_per_agent": messages, "total_messages": len(sends),
+                       "mix": {p.value: w for p, w in weights.items()}, "rate": rate, "seed": seed},
+            "python": python_result,
+            "files": file_sizes(bridge),
+            "memory": memory,
+        }
+        if scripts:
+            script_bridge = provision(root / "scripts", names)
+            report["scripts"] = run_scripts(script_bridge, names, sends)
+        return report
+    finally:
+        if not keep:
+            shutil.rmtree(root, ignore_errors=True)
+
+
+def print_report(report: Dict):
+    cfg = report["config"]
+    py = report["python"]
+    print(f"Bridge benchmark: {cfg['agents']} agents x {cfg['messages_per_agent']} messages "
+          f"({cfg['total_messages']} total)")
+    print("=" * 72)
+    print(f"Sent {py['sent']} ({py['send_failures']} failed), received {py['received']}")
+    print(f"Throughput: send {py['throughput_msgs_per_s']['send']}/s, "
+          f"receive {py['throughput_msgs_per_s']['receive']}/s")
+    print(f"\n  {'operation':22s} {'count':>7s} {'p50 ms':>10s} {'p95 ms':>10s} {'p99 ms':>10s}")
+    for name, s in py["latency"].items():
+        print(f"  {name:22s} {s['count']:7d} {s['p50_ms']:10.2f} {s['p95_ms']:10.2f} {s['p99_ms']:10.2f}")
+    if "scripts" in report:
+        scripts = report["scripts"]
+        print("\nShell scripts:")
+        if "skipped" in scripts:
+            print(f"  skipped ({scripts['skipped']})")
+        else:
+            for name, s in scripts["latency"].items():
+                print(f"  {name:22s} {s['count']:7d} {s['p50_ms']:10.2f} {s['p95_ms']:10.2f} {s['p99_ms']:10.2f}")
+    print("\nFiles:")
+    for name, size in report["files"].items():
+        print(f"  {name:22s} {size:>12,} bytes")
+    print("\nMemory:")
+    for name, size in report["memory"].items():
+        print(f"  {name:22s} {size:>12,} bytes")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Synthetic load benchmark for the bridge")
+    parser.add_argument("--agents", type=int, default=4, help="Number of agents (default: 4)")
+    parser.add_argument("--messages", type=int, default=100, help="Messages per agent (default: 100)")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"Priority weights (default: {DEFAULT_MIX})")
+    parser.add_argument("--rate", type=float, default=0.0, help="Send rate in msgs/s (default: unthrottled)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--queries", type=int, default=100, help="Registry query samples (default: 100)")
+    parser.add_argument("--scripts", action="store_true", help="Also benchmark the shell scripts")
+    parser.add_argument("--tracemalloc", action="store_true", help="Report Python allocation peak")
+    parser.add_argument("--keep", type=Path, help="Provision here and keep the tree for inspection")
+    parser.add_argument("--json", action="store_true", help="Machine-readable output")
+    parser.add_argument("--output", type=Path, help="Also write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    try:
+        report = benchmark(args.agents, args.messages, args.mix, args.rate, args.seed,
+                           args.queries, args.scripts, args.tracemalloc, args.keep)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
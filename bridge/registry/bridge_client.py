@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Async Bridge Client
+asyncio-native consumer API for bridge inboxes.
+
+    client = AsyncBridgeClient(bridge_root)
+    async for msg in client.subscribe("redteam"):
+        try:
+            await handle(msg.content)
+            await msg.ack()
+        except Exception:
+            await msg.nack()
+
+Messages are delivered in inbox order (priority, then queue number). A
+message is claimed with the same "<file>.lock" convention bridge-receive.sh
+uses, so shell and async consumers never process the same file twice. All
+file and registry I/O runs in the default thread pool.
+"""
+
+import asyncio
+import os
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import AsyncIterator, Dict, Optional
+
+from bridge_registry import BridgeRegistry, MessageStatus
+from inbox_index import InboxIndex
+from lifecycle_trace import record_span
+
+
+DEFAULT_POLL_INTERVAL = 0.25
+DEFAULT_RETRY_DELAY = 5.0
+DEFAULT_MAX_ATTEMPTS = 3
+
+
+@dataclass
+class BridgeMessage:
+    """A claimed inbox message awaiting ack() or nack()"""
+    path: Path
+    agent: str
+    header: Dict
+    content: str
+    attempts: int
+    _subscription: "_Subscription" = field(repr=False)
+    _settled: bool = field(default=False, repr=False)
+
+    @property
+    def message_id(self) -> str:
+        return self.header["message_id"]
+
+    @property
+    def sender(self) -> Optional[str]:
+        return self.header.get("from")
+
+    @property
+    def priority(self) -> str:
+        return self.header["priority"]
+
+    async def ack(self):
+        """Mark processed: archive the file and complete its registry record"""
+        if self._settled:
+            return
+        self._settled = True
+        await self._subscription.client._ack(self)
+
+    async def nack(self, retry_after: Optional[float] = None):
+        """
+        Mark failed: release the claim for redelivery after retry_after seconds.
+
+        After max_attempts failures the file is moved to the dead-letter directory.
+        """
+        if self._settled:
+            return
+        self._settled = True
+        await self._subscription.client._nack(self, retry_after)
+
+
+class _Subscription:
+    """Per-agent delivery state"""
+
+    def __init__(self,
+                 client: "AsyncBridgeClient",
+                 agent: str,
+                 archive_dir: Path,
+                 dead_letter_dir: Path):
+        self.client = client
+        self.agent = agent
+        self.index = InboxIndex.for_agent(client.bridge_root, agent)
+        self.archive_dir = archive_dir
+        self.dead_letter_dir = dead_letter_dir
+        self.in_flight = set()
+        self.attempts: Dict[str, int] = {}
+        self.not_before: Dict[str, float] = {}
+
+    def poll(self) -> bool:
+        """
+        Refresh the index (blocking; run in a thread). The index only lists
+        the inbox when its mtime has changed.
+
+        Returns:
+            True if messages arrived or left
+        """
+        return self.index.refresh() != (0, 0)
+
+    def ready(self):
+        """Yield deliverable index entries in inbox order"""
+        now = time.monotonic()
+        cursor = None
+        while True:
+            page, cursor = self.index.list_messages(limit=100, after=cursor)
+            for entry in page:
+                name = entry["filename"]
+                if name in self.in_flight or self.not_before.get(name, 0.0) > now:
+                    continue
+                yield entry
+            if cursor is None:
+                return
+
+    def next_retry_in(self) -> Optional[float]:
+        """Seconds until the earliest delayed redelivery, if any"""
+        if not self.not_before:
+            return None
+        return max(min(self.not_before.values()) - time.monotonic(), 0.0)
+
+
+class AsyncBridgeClient:
+    """
+    Resident asyncio consumer for bridge inboxes.
+
+    Optionally keeps BridgeRegistry records in step: IN_PROGRESS on delivery,
+    COMPLETED on ack, back to PENDING on nack, FAILED once dead-lettered.
+    """
+
+    def __init__(self,
+                 bridge_root: Path,
+                 registry: Optional[BridgeRegistry] = None,
+                 poll_interval: float = DEFAULT_POLL_INTERVAL,
+                 max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+                 retry_delay: float = DEFAULT_RETRY_DELAY):
+        """
+        Initialize the client.
+
+        Args:
+            bridge_root: Bridge directory containing inbox/ and archive/
+            registry: Registry to update on delivery, ack and nack
+            poll_interval: Seconds between inbox checks when idle
+            max_attempts: Deliveries before a message is dead-lettered
+            retry_delay: Default nack redelivery delay in seconds
+        """
+        self.bridge_root = Path(bridge_root)
+        self.registry = registry
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self._closed = False
+        self._wake: Optional[asyncio.Event] = None
+
+    def close(self):
+        """Stop all subscriptions after their current message"""
+        self._closed = True
+        if self._wake is not None:
+            self._wake.set()
+
+    async def subscribe(self,
+                        agent: str,
+                        once: bool = False,
+                        archive_dir: Optional[Path] = None,
+                        dead_letter_dir: Optional[Path] = None) -> AsyncIterator[BridgeMessage]:
+        """
+        Yield messages for an agent as they arrive.
+
+        Args:
+            agent: Inbox namespace (e.g. 'redteam')
+            once: Deliver what is currently in the inbox, then stop
+            archive_dir: Where ack() moves files. Defaults to archive/<agent>
+            dead_letter_dir: Where exhausted messages go. Defaults to archive/<agent>/failed
+
+        Yields:
+            BridgeMessage objects; each must be ack()ed or nack()ed
+        """
+        if self._wake is None:
+            self._wake = asyncio.Event()
+        archive_dir = archive_dir or self.bridge_root / "archive" / agent
+        sub = _Subscription(self, agent, archive_dir, dead_letter_dir or archive_dir / "failed")
+
+        while not self._closed:
+            await asyncio.to_thread(sub.poll)
+
+            for entry in sub.ready():
+                if self._closed:
+                    return
+                msg = await asyncio.to_thread(self._claim, sub, entry)
+                if msg is not None:
+                    yield msg
+
+            if once:
+                return
+
+            timeout = self.poll_interval
+            retry_in = sub.next_retry_in()
+            if retry_in is not None:
+                timeout = min(timeout, retry_in)
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def _claim(self, sub: _Subscription, entry: Dict) -> Optional[BridgeMessage]:
+        """Take the file lock and read the message (blocking)"""
+        name = entry["filename"]
+        path = sub.index.directory / name
+        lock_path = path.with_name(name + ".lock")
+        try:
+            fd = os.open(lock_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+        except FileExistsError:
+            return None
+        os.write(fd, f"{os.getpid()}\n".encode())
+        os.close(fd)
+
+        try:
+            content = path.read_text()
+        except FileNotFoundError:
+            # Processed by another consumer between listing and claiming
+            lock_path.unlink(missing_ok=True)
+            sub.index.discard(name)
+            return None
+
+        sub.in_flight.add(name)
+        sub.not_before.pop(name, None)
+        sub.attempts[name] = sub.attempts.get(name, 0) + 1
+        self._set_registry_status(path, MessageStatus.IN_PROGRESS)
+        record_span(self.bridge_root, entry["message_id"], "received", sub.agent, "bridge_client")
+
+        return BridgeMessage(
+            path=path,
+            agent=sub.agent,
+            header=entry,
+            content=content,
+            attempts=sub.attempts[name],
+            _subscription=sub,
+        )
+
+    def _set_registry_status(self, path: Path, status: MessageStatus):
+        if self.registry is None:
+            return
+        record = self.registry.find_by_path(path)
+        if record is None and self.registry.refresh():
+            # Registered by another process after this one loaded the registry
+            record = self.registry.find_by_path(path)
+        if record is not None:
+            self.registry.update_message_status(record["id"], status)
+
+    def _move_and_release(self, msg: BridgeMessage, destination_dir: Path):
+        sub = msg._subscription
+        name = msg.path.name
+        destination_dir.mkdir(parents=True, exist_ok=True)
+        msg.path.rename(destination_dir / name)
+        msg.path.with_name(name + ".lock").unlink(missing_ok=True)
+        sub.index.discard(name)
+        sub.in_flight.discard(name)
+        sub.attempts.pop(name, None)
+
+    def _ack_blocking(self, msg: BridgeMessage):
+        record_span(self.bridge_root, msg.message_id, "processed", msg.agent, "bridge_client")
+        self._move_and_release(msg, msg._subscription.archive_dir)
+        self._set_registry_status(msg.path, MessageStatus.COMPLETED)
+        record_span(self.bridge_root, msg.message_id, "archived", msg.agent, "bridge_client")
+
+    def _nack_blocking(self, msg: BridgeMessage, retry_after: float):
+        sub = msg._subscription
+        name = msg.path.name
+        if msg.attempts >= self.max_attempts:
+            self._move_and_release(msg, sub.dead_letter_dir)
+            self._set_registry_status(msg.path, MessageStatus.FAILED)
+            return
+        sub.not_before[name] = time.monotonic() + retry_after
+        sub.in_flight.discard(name)
+        msg.path.with_name(name + ".lock").unlink(missing_ok=True)
+        self._set_registry_status(msg.path, MessageStatus.PENDING)
+
+    async def _ack(self, msg: BridgeMessage):
+        await asyncio.to_thread(self._ack_blocking, msg)
+
+    async def _nack(self, msg: BridgeMessage, retry_after: Optional[float]):
+        delay = self.retry_delay if retry_after is None else retry_after
+        await asyncio.to_thread(self._nack_blocking, msg, delay)
+        if self._wake is not None:
+            self._wake.set()
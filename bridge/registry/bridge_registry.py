@@ -4,12 +4,43 @@ Bridge Registry System
 Implements TLA+ constraint checking and message registration for the bridge system.
 """
 
+import copy
+import fcntl
+import heapq
 import json
+import os
+import threading
+from collections import Counter
+from contextlib import contextmanager
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
 from enum import Enum
 
+from cold_storage import ColdStore
+
+
+GENERATION_FILE = "registry.gen"
+# With no replica registered in registry/replicas/ nothing reads the
+# journal, so it is cut once it grows past this
+UNSHIPPED_JOURNAL_MAX_BYTES = 1 << 20
+
+
+def write_registry(registry_file: Path, registry: Dict):
+    """
+    Write registry.json and its registry.gen sidecar atomically.
+
+    The sidecar goes first: a crash in between leaves it ahead of
+    registry.json, which makes other writers reload rather than miss a
+    generation.
+    """
+    registry_file.parent.mkdir(parents=True, exist_ok=True)
+    for path, text in ((registry_file.with_name(GENERATION_FILE), str(registry["generation"])),
+                       (registry_file, json.dumps(registry, indent=2))):
+        tmp_file = path.with_name(f"{path.name}.tmp.{os.getpid()}")
+        tmp_file.write_text(text)
+        os.replace(tmp_file, path)
+
 
 class Priority(Enum):
     """Message priority levels"""
@@ -25,6 +56,7 @@ class MessageStatus(Enum):
     IN_PROGRESS = "in_progress"
     COMPLETED = "completed"
     ARCHIVED = "archived"
+    FAILED = "failed"
 
 
 class BridgeRegistry:
@@ -36,6 +68,21 @@ class BridgeRegistry:
     - Maximum directory depth
     - Maximum dotfiles at root
     - Bridge message consistency
+
+    Safe for concurrent writers: every mutation takes an advisory lock on
+    registry.lock, reloads registry.json if another process advanced its
+    generation number, applies the change on top and writes atomically.
+    The generation is also kept in registry/registry.gen, written before
+    registry.json is replaced, so the check reads a few bytes instead of
+    the whole registry.
+    Reads use the last loaded state; call refresh() to pick up other
+    writers' changes.
+
+    Every save also appends the records it touched to registry/journal.jsonl
+    (one line per generation) so replication.LogShipper can replay the
+    mutation stream on another node. Only registry metadata that changed is
+    journaled. While no replica is registered the journal is emptied
+    whenever it reaches UNSHIPPED_JOURNAL_MAX_BYTES.
     """
 
     def __init__(self, base_path: Optional[Path] = None):
@@ -50,13 +97,33 @@ class BridgeRegistry:
 
         self.base = Path(base_path)
         self.registry_file = self.base / "registry" / "registry.json"
+        self.lock_file = self.base / "registry" / "registry.lock"
+        self.journal_file = self.base / "registry" / "journal.jsonl"
+        self.generation_file = self.base / "registry" / GENERATION_FILE
+        self.replicas_dir = self.base / "registry" / "replicas"
+        self._journal_upserts: Dict[str, Dict] = {}
+        self._journal_offloads: List[Dict] = []
+        self._thread_lock = threading.RLock()
+        self._lock_depth = 0
+        self._lock_fd: Optional[int] = None
+        self.conflicts = 0
+        exists = self.registry_file.exists()
         self.registry = self._load_registry()
+        # A registry not yet on disk has never journaled its meta
+        self._journal_meta = copy.deepcopy(self._meta()) if exists else {}
+        self.cold = ColdStore(self.base / "registry" / "cold")
+        self._rebuild_indexes()
 
     def _load_registry(self) -> Dict:
         """Load registry from disk or initialize new one"""
         if self.registry_file.exists():
             try:
-                return json.loads(self.registry_file.read_text())
+                registry = json.loads(self.registry_file.read_text())
+                # Replicas of registries journaled before the meta carried
+                # every field lack constraints and paths
+                for key, value in self._init_registry().items():
+                    registry.setdefault(key, value)
+                return registry
             except json.JSONDecodeError:
                 print(f"Warning: Could not parse {self.registry_file}, initializing new registry")
                 return self._init_registry()
@@ -79,15 +146,203 @@ class BridgeRegistry:
                 "max_dotfiles_root": 10,
                 "max_message_age_days": 90
             },
+            "generation": 0,
             "messages": [],
             "last_check": datetime.now().isoformat(),
             "last_cleanup": datetime.now().isoformat()
         }
 
+    def _rebuild_indexes(self):
+        """
+        Rebuild in-memory indexes from the loaded registry.
+
+        - _by_id: message ID → record
+        - _by_path: message file path → record
+        - _expiry_heap: (expiry_timestamp, message ID) for COMPLETED messages.
+          Entries are invalidated lazily: a popped entry is only acted on if
+          the record is still COMPLETED with the same expiry.
+        - _counts: (status, priority) → hot message count
+        - _pending_heap: (created, message ID) for PENDING messages, also
+          invalidated lazily
+        """
+        self._by_id = {msg["id"]: msg for msg in self.registry["messages"]}
+        self._by_path = {msg["path"]: msg for msg in self.registry["messages"]}
+        self._expiry_heap = [
+            (self._expiry_timestamp(msg), msg["id"])
+            for msg in self.registry["messages"]
+            if msg["status"] == MessageStatus.COMPLETED.value
+        ]
+        heapq.heapify(self._expiry_heap)
+        self._counts, self._pending_heap = self._compute_stats_indexes()
+
+    def _compute_stats_indexes(self) -> Tuple[Counter, List[Tuple[str, str]]]:
+        """Recompute status × priority counts and the pending heap from scratch"""
+        counts: Counter = Counter(
+            (msg["status"], msg["priority"]) for msg in self.registry["messages"]
+        )
+        pending_heap = [
+            (msg["created"], msg["id"])
+            for msg in self.registry["messages"]
+            if msg["status"] == MessageStatus.PENDING.value
+        ]
+        heapq.heapify(pending_heap)
+        return counts, pending_heap
+
+    def _set_status(self, msg: Dict, status: MessageStatus):
+        """Change a record's status, keeping counters and heaps in step"""
+        self._counts[(msg["status"], msg["priority"])] -= 1
+        msg["status"] = status.value
+        msg["updated"] = datetime.now().isoformat()
+        self._counts[(msg["status"], msg["priority"])] += 1
+        self._journal_upserts[msg["id"]] = msg
+
+        if status == MessageStatus.COMPLETED:
+            heapq.heappush(self._expiry_heap, (self._expiry_timestamp(msg), msg["id"]))
+        elif status == MessageStatus.PENDING:
+            heapq.heappush(self._pending_heap, (msg["created"], msg["id"]))
+
+    def _expiry_timestamp(self, msg: Dict) -> float:
+        """Expiry time of a message: created + its TTL (default max_message_age_days)"""
+        ttl_days = msg.get("ttl_days")
+        if ttl_days is None:
+            ttl_days = self.registry["constraints"]["max_message_age_days"]
+        created = datetime.fromisoformat(msg["created"])
+        return (created + timedelta(days=ttl_days)).timestamp()
+
+    def _disk_generation(self) -> Optional[int]:
+        """
+        Generation of the registry on disk, or None if there is none.
+
+        Reads registry.gen; registries written before it existed fall back
+        to parsing registry.json.
+        """
+        try:
+            return int(self.generation_file.read_text())
+        except (FileNotFoundError, ValueError):
+            pass
+        try:
+            return json.loads(self.registry_file.read_text()).get("generation", 0)
+        except FileNotFoundError:
+            return None
+        except json.JSONDecodeError:
+            print(f"Warning: Could not parse {self.registry_file}, keeping in-memory registry")
+            return None
+
+    @contextmanager
+    def _locked(self):
+        """
+        Hold the registry write lock.
+
+        Re-entrant within a process; across processes an exclusive flock on
+        registry.lock serializes writers.
+        """
+        with self._thread_lock:
+            if self._lock_depth == 0:
+                self.lock_file.parent.mkdir(parents=True, exist_ok=True)
+                self._lock_fd = os.open(self.lock_file, os.O_RDWR | os.O_CREAT, 0o644)
+                fcntl.flock(self._lock_fd, fcntl.LOCK_EX)
+            self._lock_depth += 1
+            try:
+                yield
+            finally:
+                self._lock_depth -= 1
+                if self._lock_depth == 0:
+                    fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+                    os.close(self._lock_fd)
+                    self._lock_fd = None
+
+    def _sync(self) -> bool:
+        """
+        Reload registry.json if another writer changed it (call under _locked).
+
+        Compare-and-swap check: the on-disk generation must equal the one this
+        instance last wrote or read. If it does not, the in-memory state is
+        replaced by the disk state and the caller's mutation is applied on
+        top of it, so no other writer's registrations are lost.
+
+        Returns:
+            True if the registry was reloaded
+        """
+        # File metadata is not trusted here: after os.replace an inode can be
+        # reused with an equal size and an mtime the filesystem rounds away
+        generation = self._disk_generation()
+        if generation is None or generation == self.registry["generation"]:
+            return False
+
+        try:
+            disk = json.loads(self.registry_file.read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            print(f"Warning: Could not parse {self.registry_file}, keeping in-memory registry")
+            return False
+        disk.setdefault("generation", 0)
+
+        # registry.gen is written first, so a writer that died before
+        # replacing registry.json leaves it one generation ahead
+        if disk["generation"] == self.registry["generation"]:
+            return False
+
+        self.registry = disk
+        self._journal_meta = copy.deepcopy(self._meta())
+        self._journal_upserts.clear()
+        self._journal_offloads.clear()
+        self.cold = ColdStore(self.base / "registry" / "cold")
+        self._rebuild_indexes()
+        self.conflicts += 1
+        return True
+
+    def refresh(self) -> bool:
+        """
+        Pick up changes written by other processes.
+
+        Returns:
+            True if the registry was reloaded
+        """
+        with self._locked():
+            return self._sync()
+
     def _save_registry(self):
-        """Save registry to disk"""
-        self.registry_file.parent.mkdir(parents=True, exist_ok=True)
-        self.registry_file.write_text(json.dumps(self.registry, indent=2))
+        """Advance the generation and write registry.json atomically (call under _locked)"""
+        self.registry["generation"] = self.registry.get("generation", 0) + 1
+        write_registry(self.registry_file, self.registry)
+        self._append_journal()
+
+    def _meta(self) -> Dict:
+        """Everything in the registry but the records and the generation"""
+        return {
+            key: value for key, value in self.registry.items()
+            if key not in ("generation", "messages")
+        }
+
+    def _append_journal(self):
+        """Append this generation's upserts and offloads to journal.jsonl (call under _locked)"""
+        # Only the metadata keys that changed, so a replica built from the
+        # journal alone opens as a full registry without every entry
+        # repeating paths and constraints. registry.json always holds the
+        # last journaled meta, so comparing with what was loaded is enough.
+        meta = {
+            key: value for key, value in self._meta().items()
+            if self._journal_meta.get(key) != value
+        }
+        self._journal_meta.update(copy.deepcopy(meta))
+        entry = {
+            "generation": self.registry["generation"],
+            "ts": datetime.now().timestamp(),
+            "upserts": list(self._journal_upserts.values()),
+            "offloads": self._journal_offloads,
+            "meta": meta,
+        }
+        self._journal_upserts = {}
+        self._journal_offloads = []
+        fd = os.open(self.journal_file, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, (json.dumps(entry) + "\n").encode())
+            size = os.fstat(fd).st_size
+        finally:
+            os.close(fd)
+        if size >= UNSHIPPED_JOURNAL_MAX_BYTES and not any(self.replicas_dir.glob("*.json")):
+            # A replica registered later cannot continue from a cut journal
+            # and falls back to a full resync
+            os.truncate(self.journal_file, 0)
 
     def check_path_constraints(self, path: Path) -> Tuple[bool, Optional[str]]:
         """
@@ -163,7 +418,8 @@ class BridgeRegistry:
                         source: str,
                         target: str,
                         content: str,
-                        path: Path) -> str:
+                        path: Path,
+                        ttl_days: Optional[float] = None) -> str:
         """
         Register a bridge message in the registry.
 
@@ -174,6 +430,8 @@ class BridgeRegistry:
             target: Target namespace
             content: Message content summary
             path: Path to message file
+            ttl_days: Days after creation before the message is archived once
+                completed. Defaults to the max_message_age_days constraint.
 
         Returns:
             Message ID
@@ -187,8 +445,26 @@ class BridgeRegistry:
         if not bridge_valid:
             raise ValueError(f"Bridge constraint violation: {bridge_error}")
 
-        # Create message record
-        message_id = f"{datetime.now().isoformat()}-{source}-{target}"
+        with self._locked():
+            self._sync()
+            return self._add_message(msg_type, priority, source, target, content, path, ttl_days)
+
+    def _add_message(self,
+                     msg_type: str,
+                     priority: Priority,
+                     source: str,
+                     target: str,
+                     content: str,
+                     path: Path,
+                     ttl_days: Optional[float]) -> str:
+        """Append a new record and save (call under _locked)"""
+        # Create message record; concurrent writers can share a timestamp
+        stamp = datetime.now().isoformat()
+        message_id = f"{stamp}-{source}-{target}"
+        suffix = 1
+        while message_id in self._by_id:
+            suffix += 1
+            message_id = f"{stamp}-{source}-{target}-{suffix}"
         message = {
             "id": message_id,
             "type": msg_type,
@@ -201,8 +477,15 @@ class BridgeRegistry:
             "created": datetime.now().isoformat(),
             "updated": datetime.now().isoformat()
         }
+        if ttl_days is not None:
+            message["ttl_days"] = ttl_days
 
         self.registry["messages"].append(message)
+        self._by_id[message_id] = message
+        self._by_path[message["path"]] = message
+        self._journal_upserts[message_id] = message
+        self._counts[(message["status"], message["priority"])] += 1
+        heapq.heappush(self._pending_heap, (message["created"], message_id))
         self.registry["last_check"] = datetime.now().isoformat()
         self._save_registry()
 
@@ -219,13 +502,15 @@ class BridgeRegistry:
         Returns:
             True if updated, False if not found
         """
-        for msg in self.registry["messages"]:
-            if msg["id"] == message_id:
-                msg["status"] = status.value
-                msg["updated"] = datetime.now().isoformat()
-                self._save_registry()
-                return True
-        return False
+        with self._locked():
+            self._sync()
+            msg = self._by_id.get(message_id)
+            if msg is None:
+                return False
+
+            self._set_status(msg, status)
+            self._save_registry()
+            return True
 
     def get_pending_messages(self, target: Optional[str] = None) -> List[Dict]:
         """
@@ -247,9 +532,128 @@ class BridgeRegistry:
 
         return sorted(messages, key=lambda m: m["created"])
 
+    def get_message(self, message_id: str, include_cold: bool = False) -> Optional[Dict]:
+        """
+        Look up a message record by ID.
+
+        Args:
+            message_id: Message ID
+            include_cold: Fall through to cold storage for archived messages
+
+        Returns:
+            Record dict or None if not found
+        """
+        msg = self._by_id.get(message_id)
+        if msg is None and include_cold:
+            msg = self.cold.get(message_id)
+        return msg
+
+    def find_by_path(self, path: Path) -> Optional[Dict]:
+        """
+        Look up the hot record registered for a message file.
+
+        Args:
+            path: Path the message was registered with
+
+        Returns:
+            Record dict or None if not registered
+        """
+        return self._by_path.get(str(path))
+
+    def get_history(self,
+                    target: Optional[str] = None,
+                    source: Optional[str] = None,
+                    include_cold: bool = False) -> List[Dict]:
+        """
+        Get message records in creation order, optionally filtered.
+
+        Args:
+            target: Target namespace to filter by
+            source: Source namespace to filter by
+            include_cold: Also read archived records from cold storage
+
+        Returns:
+            List of message records
+        """
+        records = list(self.registry["messages"])
+        if include_cold:
+            records.extend(self.cold.iter_records())
+
+        if target:
+            records = [m for m in records if m["target"] == target]
+        if source:
+            records = [m for m in records if m["source"] == source]
+
+        return sorted(records, key=lambda m: m["created"])
+
+    def _offload(self, message_ids: List[str]) -> int:
+        """Move records from the hot registry to cold storage (no save)"""
+        if not message_ids:
+            return 0
+        moving = set(message_ids)
+        records = [self._by_id.pop(message_id) for message_id in message_ids]
+        for msg in records:
+            self._counts[(msg["status"], msg["priority"])] -= 1
+            if self._by_path.get(msg["path"]) is msg:
+                del self._by_path[msg["path"]]
+            self._journal_upserts.pop(msg["id"], None)
+        self._journal_offloads.extend(records)
+        self.cold.offload(records)
+        self.registry["messages"] = [
+            msg for msg in self.registry["messages"] if msg["id"] not in moving
+        ]
+        return len(records)
+
+    def compact(self) -> int:
+        """
+        Move every ARCHIVED record still in the hot registry to cold storage.
+
+        Returns:
+            Number of records moved
+        """
+        with self._locked():
+            self._sync()
+            archived = [
+                msg["id"] for msg in self.registry["messages"]
+                if msg["status"] == MessageStatus.ARCHIVED.value
+            ]
+            moved = self._offload(archived)
+            if moved:
+                self._save_registry()
+                self.write_snapshot()
+            return moved
+
+    def write_snapshot(self) -> int:
+        """
+        Write the binary read-only snapshot (registry/registry.snapshot).
+
+        Called after every compaction; readers open it with
+        registry_snapshot.RegistrySnapshot instead of parsing registry.json.
+
+        Returns:
+            Size of the snapshot in bytes
+        """
+        from registry_snapshot import snapshot_path, write_snapshot
+
+        with self._locked():
+            return write_snapshot(
+                self.registry["messages"],
+                snapshot_path(self.base),
+                self.registry["generation"],
+                meta={
+                    "cold": self.cold.stats(),
+                    "last_check": self.registry["last_check"],
+                    "last_cleanup": self.registry["last_cleanup"],
+                },
+            )
+
     def cleanup_old_messages(self, dry_run: bool = False) -> List[str]:
         """
-        Archive messages older than max_message_age_days.
+        Archive completed messages whose TTL has elapsed.
+
+        Only the expiry index is consulted, so the cost is proportional to
+        the number of messages that actually expire. Archived records are
+        moved to cold storage along with any left over in the hot registry.
 
         Args:
             dry_run: If True, return what would be archived without doing it
@@ -257,52 +661,240 @@ class BridgeRegistry:
         Returns:
             List of archived message IDs
         """
-        max_age = self.registry["constraints"]["max_message_age_days"]
-        cutoff = datetime.now() - timedelta(days=max_age)
+        if dry_run:
+            return self.sweep_expired(dry_run=True)
+
+        with self._locked():
+            self._sync()
+            archived_ids = self._archive_expired(datetime.now().timestamp(), None)
+            self._offload([
+                msg["id"] for msg in self.registry["messages"]
+                if msg["status"] == MessageStatus.ARCHIVED.value
+            ])
+            self.registry["last_cleanup"] = datetime.now().isoformat()
+            self._save_registry()
+            self.write_snapshot()
 
-        archived_ids = []
-        new_messages = []
+        return archived_ids
+
+    def _is_live_expiry(self, expires_at: float, message_id: str) -> bool:
+        """Check that a heap entry still describes a COMPLETED message"""
+        msg = self._by_id.get(message_id)
+        return (
+            msg is not None
+            and msg["status"] == MessageStatus.COMPLETED.value
+            and self._expiry_timestamp(msg) == expires_at
+        )
+
+    def _peek_expired(self, cutoff: float, limit: Optional[int]) -> List[str]:
+        """Walk the heap without popping, pruning subtrees that expire after cutoff"""
+        expired = []
+        seen = set()
+        stack = [0]
+        while stack and (limit is None or len(expired) < limit):
+            i = stack.pop()
+            if i >= len(self._expiry_heap):
+                continue
+            expires_at, message_id = self._expiry_heap[i]
+            if expires_at > cutoff:
+                continue
+            if message_id not in seen and self._is_live_expiry(expires_at, message_id):
+                seen.add(message_id)
+                expired.append(message_id)
+            stack.extend((2 * i + 1, 2 * i + 2))
+        return expired
+
+    def sweep_expired(self,
+                      now: Optional[datetime] = None,
+                      limit: Optional[int] = None,
+                      dry_run: bool = False) -> List[str]:
+        """
+        Archive completed messages whose expiry time has passed and move
+        them to cold storage.
 
-        for msg in self.registry["messages"]:
-            msg_date = datetime.fromisoformat(msg["created"])
+        Args:
+            now: Reference time. Defaults to datetime.now()
+            limit: Maximum number of messages to archive in this call
+            dry_run: If True, return what would be archived without doing it
 
-            if msg_date < cutoff and msg["status"] == MessageStatus.COMPLETED.value:
-                archived_ids.append(msg["id"])
-                if not dry_run:
-                    msg["status"] = MessageStatus.ARCHIVED.value
-                    msg["updated"] = datetime.now().isoformat()
+        Returns:
+            List of archived message IDs
+        """
+        cutoff = (now or datetime.now()).timestamp()
 
-            new_messages.append(msg)
+        if dry_run:
+            return self._peek_expired(cutoff, limit)
 
-        if not dry_run:
-            self.registry["messages"] = new_messages
-            self.registry["last_cleanup"] = datetime.now().isoformat()
-            self._save_registry()
+        with self._locked():
+            self._sync()
+            archived_ids = self._archive_expired(cutoff, limit)
+            if archived_ids:
+                self._offload(archived_ids)
+                self._save_registry()
+                self.write_snapshot()
 
         return archived_ids
 
+    def _archive_expired(self, cutoff: float, limit: Optional[int]) -> List[str]:
+        """Pop due heap entries and mark their messages ARCHIVED (no save)"""
+        archived_ids = []
+        while self._expiry_heap and self._expiry_heap[0][0] <= cutoff:
+            if limit is not None and len(archived_ids) >= limit:
+                break
+            expires_at, message_id = heapq.heappop(self._expiry_heap)
+            if not self._is_live_expiry(expires_at, message_id):
+                continue
+            self._set_status(self._by_id[message_id], MessageStatus.ARCHIVED)
+            archived_ids.append(message_id)
+
+        return archived_ids
+
+    def next_expiry(self) -> Optional[datetime]:
+        """Return when the next completed message expires, or None"""
+        with self._thread_lock:
+            while self._expiry_heap and not self._is_live_expiry(*self._expiry_heap[0]):
+                heapq.heappop(self._expiry_heap)
+            if not self._expiry_heap:
+                return None
+            return datetime.fromtimestamp(self._expiry_heap[0][0])
+
+    def _oldest_pending(self) -> Optional[str]:
+        """Creation time of the oldest pending message, dropping stale heap entries"""
+        while self._pending_heap:
+            created, message_id = self._pending_heap[0]
+            msg = self._by_id.get(message_id)
+            if msg is not None and msg["status"] == MessageStatus.PENDING.value:
+                return created
+            heapq.heappop(self._pending_heap)
+        return None
+
     def get_stats(self) -> Dict:
-        """Get registry statistics"""
-        messages = self.registry["messages"]
+        """
+        Get registry statistics across the hot registry and cold storage.
+
+        Counts are maintained incrementally on every mutation, so this does
+        not scan the message list. Use verify_stats() to check for drift.
+        """
+        with self._thread_lock:
+            return self._stats_snapshot()
+
+    def _stats_snapshot(self) -> Dict:
+        cold = self.cold.stats()
+        hot_total = len(self.registry["messages"])
+
+        by_status = {status.value: cold["by_status"].get(status.value, 0) for status in MessageStatus}
+        by_priority = {priority.value: cold["by_priority"].get(priority.value, 0) for priority in Priority}
+        for (status, priority), count in self._counts.items():
+            if status in by_status:
+                by_status[status] += count
+            if priority in by_priority:
+                by_priority[priority] += count
 
         return {
-            "total_messages": len(messages),
-            "by_status": {
-                status.value: len([m for m in messages if m["status"] == status.value])
-                for status in MessageStatus
-            },
-            "by_priority": {
-                priority.value: len([m for m in messages if m["priority"] == priority.value])
-                for priority in Priority
-            },
-            "oldest_pending": min(
-                (m["created"] for m in messages if m["status"] == MessageStatus.PENDING.value),
-                default=None
-            ),
+            "total_messages": hot_total + cold["total"],
+            "hot_messages": hot_total,
+            "cold_messages": cold["total"],
+            "cold_partitions": cold["partitions"],
+            "by_status": by_status,
+            "by_priority": by_priority,
+            "oldest_pending": self._oldest_pending(),
             "last_check": self.registry["last_check"],
             "last_cleanup": self.registry["last_cleanup"]
         }
 
+    def verify_stats(self, repair: bool = False) -> Dict:
+        """
+        Recompute statistics from scratch and compare with the incremental counters.
+
+        Args:
+            repair: Replace the incremental state with the recomputed one
+
+        Returns:
+            Dict with 'consistent' flag and 'drift' per (status, priority) key
+            as {"expected": n, "actual": m}
+        """
+        expected_counts, expected_heap = self._compute_stats_indexes()
+
+        drift = {}
+        for key in set(expected_counts) | set(self._counts):
+            expected = expected_counts.get(key, 0)
+            actual = self._counts.get(key, 0)
+            if expected != actual:
+                drift[f"{key[0]}/{key[1]}"] = {"expected": expected, "actual": actual}
+
+        expected_oldest = expected_heap[0][0] if expected_heap else None
+        actual_oldest = self._oldest_pending()
+        if expected_oldest != actual_oldest:
+            drift["oldest_pending"] = {"expected": expected_oldest, "actual": actual_oldest}
+
+        if repair and drift:
+            self._counts, self._pending_heap = expected_counts, expected_heap
+
+        return {"consistent": not drift, "drift": drift}
+
+class ExpirySweeper:
+    """
+    Background task that archives expired messages continuously.
+
+    Sleeps until the next expiry (capped at max_interval) and archives at
+    most batch_size messages per wake-up, so archival happens in small
+    increments instead of one large cleanup pass.
+    """
+
+    def __init__(self,
+                 registry: BridgeRegistry,
+                 max_interval: float = 60.0,
+                 batch_size: int = 100):
+        """
+        Initialize the sweeper.
+
+        Args:
+            registry: Registry to sweep
+            max_interval: Longest time to sleep between sweeps, in seconds
+            batch_size: Maximum messages archived per sweep
+        """
+        self.registry = registry
+        self.max_interval = max_interval
+        self.batch_size = batch_size
+        self.archived_count = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def run_once(self) -> List[str]:
+        """Archive one batch of expired messages"""
+        archived = self.registry.sweep_expired(limit=self.batch_size)
+        self.archived_count += len(archived)
+        return archived
+
+    def _seconds_until_next(self) -> float:
+        next_expiry = self.registry.next_expiry()
+        if next_expiry is None:
+            return self.max_interval
+        delay = (next_expiry - datetime.now()).total_seconds()
+        return min(max(delay, 0.0), self.max_interval)
+
+    def _run(self):
+        while not self._stop.is_set():
+            archived = self.run_once()
+            # A full batch means more may be due; yield briefly and continue
+            delay = 0.0 if len(archived) >= self.batch_size else self._seconds_until_next()
+            self._stop.wait(delay)
+
+    def start(self):
+        """Start sweeping in a daemon thread"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="bridge-expiry-sweeper", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        """Stop the background thread"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
 
 if __name__ == "__main__":
     # Example usage
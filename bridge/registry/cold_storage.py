@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Cold Storage
+Compressed, month-partitioned storage for archived bridge registry records.
+
+Layout under bridge/registry/cold/:
+    index.json          Per-partition counts (total, by status, by priority)
+    ids.jsonl           Message ID → partition, one line appended per record,
+                        loaded only for lookups
+    YYYY-MM.jsonl.gz    One gzip member appended per offload batch
+
+Offloading appends to the partitions and the ID log and rewrites only the
+small partition summary, so a batch costs the same however much is archived.
+"""
+
+import gzip
+import json
+import os
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+
+COLD_INDEX_VERSION = 1
+
+
+def partition_for(record: Dict) -> str:
+    """Month partition (YYYY-MM) a record belongs to, by creation time"""
+    return record["created"][:7]
+
+
+def _write_json_atomic(path: Path, data: Dict):
+    tmp_file = path.with_suffix(f".tmp.{os.getpid()}")
+    tmp_file.write_text(json.dumps(data))
+    os.replace(tmp_file, path)
+
+
+class ColdStore:
+    """
+    Append-only archive tier for registry records.
+
+    Only the small partition summary is read eagerly; the ID map and the
+    compressed partitions are opened on demand.
+    """
+
+    def __init__(self, cold_dir: Path):
+        """
+        Initialize the cold store.
+
+        Args:
+            cold_dir: Directory holding partitions and indexes
+        """
+        self.cold_dir = Path(cold_dir)
+        self.index_file = self.cold_dir / "index.json"
+        self.ids_file = self.cold_dir / "ids.jsonl"
+        # Written whole on every offload before the ID log existed; still read
+        self.legacy_ids_file = self.cold_dir / "ids.json"
+        self.partitions = self._load_index()
+        self._ids: Optional[Dict[str, str]] = None
+        self._totals = self._sum_partitions()
+
+    def _load_index(self) -> Dict[str, Dict]:
+        if not self.index_file.exists():
+            return {}
+        try:
+            data = json.loads(self.index_file.read_text())
+        except json.JSONDecodeError:
+            print(f"Warning: Could not parse {self.index_file}, cold counts unavailable")
+            return {}
+        return data.get("partitions", {})
+
+    def _sum_partitions(self) -> Dict:
+        by_status: Counter = Counter()
+        by_priority: Counter = Counter()
+        total = 0
+        for summary in self.partitions.values():
+            total += summary["count"]
+            by_status.update(summary["by_status"])
+            by_priority.update(summary["by_priority"])
+        return {"total": total, "by_status": by_status, "by_priority": by_priority}
+
+    def _load_ids(self) -> Dict[str, str]:
+        if self._ids is None:
+            self._ids = {}
+            if self.legacy_ids_file.exists():
+                try:
+                    self._ids = json.loads(self.legacy_ids_file.read_text())
+                except json.JSONDecodeError:
+                    print(f"Warning: Could not parse {self.legacy_ids_file}, older cold lookups unavailable")
+            if self.ids_file.exists():
+                with open(self.ids_file, encoding="utf-8") as f:
+                    for line in f:
+                        try:
+                            entry = json.loads(line)
+                        except json.JSONDecodeError:
+                            # Torn final line from an interrupted offload
+                            continue
+                        self._ids[entry["id"]] = entry["partition"]
+        return self._ids
+
+    def partition_file(self, partition: str) -> Path:
+        return self.cold_dir / f"{partition}.jsonl.gz"
+
+    def offload(self, records: List[Dict]) -> int:
+        """
+        Append records to their month partitions and update the indexes.
+
+        Args:
+            records: Registry records (normally ARCHIVED) to move to cold storage
+
+        Returns:
+            Number of records written
+        """
+        if not records:
+            return 0
+
+        self.cold_dir.mkdir(parents=True, exist_ok=True)
+
+        by_partition: Dict[str, List[Dict]] = {}
+        for record in records:
+            by_partition.setdefault(partition_for(record), []).append(record)
+
+        for partition, batch in sorted(by_partition.items()):
+            payload = "".join(json.dumps(record) + "\n" for record in batch)
+            with gzip.open(self.partition_file(partition), "at", encoding="utf-8") as f:
+                f.write(payload)
+
+            summary = self.partitions.setdefault(
+                partition, {"count": 0, "by_status": {}, "by_priority": {}}
+            )
+            summary["count"] += len(batch)
+            for field, key in (("by_status", "status"), ("by_priority", "priority")):
+                counts = Counter(summary[field])
+                counts.update(record[key] for record in batch)
+                summary[field] = dict(counts)
+            id_lines = "".join(
+                json.dumps({"id": record["id"], "partition": partition}) + "\n" for record in batch
+            )
+            with open(self.ids_file, "a", encoding="utf-8") as f:
+                f.write(id_lines)
+            if self._ids is not None:
+                self._ids.update((record["id"], partition) for record in batch)
+
+        self._totals["total"] += len(records)
+        self._totals["by_status"].update(record["status"] for record in records)
+        self._totals["by_priority"].update(record["priority"] for record in records)
+
+        _write_json_atomic(self.index_file, {
+            "version": COLD_INDEX_VERSION,
+            "partitions": self.partitions,
+        })
+        return len(records)
+
+    def iter_partition(self, partition: str) -> Iterator[Dict]:
+        """Yield every record in one month partition"""
+        path = self.partition_file(partition)
+        if not path.exists():
+            return
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+    def iter_records(self) -> Iterator[Dict]:
+        """Yield every cold record, oldest partition first"""
+        for partition in sorted(self.partitions):
+            yield from self.iter_partition(partition)
+
+    def get(self, message_id: str) -> Optional[Dict]:
+        """
+        Fetch an archived record by ID.
+
+        Args:
+            message_id: Message ID
+
+        Returns:
+            Record dict or None if not in cold storage
+        """
+        partition = self._load_ids().get(message_id)
+        if partition is None:
+            return None
+        for record in self.iter_partition(partition):
+            if record["id"] == message_id:
+                return record
+        return None
+
+    def __contains__(self, message_id: str) -> bool:
+        return message_id in self._load_ids()
+
+    def stats(self) -> Dict:
+        """Aggregate counts across partitions, maintained on offload"""
+        return {
+            "total": self._totals["total"],
+            "by_status": dict(self._totals["by_status"]),
+            "by_priority": dict(self._totals["by_priority"]),
+            "partitions": len(self.partitions),
+        }
@@ -0,0 +1,397 @@
+#!/usr/bin/env python3
+"""
+Inbox Index
+Cursor-based pagination and O(1) Message-ID lookup for bridge inboxes.
+
+Large inboxes are never globbed or sorted as a whole. The directory is read
+with os.scandir() only when its mtime has changed since the last scan, and
+only files not already in the index have their headers parsed; the resulting
+entries are kept in (priority, queue number) order so a page is a bisect
+plus a slice.
+"""
+
+import argparse
+import base64
+import bisect
+import json
+import os
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from bridge_registry import Priority
+
+
+INDEX_VERSION = 1
+HEADER_LINES = 20
+DEFAULT_PAGE_SIZE = 50
+
+PRIORITY_RANK = {priority.value: rank for rank, priority in enumerate(Priority)}
+UNKNOWN_QUEUE_NUMBER = 999999
+# Rescan even an unchanged directory this often, in case an mtime update was missed
+FULL_RESCAN_INTERVAL = 30.0
+# Only trust a directory mtime this much older than the scan that read it:
+# a file added within the same timestamp tick would not change it
+MTIME_SLACK_NS = 2_000_000_000
+
+_HEADER_PATTERNS = {
+    "message_id": re.compile(r"^\*\*Message-ID\*\*:\s*(.+)$", re.MULTILINE),
+    "queue_number": re.compile(r"^\*\*Queue-Number\*\*:\s*(\d+)", re.MULTILINE),
+    "from": re.compile(r"^\*\*From\*\*:\s*(.+)$", re.MULTILINE),
+    "to": re.compile(r"^\*\*To\*\*:\s*(.+)$", re.MULTILINE),
+    "priority": re.compile(r"^\*\*Priority\*\*:\s*(CRITICAL|HIGH|NORMAL|INFO)", re.MULTILINE),
+    "title_priority": re.compile(r"^# \[PRIORITY:\s*(CRITICAL|HIGH|NORMAL|INFO)\]", re.MULTILINE),
+}
+
+
+def parse_header(message_path: Path) -> Dict:
+    """
+    Parse the header block of a bridge message without reading the body.
+
+    Args:
+        message_path: Path to message file
+
+    Returns:
+        Dict with message_id, queue_number, from, to and priority
+    """
+    lines = []
+    with open(message_path, "r", encoding="utf-8", errors="replace") as f:
+        for _ in range(HEADER_LINES):
+            line = f.readline()
+            if not line:
+                break
+            lines.append(line)
+    head = "".join(lines)
+
+    fields = {}
+    for field, pattern in _HEADER_PATTERNS.items():
+        match = pattern.search(head)
+        if match:
+            fields[field] = match.group(1).strip()
+
+    # Fall back to the filename for anything the header does not carry:
+    # bridge-send.sh names files "{queue_number}-{message_id}.md"
+    name_match = re.match(r"^(\d+)-(.+)$", message_path.stem)
+    queue_number = fields.get("queue_number") or (name_match.group(1) if name_match else None)
+    message_id = fields.get("message_id") or (name_match.group(2) if name_match else message_path.stem)
+
+    return {
+        "message_id": message_id,
+        "queue_number": int(queue_number) if queue_number else UNKNOWN_QUEUE_NUMBER,
+        "from": fields.get("from"),
+        "to": fields.get("to"),
+        "priority": fields.get("priority") or fields.get("title_priority") or Priority.NORMAL.value,
+    }
+
+
+def sort_key(entry: Dict) -> Tuple[int, int, str]:
+    """Inbox order: priority first, then queue number, then filename"""
+    return (
+        PRIORITY_RANK.get(entry["priority"], len(PRIORITY_RANK)),
+        entry["queue_number"],
+        entry["filename"],
+    )
+
+
+def encode_cursor(entry: Dict) -> str:
+    """Encode an entry's sort key as an opaque pagination cursor"""
+    raw = json.dumps(list(sort_key(entry)), separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[int, int, str]:
+    """
+    Decode a pagination cursor back into a sort key.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        rank, queue_number, filename = json.loads(base64.urlsafe_b64decode(padded))
+        return (int(rank), int(queue_number), str(filename))
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+class InboxIndex:
+    """
+    Persistent index over a single message directory.
+
+    Maintains:
+    - Entries sorted by (priority, queue number, filename)
+    - Message-ID → filename map for O(1) lookup
+
+    The index is cached as JSON so repeated calls only pay for a directory
+    listing plus header parsing of files that arrived since the last call.
+    """
+
+    def __init__(self, directory: Path, cache_file: Optional[Path] = None):
+        """
+        Initialize the inbox index.
+
+        Args:
+            directory: Message directory to index (e.g. bridge/inbox/code)
+            cache_file: Where to persist the index. Not persisted if None.
+        """
+        self.directory = Path(directory)
+        self.cache_file = Path(cache_file) if cache_file else None
+        self.entries: Dict[str, Dict] = {}
+        self.by_id: Dict[str, str] = {}
+        self._ordered: List[Tuple[int, int, str]] = []
+        # Directory mtime at the last full scan (None: scan on next refresh)
+        self.scanned_mtime: Optional[int] = None
+        self._last_scan = 0.0
+        self._load_cache()
+
+    @classmethod
+    def for_agent(cls, bridge_base: Path, agent: str) -> "InboxIndex":
+        """Index for bridge/inbox/<agent>, cached under bridge/registry/inbox_index"""
+        bridge_base = Path(bridge_base)
+        return cls(
+            bridge_base / "inbox" / agent,
+            bridge_base / "registry" / "inbox_index" / f"{agent}.json",
+        )
+
+    @classmethod
+    def for_queue(cls, bridge_base: Path) -> "InboxIndex":
+        """Index for bridge/queue/pending (messages not yet delivered)"""
+        bridge_base = Path(bridge_base)
+        return cls(
+            bridge_base / "queue" / "pending",
+            bridge_base / "registry" / "inbox_index" / "_queue_pending.json",
+        )
+
+    def _load_cache(self):
+        """Load cached entries if the cache matches this directory"""
+        if not self.cache_file or not self.cache_file.exists():
+            return
+        try:
+            data = json.loads(self.cache_file.read_text())
+        except (json.JSONDecodeError, OSError):
+            return
+        if data.get("version") != INDEX_VERSION or data.get("directory") != str(self.directory):
+            return
+        self.entries = data.get("entries", {})
+        self.scanned_mtime = data.get("scanned_mtime")
+        self._last_scan = time.monotonic()
+        self._reindex()
+
+    def _save_cache(self):
+        """Persist entries atomically"""
+        if not self.cache_file:
+            return
+        self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = self.cache_file.with_suffix(f".tmp.{os.getpid()}")
+        tmp_file.write_text(json.dumps({
+            "version": INDEX_VERSION,
+            "directory": str(self.directory),
+            "scanned_mtime": self.scanned_mtime,
+            "entries": self.entries,
+        }))
+        os.replace(tmp_file, self.cache_file)
+
+    def _reindex(self):
+        """Rebuild the ordered list and ID map from entries"""
+        self._ordered = sorted(sort_key(e) for e in self.entries.values())
+        self.by_id = {e["message_id"]: name for name, e in self.entries.items()}
+
+    def refresh(self, force: bool = False) -> Tuple[int, int]:
+        """
+        Bring the index in line with the directory contents.
+
+        Adding, removing or renaming a file changes the directory's mtime, so
+        while it matches the last scan (and that scan is under
+        FULL_RESCAN_INTERVAL old) nothing is listed. Otherwise only newly
+        arrived files are opened; removed files are dropped.
+
+        Args:
+            force: Scan even if the directory looks unchanged
+
+        Returns:
+            Tuple of (added_count, removed_count)
+        """
+        try:
+            mtime = os.stat(self.directory).st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        now = time.monotonic()
+        if (not force and mtime is not None and mtime == self.scanned_mtime
+                and now - self._last_scan < FULL_RESCAN_INTERVAL):
+            return 0, 0
+
+        started = time.time_ns()
+        if mtime is None:
+            present = set()
+        else:
+            with os.scandir(self.directory) as it:
+                present = {
+                    entry.name for entry in it
+                    if entry.name.endswith(".md")
+                    and not entry.name.startswith("_")
+                    and entry.is_file()
+                }
+
+        removed = [name for name in self.entries if name not in present]
+        added = [name for name in present if name not in self.entries]
+
+        for name in removed:
+            del self.entries[name]
+
+        for name in added:
+            try:
+                header = parse_header(self.directory / name)
+            except OSError:
+                # File vanished between listing and reading (claimed by another agent)
+                continue
+            header["filename"] = name
+            self.entries[name] = header
+
+        previous_mtime = self.scanned_mtime
+        self.scanned_mtime = mtime if mtime is not None and started - mtime > MTIME_SLACK_NS else None
+        self._last_scan = now
+        if removed or added:
+            self._reindex()
+        if removed or added or self.scanned_mtime != previous_mtime:
+            self._save_cache()
+
+        return len(added), len(removed)
+
+    def discard(self, filename: str) -> bool:
+        """
+        Drop an entry without rescanning (e.g. after a consumer archived it).
+
+        Returns:
+            True if the entry was indexed
+        """
+        entry = self.entries.pop(filename, None)
+        if entry is None:
+            return False
+        key = sort_key(entry)
+        i = bisect.bisect_left(self._ordered, key)
+        if i < len(self._ordered) and self._ordered[i] == key:
+            del self._ordered[i]
+        if self.by_id.get(entry["message_id"]) == filename:
+            del self.by_id[entry["message_id"]]
+        self._save_cache()
+        return True
+
+    def __len__(self) -> int:
+        return len(self._ordered)
+
+    def list_messages(self,
+                      limit: int = DEFAULT_PAGE_SIZE,
+                      after: Optional[str] = None) -> Tuple[List[Dict], Optional[str]]:
+        """
+        Return one page of messages in (priority, queue number) order.
+
+        Args:
+            limit: Maximum number of messages to return
+            after: Cursor returned by a previous call
+
+        Returns:
+            Tuple of (page_entries, next_cursor). next_cursor is None on the last page.
+        """
+        if limit <= 0:
+            raise ValueError(f"limit must be positive, not {limit}")
+
+        start = 0
+        if after:
+            # Keyset pagination: resume strictly after the cursor's sort key,
+            # so messages consumed meanwhile never shift the next page
+            start = bisect.bisect_right(self._ordered, decode_cursor(after))
+
+        window = self._ordered[start:start + limit]
+        page = [dict(self.entries[name], path=str(self.directory / name)) for _, _, name in window]
+
+        next_cursor = None
+        if page and start + limit < len(self._ordered):
+            next_cursor = encode_cursor(page[-1])
+
+        return page, next_cursor
+
+    def next_message(self) -> Optional[Dict]:
+        """Return the highest-priority, lowest-queue-number message"""
+        page, _ = self.list_messages(limit=1)
+        return page[0] if page else None
+
+    def find(self, message_id: str) -> Optional[Path]:
+        """
+        Look up a message file by Message-ID.
+
+        Args:
+            message_id: Full Message-ID from the message header
+
+        Returns:
+            Path to message file or None if not indexed
+        """
+        name = self.by_id.get(message_id)
+        if name is None:
+            return None
+        return self.directory / name
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Paginated bridge inbox listing and lookup")
+    parser.add_argument("--bridge-root", type=Path,
+                        default=Path.home() / "devvyn-meta-project" / "bridge",
+                        help="Bridge directory (default: ~/devvyn-meta-project/bridge)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    list_cmd = sub.add_parser("list", help="List one page of an agent's inbox")
+    list_cmd.add_argument("agent")
+    list_cmd.add_argument("--limit", type=int, default=DEFAULT_PAGE_SIZE)
+    list_cmd.add_argument("--after", default=None, help="Cursor from a previous page")
+    list_cmd.add_argument("--json", action="store_true", help="Machine-readable output")
+
+    next_cmd = sub.add_parser("next", help="Print path of the next message to process")
+    next_cmd.add_argument("agent")
+
+    find_cmd = sub.add_parser("find", help="Print path of a message by Message-ID")
+    find_cmd.add_argument("agent")
+    find_cmd.add_argument("message_id")
+
+    args = parser.parse_args(argv)
+    index = InboxIndex.for_agent(args.bridge_root, args.agent)
+    index.refresh()
+
+    if args.command == "list":
+        try:
+            page, next_cursor = index.list_messages(limit=args.limit, after=args.after)
+        except ValueError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return 2
+        if args.json:
+            print(json.dumps({"messages": page, "next_cursor": next_cursor, "total": len(index)}))
+        else:
+            for entry in page:
+                print(f"{entry['priority']:8s} {entry['queue_number']:>6} {entry['message_id']}  {entry['path']}")
+            if next_cursor:
+                print(f"# next: --after {next_cursor}")
+        return 0
+
+    if args.command == "next":
+        entry = index.next_message()
+        if entry is None:
+            print(f"No pending messages for agent '{args.agent}'", file=sys.stderr)
+            return 1
+        print(entry["path"])
+        return 0
+
+    # find: agent inbox first, then undelivered queue
+    path = index.find(args.message_id)
+    if path is None:
+        queue_index = InboxIndex.for_queue(args.bridge_root)
+        queue_index.refresh()
+        path = queue_index.find(args.message_id)
+    if path is None:
+        print(f"Message ID '{args.message_id}' not found", file=sys.stderr)
+        return 1
+    print(path)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Lifecycle Trace
+Per-message span timestamps across the bridge lifecycle, plus a latency report.
+
+Every component appends one JSON line per stage to
+bridge/registry/traces/lifecycle.jsonl:
+
+    {"message_id": ..., "stage": "queued", "ts": 1728000000.123456,
+     "agent": "code", "component": "bridge-send.sh"}
+
+Stages, in order: created, queued, dispatched, received, processed, archived.
+Shell scripts write the same format through scripts/bridge-trace.sh. Set
+BRIDGE_TRACE=0 to disable recording.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+
+STAGES = ("created", "queued", "dispatched", "received", "processed", "archived")
+STAGE_ORDER = {stage: i for i, stage in enumerate(STAGES)}
+PERCENTILES = (50, 95, 99)
+
+
+def trace_file(bridge_base: Path) -> Path:
+    """Trace log location for a bridge directory"""
+    return Path(bridge_base) / "registry" / "traces" / "lifecycle.jsonl"
+
+
+def tracing_enabled() -> bool:
+    return os.environ.get("BRIDGE_TRACE", "1") != "0"
+
+
+def record_span(bridge_base: Path,
+                message_id: str,
+                stage: str,
+                agent: Optional[str] = None,
+                component: str = "python",
+                ts: Optional[float] = None):
+    """
+    Append one span to the trace log.
+
+    The line is written with a single O_APPEND write, so concurrent
+    writers (Python or shell) never interleave partial lines.
+
+    Args:
+        bridge_base: Bridge directory
+        message_id: Message-ID from the message header
+        stage: One of STAGES
+        agent: Agent performing or receiving the stage
+        component: Script or module recording the span
+        ts: Epoch seconds. Defaults to now.
+    """
+    if not tracing_enabled():
+        return
+    if stage not in STAGE_ORDER:
+        raise ValueError(f"Unknown lifecycle stage '{stage}', expected one of {STAGES}")
+
+    span = {
+        "message_id": message_id,
+        "stage": stage,
+        "ts": time.time() if ts is None else ts,
+        "agent": agent,
+        "component": component,
+    }
+    path = trace_file(bridge_base)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, (json.dumps(span) + "\n").encode())
+    finally:
+        os.close(fd)
+
+
+def load_spans(path: Path) -> List[Dict]:
+    """Load spans, skipping malformed lines"""
+    spans: List[Dict] = []
+    if not path.exists():
+        return spans
+    with path.open() as f:
+        for line in f:
+            try:
+                spans.append(json.loads(line))
+            except json.JSONDecodeError:
+                pass
+    return spans
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * pct // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def summarize(samples: List[float]) -> Dict:
+    samples = sorted(samples)
+    summary = {"count": len(samples)}
+    for pct in PERCENTILES:
+        summary[f"p{pct}_ms"] = round(percentile(samples, pct) * 1000, 3)
+    summary["max_ms"] = round(samples[-1] * 1000, 3) if samples else 0.0
+    return summary
+
+
+def build_report(spans: Iterable[Dict], agent: Optional[str] = None) -> Dict:
+    """
+    Compute per-stage latency percentiles and per-agent breakdowns.
+
+    For each message, stages are ordered and each adjacent pair of recorded
+    stages becomes one transition sample (e.g. "queued→dispatched"); a
+    missing stage merges its neighbours ("created→received"). The
+    end-to-end sample runs from the first to the last recorded stage.
+
+    Args:
+        spans: Span dicts as written by record_span
+        agent: Only include messages delivered to this agent
+
+    Returns:
+        Dict with message count, overall transitions and per-agent transitions
+    """
+    by_message: Dict[str, Dict[str, Dict]] = defaultdict(dict)
+    for span in spans:
+        stage = span.get("stage")
+        if stage not in STAGE_ORDER:
+            continue
+        stages = by_message[span["message_id"]]
+        # Keep the first occurrence of a stage (retries re-record later ones)
+        if stage not in stages or span["ts"] < stages[stage]["ts"]:
+            stages[stage] = span
+
+    overall: Dict[str, List[float]] = defaultdict(list)
+    per_agent: Dict[str, Dict[str, List[float]]] = defaultdict(lambda: defaultdict(list))
+    messages = 0
+
+    for stages in by_message.values():
+        ordered = sorted(stages.values(), key=lambda s: STAGE_ORDER[s["stage"]])
+        recipient = next(
+            (s.get("agent") for s in reversed(ordered)
+             if s["stage"] not in ("created", "queued") and s.get("agent")),
+            None,
+        ) or "unknown"
+        if agent and recipient != agent:
+            continue
+        messages += 1
+
+        for prev, cur in zip(ordered, ordered[1:]):
+            key = f"{prev['stage']}→{cur['stage']}"
+            delta = max(cur["ts"] - prev["ts"], 0.0)
+            overall[key].append(delta)
+            per_agent[recipient][key].append(delta)
+        if len(ordered) > 1:
+            delta = max(ordered[-1]["ts"] - ordered[0]["ts"], 0.0)
+            overall["end_to_end"].append(delta)
+            per_agent[recipient]["end_to_end"].append(delta)
+
+    def ordered_summary(samples_by_key: Dict[str, List[float]]) -> Dict:
+        def key_order(key: str):
+            if key == "end_to_end":
+                return (len(STAGES), 0)
+            start, end = key.split("→")
+            return (STAGE_ORDER[start], STAGE_ORDER[end])
+        return {key: summarize(samples_by_key[key]) for key in sorted(samples_by_key, key=key_order)}
+
+    return {
+        "messages": messages,
+        "transitions": ordered_summary(overall),
+        "by_agent": {name: ordered_summary(samples) for name, samples in sorted(per_agent.items())},
+    }
+
+
+def print_report(report: Dict):
+    def table(transitions: Dict):
+        print(f"  {'transition':28s} {'count':>6s} {'p50 ms':>10s} {'p95 ms':>10s} {'p99 ms':>10s} {'max ms':>10s}")
+        for key, s in transitions.items():
+            print(f"  {key:28s} {s['count']:6d} {s['p50_ms']:10.1f} {s['p95_ms']:10.1f} {s['p99_ms']:10.1f} {s['max_ms']:10.1f}")
+
+    print(f"Bridge lifecycle latency ({report['messages']} messages)")
+    print("=" * 80)
+    table(report["transitions"])
+    for name, transitions in report["by_agent"].items():
+        print(f"\nAgent: {name}")
+        print("-" * 80)
+        table(transitions)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Bridge message lifecycle tracing")
+    parser.add_argument("--bridge-root", type=Path,
+                        default=Path.home() / "devvyn-meta-project" / "bridge",
+                        help="Bridge directory (default: ~/devvyn-meta-project/bridge)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    record_cmd = sub.add_parser("record", help="Append a span")
+    record_cmd.add_argument("message_id")
+    record_cmd.add_argument("stage", choices=STAGES)
+    record_cmd.add_argument("--agent")
+    record_cmd.add_argument("--component", default="cli")
+
+    report_cmd = sub.add_parser("report", help="Per-stage latency percentiles")
+    report_cmd.add_argument("--agent", help="Only messages delivered to this agent")
+    report_cmd.add_argument("--json", action="store_true", help="Machine-readable output")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "record":
+        record_span(args.bridge_root, args.message_id, args.stage, args.agent, args.component)
+        return 0
+
+    report = build_report(load_spans(trace_file(args.bridge_root)), agent=args.agent)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -11,6 +11,7 @@ from typing import Optional, Dict, List, Tuple
 from datetime import datetime
 
 from bridge_registry import BridgeRegistry, Priority, MessageStatus
+from lifecycle_trace import record_span
 
 
 class MessageValidator:
@@ -201,6 +202,7 @@ class MessageValidator:
 
         # Create message content
         message_id = f"{datetime.now().isoformat()}-{msg_from}-{msg_to}"
+        record_span(self.bridge_base, message_id, "created", msg_from, "message_validator")
 
         message_content = f"""# {subject}
 
@@ -234,6 +236,8 @@ class MessageValidator:
                 content=content,
                 path=message_path
             )
+            # Written straight into the inbox, so there is no queue stage
+            record_span(self.bridge_base, message_id, "dispatched", msg_to, "message_validator")
             return True, registered_id, message_path
         except Exception as e:
             # Clean up file if registration fails
@@ -256,6 +260,9 @@ class MessageValidator:
 
         results = []
 
+        # Another agent may have registered some of these since we loaded
+        self.registry.refresh()
+
         for msg_file in inbox_dir.glob("*.md"):
             # Skip example files
             if msg_file.name.startswith("_"):
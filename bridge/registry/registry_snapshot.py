@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Registry Snapshot
+Compact binary, read-only snapshot of the hot registry for mmap readers.
+
+Dashboards and triage scripts can open the snapshot and answer lookups and
+counts without parsing registry.json. Layout (little-endian):
+
+    header   64 bytes   magic, version, record count, generation, offsets
+    records  N x 88     fixed-width, sorted by message ID
+    strings  UTF-8      deduplicated string table referenced by (offset, length)
+
+Each record holds (offset, length) pairs for its eight string fields, a
+status code, a priority code, the creation time as a float timestamp and
+the TTL in days (NaN when unset).
+"""
+
+import argparse
+import json
+import math
+import mmap
+import os
+import struct
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from bridge_registry import BridgeRegistry, MessageStatus, Priority
+
+
+MAGIC = b"BRSNAP1\0"
+SNAPSHOT_VERSION = 1
+
+HEADER = struct.Struct("<8sIIQQQQQd")
+HEADER_SIZE = 64
+STRING_FIELDS = ("id", "type", "source", "target", "path", "content_summary", "created", "updated")
+RECORD = struct.Struct("<16IBB6xdd")
+
+STATUS_CODES = [status.value for status in MessageStatus]
+PRIORITY_CODES = [priority.value for priority in Priority]
+_STATUS_OFFSET = 64
+_PRIORITY_OFFSET = 65
+
+
+def snapshot_path(bridge_base: Path) -> Path:
+    """Default snapshot location for a bridge directory"""
+    return Path(bridge_base) / "registry" / "registry.snapshot"
+
+
+def write_snapshot(messages: List[Dict], path: Path, generation: int, meta: Optional[Dict] = None) -> int:
+    """
+    Write a snapshot atomically (temp file + os.replace).
+
+    Args:
+        messages: Hot registry records
+        path: Destination file
+        generation: Registry generation the snapshot reflects
+        meta: Extra JSON-serialisable data (e.g. cold-tier totals)
+
+    Returns:
+        Size of the snapshot in bytes
+    """
+    strings = bytearray()
+    interned: Dict[str, int] = {}
+
+    def intern(value: str) -> tuple:
+        encoded = value.encode("utf-8")
+        offset = interned.get(value)
+        if offset is None:
+            offset = len(strings)
+            interned[value] = offset
+            strings.extend(encoded)
+        return offset, len(encoded)
+
+    records = bytearray()
+    for msg in sorted(messages, key=lambda m: m["id"]):
+        refs = []
+        for field in STRING_FIELDS:
+            refs.extend(intern(str(msg.get(field, ""))))
+        ttl_days = msg.get("ttl_days")
+        records.extend(RECORD.pack(
+            *refs,
+            STATUS_CODES.index(msg["status"]),
+            PRIORITY_CODES.index(msg["priority"]),
+            datetime.fromisoformat(msg["created"]).timestamp(),
+            float("nan") if ttl_days is None else float(ttl_days),
+        ))
+
+    meta_offset, meta_len = intern(json.dumps(meta or {}, sort_keys=True))
+    records_offset = HEADER_SIZE
+    strings_offset = records_offset + len(records)
+
+    header = HEADER.pack(
+        MAGIC, SNAPSHOT_VERSION, len(messages), generation,
+        strings_offset, len(strings), meta_offset, meta_len,
+        datetime.now().timestamp(),
+    ).ljust(HEADER_SIZE, b"\0")
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = path.with_name(f"{path.name}.tmp.{os.getpid()}")
+    with open(tmp_file, "wb") as f:
+        f.write(header)
+        f.write(records)
+        f.write(strings)
+    os.replace(tmp_file, path)
+    return HEADER_SIZE + len(records) + len(strings)
+
+
+class RegistrySnapshot:
+    """
+    Zero-copy reader over a registry snapshot.
+
+    Strings are decoded only for the fields a caller actually touches;
+    counts and status filters read single bytes from the mapped records.
+    """
+
+    def __init__(self, path: Path):
+        """
+        Map a snapshot file.
+
+        Args:
+            path: Snapshot file written by write_snapshot()
+
+        Raises:
+            ValueError: If the file is not a compatible snapshot
+        """
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._buf = memoryview(self._mm)
+
+        (magic, version, self.count, self.generation, self._strings_offset,
+         self._strings_size, meta_offset, meta_len, self.written_at) = HEADER.unpack_from(self._buf, 0)
+        if magic != MAGIC or version != SNAPSHOT_VERSION:
+            self.close()
+            raise ValueError(f"{self.path} is not a version {SNAPSHOT_VERSION} registry snapshot")
+        self._meta_ref = (meta_offset, meta_len)
+
+    @classmethod
+    def open(cls, bridge_base: Path) -> "RegistrySnapshot":
+        """Open the default snapshot for a bridge directory"""
+        return cls(snapshot_path(bridge_base))
+
+    def close(self):
+        self._buf.release()
+        self._mm.close()
+
+    def __enter__(self) -> "RegistrySnapshot":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _record_offset(self, i: int) -> int:
+        return HEADER_SIZE + i * RECORD.size
+
+    def _string(self, offset: int, length: int) -> str:
+        start = self._strings_offset + offset
+        return str(self._buf[start:start + length], "utf-8")
+
+    def _field(self, i: int, field_index: int) -> str:
+        offset, length = struct.unpack_from("<II", self._buf, self._record_offset(i) + 8 * field_index)
+        return self._string(offset, length)
+
+    def meta(self) -> Dict:
+        """Extra data stored with the snapshot"""
+        return json.loads(self._string(*self._meta_ref))
+
+    def record(self, i: int) -> Dict:
+        """Decode record i into a registry-style dict"""
+        values = RECORD.unpack_from(self._buf, self._record_offset(i))
+        msg = {
+            field: self._string(values[2 * n], values[2 * n + 1])
+            for n, field in enumerate(STRING_FIELDS)
+        }
+        msg["status"] = STATUS_CODES[values[16]]
+        msg["priority"] = PRIORITY_CODES[values[17]]
+        if not math.isnan(values[19]):
+            msg["ttl_days"] = values[19]
+        return msg
+
+    def get(self, message_id: str) -> Optional[Dict]:
+        """Binary search by message ID; decodes only the probed IDs"""
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._field(mid, 0) < message_id:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.count and self._field(lo, 0) == message_id:
+            return self.record(lo)
+        return None
+
+    def status_of(self, i: int) -> str:
+        return STATUS_CODES[self._buf[self._record_offset(i) + _STATUS_OFFSET]]
+
+    def iter_records(self, status: Optional[MessageStatus] = None, target: Optional[str] = None) -> Iterator[Dict]:
+        """Yield records, filtering on status and target before decoding"""
+        status_code = None if status is None else STATUS_CODES.index(status.value)
+        for i in range(self.count):
+            base = self._record_offset(i)
+            if status_code is not None and self._buf[base + _STATUS_OFFSET] != status_code:
+                continue
+            if target is not None and self._field(i, 3) != target:
+                continue
+            yield self.record(i)
+
+    def get_pending_messages(self, target: Optional[str] = None) -> List[Dict]:
+        """Same result as BridgeRegistry.get_pending_messages"""
+        return sorted(self.iter_records(MessageStatus.PENDING, target), key=lambda m: m["created"])
+
+    def stats(self) -> Dict:
+        """Status and priority counts from the code bytes only"""
+        by_status = [0] * len(STATUS_CODES)
+        by_priority = [0] * len(PRIORITY_CODES)
+        for i in range(self.count):
+            base = self._record_offset(i)
+            by_status[self._buf[base + _STATUS_OFFSET]] += 1
+            by_priority[self._buf[base + _PRIORITY_OFFSET]] += 1
+        return {
+            "hot_messages": self.count,
+            "generation": self.generation,
+            "by_status": dict(zip(STATUS_CODES, by_status)),
+            "by_priority": dict(zip(PRIORITY_CODES, by_priority)),
+            "meta": self.meta(),
+        }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Build or query the binary registry snapshot")
+    parser.add_argument("--bridge-root", type=Path,
+                        default=Path.home() / "devvyn-meta-project" / "bridge",
+                        help="Bridge directory (default: ~/devvyn-meta-project/bridge)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("build", help="Write a snapshot from registry.json now")
+    sub.add_parser("stats", help="Print counts from the snapshot")
+    get_cmd = sub.add_parser("get", help="Print one record by message ID")
+    get_cmd.add_argument("message_id")
+    pending_cmd = sub.add_parser("pending", help="List pending messages")
+    pending_cmd.add_argument("target", nargs="?")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        size = BridgeRegistry(args.bridge_root).write_snapshot()
+        print(f"Wrote {snapshot_path(args.bridge_root)} ({size:,} bytes)")
+        return 0
+
+    with RegistrySnapshot.open(args.bridge_root) as snapshot:
+        if args.command == "stats":
+            print(json.dumps(snapshot.stats(), indent=2))
+        elif args.command == "get":
+            record = snapshot.get(args.message_id)
+            if record is None:
+                print(f"Message ID '{args.message_id}' not in snapshot", file=sys.stderr)
+                return 1
+            print(json.dumps(record, indent=2))
+        else:
+            for msg in snapshot.get_pending_messages(args.target):
+                print(f"{msg['created']}  {msg['priority']:8s} {msg['id']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,812 @@
+#!/usr/bin/env python3
+"""
+Bridge Replication
+Log-shipping from a primary bridge directory to a read-only replica.
+
+Two streams are shipped:
+
+- Registry mutations: BridgeRegistry appends one entry per generation to
+  registry/journal.jsonl (records upserted and records offloaded to the
+  cold tier). The replica replays entries in generation order and skips
+  any it has already applied, so replay is idempotent.
+- Message and event files: inbox/, outbox/, queue/, archive/ and events/
+  are write-once (files are created with mv and later moved, never edited),
+  so only directories whose mtime changed are re-listed. context/ and the
+  small registry JSON files are edited in place and are compared by
+  size and mtime.
+
+The replica keeps its applied generation, journal byte offset and file
+manifest in registry/replication.json. A shipper that restarts resumes
+from there. If the journal cannot continue the replica (journal missing,
+rotated or gapped), the shipper falls back to a full registry resync.
+
+Each shipper records the generation its replica has applied in the
+primary's registry/replicas/. Journal entries every recorded replica has
+applied are cut from the front of journal.jsonl once they reach 1 MiB.
+Delete a retired replica's file there, or the journal keeps growing. With
+no replica recorded there, BridgeRegistry empties the journal itself at
+1 MiB, and a replica added later starts from a full resync.
+
+The replica refuses any file outside its own trees. `serve` listens on a
+Unix socket inside the replica by default. Listening on TCP requires a
+shared secret, read from --secret-file or BRIDGE_REPLICATION_SECRET, which
+every connecting shipper must present.
+
+    # Same machine (or a shared mount)
+    python3 replication.py ship ~/bridge --to /mnt/replica/bridge --watch
+
+    # Across machines
+    python3 replication.py serve /srv/bridge-replica --listen tcp://0.0.0.0:7341 --secret-file ~/.bridge-secret
+    python3 replication.py ship ~/bridge --connect tcp://replica-host:7341 --secret-file ~/.bridge-secret --watch
+
+Record paths are kept as written on the primary.
+"""
+
+import argparse
+import base64
+import fcntl
+import hmac
+import json
+import os
+import re
+import shutil
+import socket
+import socketserver
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from bridge_registry import GENERATION_FILE, write_registry
+from cold_storage import ColdStore
+
+
+WRITE_ONCE_TREES = ("inbox", "outbox", "queue", "archive", "events")
+MUTABLE_TREES = ("context",)
+REGISTRY_FILES = ("agents.json", "queue_stats.json")
+SKIP_SUFFIXES = (".lock", ".tmp")
+MAX_BATCH_FILES = 200
+MAX_BATCH_ENTRIES = 500
+JOURNAL_TRUNCATE_BYTES = 1 << 20
+SECRET_ENV = "BRIDGE_REPLICATION_SECRET"
+
+
+def _skip(name: str) -> bool:
+    return name.startswith(".") or name.endswith(SKIP_SUFFIXES) or ".tmp." in name
+
+
+def _contained(base: Path, rel: str) -> Path:
+    """
+    Resolve a shipped relative path under base.
+
+    Raises:
+        ValueError: If rel is absolute or resolves outside base
+    """
+    base = base.resolve()
+    target = (base / rel).resolve()
+    if os.path.isabs(rel) or target == base or not target.is_relative_to(base):
+        raise ValueError(f"Refusing path outside the replica: {rel!r}")
+    return target
+
+
+def _write_atomic(path: Path, data: bytes):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = path.with_name(f"{path.name}.tmp.{os.getpid()}")
+    tmp_file.write_bytes(data)
+    os.replace(tmp_file, path)
+
+
+class Replica:
+    """
+    Apply side of replication: owns a replica bridge directory.
+
+    Nothing else should write to the replica's registry.
+    """
+
+    def __init__(self, root: Path):
+        """
+        Open (or create) a replica.
+
+        Args:
+            root: Replica bridge directory
+        """
+        self.root = Path(root)
+        self.state_file = self.root / "registry" / "replication.json"
+        self.registry_file = self.root / "registry" / "registry.json"
+        if self.state_file.exists():
+            self.state = json.loads(self.state_file.read_text())
+        else:
+            self.state = {"generation": 0, "journal_offset": 0, "files": {}, "applied_at": None}
+        self._registry: Optional[Dict] = None
+
+    def status(self, manifest: bool = True) -> Dict:
+        """
+        Resume point for a shipper.
+
+        Args:
+            manifest: Include the shipped-file manifest (needed once per
+                shipper start, not after every batch)
+        """
+        status = {
+            "generation": self.state["generation"],
+            "journal_offset": self.state["journal_offset"],
+            "applied_at": self.state["applied_at"],
+        }
+        if manifest:
+            status["files"] = self.state["files"]
+        return status
+
+    def _load_registry(self) -> Dict:
+        if self._registry is None:
+            if self.registry_file.exists():
+                self._registry = json.loads(self.registry_file.read_text())
+            else:
+                self._registry = {"generation": 0, "messages": []}
+        return self._registry
+
+    def apply(self, batch: Dict) -> Dict:
+        """
+        Apply a batch from LogShipper.
+
+        Args:
+            batch: Dict with optional "resync", "entries", "journal_offset"
+                and "files" keys
+
+        Returns:
+            Updated status, without the file manifest
+        """
+        if "resync" in batch:
+            self._apply_resync(batch["resync"])
+        if batch.get("files"):
+            self._apply_files(batch["files"])
+        if batch.get("entries"):
+            self._apply_entries(batch["entries"])
+        if "journal_offset" in batch:
+            self.state["journal_offset"] = batch["journal_offset"]
+        self.state["applied_at"] = datetime.now().timestamp()
+        _write_atomic(self.state_file, json.dumps(self.state).encode())
+        return self.status(manifest=False)
+
+    def _apply_resync(self, resync: Dict):
+        """Replace the replica registry and cold tier wholesale"""
+        cold_dir = self.root / "registry" / "cold"
+        targets = {}
+        for name in resync["cold"]:
+            if "/" in name or "\\" in name:
+                raise ValueError(f"Refusing cold partition name {name!r}")
+            targets[name] = _contained(cold_dir, name)
+        shutil.rmtree(cold_dir, ignore_errors=True)
+        for name, data in resync["cold"].items():
+            _write_atomic(targets[name], base64.b64decode(data))
+        self._registry = json.loads(resync["registry"])
+        self._registry.setdefault("generation", 0)
+        write_registry(self.registry_file, self._registry)
+        self.state["generation"] = self._registry["generation"]
+
+    def _file_target(self, rel: str) -> Path:
+        """Replica path for a shipped file; only the trees LogShipper ships are accepted"""
+        parts = Path(rel).parts
+        allowed = (
+            (len(parts) > 1 and parts[0] in WRITE_ONCE_TREES + MUTABLE_TREES)
+            or (len(parts) == 2 and parts[0] == "registry" and parts[1] in REGISTRY_FILES)
+        )
+        if not allowed:
+            raise ValueError(f"Refusing path outside the replicated trees: {rel!r}")
+        return _contained(self.root, rel)
+
+    def _apply_files(self, files: List[Dict]):
+        manifest = self.state["files"]
+        # Check the whole batch before writing any of it
+        targets = [self._file_target(item["path"]) for item in files]
+        for item, target in zip(files, targets):
+            rel = item["path"]
+            if item.get("delete"):
+                target.unlink(missing_ok=True)
+                manifest.pop(rel, None)
+            else:
+                _write_atomic(target, base64.b64decode(item["data"]))
+                manifest[rel] = item["stat"]
+
+    def _apply_entries(self, entries: List[Dict]):
+        registry = self._load_registry()
+        # The generation in registry.json is written atomically with the
+        # records, so it (not replication.json) decides what is applied
+        applied = registry.get("generation", 0)
+        pending = [e for e in entries if e["generation"] > applied]
+        if not pending:
+            self.state["generation"] = applied
+            return
+
+        by_id = {msg["id"]: msg for msg in registry["messages"]}
+        cold = ColdStore(self.root / "registry" / "cold")
+        for entry in pending:
+            for msg in entry["upserts"]:
+                by_id[msg["id"]] = msg
+            if entry["offloads"]:
+                for msg in entry["offloads"]:
+                    by_id.pop(msg["id"], None)
+                cold.offload([msg for msg in entry["offloads"] if msg["id"] not in cold])
+            registry.update(entry["meta"])
+            registry["generation"] = entry["generation"]
+
+        registry["messages"] = list(by_id.values())
+        write_registry(self.registry_file, registry)
+        self.state["generation"] = registry["generation"]
+
+
+class LocalTransport:
+    """Ship to a replica directory reachable from this machine"""
+
+    def __init__(self, replica_root: Path):
+        self.replica = Replica(replica_root)
+        self.name = str(Path(replica_root).resolve())
+
+    def status(self) -> Dict:
+        return self.replica.status()
+
+    def apply(self, batch: Dict) -> Dict:
+        return self.replica.apply(batch)
+
+    def close(self):
+        pass
+
+
+def parse_address(address: str) -> Tuple[int, object]:
+    """
+    Parse "tcp://host:port" or "unix:///path/to.sock".
+
+    Returns:
+        (socket family, address) suitable for socket.connect/bind
+
+    Raises:
+        ValueError: For any other scheme
+    """
+    if address.startswith("tcp://"):
+        host, _, port = address[len("tcp://"):].rpartition(":")
+        return socket.AF_INET, (host, int(port))
+    if address.startswith("unix://"):
+        return socket.AF_UNIX, address[len("unix://"):]
+    raise ValueError(f"Unsupported replica address '{address}' (use tcp://host:port or unix:///path)")
+
+
+class SocketTransport:
+    """Ship to a `replication.py serve` process, one JSON line per request"""
+
+    def __init__(self, address: str, timeout: float = 30.0, secret: Optional[str] = None):
+        family, addr = parse_address(address)
+        self.name = address
+        self._sock = socket.socket(family, socket.SOCK_STREAM)
+        self._sock.settimeout(timeout)
+        self._sock.connect(addr)
+        self._reader = self._sock.makefile("rb")
+        if secret is not None:
+            self._request({"op": "auth", "secret": secret})
+
+    def _request(self, request: Dict) -> Dict:
+        self._sock.sendall((json.dumps(request) + "\n").encode())
+        line = self._reader.readline()
+        if not line:
+            raise ConnectionError("Replica closed the connection")
+        reply = json.loads(line)
+        if "error" in reply:
+            raise RuntimeError(f"Replica error: {reply['error']}")
+        return reply
+
+    def status(self) -> Dict:
+        return self._request({"op": "status"})
+
+    def apply(self, batch: Dict) -> Dict:
+        return self._request({"op": "apply", "batch": batch})
+
+    def close(self):
+        self._reader.close()
+        self._sock.close()
+
+
+class _ReplicaHandler(socketserver.StreamRequestHandler):
+    def _reply(self, reply: Dict):
+        self.wfile.write((json.dumps(reply) + "\n").encode())
+        self.wfile.flush()
+
+    def handle(self):
+        secret = self.server.secret
+        authenticated = secret is None
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+                op = request["op"]
+            except (ValueError, TypeError, KeyError):
+                self._reply({"error": "malformed request"})
+                return
+            if op == "auth":
+                authenticated = secret is None or hmac.compare_digest(
+                    str(request.get("secret", "")).encode(), secret.encode())
+                if not authenticated:
+                    self._reply({"error": "authentication failed"})
+                    return
+                self._reply({"ok": True})
+                continue
+            if not authenticated:
+                self._reply({"error": "authentication required"})
+                return
+            try:
+                with self.server.apply_lock:
+                    if op == "status":
+                        reply = self.server.replica.status()
+                    elif op == "apply":
+                        reply = self.server.replica.apply(request["batch"])
+                    else:
+                        reply = {"error": f"unknown op {op!r}"}
+            except Exception as e:
+                reply = {"error": str(e)}
+            self._reply(reply)
+
+
+class _ReusableTCPServer(socketserver.ThreadingTCPServer):
+    """Threaded TCP server that can rebind a port still in TIME_WAIT"""
+    allow_reuse_address = True
+
+
+def make_server(replica_root: Path, address: str, secret: Optional[str] = None) -> socketserver.BaseServer:
+    """
+    Build a threaded server applying batches to a replica directory.
+
+    Call serve_forever() on the result; shutdown() stops it.
+
+    Args:
+        replica_root: Replica bridge directory
+        address: tcp://host:port or unix:///path
+        secret: Shared secret clients must send before any other request
+
+    Raises:
+        ValueError: For a TCP address without a secret
+    """
+    family, addr = parse_address(address)
+    if family != socket.AF_UNIX and not secret:
+        raise ValueError("Serving replication over TCP requires a shared secret")
+    if family == socket.AF_UNIX:
+        Path(addr).parent.mkdir(parents=True, exist_ok=True)
+        Path(addr).unlink(missing_ok=True)
+        server = socketserver.ThreadingUnixStreamServer(addr, _ReplicaHandler)
+        os.chmod(addr, 0o600)
+    else:
+        server = _ReusableTCPServer(addr, _ReplicaHandler)
+    server.daemon_threads = True
+    server.replica = Replica(replica_root)
+    server.apply_lock = threading.Lock()
+    server.secret = secret or None
+    return server
+
+
+class LogShipper:
+    """
+    Ship a primary bridge directory's changes to a replica.
+
+    Keeps directory mtimes in memory so repeated ship() calls only re-list
+    directories that changed; the authoritative resume point lives on the
+    replica.
+    """
+
+    def __init__(self,
+                 primary_root: Path,
+                 transport,
+                 truncate_bytes: int = JOURNAL_TRUNCATE_BYTES):
+        """
+        Initialize the shipper.
+
+        Args:
+            primary_root: Primary bridge directory
+            transport: LocalTransport or SocketTransport
+            truncate_bytes: Cut applied entries from the journal once they
+                take at least this many bytes
+        """
+        self.root = Path(primary_root)
+        self.transport = transport
+        self.truncate_bytes = truncate_bytes
+        self.journal_file = self.root / "registry" / "journal.jsonl"
+        self.lock_file = self.root / "registry" / "registry.lock"
+        self.acks_dir = self.root / "registry" / "replicas"
+        self.ack_file = self.acks_dir / (re.sub(r"[^A-Za-z0-9_.-]+", "_", transport.name).strip("_") + ".json")
+        self._remote = transport.status()
+        self._manifest: Dict[str, List[int]] = self._remote.pop("files")
+        self._dir_cache: Dict[str, Tuple[int, List[str], List[str]]] = {}
+        self.resyncs = 0
+
+    @contextmanager
+    def _registry_lock(self):
+        """Hold the primary's registry lock so a resync sees one generation"""
+        self.lock_file.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.lock_file, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+
+    # -- registry journal --------------------------------------------------
+
+    def _read_journal(self, offset: int) -> Iterator[Tuple[Dict, int]]:
+        """Yield (entry, offset after entry) for complete lines from offset"""
+        if not self.journal_file.exists():
+            return
+        with open(self.journal_file, "rb") as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    return  # writer mid-append; pick it up next time
+                offset += len(line)
+                yield json.loads(line), offset
+
+    def _journal_start(self, generation: int) -> Optional[int]:
+        """
+        Byte offset of the first journal entry after `generation`.
+
+        Tries the replica's stored offset first, then the start of the
+        journal. Returns None if the journal cannot continue the replica
+        (rotated, gapped, or the registry predates journaling).
+        """
+        stored = self._remote["journal_offset"]
+        for start in ([stored, 0] if stored else [0]):
+            position, last = start, None
+            try:
+                for entry, end in self._read_journal(start):
+                    if entry["generation"] > generation:
+                        if entry["generation"] == generation + 1:
+                            return position
+                        break
+                    position, last = end, entry["generation"]
+                else:
+                    if last == generation:
+                        return position
+                    if last is None and start == stored and stored:
+                        # Nothing appended since the replica's last batch, or
+                        # the journal was truncated under the stored offset
+                        if generation == self._primary_generation():
+                            return position
+                        continue
+                    if last is None and generation == self._primary_generation():
+                        return position
+            except (ValueError, TypeError, KeyError, OSError):
+                # Stored offset from before a truncation landed mid-line
+                continue
+        return None
+
+    def _primary_generation(self) -> int:
+        try:
+            return int((self.root / "registry" / GENERATION_FILE).read_text())
+        except (FileNotFoundError, ValueError):
+            pass
+        registry_file = self.root / "registry" / "registry.json"
+        if not registry_file.exists():
+            return 0
+        return json.loads(registry_file.read_text()).get("generation", 0)
+
+    def _resync_batch(self) -> Dict:
+        with self._registry_lock():
+            registry_file = self.root / "registry" / "registry.json"
+            registry = registry_file.read_text() if registry_file.exists() else json.dumps(
+                {"generation": 0, "messages": []})
+            cold_dir = self.root / "registry" / "cold"
+            cold = {
+                p.name: base64.b64encode(p.read_bytes()).decode()
+                for p in sorted(cold_dir.iterdir()) if p.is_file() and not _skip(p.name)
+            } if cold_dir.exists() else {}
+            journal_offset = self.journal_file.stat().st_size if self.journal_file.exists() else 0
+        self.resyncs += 1
+        return {"resync": {"registry": registry, "cold": cold}, "journal_offset": journal_offset}
+
+    def _ship_journal(self) -> int:
+        generation = self._remote["generation"]
+        start = self._journal_start(generation)
+        if start is None:
+            self._remote = self.transport.apply(self._resync_batch())
+            generation = self._remote["generation"]
+            start = self._remote["journal_offset"]
+
+        shipped = 0
+        entries: List[Dict] = []
+        offset = start
+        for entry, end in self._read_journal(start):
+            if entry["generation"] <= generation:
+                offset = end
+                continue
+            if entry["generation"] != generation + 1:
+                break  # lost append; the next pass resyncs
+            entries.append(entry)
+            generation = entry["generation"]
+            offset = end
+            if len(entries) >= MAX_BATCH_ENTRIES:
+                self._remote = self.transport.apply({"entries": entries, "journal_offset": offset})
+                shipped += len(entries)
+                entries = []
+        if entries or offset != self._remote["journal_offset"]:
+            self._remote = self.transport.apply({"entries": entries, "journal_offset": offset})
+            shipped += len(entries)
+        return shipped
+
+    def _acknowledge(self):
+        """Record the replica's applied generation in the primary's registry/replicas/"""
+        ack = {
+            "replica": self.transport.name,
+            "generation": self._remote["generation"],
+            "acked_at": datetime.now().timestamp(),
+        }
+        _write_atomic(self.ack_file, json.dumps(ack).encode())
+
+    def _acked_generation(self) -> int:
+        """Lowest generation applied by every replica with an ack file"""
+        generations = []
+        for path in self.acks_dir.glob("*.json"):
+            try:
+                generations.append(json.loads(path.read_text())["generation"])
+            except (OSError, ValueError, KeyError):
+                return 0  # unreadable: keep everything
+        return min(generations, default=0)
+
+    def _truncate_journal(self) -> int:
+        """
+        Cut entries every replica has applied from the front of the journal.
+
+        Runs under the registry lock, so no writer is mid-append. Replicas
+        that stored an offset into the old file fall back to scanning the
+        new one from the start.
+
+        Returns:
+            Bytes removed
+        """
+        try:
+            if self.journal_file.stat().st_size < self.truncate_bytes:
+                return 0
+        except FileNotFoundError:
+            return 0
+        acked = self._acked_generation()
+        with self._registry_lock():
+            cut = 0
+            with open(self.journal_file, "rb") as f:
+                for line in f:
+                    try:
+                        if json.loads(line)["generation"] > acked:
+                            break
+                    except (ValueError, KeyError):
+                        break  # damaged line: keep it and everything after
+                    cut += len(line)
+                if cut < self.truncate_bytes:
+                    return 0
+                f.seek(cut)
+                tmp_file = self.journal_file.with_name(f"{self.journal_file.name}.tmp.{os.getpid()}")
+                with open(tmp_file, "wb") as out:
+                    shutil.copyfileobj(f, out)
+            os.replace(tmp_file, self.journal_file)
+        offset = self._remote["journal_offset"]
+        self._remote = self.transport.apply({"journal_offset": offset - cut if offset >= cut else 0})
+        return cut
+
+    # -- message and event files -------------------------------------------
+
+    def _list_dir(self, rel: str) -> Tuple[List[str], List[str]]:
+        """(files, subdirs) of a primary directory, re-listed only if its mtime changed"""
+        path = self.root / rel
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            self._dir_cache.pop(rel, None)
+            return [], []
+        cached = self._dir_cache.get(rel)
+        if cached and cached[0] == mtime:
+            return cached[1], cached[2]
+        files, dirs = [], []
+        with os.scandir(path) as it:
+            for entry in it:
+                if _skip(entry.name):
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    dirs.append(entry.name)
+                elif entry.is_file(follow_symlinks=False):
+                    files.append(entry.name)
+        self._dir_cache[rel] = (mtime, files, dirs)
+        return files, dirs
+
+    def _walk(self, rel: str) -> Iterator[str]:
+        files, dirs = self._list_dir(rel)
+        for name in files:
+            yield f"{rel}/{name}"
+        for name in dirs:
+            yield from self._walk(f"{rel}/{name}")
+
+    def _file_changes(self) -> List[Tuple[str, Optional[List[int]]]]:
+        """(relative path, stat or None for delete) for files the replica lacks or has stale"""
+        manifest = self._manifest
+        current: Dict[str, Optional[List[int]]] = {}
+
+        for tree in WRITE_ONCE_TREES:
+            for rel in self._walk(tree):
+                # Write-once: an existing manifest entry is trusted without a stat
+                current[rel] = manifest.get(rel)
+        mutable = [rel for tree in MUTABLE_TREES for rel in self._walk(tree)]
+        mutable += [f"registry/{name}" for name in REGISTRY_FILES if (self.root / "registry" / name).exists()]
+        for rel in mutable:
+            try:
+                st = os.stat(self.root / rel)
+            except FileNotFoundError:
+                continue
+            current[rel] = [st.st_size, st.st_mtime_ns]
+
+        changes: List[Tuple[str, Optional[List[int]]]] = []
+        for rel, stat in current.items():
+            if stat is None or manifest.get(rel) != stat:
+                if stat is None:
+                    try:
+                        st = os.stat(self.root / rel)
+                    except FileNotFoundError:
+                        continue
+                    stat = [st.st_size, st.st_mtime_ns]
+                changes.append((rel, stat))
+        changes.extend((rel, None) for rel in manifest if rel not in current)
+        return changes
+
+    def _ship_files(self) -> int:
+        changes = self._file_changes()
+        shipped = 0
+        for i in range(0, len(changes), MAX_BATCH_FILES):
+            files = []
+            for rel, stat in changes[i:i + MAX_BATCH_FILES]:
+                if stat is None:
+                    files.append({"path": rel, "delete": True})
+                    continue
+                try:
+                    data = (self.root / rel).read_bytes()
+                except FileNotFoundError:
+                    continue  # moved since listing; the next pass sees its new home
+                files.append({"path": rel, "stat": stat, "data": base64.b64encode(data).decode()})
+            if files:
+                self._remote = self.transport.apply({"files": files})
+                for item in files:
+                    if item.get("delete"):
+                        self._manifest.pop(item["path"], None)
+                    else:
+                        self._manifest[item["path"]] = item["stat"]
+                shipped += len(files)
+        return shipped
+
+    # -- public API ----------------------------------------------------------
+
+    def ship(self) -> Dict:
+        """
+        Ship everything new once.
+
+        Returns:
+            Dict with counts of journal entries and files shipped, and lag()
+        """
+        entries = self._ship_journal()
+        files = self._ship_files()
+        self._acknowledge()
+        truncated = self._truncate_journal()
+        return {"entries": entries, "files": files, "resyncs": self.resyncs,
+                "truncated": truncated, "lag": self.lag()}
+
+    def lag(self) -> Dict:
+        """
+        Replication lag.
+
+        Returns:
+            Dict with primary and replica generations, the generation gap,
+            and seconds since the oldest unshipped journal entry was written
+        """
+        replica_generation = self._remote["generation"]
+        primary_generation = replica_generation
+        oldest_unshipped = None
+        try:
+            for entry, _ in self._read_journal(self._remote["journal_offset"]):
+                primary_generation = max(primary_generation, entry["generation"])
+                if entry["generation"] > replica_generation and oldest_unshipped is None:
+                    oldest_unshipped = entry["ts"]
+        except (ValueError, TypeError, KeyError, OSError):
+            pass
+        return {
+            "primary_generation": primary_generation,
+            "replica_generation": replica_generation,
+            "generations": primary_generation - replica_generation,
+            "seconds": round(time.time() - oldest_unshipped, 3) if oldest_unshipped else 0.0,
+        }
+
+    def run(self, interval: float = 1.0, stop=None):
+        """
+        Ship continuously until stop() (a callable) returns True.
+
+        Args:
+            interval: Seconds between passes
+            stop: Optional callable checked between passes
+        """
+        while stop is None or not stop():
+            self.ship()
+            time.sleep(interval)
+
+
+def _read_secret(secret_file: Optional[Path]) -> Optional[str]:
+    """Shared secret from --secret-file, else BRIDGE_REPLICATION_SECRET, else None"""
+    if secret_file is not None:
+        return secret_file.read_text().strip() or None
+    return os.environ.get(SECRET_ENV) or None
+
+
+def _transport(args):
+    if args.connect:
+        return SocketTransport(args.connect, secret=_read_secret(args.secret_file))
+    return LocalTransport(args.to)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Replicate a bridge directory to a second node")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    for name, help_text in (("ship", "Ship changes to a replica"), ("lag", "Show replication lag")):
+        cmd = sub.add_parser(name, help=help_text)
+        cmd.add_argument("primary", type=Path, help="Primary bridge directory")
+        target = cmd.add_mutually_exclusive_group(required=True)
+        target.add_argument("--to", type=Path, help="Replica directory on this machine")
+        target.add_argument("--connect", help="Replica server (tcp://host:port or unix:///path)")
+        cmd.add_argument("--secret-file", type=Path, help=f"Shared secret for --connect (default: ${SECRET_ENV})")
+        if name == "ship":
+            cmd.add_argument("--watch", action="store_true", help="Keep shipping")
+            cmd.add_argument("--interval", type=float, default=1.0, help="Seconds between passes")
+
+    serve_cmd = sub.add_parser("serve", help="Accept batches into a replica directory")
+    serve_cmd.add_argument("replica", type=Path)
+    serve_cmd.add_argument("--listen", help="tcp://host:port or unix:///path "
+                                            "(default: unix://REPLICA/registry/replication.sock)")
+    serve_cmd.add_argument("--secret-file", type=Path,
+                           help=f"Shared secret clients must present; required for tcp (default: ${SECRET_ENV})")
+
+    status_cmd = sub.add_parser("status", help="Show a replica's resume point")
+    status_cmd.add_argument("replica", type=Path)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        listen = args.listen or f"unix://{args.replica.resolve() / 'registry' / 'replication.sock'}"
+        try:
+            server = make_server(args.replica, listen, _read_secret(args.secret_file))
+        except ValueError as e:
+            print(f"Error: {e} (use --secret-file or ${SECRET_ENV})", file=sys.stderr)
+            return 1
+        print(f"Replica {args.replica} listening on {listen}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    if args.command == "status":
+        status = Replica(args.replica).status()
+        status["files"] = len(status["files"])
+        print(json.dumps(status, indent=2))
+        return 0
+
+    transport = _transport(args)
+    try:
+        shipper = LogShipper(args.primary, transport)
+        if args.command == "lag":
+            print(json.dumps(shipper.lag(), indent=2))
+        elif args.watch:
+            try:
+                while True:
+                    result = shipper.ship()
+                    if result["entries"] or result["files"]:
+                        print(f"[{datetime.now():%H:%M:%S}] shipped {result['entries']} entries, "
+                              f"{result['files']} files; lag {result['lag']['generations']} generations")
+                    time.sleep(args.interval)
+            except KeyboardInterrupt:
+                pass
+        else:
+            print(json.dumps(shipper.ship(), indent=2))
+    finally:
+        transport.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Test suite for Bridge Benchmark
+
+Tests:
+- Priority mix parsing
+- A small end-to-end run produces a complete report
+"""
+
+import json
+import sys
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+# Add paths
+project_root = Path(__file__).parent.parent.parent.parent
+sys.path.insert(0, str(project_root / "bridge" / "registry"))
+
+from bench_bridge import benchmark, parse_mix, plan
+from bridge_registry import Priority
+
+
+class TestConfig:
+    """Test load configuration"""
+
+    def test_parse_mix(self) -> None:
+        """Test weights are keyed by Priority"""
+        assert parse_mix("critical=1,NORMAL=3") == {Priority.CRITICAL: 1.0, Priority.NORMAL: 3.0}
+
+    def test_parse_mix_rejects_unknown(self) -> None:
+        """Test typos in the mix fail loudly"""
+        with pytest.raises(ValueError):
+            parse_mix("URGENT=1")
+        with pytest.raises(ValueError):
+            parse_mix("NORMAL=0")
+
+    def test_plan_is_seeded(self) -> None:
+        """Test the same seed produces the same load"""
+        mix = parse_mix("HIGH=1,INFO=1")
+        assert plan(["a", "b"], 10, mix, seed=3) == plan(["a", "b"], 10, mix, seed=3)
+        assert len(plan(["a", "b"], 10, mix, seed=3)) == 20
+
+
+class TestRun:
+    """Test a small benchmark run"""
+
+    def test_report_shape(self, tmp_path: Any) -> None:
+        """Test every message round-trips and the report is JSON-serialisable"""
+        report = benchmark(agents=2, messages=5, queries=3, keep=tmp_path)
+
+        python = report["python"]
+        assert python["sent"] == python["received"] == 10
+        assert python["latency"]["end_to_end"]["count"] == 10
+        assert report["files"]["registry_json"] > 0
+        assert report["files"]["journal"] > 0
+        assert report["memory"]["max_rss_bytes"] > 0
+        assert not any((tmp_path / "python" / "inbox").rglob("*.md"))
+        json.dumps(report)
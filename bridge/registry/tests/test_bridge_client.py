@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Test suite for Async Bridge Client
+
+Tests:
+- Ordered delivery and ack archival
+- nack redelivery, dead-lettering and FAILED registry status
+- Lock interop with bridge-receive.sh
+- Resident subscription picking up new files
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+# Add paths
+project_root = Path(__file__).parent.parent.parent.parent
+sys.path.insert(0, str(project_root / "bridge" / "registry"))
+
+from bridge_client import AsyncBridgeClient
+from bridge_registry import BridgeRegistry, Priority
+
+
+def write_message(inbox: Path, queue_number: int, priority: str = "NORMAL") -> Path:
+    """Write a minimal bridge message"""
+    inbox.mkdir(parents=True, exist_ok=True)
+    path = inbox / f"{queue_number:03d}-msg{queue_number}.md"
+    path.write_text(
+        f"# [PRIORITY: {priority}] Test\n\n"
+        f"**Message-ID**: msg{queue_number}\n"
+        f"**Queue-Number**: {queue_number:03d}\n"
+        f"**From**: chat\n"
+        f"**To**: redteam\n\n"
+        f"## Content\n\nproposal {queue_number}\n"
+    )
+    return path
+
+
+class TestDelivery:
+    """Test ack/nack semantics"""
+
+    @pytest.mark.asyncio
+    async def test_ack_archives_in_priority_order(self, tmp_path: Any) -> None:
+        """Test messages arrive by priority and ack moves them to archive"""
+        bridge = tmp_path / "bridge"
+        inbox = bridge / "inbox" / "redteam"
+        write_message(inbox, 1, "INFO")
+        write_message(inbox, 2, "CRITICAL")
+
+        client = AsyncBridgeClient(bridge)
+        seen = []
+        async for msg in client.subscribe("redteam", once=True):
+            seen.append(msg.message_id)
+            await msg.ack()
+
+        assert seen == ["msg2", "msg1"]
+        assert list(inbox.glob("*.md")) == []
+        assert len(list((bridge / "archive" / "redteam").glob("*.md"))) == 2
+
+    @pytest.mark.asyncio
+    async def test_nack_redelivers_then_dead_letters(self, tmp_path: Any) -> None:
+        """Test a failing message is retried max_attempts times"""
+        bridge = tmp_path / "bridge"
+        write_message(bridge / "inbox" / "redteam", 1)
+
+        client = AsyncBridgeClient(bridge, poll_interval=0.01, max_attempts=3)
+        attempts = []
+        async for msg in client.subscribe("redteam"):
+            attempts.append(msg.attempts)
+            await msg.nack(retry_after=0.01)
+            if msg.attempts == 3:
+                client.close()
+
+        assert attempts == [1, 2, 3]
+        assert (bridge / "archive" / "redteam" / "failed" / "001-msg1.md").exists()
+
+    @pytest.mark.asyncio
+    async def test_skips_files_locked_by_shell_consumer(self, tmp_path: Any) -> None:
+        """Test a bridge-receive.sh lock file prevents delivery"""
+        bridge = tmp_path / "bridge"
+        path = write_message(bridge / "inbox" / "redteam", 1)
+        path.with_name(path.name + ".lock").write_text("12345\n")
+
+        client = AsyncBridgeClient(bridge)
+        delivered = [msg async for msg in client.subscribe("redteam", once=True)]
+
+        assert delivered == []
+
+    @pytest.mark.asyncio
+    async def test_registry_status_follows_ack(self, tmp_path: Any) -> None:
+        """Test registered messages are completed on ack"""
+        bridge = tmp_path / "bridge"
+        path = write_message(bridge / "inbox" / "redteam", 1)
+        registry = BridgeRegistry(bridge)
+        message_id = registry.register_message("task", Priority.NORMAL, "chat", "redteam", "x", path)
+
+        client = AsyncBridgeClient(bridge, registry=registry)
+        async for msg in client.subscribe("redteam", once=True):
+            assert registry.get_message(message_id)["status"] == "in_progress"
+            await msg.ack()
+
+        assert registry.get_message(message_id)["status"] == "completed"
+
+    @pytest.mark.asyncio
+    async def test_registry_status_for_message_registered_elsewhere(self, tmp_path: Any) -> None:
+        """Test a message registered by another instance after the client started"""
+        bridge = tmp_path / "bridge"
+        client_registry = BridgeRegistry(bridge)
+        client = AsyncBridgeClient(bridge, registry=client_registry)
+
+        path = write_message(bridge / "inbox" / "redteam", 1)
+        sender = BridgeRegistry(bridge)
+        message_id = sender.register_message("task", Priority.NORMAL, "chat", "redteam", "x", path)
+
+        async for msg in client.subscribe("redteam", once=True):
+            assert client_registry.get_message(message_id)["status"] == "in_progress"
+            await msg.ack()
+
+        assert BridgeRegistry(bridge).get_message(message_id)["status"] == "completed"
+
+    @pytest.mark.asyncio
+    async def test_registry_status_after_dead_letter(self, tmp_path: Any) -> None:
+        """Test a dead-lettered message is left FAILED, not IN_PROGRESS"""
+        bridge = tmp_path / "bridge"
+        path = write_message(bridge / "inbox" / "redteam", 1)
+        registry = BridgeRegistry(bridge)
+        message_id = registry.register_message("task", Priority.NORMAL, "chat", "redteam", "x", path)
+
+        client = AsyncBridgeClient(bridge, registry=registry, poll_interval=0.01, max_attempts=2)
+        async for msg in client.subscribe("redteam"):
+            await msg.nack(retry_after=0.01)
+            if msg.attempts == 2:
+                client.close()
+
+        assert registry.get_message(message_id)["status"] == "failed"
+        assert BridgeRegistry(bridge).get_message(message_id)["status"] == "failed"
+        assert BridgeRegistry(bridge).get_stats()["by_status"]["failed"] == 1
+
+
+class TestResident:
+    """Test long-running subscriptions"""
+
+    @pytest.mark.asyncio
+    async def test_new_files_are_picked_up(self, tmp_path: Any) -> None:
+        """Test a message written after subscribing is delivered"""
+        bridge = tmp_path / "bridge"
+        inbox = bridge / "inbox" / "redteam"
+        inbox.mkdir(parents=True)
+        client = AsyncBridgeClient(bridge, poll_interval=0.01)
+
+        async def consume() -> str:
+            async for msg in client.subscribe("redteam"):
+                await msg.ack()
+                client.close()
+                return msg.message_id
+            return ""
+
+        task = asyncio.create_task(consume())
+        await asyncio.sleep(0.05)
+        write_message(inbox, 7)
+
+        assert await asyncio.wait_for(task, timeout=5) == "msg7"
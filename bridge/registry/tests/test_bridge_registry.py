@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+Test suite for Bridge Registry
+
+Tests:
+- Message TTLs and the expiry index
+- Background expiry sweeper
+- Cold-tier offload of archived records
+- Incrementally maintained statistics
+- Concurrent writers across processes
+"""
+
+import json
+import os
+import subprocess
+import sys
+import textwrap
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+# Add paths
+project_root = Path(__file__).parent.parent.parent.parent
+sys.path.insert(0, str(project_root / "bridge" / "registry"))
+
+from bridge_registry import BridgeRegistry, ExpirySweeper, MessageStatus, Priority
+from cold_storage import ColdStore
+
+
+def register(registry: BridgeRegistry, name: str, **kwargs: Any) -> str:
+    """Register a message file under the registry's inbox"""
+    path = registry.base / "inbox" / "code" / f"{name}.md"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(f"# {name}\n")
+    return registry.register_message(
+        msg_type="task",
+        priority=kwargs.pop("priority", Priority.NORMAL),
+        source="chat",
+        target="code",
+        content=f"content of {name}",
+        path=path,
+        **kwargs,
+    )
+
+
+class TestExpiry:
+    """Test TTL-driven archival"""
+
+    def test_only_completed_messages_expire(self, tmp_path: Any) -> None:
+        """Test pending messages survive past their TTL"""
+        registry = BridgeRegistry(tmp_path / "bridge")
+        done = register(registry, "done", ttl_days=1)
+        register(registry, "pending", ttl_days=1)
+        registry.update_message_status(done, MessageStatus.COMPLETED)
+
+        archived = registry.sweep_expired(now=datetime.now() + timedelta(days=2))
+
+        assert archived == [done]
+        stats = registry.get_stats()
+        assert stats["by_status"]["archived"] == 1
+        assert stats["by_status"]["pending"] == 1
+
+    def test_per_message_ttl_overrides_default(self, tmp_path: Any) -> None:
+        """Test short TTLs expire before the registry-wide default"""
+        registry = BridgeRegistry(tmp_path / "bridge")
+        short = register(registry, "short", ttl_days=1)
+        default = register(registry, "default")
+        for message_id in (short, default):
+            registry.update_message_status(message_id, MessageStatus.COMPLETED)
+
+        later = datetime.now() + timedelta(days=5)
+        assert registry.sweep_expired(now=later, dry_run=True) == [short]
+        assert registry.sweep_expired(now=later) == [short]
+        assert registry.sweep_expired(now=later) == []
+
+        much_later = datetime.now() + timedelta(days=91)
+        assert registry.sweep_expired(now=much_later) == [default]
+
+    def test_reopened_message_is_not_archived(self, tmp_path: Any) -> None:
+        """Test stale heap entries are skipped after a status change"""
+        registry = BridgeRegistry(tmp_path / "bridge")
+        message_id = register(registry, "reopened", ttl_days=1)
+        registry.update_message_status(message_id, MessageStatus.COMPLETED)
+        registry.update_message_status(message_id, MessageStatus.IN_PROGRESS)
+
+        assert registry.sweep_expired(now=datetime.now() + timedelta(days=2)) == []
+        assert registry.next_expiry() is None
+
+    def test_expiry_index_rebuilt_on_load(self, tmp_path: Any) -> None:
+        """Test a fresh registry instance sees previously completed messages"""
+        registry = BridgeRegistry(tmp_path / "bridge")
+        message_id = register(registry, "persisted", ttl_days=1)
+        registry.update_message_status(message_id, MessageStatus.COMPLETED)
+
+        reloaded = BridgeRegistry(tmp_path / "bridge")
+        assert reloaded.sweep_expired(now=datetime.now() + timedelta(days=2)) == [message_id]
+
+    def test_background_sweeper(self, tmp_path: Any) -> None:
+        """Test the sweeper archives a message shortly after it expires"""
+        registry = BridgeRegistry(tmp_path / "bridge")
+        message_id = register(registry, "soon", ttl_days=0.2 / 86400)
+        registry.update_message_status(message_id, MessageStatus.COMPLETED)
+
+        sweeper = ExpirySweeper(registry, max_interval=0.05)
+        sweeper.start()
+        try:
+            deadline = time.time() + 5
+            while sweeper.archived_count == 0 and time.time() < deadline:
+                time.sleep(0.02)
+        finally:
+            sweeper.stop(timeout=1)
+
+        assert sweeper.archived_count == 1
+        assert registry.get_stats()["by_status"]["archived"] == 1
+
+
+class TestColdTier:
+    """Test archived records moving to cold storage"""
+
+    def test_archived_records_leave_hot_registry(self, tmp_path: Any) -> None:
+        """Test sweeping shrinks the hot registry and fills a month partition"""
+        registry = BridgeRegistry(tmp_path / "bridge")
+        message_id = register(registry, "old", ttl_days=1)
+        register(registry, "active")
+        registry.update_message_status(message_id, MessageStatus.COMPLETED)
+
+        registry.sweep_expired(now=datetime.now() + timedelta(days=2))
+
+        assert message_id not in {m["id"] for m in registry.registry["messages"]}
+        assert len(registry.registry["messages"]) == 1
+        partition = message_id[:7]
+        assert (registry.base / "registry" / "cold" / f"{partition}.jsonl.gz").exists()
+
+    def test_stats_span_both_tiers(self, tmp_path: Any) -> None:
+        """Test get_stats counts cold records without loading them"""
+        registry = BridgeRegistry(tmp_path / "bridge")
+        for name in ("a", "b"):
+            message_id = register(registry, name, ttl_days=1, priority=Priority.HIGH)
+            registry.update_message_status(message_id, MessageStatus.COMPLETED)
+        register(registry, "c")
+        registry.sweep_expired(now=datetime.now() + timedelta(days=2))
+
+        stats = BridgeRegistry(tmp_path / "bridge").get_stats()
+
+        assert stats["total_messages"] == 3
+        assert stats["hot_messages"] == 1
+        assert stats["cold_messages"] == 2
+        assert stats["by_status"]["archived"] == 2
+        assert stats["by_priority"]["HIGH"] == 2
+
+    def test_history_falls_through_only_when_asked(self, tmp_path: Any) -> None:
+        """Test cold records are returned only with include_cold"""
+        registry = BridgeRegistry(tmp_path / "bridge")
+        message_id = register(registry, "old", ttl_days=1)
+        registry.update_message_status(message_id, MessageStatus.COMPLETED)
+        registry.sweep_expired(now=datetime.now() + timedelta(days=2))
+
+        assert registry.get_message(message_id) is None
+        assert registry.get_message(message_id, include_cold=True)["status"] == "archived"
+        assert registry.get_history(target="code") == []
+        assert len(registry.get_history(target="code", include_cold=True)) == 1
+
+    def test_compact_moves_legacy_archived_records(self, tmp_path: Any) -> None:
+        """Test records archived before tiering are offloaded by compact()"""
+        registry = BridgeRegistry(tmp_path / "bridge")
+        message_id = register(registry, "legacy")
+        registry.update_message_status(message_id, MessageStatus.ARCHIVED)
+
+        assert registry.compact() == 1
+        assert registry.registry["messages"] == []
+        assert message_id in registry.cold
+
+    def test_offload_appends_ids(self, tmp_path: Any) -> None:
+        """Test each offload appends its IDs instead of rewriting every archived one"""
+        cold_dir = tmp_path / "cold"
+        record = {"status": "archived", "priority": "NORMAL", "created": "2026-10-01T00:00:00"}
+        ColdStore(cold_dir).offload([dict(record, id="a"), dict(record, id="b")])
+        first = (cold_dir / "ids.jsonl").read_text()
+        store = ColdStore(cold_dir)
+        store.offload([dict(record, id="c", created="2026-09-30T00:00:00")])
+
+        assert (cold_dir / "ids.jsonl").read_text().startswith(first)
+        assert not (cold_dir / "ids.json").exists()
+        assert store.get("c")["created"].startswith("2026-09")
+        assert all(message_id in ColdStore(cold_dir) for message_id in "abc")
+
+    def test_legacy_ids_and_torn_line(self, tmp_path: Any) -> None:
+        """Test IDs from the old ids.json still resolve and a torn log line is skipped"""
+        cold_dir = tmp_path / "cold"
+        cold_dir.mkdir()
+        (cold_dir / "ids.json").write_text(json.dumps({"old": "2025-01"}))
+        (cold_dir / "ids.jsonl").write_text('{"id": "new", "partition": "2026-10"}\n{"id": "to')
+
+        store = ColdStore(cold_dir)
+        assert "old" in store and "new" in store
+        assert "to" not in store
+
+
+class TestIncrementalStats:
+    """Test counters maintained on mutation"""
+
+    def test_counters_track_mutations(self, tmp_path: Any) -> None:
+        """Test stats match a full recount after a mix of mutations"""
+        registry = BridgeRegistry(tmp_path / "bridge")
+        ids = [
+            register(registry, f"m{i}", ttl_days=1, priority=priority)
+            for i, priority in enumerate([Priority.CRITICAL, Priority.HIGH, Priority.INFO, Priority.HIGH])
+        ]
+        registry.update_message_status(ids[0], MessageStatus.IN_PROGRESS)
+        registry.update_message_status(ids[1], MessageStatus.COMPLETED)
+        registry.update_message_status(ids[2], MessageStatus.COMPLETED)
+        registry.sweep_expired(now=datetime.now() + timedelta(days=2), limit=1)
+
+        stats = registry.get_stats()
+
+        assert stats["by_status"] == {"pending": 1, "in_progress": 1, "completed": 1, "archived": 1, "failed": 0}
+        assert stats["by_priority"] == {"CRITICAL": 1, "HIGH": 2, "NORMAL": 0, "INFO": 1}
+        assert registry.verify_stats()["consistent"]
+
+    def test_oldest_pending_skips_processed_messages(self, tmp_path: Any) -> None:
+        """Test the pending heap drops messages that left PENDING"""
+        registry = BridgeRegistry(tmp_path / "bridge")
+        first = register(registry, "first")
+        second = register(registry, "second")
+        registry.update_message_status(first, MessageStatus.COMPLETED)
+
+        assert registry.get_stats()["oldest_pending"] == registry.get_message(second)["created"]
+
+        registry.update_message_status(second, MessageStatus.IN_PROGRESS)
+        assert registry.get_stats()["oldest_pending"] is None
+
+    def test_verify_detects_and_repairs_drift(self, tmp_path: Any) -> None:
+        """Test out-of-band edits show up as drift"""
+        registry = BridgeRegistry(tmp_path / "bridge")
+        message_id = register(registry, "edited")
+        registry.get_message(message_id)["status"] = MessageStatus.COMPLETED.value
+
+        report = registry.verify_stats(repair=True)
+
+        assert not report["consistent"]
+        assert report["drift"]["pending/NORMAL"] == {"expected": 0, "actual": 1}
+        assert registry.verify_stats()["consistent"]
+
+
+class TestConcurrentWriters:
+    """Test registries shared between instances and processes"""
+
+    def test_stale_instance_merges_instead_of_overwriting(self, tmp_path: Any) -> None:
+        """Test a write from an out-of-date instance keeps the other's record"""
+        first = BridgeRegistry(tmp_path / "bridge")
+        second = BridgeRegistry(tmp_path / "bridge")
+
+        a = register(first, "a")
+        b = register(second, "b")
+
+        assert second.conflicts == 1
+        reloaded = BridgeRegistry(tmp_path / "bridge")
+        assert {m["id"] for m in reloaded.registry["messages"]} == {a, b}
+        assert reloaded.registry["generation"] == 2
+
+    def test_reload_ignores_file_metadata(self, tmp_path: Any) -> None:
+        """Test a rewrite that leaves registry.json's mtime unchanged is still seen"""
+        first = BridgeRegistry(tmp_path / "bridge")
+        a = register(first, "a")
+        second = BridgeRegistry(tmp_path / "bridge")
+        mtime = first.registry_file.stat().st_mtime_ns
+
+        b = register(second, "b")
+        os.utime(first.registry_file, ns=(mtime, mtime))
+        assert first.generation_file.read_text() == "2"
+
+        c = register(first, "c")
+        assert first.conflicts == 1
+        reloaded = BridgeRegistry(tmp_path / "bridge")
+        assert {m["id"] for m in reloaded.registry["messages"]} == {a, b, c}
+
+    def test_status_update_applies_to_fresh_state(self, tmp_path: Any) -> None:
+        """Test updating a message registered by another instance"""
+        writer = BridgeRegistry(tmp_path / "bridge")
+        updater = BridgeRegistry(tmp_path / "bridge")
+        message_id = register(writer, "remote")
+
+        assert updater.update_message_status(message_id, MessageStatus.COMPLETED)
+        assert updater.get_stats()["by_status"]["completed"] == 1
+
+    def test_parallel_processes_lose_nothing(self, tmp_path: Any) -> None:
+        """Test several processes registering at once keep every record"""
+        base = tmp_path / "bridge"
+        script = textwrap.dedent(f"""
+            import sys
+            from pathlib import Path
+            sys.path.insert(0, {str(project_root / "bridge" / "registry")!r})
+            from bridge_registry import BridgeRegistry, Priority
+
+            worker = sys.argv[1]
+            registry = BridgeRegistry(Path({str(base)!r}))
+            for i in range(25):
+                path = registry.base / "inbox" / "code" / f"{{worker}}-{{i}}.md"
+                path.parent.mkdir(parents=True, exist_ok=True)
+                path.write_text("x")
+                registry.register_message("task", Priority.NORMAL, worker, "code", "x", path)
+        """)
+
+        workers = [
+            subprocess.Popen([sys.executable, "-c", script, f"w{n}"])
+            for n in range(4)
+        ]
+        assert all(worker.wait(timeout=60) == 0 for worker in workers)
+
+        registry = BridgeRegistry(base)
+        assert len(registry.registry["messages"]) == 100
+        assert len({m["id"] for m in registry.registry["messages"]}) == 100
+        assert registry.registry["generation"] == 100
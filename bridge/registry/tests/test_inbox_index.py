@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Test suite for Inbox Index
+
+Tests:
+- Header parsing with filename fallback
+- (priority, queue number) ordering
+- Cursor pagination stability
+- Message-ID lookup and cache persistence
+- Unchanged directories are not listed again
+"""
+
+import os
+import sys
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+# Add paths
+project_root = Path(__file__).parent.parent.parent.parent
+sys.path.insert(0, str(project_root / "bridge" / "registry"))
+
+import inbox_index
+from inbox_index import InboxIndex, decode_cursor
+
+
+def write_message(inbox: Path, queue_number: int, message_id: str, priority: str) -> Path:
+    """Write a bridge-send.sh style message"""
+    inbox.mkdir(parents=True, exist_ok=True)
+    path = inbox / f"{queue_number:03d}-{message_id}.md"
+    path.write_text(
+        f"# [PRIORITY: {priority}] Test\n\n"
+        f"**Message-ID**: {message_id}\n"
+        f"**Queue-Number**: {queue_number:03d}\n"
+        f"**From**: chat\n"
+        f"**To**: code\n\n"
+        f"## Content\n\nbody\n"
+    )
+    return path
+
+
+class TestOrdering:
+    """Test inbox ordering and pagination"""
+
+    def test_priority_then_queue_order(self, tmp_path: Any) -> None:
+        """Test CRITICAL messages come before older NORMAL ones"""
+        inbox = tmp_path / "bridge" / "inbox" / "code"
+        write_message(inbox, 1, "m1", "NORMAL")
+        write_message(inbox, 2, "m2", "CRITICAL")
+        write_message(inbox, 3, "m3", "INFO")
+        write_message(inbox, 4, "m4", "CRITICAL")
+
+        index = InboxIndex.for_agent(tmp_path / "bridge", "code")
+        index.refresh()
+        page, cursor = index.list_messages(limit=10)
+
+        assert [m["message_id"] for m in page] == ["m2", "m4", "m1", "m3"]
+        assert cursor is None
+
+    def test_pages_cover_inbox_once(self, tmp_path: Any) -> None:
+        """Test walking cursors visits every message exactly once"""
+        inbox = tmp_path / "bridge" / "inbox" / "code"
+        priorities = ["CRITICAL", "HIGH", "NORMAL", "INFO"]
+        for i in range(1, 24):
+            write_message(inbox, i, f"m{i}", priorities[i % 4])
+
+        index = InboxIndex.for_agent(tmp_path / "bridge", "code")
+        index.refresh()
+
+        seen = []
+        cursor = None
+        while True:
+            page, cursor = index.list_messages(limit=5, after=cursor)
+            seen.extend(m["message_id"] for m in page)
+            if cursor is None:
+                break
+
+        assert len(seen) == 23
+        assert len(set(seen)) == 23
+
+    def test_cursor_survives_consumed_messages(self, tmp_path: Any) -> None:
+        """Test removing already-listed messages does not skip later ones"""
+        inbox = tmp_path / "bridge" / "inbox" / "code"
+        paths = [write_message(inbox, i, f"m{i}", "NORMAL") for i in range(1, 7)]
+
+        index = InboxIndex.for_agent(tmp_path / "bridge", "code")
+        index.refresh()
+        _, cursor = index.list_messages(limit=3)
+
+        for path in paths[:3]:
+            path.unlink()
+        index.refresh()
+        page, _ = index.list_messages(limit=3, after=cursor)
+
+        assert [m["message_id"] for m in page] == ["m4", "m5", "m6"]
+
+    def test_invalid_cursor(self, tmp_path: Any) -> None:
+        """Test malformed cursors raise ValueError"""
+        with pytest.raises(ValueError, match="Invalid cursor"):
+            decode_cursor("not-a-cursor")
+
+
+class TestLookup:
+    """Test Message-ID lookup"""
+
+    def test_find_by_id(self, tmp_path: Any) -> None:
+        """Test lookup returns the message path"""
+        inbox = tmp_path / "bridge" / "inbox" / "code"
+        path = write_message(inbox, 7, "2025-10-01T10:00:00-06:00-chat-abc", "HIGH")
+
+        index = InboxIndex.for_agent(tmp_path / "bridge", "code")
+        index.refresh()
+
+        assert index.find("2025-10-01T10:00:00-06:00-chat-abc") == path
+        assert index.find("missing") is None
+
+    def test_cache_only_parses_new_files(self, tmp_path: Any) -> None:
+        """Test a second index instance reuses cached headers"""
+        inbox = tmp_path / "bridge" / "inbox" / "code"
+        write_message(inbox, 1, "m1", "NORMAL")
+
+        first = InboxIndex.for_agent(tmp_path / "bridge", "code")
+        assert first.refresh() == (1, 0)
+
+        write_message(inbox, 2, "m2", "HIGH")
+        second = InboxIndex.for_agent(tmp_path / "bridge", "code")
+        assert second.refresh() == (1, 0)
+        assert second.next_message()["message_id"] == "m2"
+
+    def test_skips_example_files(self, tmp_path: Any) -> None:
+        """Test underscore-prefixed templates are not indexed"""
+        inbox = tmp_path / "bridge" / "inbox" / "code"
+        inbox.mkdir(parents=True)
+        (inbox / "_example_from_chat.md").write_text("# example\n")
+
+        index = InboxIndex.for_agent(tmp_path / "bridge", "code")
+        index.refresh()
+
+        assert len(index) == 0
+
+
+class TestRefresh:
+    """Test refresh skips unchanged directories"""
+
+    def test_unchanged_directory_is_not_listed(self, tmp_path: Any, monkeypatch: Any) -> None:
+        """Test refresh lists the inbox only after its mtime changes"""
+        inbox = tmp_path / "bridge" / "inbox" / "code"
+        write_message(inbox, 1, "m1", "NORMAL")
+        os.utime(inbox, ns=(1, 1))
+        index = InboxIndex.for_agent(tmp_path / "bridge", "code")
+        assert index.refresh() == (1, 0)
+
+        scans = []
+        real_scandir = os.scandir
+        monkeypatch.setattr(inbox_index.os, "scandir", lambda path: scans.append(path) or real_scandir(path))
+        assert index.refresh() == (0, 0)
+        assert InboxIndex.for_agent(tmp_path / "bridge", "code").refresh() == (0, 0)
+        assert scans == []
+
+        write_message(inbox, 2, "m2", "HIGH")
+        assert index.refresh() == (1, 0)
+        assert len(scans) == 1
+        assert index.next_message()["message_id"] == "m2"
+
+    def test_recent_mtime_is_not_trusted(self, tmp_path: Any) -> None:
+        """Test a directory modified moments before the scan is listed again"""
+        inbox = tmp_path / "bridge" / "inbox" / "code"
+        write_message(inbox, 1, "m1", "NORMAL")
+        index = InboxIndex.for_agent(tmp_path / "bridge", "code")
+        index.refresh()
+        assert index.scanned_mtime is None
+        assert index.refresh(force=True) == (0, 0)
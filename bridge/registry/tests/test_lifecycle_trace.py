@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Test suite for Lifecycle Trace
+
+Tests:
+- Span recording and the BRIDGE_TRACE kill switch
+- Per-stage percentiles and per-agent breakdowns
+- Shell helper writing the same format
+- Async client spans on receive/ack
+"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+# Add paths
+project_root = Path(__file__).parent.parent.parent.parent
+sys.path.insert(0, str(project_root / "bridge" / "registry"))
+
+from bridge_client import AsyncBridgeClient
+from lifecycle_trace import build_report, load_spans, percentile, record_span, trace_file
+
+
+def trace_message(bridge: Path, message_id: str, agent: str, start: float, gaps: list) -> None:
+    """Record a full lifecycle with the given stage-to-stage gaps (seconds)"""
+    ts = start
+    stages = ["created", "queued", "dispatched", "received", "processed", "archived"]
+    for i, stage in enumerate(stages):
+        record_span(bridge, message_id, stage, "chat" if i < 2 else agent, ts=ts)
+        if i < len(gaps):
+            ts += gaps[i]
+
+
+class TestRecording:
+    """Test the trace log"""
+
+    def test_record_appends_jsonl(self, tmp_path: Any) -> None:
+        """Test spans are appended one per line"""
+        record_span(tmp_path, "m1", "created", "chat", ts=1.0)
+        record_span(tmp_path, "m1", "queued", "chat", ts=2.0)
+
+        spans = load_spans(trace_file(tmp_path))
+        assert [s["stage"] for s in spans] == ["created", "queued"]
+        assert spans[1]["ts"] == 2.0
+
+    def test_unknown_stage_rejected(self, tmp_path: Any) -> None:
+        """Test typos in stage names fail loudly"""
+        with pytest.raises(ValueError):
+            record_span(tmp_path, "m1", "deliverd")
+
+    def test_disabled_by_env(self, tmp_path: Any, monkeypatch: Any) -> None:
+        """Test BRIDGE_TRACE=0 turns recording off"""
+        monkeypatch.setenv("BRIDGE_TRACE", "0")
+        record_span(tmp_path, "m1", "created")
+        assert not trace_file(tmp_path).exists()
+
+
+class TestReport:
+    """Test latency aggregation"""
+
+    def test_percentiles_and_agents(self, tmp_path: Any) -> None:
+        """Test per-transition percentiles and the per-agent split"""
+        for i in range(100):
+            trace_message(tmp_path, f"c{i}", "code", 1000.0, [0.001, (i + 1) / 1000, 0.5, 0.1, 0.01])
+        trace_message(tmp_path, "r1", "redteam", 1000.0, [0.001, 2.0, 0.5, 0.1, 0.01])
+
+        report = build_report(load_spans(trace_file(tmp_path)))
+
+        assert report["messages"] == 101
+        assert list(report["transitions"]) == [
+            "created→queued", "queued→dispatched", "dispatched→received",
+            "received→processed", "processed→archived", "end_to_end",
+        ]
+        assert set(report["by_agent"]) == {"code", "redteam"}
+        code = report["by_agent"]["code"]["queued→dispatched"]
+        assert code["count"] == 100
+        assert code["p50_ms"] == pytest.approx(50.0)
+        assert code["p99_ms"] == pytest.approx(99.0)
+        assert report["by_agent"]["redteam"]["queued→dispatched"]["max_ms"] == pytest.approx(2000.0)
+
+    def test_missing_stages_merge(self, tmp_path: Any) -> None:
+        """Test a message created straight into an inbox reports created→received"""
+        record_span(tmp_path, "m1", "created", "chat", ts=10.0)
+        record_span(tmp_path, "m1", "received", "code", ts=10.25)
+
+        report = build_report(load_spans(trace_file(tmp_path)), agent="code")
+        assert report["transitions"]["created→received"]["p50_ms"] == pytest.approx(250.0)
+
+    def test_percentile_nearest_rank(self) -> None:
+        """Test nearest-rank percentile on small lists"""
+        assert percentile([1.0, 2.0, 3.0, 4.0], 50) == 2.0
+        assert percentile([1.0, 2.0, 3.0, 4.0], 99) == 4.0
+        assert percentile([], 95) == 0.0
+
+
+class TestInstrumentation:
+    """Test the shell helper and the Python client emit spans"""
+
+    def test_shell_helper_format(self, tmp_path: Any) -> None:
+        """Test bridge-trace.sh writes spans load_spans can read"""
+        helper = project_root / "scripts" / "bridge-trace.sh"
+        subprocess.run(
+            ["bash", "-c", f'source "{helper}"; bridge_trace "2025-01-01T10:00:00-chat-x" queued chat'],
+            env={**os.environ, "BRIDGE_ROOT": str(tmp_path)},
+            check=True,
+        )
+        (span,) = load_spans(trace_file(tmp_path))
+        assert span["message_id"] == "2025-01-01T10:00:00-chat-x"
+        assert span["stage"] == "queued"
+        assert span["agent"] == "chat"
+
+    def test_shell_helper_survives_strict_mode(self, tmp_path: Any) -> None:
+        """Test a message without a Message-ID does not end a set -euo pipefail caller"""
+        helper = project_root / "scripts" / "bridge-trace.sh"
+        (tmp_path / "no-id.md").write_text("# No header\n")
+        (tmp_path / "with-id.md").write_text("**Message-ID**: m1\n")
+        result = subprocess.run(
+            ["bash", "-c",
+             f'set -euo pipefail; source "{helper}"; '
+             f'bridge_trace_file "{tmp_path}/no-id.md" dispatched code; '
+             f'bridge_trace_file "{tmp_path}/missing.md" dispatched code; '
+             f'bridge_trace_file "{tmp_path}/with-id.md" dispatched code; echo done'],
+            env={**os.environ, "BRIDGE_ROOT": str(tmp_path)},
+            capture_output=True,
+            text=True,
+        )
+        assert result.returncode == 0
+        assert result.stdout == "done\n"
+        assert [span["message_id"] for span in load_spans(trace_file(tmp_path))] == ["m1"]
+
+    @pytest.mark.asyncio
+    async def test_client_records_receive_and_ack(self, tmp_path: Any) -> None:
+        """Test AsyncBridgeClient records received, processed and archived"""
+        inbox = tmp_path / "inbox" / "code"
+        inbox.mkdir(parents=True)
+        (inbox / "001-m1.md").write_text(
+            "# [PRIORITY: NORMAL] Test\n\n**Message-ID**: m1\n**From**: chat\n**To**: code\n"
+        )
+
+        client = AsyncBridgeClient(tmp_path)
+        async for msg in client.subscribe("code", once=True):
+            await msg.ack()
+
+        stages = [s["stage"] for s in load_spans(trace_file(tmp_path)) if s["message_id"] == "m1"]
+        assert stages == ["received", "processed", "archived"]
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Test suite for Registry Snapshot
+
+Tests:
+- Round-trip of records through the binary format
+- ID lookup, pending listing and stats against the live registry
+- Snapshot refresh after compaction
+"""
+
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+# Add paths
+project_root = Path(__file__).parent.parent.parent.parent
+sys.path.insert(0, str(project_root / "bridge" / "registry"))
+
+from bridge_registry import BridgeRegistry, MessageStatus, Priority
+from registry_snapshot import RegistrySnapshot, snapshot_path
+
+
+def populated_registry(tmp_path: Any) -> BridgeRegistry:
+    """Registry with a mix of targets, priorities and statuses"""
+    registry = BridgeRegistry(tmp_path / "bridge")
+    priorities = [Priority.CRITICAL, Priority.HIGH, Priority.NORMAL, Priority.INFO]
+    for i in range(12):
+        target = "code" if i % 2 else "chat"
+        path = registry.base / "inbox" / target / f"m{i}.md"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("x")
+        message_id = registry.register_message(
+            "task", priorities[i % 4], "human", target, f"summary ünïcode {i}", path,
+            ttl_days=1 if i % 3 == 0 else None,
+        )
+        if i % 4 == 0:
+            registry.update_message_status(message_id, MessageStatus.COMPLETED)
+    return registry
+
+
+class TestSnapshot:
+    """Test snapshot reads match the registry"""
+
+    def test_round_trip(self, tmp_path: Any) -> None:
+        """Test every record decodes back to the registry record"""
+        registry = populated_registry(tmp_path)
+        registry.write_snapshot()
+
+        with RegistrySnapshot.open(registry.base) as snapshot:
+            assert len(snapshot) == 12
+            for msg in registry.registry["messages"]:
+                assert snapshot.get(msg["id"]) == msg
+            assert snapshot.get("missing") is None
+
+    def test_queries_match_registry(self, tmp_path: Any) -> None:
+        """Test pending listing and counts agree with BridgeRegistry"""
+        registry = populated_registry(tmp_path)
+        registry.write_snapshot()
+
+        with RegistrySnapshot.open(registry.base) as snapshot:
+            assert snapshot.get_pending_messages("code") == registry.get_pending_messages("code")
+            stats = snapshot.stats()
+            live = registry.get_stats()
+            assert stats["by_status"] == live["by_status"]
+            assert stats["by_priority"] == live["by_priority"]
+            assert stats["generation"] == registry.registry["generation"]
+
+    def test_written_after_compaction(self, tmp_path: Any) -> None:
+        """Test sweeping rewrites the snapshot without archived records"""
+        registry = populated_registry(tmp_path)
+        registry.sweep_expired(now=datetime.now() + timedelta(days=2))
+
+        with RegistrySnapshot.open(registry.base) as snapshot:
+            assert len(snapshot) == len(registry.registry["messages"])
+            assert snapshot.meta()["cold"]["total"] == registry.get_stats()["cold_messages"]
+
+    def test_rejects_foreign_files(self, tmp_path: Any) -> None:
+        """Test a non-snapshot file raises ValueError"""
+        path = snapshot_path(tmp_path / "bridge")
+        path.parent.mkdir(parents=True)
+        path.write_bytes(b"{}" * 64)
+
+        with pytest.raises(ValueError, match="not a version 1 registry snapshot"):
+            RegistrySnapshot(path)
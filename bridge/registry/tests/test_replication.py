@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+Test suite for Bridge Replication
+
+Tests:
+- Registry journal replay (upserts, status changes, cold offloads)
+- Idempotent replay and resume from the replica's offset
+- Full resync when the journal cannot continue the replica
+- Message/event file shipping, including moves
+- Lag metric
+- Unix socket transport
+- Replicas open as a BridgeRegistry for failover
+- Journal truncation behind every replica's acknowledged generation
+- Journal cap with no replica and metadata only on change
+- Paths outside the replica and unauthenticated TCP clients are refused
+"""
+
+import base64
+import json
+import sys
+import threading
+
+import pytest
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+# Add paths
+project_root = Path(__file__).parent.parent.parent.parent
+sys.path.insert(0, str(project_root / "bridge" / "registry"))
+
+import bridge_registry
+from bridge_registry import BridgeRegistry, MessageStatus, Priority
+from cold_storage import ColdStore
+from replication import LocalTransport, LogShipper, Replica, SocketTransport, make_server
+
+
+def register(registry: BridgeRegistry, n: int, target: str = "code") -> list:
+    ids = []
+    for i in range(n):
+        path = registry.base / "inbox" / target / f"{i:03d}-m{i}.md"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(f"**Message-ID**: m{i}\n")
+        ids.append(registry.register_message("task", Priority.NORMAL, "chat", target, f"msg {i}", path))
+    return ids
+
+
+def replica_messages(root: Path) -> dict:
+    registry = json.loads((root / "registry" / "registry.json").read_text())
+    return {msg["id"]: msg["status"] for msg in registry["messages"]}
+
+
+class TestJournalReplay:
+    """Test the registry mutation stream"""
+
+    def test_replica_matches_primary(self, tmp_path: Any) -> None:
+        """Test registrations, status changes and offloads replay on the replica"""
+        primary = BridgeRegistry(tmp_path / "primary")
+        ids = register(primary, 5)
+        primary.update_message_status(ids[0], MessageStatus.ARCHIVED)
+        primary.update_message_status(ids[1], MessageStatus.COMPLETED)
+        primary.compact()
+
+        shipper = LogShipper(primary.base, LocalTransport(tmp_path / "replica"))
+        result = shipper.ship()
+
+        assert result["resyncs"] == 0
+        assert result["entries"] == primary.registry["generation"]
+        assert replica_messages(tmp_path / "replica") == {
+            msg["id"]: msg["status"] for msg in primary.registry["messages"]
+        }
+        assert ids[0] in ColdStore(tmp_path / "replica" / "registry" / "cold")
+
+    def test_replay_is_idempotent(self, tmp_path: Any) -> None:
+        """Test applying the same entries twice changes nothing"""
+        primary = BridgeRegistry(tmp_path / "primary")
+        register(primary, 3)
+        entries = [json.loads(line) for line in primary.journal_file.read_text().splitlines()]
+
+        replica = Replica(tmp_path / "replica")
+        replica.apply({"entries": entries})
+        first = (tmp_path / "replica" / "registry" / "registry.json").read_text()
+        replica.apply({"entries": entries})
+
+        assert (tmp_path / "replica" / "registry" / "registry.json").read_text() == first
+        assert replica.status()["generation"] == 3
+
+    def test_resume_from_offset(self, tmp_path: Any) -> None:
+        """Test a restarted shipper only sends new entries"""
+        primary = BridgeRegistry(tmp_path / "primary")
+        register(primary, 3)
+        LogShipper(primary.base, LocalTransport(tmp_path / "replica")).ship()
+
+        register(primary, 2, target="chat")
+        result = LogShipper(primary.base, LocalTransport(tmp_path / "replica")).ship()
+
+        assert result["entries"] == 2
+        assert len(replica_messages(tmp_path / "replica")) == 5
+
+    def test_replica_opens_as_registry(self, tmp_path: Any) -> None:
+        """Test a replica built from the journal alone can take over as a registry"""
+        primary = BridgeRegistry(tmp_path / "primary")
+        ids = register(primary, 2)
+        primary.update_message_status(ids[0], MessageStatus.COMPLETED)
+        LogShipper(primary.base, LocalTransport(tmp_path / "replica")).ship()
+
+        replica = BridgeRegistry(tmp_path / "replica")
+        assert replica.registry["constraints"] == primary.registry["constraints"]
+        assert replica.get_message(ids[0])["status"] == "completed"
+        assert [m["id"] for m in replica.get_pending_messages()] == [ids[1]]
+        register(replica, 1, target="chat")
+        assert replica.registry["generation"] == primary.registry["generation"] + 1
+
+    def test_resync_without_journal(self, tmp_path: Any) -> None:
+        """Test a registry that predates the journal is copied wholesale"""
+        primary = BridgeRegistry(tmp_path / "primary")
+        register(primary, 4)
+        primary.journal_file.unlink()
+
+        result = LogShipper(primary.base, LocalTransport(tmp_path / "replica")).ship()
+
+        assert result["resyncs"] == 1
+        assert len(replica_messages(tmp_path / "replica")) == 4
+
+        register(primary, 1, target="chat")
+        result = LogShipper(primary.base, LocalTransport(tmp_path / "replica")).ship()
+        assert result["entries"] == 1
+        assert result["resyncs"] == 0
+
+
+class TestJournalTruncation:
+    """Test the journal is cut behind the slowest replica"""
+
+    def test_applied_entries_are_cut(self, tmp_path: Any) -> None:
+        """Test entries every replica applied leave the journal and shipping continues"""
+        primary = BridgeRegistry(tmp_path / "primary")
+        register(primary, 3)
+        shipper = LogShipper(primary.base, LocalTransport(tmp_path / "replica"), truncate_bytes=1)
+        result = shipper.ship()
+
+        assert result["truncated"] > 0
+        assert primary.journal_file.read_text() == ""
+
+        register(primary, 2, target="chat")
+        result = LogShipper(primary.base, LocalTransport(tmp_path / "replica"), truncate_bytes=1).ship()
+        assert result["entries"] == 2
+        assert result["resyncs"] == 0
+        assert len(replica_messages(tmp_path / "replica")) == 5
+
+    def test_lagging_replica_pins_journal(self, tmp_path: Any) -> None:
+        """Test entries one replica has not applied stay, and it resumes without a resync"""
+        primary = BridgeRegistry(tmp_path / "primary")
+        register(primary, 2)
+        slow = LogShipper(primary.base, LocalTransport(tmp_path / "slow"), truncate_bytes=1)
+        slow.ship()
+        register(primary, 3, target="chat")
+        fast = LogShipper(primary.base, LocalTransport(tmp_path / "fast"), truncate_bytes=1)
+        fast.ship()
+
+        generations = [json.loads(line)["generation"] for line in primary.journal_file.read_text().splitlines()]
+        assert generations == [3, 4, 5]
+        result = slow.ship()
+        assert result["entries"] == 3
+        assert result["resyncs"] == 0
+        assert primary.journal_file.read_text() == ""
+
+    def test_new_replica_after_truncation_resyncs(self, tmp_path: Any) -> None:
+        """Test a replica the journal no longer covers is copied wholesale"""
+        primary = BridgeRegistry(tmp_path / "primary")
+        register(primary, 3)
+        LogShipper(primary.base, LocalTransport(tmp_path / "first"), truncate_bytes=1).ship()
+
+        result = LogShipper(primary.base, LocalTransport(tmp_path / "second"), truncate_bytes=1).ship()
+        assert result["resyncs"] == 1
+        assert len(replica_messages(tmp_path / "second")) == 3
+
+
+    def test_unshipped_journal_is_capped(self, tmp_path: Any, monkeypatch: Any) -> None:
+        """Test the registry empties the journal itself only while no replica is registered"""
+        monkeypatch.setattr(bridge_registry, "UNSHIPPED_JOURNAL_MAX_BYTES", 2000)
+        primary = BridgeRegistry(tmp_path / "primary")
+        register(primary, 10)
+        assert primary.journal_file.stat().st_size < 2000
+
+        LogShipper(primary.base, LocalTransport(tmp_path / "replica")).ship()
+        register(primary, 10, target="chat")
+        assert primary.journal_file.stat().st_size >= 2000
+        result = LogShipper(primary.base, LocalTransport(tmp_path / "replica")).ship()
+        assert result["resyncs"] == 0
+        assert len(replica_messages(tmp_path / "replica")) == 20
+
+    def test_meta_only_when_changed(self, tmp_path: Any) -> None:
+        """Test entries carry the registry metadata only when it changed"""
+        primary = BridgeRegistry(tmp_path / "primary")
+        register(primary, 2)
+        primary.cleanup_old_messages()
+        register(BridgeRegistry(tmp_path / "primary"), 1, target="chat")
+
+        entries = [json.loads(line) for line in primary.journal_file.read_text().splitlines()]
+        assert "constraints" in entries[0]["meta"]
+        assert [sorted(entry["meta"]) for entry in entries[1:]] == [
+            ["last_check"], ["last_cleanup"], ["last_check"],
+        ]
+
+
+class TestFiles:
+    """Test message and event file shipping"""
+
+    def test_new_moved_and_edited_files(self, tmp_path: Any) -> None:
+        """Test new files appear, moved files move and edited context files update"""
+        primary = tmp_path / "primary"
+        inbox = primary / "inbox" / "code"
+        inbox.mkdir(parents=True)
+        (inbox / "001-a.md").write_text("a")
+        (primary / "events").mkdir()
+        (primary / "events" / "2025-10-01T10:00:00-story-x.md").write_text("event")
+        (primary / "context").mkdir()
+        (primary / "context" / "state.json").write_text("{}")
+        (inbox / "001-a.md.lock").write_text("123")
+
+        replica = tmp_path / "replica"
+        shipper = LogShipper(primary, LocalTransport(replica))
+        assert shipper.ship()["files"] == 3
+        assert (replica / "inbox" / "code" / "001-a.md").read_text() == "a"
+        assert not (replica / "inbox" / "code" / "001-a.md.lock").exists()
+
+        (primary / "archive" / "code").mkdir(parents=True)
+        (inbox / "001-a.md").rename(primary / "archive" / "code" / "001-a.md")
+        (primary / "context" / "state.json").write_text('{"phase": 2}')
+        assert shipper.ship()["files"] == 3
+        assert not (replica / "inbox" / "code" / "001-a.md").exists()
+        assert (replica / "archive" / "code" / "001-a.md").exists()
+        assert (replica / "context" / "state.json").read_text() == '{"phase": 2}'
+
+        assert shipper.ship()["files"] == 0
+
+    def test_paths_outside_replica_refused(self, tmp_path: Any) -> None:
+        """Test traversal, absolute and non-replicated paths are rejected before any write"""
+        replica = Replica(tmp_path / "replica")
+        data = base64.b64encode(b"x").decode()
+        for path in ("../escaped.txt", "inbox/../../escaped.txt", str(tmp_path / "abs.txt"),
+                     "registry/registry.json", "registry/replication.json", "inbox"):
+            batch = {"files": [{"path": "inbox/code/ok.md", "stat": [1, 1], "data": data},
+                               {"path": path, "stat": [1, 1], "data": data}]}
+            with pytest.raises(ValueError):
+                replica.apply(batch)
+        with pytest.raises(ValueError):
+            replica.apply({"resync": {"registry": json.dumps({"generation": 1, "messages": []}),
+                                      "cold": {"../escaped.txt": data}}})
+
+        assert not (tmp_path / "escaped.txt").exists()
+        assert not (tmp_path / "abs.txt").exists()
+        assert not (tmp_path / "replica" / "inbox" / "code" / "ok.md").exists()
+        assert not (tmp_path / "replica" / "registry" / "registry.json").exists()
+
+
+class TestLag:
+    """Test the lag metric"""
+
+    def test_lag_tracks_unshipped_generations(self, tmp_path: Any) -> None:
+        """Test lag counts generations written since the last ship"""
+        primary = BridgeRegistry(tmp_path / "primary")
+        shipper = LogShipper(primary.base, LocalTransport(tmp_path / "replica"))
+        register(primary, 3)
+
+        lag = shipper.lag()
+        assert lag["generations"] == 3
+        assert lag["seconds"] >= 0
+
+        assert shipper.ship()["lag"]["generations"] == 0
+
+
+class TestSocketTransport:
+    """Test shipping to a replica server"""
+
+    def test_ship_over_unix_socket(self, tmp_path: Any) -> None:
+        """Test the same stream applies through serve/--connect"""
+        primary = BridgeRegistry(tmp_path / "primary")
+        ids = register(primary, 3)
+        for message_id in ids:
+            primary.update_message_status(message_id, MessageStatus.COMPLETED)
+        primary.sweep_expired(now=datetime.now() + timedelta(days=365))
+
+        address = f"unix://{tmp_path / 'replica.sock'}"
+        server = make_server(tmp_path / "replica", address)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            transport = SocketTransport(address)
+            result = LogShipper(primary.base, transport).ship()
+            transport.close()
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        assert result["lag"]["generations"] == 0
+        assert replica_messages(tmp_path / "replica") == {}
+        assert len(list(ColdStore(tmp_path / "replica" / "registry" / "cold").iter_records())) == 3
+        assert (tmp_path / "replica" / "inbox" / "code" / "000-m0.md").exists()
+
+    def test_tcp_requires_secret(self, tmp_path: Any) -> None:
+        """Test TCP serving needs a secret and clients without it are turned away"""
+        with pytest.raises(ValueError):
+            make_server(tmp_path / "replica", "tcp://127.0.0.1:0")
+
+        server = make_server(tmp_path / "replica", "tcp://127.0.0.1:0", secret="s3cret")
+        address = "tcp://127.0.0.1:%d" % server.server_address[1]
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            anonymous = SocketTransport(address)
+            with pytest.raises(RuntimeError, match="authentication required"):
+                anonymous.status()
+            anonymous.close()
+            with pytest.raises(RuntimeError, match="authentication failed"):
+                SocketTransport(address, secret="wrong")
+
+            transport = SocketTransport(address, secret="s3cret")
+            assert transport.status()["generation"] == 0
+            transport.close()
+        finally:
+            server.shutdown()
+            server.server_close()
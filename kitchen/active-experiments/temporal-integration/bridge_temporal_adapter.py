@@ -12,6 +12,9 @@ Usage:
     # As a bridge message processor (LaunchAgent integration)
     python bridge_temporal_adapter.py process-inbox
 
+    # Stay resident and trigger workflows as messages arrive
+    python bridge_temporal_adapter.py watch-inbox
+
     # Trigger from bridge message file
     python bridge_temporal_adapter.py trigger-from-message /path/to/message.md
 """
@@ -27,6 +30,9 @@ from typing import Any
 from temporalio.client import Client
 
 sys.path.append(str(Path(__file__).parent))
+sys.path.append(str(Path(__file__).parents[3] / "bridge" / "registry"))
+
+from bridge_client import AsyncBridgeClient
 
 from workflows.adversarial_challenge import (
     AdversarialChallengeInput,
@@ -72,7 +78,7 @@ class BridgeTemporalAdapter:
         Returns:
             Dictionary with message metadata and content
         """
-        content = message_path.read_text()
+        content = await asyncio.to_thread(message_path.read_text)
 
         # Extract metadata using regex
         priority_match = re.search(r"^\[PRIORITY:\s*(\w+)\]", content, re.MULTILINE)
@@ -157,9 +163,9 @@ class BridgeTemporalAdapter:
 
         return result
 
-    async def process_inbox_message(self, message_path: Path) -> None:
+    async def run_message_workflow(self, message_path: Path) -> None:
         """
-        Process a single bridge message and trigger workflow
+        Trigger the workflow for a bridge message without archiving it
 
         Args:
             message_path: Path to bridge message file
@@ -181,6 +187,15 @@ class BridgeTemporalAdapter:
             max_turns=3,  # Could parse from message or use priority mapping
         )
 
+    async def process_inbox_message(self, message_path: Path) -> None:
+        """
+        Process a single bridge message and trigger workflow
+
+        Args:
+            message_path: Path to bridge message file
+        """
+        await self.run_message_workflow(message_path)
+
         # Archive processed message
         archive_dir = self.bridge_root / "archive" / "redteam-processed"
         archive_dir.mkdir(parents=True, exist_ok=True)
@@ -242,6 +257,40 @@ class BridgeTemporalAdapter:
         logger.info(f"✅ Processed {processed}/{len(messages)} messages")
         return processed
 
+    async def watch_inbox(self, client: AsyncBridgeClient | None = None) -> int:
+        """
+        Stay resident on the RED TEAM inbox and trigger workflows as messages arrive
+
+        Failed messages are retried by the bridge client and moved to
+        archive/redteam-errors once retries are exhausted.
+
+        Returns:
+            Number of messages processed before the client was closed
+        """
+        client = client or AsyncBridgeClient(self.bridge_root)
+        await self.connect()
+        logger.info(f"👀 Watching RED TEAM inbox: {self.redteam_inbox}")
+
+        processed = 0
+        async for msg in client.subscribe(
+            "redteam",
+            archive_dir=self.bridge_root / "archive" / "redteam-processed",
+            dead_letter_dir=self.bridge_root / "archive" / "redteam-errors",
+        ):
+            try:
+                await self.run_message_workflow(msg.path)
+                await msg.ack()
+                processed += 1
+                logger.info(f"📦 Archived message: {msg.path.name}")
+            except Exception as e:
+                logger.error(
+                    f"❌ Error processing {msg.path.name} (attempt {msg.attempts}): {e}",
+                    exc_info=True,
+                )
+                await msg.nack()
+
+        return processed
+
 
 async def main():
     """CLI entry point"""
@@ -250,7 +299,7 @@ async def main():
     parser = argparse.ArgumentParser(description="Bridge-to-Temporal adapter")
     parser.add_argument(
         "command",
-        choices=["process-inbox", "trigger-from-message"],
+        choices=["process-inbox", "watch-inbox", "trigger-from-message"],
         help="Command to execute",
     )
     parser.add_argument(
@@ -268,6 +317,10 @@ async def main():
             await adapter.process_inbox()
             return 0
 
+        if args.command == "watch-inbox":
+            await adapter.watch_inbox()
+            return 0
+
         if args.command == "trigger-from-message":
             if not args.message_file:
                 logger.error("❌ message_file required for trigger-from-message")
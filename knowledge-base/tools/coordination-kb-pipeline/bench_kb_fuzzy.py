@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+KB Typo Lookup Benchmark
+Times TrigramIndex.nearest on a synthetic vocabulary of pronounceable words.
+
+    python3 bench_kb_fuzzy.py --vocabulary 100000
+    python3 bench_kb_fuzzy.py --json
+
+Query sets, all absent from the vocabulary:
+    one typo    a vocabulary term with one insertion, deletion, substitution
+                or swap of adjacent characters
+    two typos   a term of 8+ characters with two such edits
+    unseen      new words from the same generator (usually no term is close)
+
+Each lookup is timed as the best of three runs, with the garbage collector
+paused, so the report shows lookup cost rather than scheduling noise.
+
+Part of: Coordination KB Pipeline
+"""
+
+import argparse
+import gc
+import json
+import random
+import sys
+import time
+from typing import Any, Callable
+
+from kb_fuzzy import TrigramIndex
+
+ONSETS = ["", "b", "c", "d", "f", "g", "h", "l", "m", "n", "p", "r", "s", "t", "v", "w",
+          "br", "ch", "cl", "cr", "dr", "fl", "gr", "pl", "pr", "sh", "st", "str", "th", "tr"]
+NUCLEI = ["a", "e", "i", "o", "u", "ai", "ea", "ee", "io", "ou", "oo"]
+CODAS = ["", "", "n", "r", "s", "t", "l", "m", "nd", "nt", "st", "ck", "ng", "rs", "ct", "ss"]
+LETTERS = "etaoinshrdlucmfwypvbgk"
+
+
+def make_word(rng: random.Random) -> str:
+    return "".join(rng.choice(ONSETS) + rng.choice(NUCLEI) + rng.choice(CODAS)
+                   for _ in range(rng.randint(1, 4)))
+
+
+def synthetic_vocabulary(size: int, seed: int = 0) -> list[str]:
+    rng = random.Random(seed)
+    vocabulary: set[str] = set()
+    while len(vocabulary) < size:
+        word = make_word(rng)
+        if len(word) >= 3:
+            vocabulary.add(word)
+    return sorted(vocabulary)
+
+
+def typo(word: str, rng: random.Random) -> str:
+    """word with one random insertion, deletion, substitution or adjacent swap"""
+    i = rng.randrange(len(word))
+    edit = rng.randrange(4)
+    if edit == 0:
+        return word[:i] + word[i + 1:]
+    if edit == 1:
+        return word[:i] + rng.choice(LETTERS) + word[i + 1:]
+    if edit == 2:
+        return word[:i] + rng.choice(LETTERS) + word[i:]
+    i = min(i, len(word) - 2)
+    return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+
+
+def query_sets(vocabulary: list[str], count: int, seed: int) -> dict[str, list[str]]:
+    rng = random.Random(seed + 1)
+    known = set(vocabulary)
+    long_words = [word for word in vocabulary if len(word) >= 8]
+
+    def sample(make: Callable[[], str]) -> list[str]:
+        queries: list[str] = []
+        while len(queries) < count:
+            query = make()
+            if len(query) >= 3 and query not in known:
+                queries.append(query)
+        return queries
+
+    return {
+        "one typo": sample(lambda: typo(rng.choice(vocabulary), rng)),
+        "two typos": sample(lambda: typo(typo(rng.choice(long_words), rng), rng)),
+        "unseen": sample(lambda: make_word(rng)),
+    }
+
+
+def time_lookups(index: TrigramIndex, queries: list[str]) -> dict[str, Any]:
+    gc.collect()
+    gc.disable()
+    try:
+        times = []
+        corrected = 0
+        for query in queries:
+            best = float("inf")
+            for _ in range(3):
+                start = time.perf_counter()
+                distance, _ = index.nearest(query)
+                best = min(best, time.perf_counter() - start)
+            times.append(best * 1000)
+            corrected += distance > 0
+    finally:
+        gc.enable()
+    times.sort()
+    return {
+        "queries": len(queries),
+        "corrected": corrected,
+        "mean_ms": round(sum(times) / len(times), 3),
+        "p50_ms": round(times[len(times) // 2], 3),
+        "p95_ms": round(times[int(len(times) * 0.95)], 3),
+        "max_ms": round(times[-1], 3),
+    }
+
+
+def benchmark(vocabulary: int, queries: int, seed: int = 0) -> dict[str, Any]:
+    terms = synthetic_vocabulary(vocabulary, seed)
+    start = time.perf_counter()
+    index = TrigramIndex(terms)
+    build_seconds = time.perf_counter() - start
+    return {
+        "vocabulary": vocabulary,
+        "trigram_lists": len(index.grams),
+        "build_seconds": round(build_seconds, 2),
+        "lookups": {name: time_lookups(index, words) for name, words in query_sets(terms, queries, seed).items()},
+    }
+
+
+def print_report(report: dict[str, Any]) -> None:
+    print(f"Vocabulary: {report['vocabulary']:,} terms, {report['trigram_lists']:,} trigram lists, "
+          f"built in {report['build_seconds']:.2f} s")
+    print(f"{'queries':10s} {'corrected':>10s} {'mean ms':>8s} {'p50 ms':>8s} {'p95 ms':>8s} {'max ms':>8s}")
+    for name, stats in report["lookups"].items():
+        print(f"{name:10s} {stats['corrected']:>5d}/{stats['queries']:<4d} {stats['mean_ms']:>8.3f} "
+              f"{stats['p50_ms']:>8.3f} {stats['p95_ms']:>8.3f} {stats['max_ms']:>8.3f}")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Latency benchmark for typo-tolerant term lookup")
+    parser.add_argument("--vocabulary", type=int, default=100000, help="Distinct terms (default: 100000)")
+    parser.add_argument("--queries", type=int, default=300, help="Queries per set (default: 300)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="Machine-readable output")
+    args = parser.parse_args(argv)
+
+    if min(args.vocabulary, args.queries) < 1:
+        print("Error: --vocabulary and --queries must be positive", file=sys.stderr)
+        return 1
+
+    report = benchmark(args.vocabulary, args.queries, args.seed)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+KB Memory Benchmark
+Compares the memory held by the retrieval structures on a synthetic corpus.
+
+    python3 bench_kb_memory.py --docs 5000 --words 400
+    python3 bench_kb_memory.py --docs 500 --json
+
+Layouts, each built from the same tokenized text and measured with
+tracemalloc while it is alive:
+    tokens+vectors  the original model: every document's token list plus a
+                    str -> float TF-IDF vector per document
+    dict index      a KBIndex being updated: every table as str-keyed dicts
+    compact index   the same KBIndex after compact(): interned term ids and
+                    typed arrays for postings, field tfs, idf and norms
+    loaded          KBIndex.load of the persisted index (tables mapped)
+
+The corpus is also persisted with open_index and loaded in a fresh process,
+reporting the peak RSS growth and time of KBIndex.load, next to decoding
+the same tables from JSON as the dict layout stored them.
+
+Part of: Coordination KB Pipeline
+"""
+
+import argparse
+import gc
+import json
+import math
+import random
+import subprocess
+import sys
+import tempfile
+import textwrap
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+from typing import Any, Callable
+
+from kb_index import INDEX_FILE, TERM_TABLES, KBIndex, open_index, tokenize
+
+# Run in a fresh interpreter so nothing else is resident. The peak is the
+# process's VmHWM where /proc exists, else ru_maxrss (KiB on Linux, bytes on macOS)
+LOAD_SCRIPT = textwrap.dedent("""
+    import json, resource, sys, time
+    from pathlib import Path
+    sys.path.insert(0, sys.argv[1])
+    from kb_index import KBIndex
+
+    def peak_rss():
+        try:
+            with open("/proc/self/status") as f:
+                return next(int(line.split()[1]) * 1024 for line in f if line.startswith("VmHWM:"))
+        except OSError:
+            scale = 1 if sys.platform == "darwin" else 1024
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+    before = peak_rss()
+    start = time.perf_counter()
+    if sys.argv[2] == "json":
+        tables = json.loads(Path(sys.argv[3]).read_text())
+    else:
+        index = KBIndex.load(Path(sys.argv[3]))
+        index.compact()
+    elapsed = time.perf_counter() - start
+    print(json.dumps({"seconds": round(elapsed, 4), "peak_rss_bytes": peak_rss() - before}))
+""")
+
+
+def synthetic_corpus(docs: int, words: int, vocabulary: int, seed: int = 0) -> dict[str, str]:
+    """Documents of Zipf-distributed words, so a few terms are very common"""
+    rng = random.Random(seed)
+    terms = [f"term{i}" for i in range(vocabulary)]
+    weights = [1 / (rank + 1) for rank in range(vocabulary)]
+    return {
+        f"doc{n:05d}": " ".join(rng.choices(terms, weights, k=words))
+        for n in range(docs)
+    }
+
+
+def tokens_and_vectors(texts: dict[str, str]) -> Any:
+    tokens = {doc_id: tokenize(text) for doc_id, text in texts.items()}
+    df = Counter(term for doc_tokens in tokens.values() for term in set(doc_tokens))
+    idf = {term: math.log(len(tokens) / n) for term, n in df.items()}
+    vectors = {
+        doc_id: {term: count / len(doc_tokens) * idf[term] for term, count in Counter(doc_tokens).items()}
+        for doc_id, doc_tokens in tokens.items()
+    }
+    return tokens, vectors
+
+
+def dict_index(texts: dict[str, str]) -> KBIndex:
+    index = KBIndex(None)
+    for doc_id, text in texts.items():
+        index.add_document(doc_id, "", text)
+    index.finalize()
+    return index
+
+
+def compact_index(texts: dict[str, str]) -> KBIndex:
+    index = dict_index(texts)
+    index.compact()
+    return index
+
+
+LAYOUTS: dict[str, Callable[[dict[str, str]], Any]] = {
+    "tokens+vectors": tokens_and_vectors,
+    "dict index": dict_index,
+    "compact index": compact_index,
+}
+
+
+def persist(texts: dict[str, str], root: Path) -> Path:
+    """Write the corpus under root and build its index with open_index"""
+    paths = []
+    for doc_id, text in texts.items():
+        path = root / f"{doc_id}.md"
+        path.write_text(text)
+        paths.append(str(path))
+    index_file = root / INDEX_FILE
+    open_index(paths, index_file)
+    return index_file
+
+
+def json_tables(index_file: Path) -> Path:
+    """The loaded index's tables as the dict layout's JSON, for comparison"""
+    index = KBIndex.load(index_file)
+    tables = {"postings": index.postings.to_dict(), "fields": index.fields.to_dict()}
+    for name in TERM_TABLES + ("norms", "bm25_norms"):
+        tables[name] = getattr(index, name).to_dict()
+    path = index_file.with_name("tables.json")
+    path.write_text(json.dumps({"docs": index.docs, **tables}, separators=(",", ":")))
+    return path
+
+
+def measure_load(mode: str, path: Path) -> dict[str, Any]:
+    """Time and peak RSS growth of loading path in a fresh process"""
+    output = subprocess.run([sys.executable, "-c", LOAD_SCRIPT, str(Path(__file__).parent), mode, str(path)],
+                            capture_output=True, text=True, check=True).stdout
+    return {"file_bytes": path.stat().st_size, **json.loads(output)}
+
+
+def measure(build: Callable[[dict[str, str]], Any], texts: dict[str, str]) -> int:
+    """Bytes still allocated by build(texts) while its result is alive"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = build(texts)
+        gc.collect()
+        current, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return current
+
+
+def benchmark(docs: int, words: int, vocabulary: int, seed: int = 0) -> dict[str, Any]:
+    texts = synthetic_corpus(docs, words, vocabulary, seed)
+    occurrences = docs * words
+    layouts = {}
+    for name, build in LAYOUTS.items():
+        layouts[name] = measure(build, texts)
+
+    with tempfile.TemporaryDirectory(prefix="kb_memory-") as root:
+        index_file = persist(texts, Path(root))
+        layouts["loaded"] = measure(lambda _: KBIndex.load(index_file), texts)
+        postings_file = index_file.with_name(KBIndex.load(index_file).postings_file)
+        load = {
+            "mapped": {**measure_load("index", index_file),
+                       "file_bytes": index_file.stat().st_size + postings_file.stat().st_size},
+            "json tables": measure_load("json", json_tables(index_file)),
+        }
+
+    baseline = layouts["tokens+vectors"]
+    layouts = {
+        name: {"bytes": size, "bytes_per_token": round(size / occurrences, 2), "vs_original": round(size / baseline, 3)}
+        for name, size in layouts.items()
+    }
+    return {
+        "docs": docs,
+        "words_per_doc": words,
+        "vocabulary": vocabulary,
+        "token_occurrences": occurrences,
+        "postings": sum(len(set(tokenize(text))) for text in texts.values()),
+        "layouts": layouts,
+        "load": load,
+    }
+
+
+def print_report(report: dict[str, Any]) -> None:
+    print(f"Corpus: {report['docs']} docs x {report['words_per_doc']} words, "
+          f"{report['vocabulary']} term vocabulary, {report['postings']:,} postings")
+    print(f"{'layout':16s} {'bytes':>14s} {'B/token':>9s} {'vs original':>12s}")
+    for name, stats in report["layouts"].items():
+        print(f"{name:16s} {stats['bytes']:>14,} {stats['bytes_per_token']:>9.2f} {stats['vs_original']:>12.3f}")
+    print()
+    print(f"{'load':16s} {'file bytes':>14s} {'peak RSS':>14s} {'seconds':>9s}")
+    for name, stats in report["load"].items():
+        print(f"{name:16s} {stats['file_bytes']:>14,} {stats['peak_rss_bytes']:>14,} {stats['seconds']:>9.3f}")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Memory benchmark for the KB retrieval structures")
+    parser.add_argument("--docs", type=int, default=2000, help="Documents (default: 2000)")
+    parser.add_argument("--words", type=int, default=300, help="Words per document (default: 300)")
+    parser.add_argument("--vocabulary", type=int, default=20000, help="Distinct terms (default: 20000)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="Machine-readable output")
+    args = parser.parse_args(argv)
+
+    if min(args.docs, args.words, args.vocabulary) < 1:
+        print("Error: --docs, --words and --vocabulary must be positive", file=sys.stderr)
+        return 1
+
+    report = benchmark(args.docs, args.words, args.vocabulary, args.seed)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
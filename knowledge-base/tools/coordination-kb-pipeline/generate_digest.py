@@ -12,26 +12,25 @@ from datetime import UTC, datetime
 from pathlib import Path
 from typing import Any
 
+from kb_log import log_segments, read_log_lines
+
 
 def load_query_log(
     log_file: Path, since: datetime | None = None
 ) -> list[dict[str, Any]]:
     """Load queries from JSONL log, optionally filtered by date"""
     queries: list[dict[str, Any]] = []
-    if not log_file.exists():
-        return queries
-
-    with log_file.open() as f:
-        for line in f:
-            try:
-                q = json.loads(line.strip())
-                if since:
-                    q_time = datetime.fromisoformat(q["timestamp"])
-                    if q_time < since:
-                        continue
-                queries.append(q)
-            except (json.JSONDecodeError, KeyError):
-                pass
+    # Rotated (gzipped) segments first, then the active file
+    for line in read_log_lines(log_file):
+        try:
+            q = json.loads(line.strip())
+            if since:
+                q_time = datetime.fromisoformat(q["timestamp"])
+                if q_time < since:
+                    continue
+            queries.append(q)
+        except (json.JSONDecodeError, KeyError):
+            pass
 
     return queries
 
@@ -163,7 +162,7 @@ def main() -> None:
 
     log_file = Path(__file__).parent / "coordination_queries.jsonl"
 
-    if not log_file.exists():
+    if not log_file.exists() and not log_segments(log_file):
         print(f"No query log found at {log_file}")
         print("Run some queries first to generate digest data")
         sys.exit(1)
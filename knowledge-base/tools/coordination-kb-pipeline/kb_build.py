@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Parallel full rebuild of the coordination KB index
+Workers read and tokenize chunks of the corpus in a process pool and each
+write partial postings, sorted by term, to a spill file. The spill files are
+k-way merged and streamed straight into the compact arrays of a fresh
+postings sidecar, so the builder never holds the postings as dicts. Each
+chunk's position and passage blocks are concatenated into a fresh positions
+sidecar.
+
+Part of: Coordination KB Pipeline
+"""
+
+import hashlib
+import heapq
+import json
+import math
+import os
+import shutil
+import sys
+import tempfile
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Iterator
+
+from kb_index import (INDEX_VERSION, TERM_TABLES, analyze, bm25_doc_norms, passage_average, postings_sections,
+                      term_upper_bounds)
+from kb_positions import positions_path, remove_stale
+from kb_postings import CompactPostings, FieldPostings, write_arrays
+
+CHUNKS_PER_WORKER = 4
+
+# One shared compact encoder; json.dumps(..., separators=...) builds a new one per call
+encode = json.JSONEncoder(separators=(",", ":")).encode
+
+
+def index_chunk(job: tuple[int, list[tuple[str, str]], str]) -> tuple[int, dict[str, Any], list[str]]:
+    """Worker: analyze a chunk of documents and spill its postings sorted by term
+
+    Position and passage blocks go to a per-chunk .pos file; each doc's
+    "positions" and "passage_tf" spans are relative to that file until
+    build_parallel concatenates them.
+
+    Args:
+        job: (chunk number, [(doc_id, path), ...], spill directory)
+
+    Returns:
+        (chunk number, doc metadata in chunk order, error messages)
+    """
+    number, docs, spill_dir = job
+    metas: dict[str, Any] = {}
+    rows: dict[str, list[dict[str, Any]]] = {}
+    errors = []
+    positions = open(Path(spill_dir) / f"{number:06d}.pos", "wb")
+    for doc_id, path in docs:
+        try:
+            st = os.stat(path)
+            with open(path, "rb") as f:
+                raw = f.read()
+            content = raw.decode("utf-8")
+        except (OSError, UnicodeDecodeError) as e:
+            errors.append(f"Error loading {path}: {e}")
+            continue
+
+        analysis = analyze(content)
+        metas[doc_id] = {
+            "path": path,
+            "mtime_ns": st.st_mtime_ns,
+            "size": st.st_size,
+            "sha256": hashlib.sha256(raw).hexdigest(),
+            "length": analysis["length"],
+            "fields": analysis["fields"],
+            "passages": analysis["passages"],
+        }
+        for name in ("positions", "passage_tf"):
+            metas[doc_id][name] = [positions.tell(), len(analysis[name])]
+            positions.write(analysis[name])
+        for term, freq in analysis["postings"].items():
+            row = rows.setdefault(term, [{}, {}])
+            row[0][doc_id] = freq
+            if term in analysis["field_tf"]:
+                row[1][doc_id] = analysis["field_tf"][term]
+    positions.close()
+
+    with open(Path(spill_dir) / f"{number:06d}.jsonl", "w") as f:
+        for term in sorted(rows):
+            f.write(encode([term] + rows[term]) + "\n")
+    return number, metas, errors
+
+
+def read_spill(path: Path) -> Iterator[list[Any]]:
+    with open(path) as f:
+        for line in f:
+            yield json.loads(line)
+
+
+def merge_spills(paths: list[Path]) -> Iterator[tuple[str, list[dict[str, Any]]]]:
+    """Merge term-sorted spill files, combining rows for the same term in chunk order"""
+    term = None
+    merged: list[dict[str, Any]] = []
+    # heapq.merge keeps input order for equal keys, so docs stay in list order
+    for row in heapq.merge(*(read_spill(p) for p in paths), key=lambda r: r[0]):
+        if row[0] != term:
+            if term is not None:
+                yield term, merged
+            term, merged = row[0], [{} for _ in row[1:]]
+        for table, part in zip(merged, row[1:]):
+            table.update(part)
+    if term is not None:
+        yield term, merged
+
+
+def build_parallel(doc_paths: list[str], index_file: Path, workers: int | None = None) -> dict[str, int]:
+    """Rebuild index_file from scratch using a process pool
+
+    Args:
+        doc_paths: Document paths in load order (later duplicates win)
+        index_file: Destination kb_index.json
+        workers: Process count (default: CPU count; 1 runs inline)
+
+    Returns:
+        Counts of documents indexed and skipped, terms and chunks
+    """
+    index_file = Path(index_file)
+    workers = workers or os.cpu_count() or 1
+
+    wanted: dict[str, str] = {}
+    for path in doc_paths:
+        wanted[Path(path).stem] = path
+    docs = list(wanted.items())
+    chunk_size = max(1, math.ceil(len(docs) / (workers * CHUNKS_PER_WORKER)))
+    chunks = [docs[i:i + chunk_size] for i in range(0, len(docs), chunk_size)]
+
+    sidecar = positions_path(index_file)
+    postings_file = positions_path(index_file, "postings")
+    spill_dir = Path(tempfile.mkdtemp(prefix=".kb_build-", dir=index_file.parent))
+    try:
+        jobs = [(n, chunk, str(spill_dir)) for n, chunk in enumerate(chunks)]
+        if workers == 1 or len(jobs) < 2:
+            results = [index_chunk(job) for job in jobs]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(index_chunk, jobs))
+
+        metas: dict[str, Any] = {}
+        with open(sidecar, "wb") as out:
+            for number, chunk_metas, errors in sorted(results, key=lambda r: r[0]):
+                base = out.tell()
+                for meta in chunk_metas.values():
+                    meta["positions"][0] += base
+                    meta["passage_tf"][0] += base
+                with open(spill_dir / f"{number:06d}.pos", "rb") as f:
+                    shutil.copyfileobj(f, out)
+                metas.update(chunk_metas)
+                for error in errors:
+                    print(error)
+        terms = write_index(metas, sorted(spill_dir.glob("*.jsonl")), index_file, sidecar.name, postings_file)
+    except BaseException:
+        sidecar.unlink(missing_ok=True)
+        postings_file.unlink(missing_ok=True)
+        raise
+    finally:
+        shutil.rmtree(spill_dir, ignore_errors=True)
+    remove_stale(index_file, sidecar.name)
+    remove_stale(index_file, postings_file.name, "postings")
+
+    return {"documents": len(metas), "skipped": len(docs) - len(metas), "terms": terms, "chunks": len(chunks)}
+
+
+def write_index(metas: dict[str, Any], spills: list[Path], index_file: Path, positions_file: str,
+                postings_file: Path) -> int:
+    """Stream merged postings into postings_file and write index_file in KBIndex's layout"""
+    doc_ids = list(metas)
+    numbers = {doc_id: n for n, doc_id in enumerate(doc_ids)}
+    doc_count = len(metas)
+    squares = dict.fromkeys(metas, 0.0)
+    postings = CompactPostings(doc_ids)
+    fields = FieldPostings(postings)
+    values = {name: array("d") for name in TERM_TABLES}
+    for term, (plist, field_tf) in merge_spills(spills):
+        idf = math.log(doc_count / len(plist))
+        for doc_id, freq in plist.items():
+            weight = freq / metas[doc_id]["length"] * idf
+            squares[doc_id] += weight * weight
+        postings.append(term, sorted((numbers[doc_id], freq) for doc_id, freq in plist.items()))
+        fields.append(sorted((numbers[doc_id], *counts) for doc_id, counts in field_tf.items()))
+        values["idf"].append(idf)
+        values["bm25_idf"].append(math.log(1 + (doc_count - len(plist) + 0.5) / (len(plist) + 0.5)))
+
+    norms = {doc_id: math.sqrt(total) for doc_id, total in squares.items()}
+    bm25_norms = bm25_doc_norms(metas)
+    # Upper bounds divide by the document norms, known only after the first
+    # pass, so the terms are walked a second time
+    for term_id, term in enumerate(postings.terms):
+        cosine_max, bm25_max = term_upper_bounds(
+            dict(postings.items(term)), fields.get(term, {}), values["idf"][term_id], values["bm25_idf"][term_id],
+            metas, norms, bm25_norms)
+        values["cosine_max"].append(cosine_max)
+        values["bm25_max"].append(bm25_max)
+    values["norms"] = array("d", norms.values())
+    values["bm25_norms"] = array("d", [norm for doc_id in doc_ids for norm in bm25_norms[doc_id]])
+    write_arrays(postings_file, postings_sections(postings, fields, values), {"docs": doc_count})
+
+    data = {
+        "version": INDEX_VERSION,
+        "docs": metas,
+        "postings_file": postings_file.name,
+        "positions_file": positions_file,
+        "positions_garbage": 0,
+        "passage_avg": passage_average(metas),
+    }
+    tmp = index_file.with_name(f"{index_file.name}.tmp.{os.getpid()}")
+    try:
+        tmp.write_text(encode(data))
+        os.replace(tmp, index_file)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+    return len(postings.terms)
+
+
+def main() -> None:
+    import argparse
+
+    from kb_index import INDEX_FILE, read_doc_list
+
+    script_dir = Path(__file__).parent
+    parser = argparse.ArgumentParser(description="Rebuild the coordination KB index in parallel")
+    parser.add_argument("--docs", type=Path, default=script_dir / "coordination_docs.txt",
+                        help="Document list (default: coordination_docs.txt)")
+    parser.add_argument("--index", type=Path, default=script_dir / INDEX_FILE,
+                        help=f"Index file (default: {INDEX_FILE})")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    args = parser.parse_args()
+
+    if not args.docs.exists():
+        print(f"Error: {args.docs} not found", file=sys.stderr)
+        sys.exit(1)
+
+    stats = build_parallel(read_doc_list(args.docs), args.index, args.workers)
+    print(f"Index: {args.index}")
+    print(f"Documents: {stats['documents']}  Skipped: {stats['skipped']}  "
+          f"Terms: {stats['terms']}  Chunks: {stats['chunks']}")
+
+
+if __name__ == "__main__":
+    main()
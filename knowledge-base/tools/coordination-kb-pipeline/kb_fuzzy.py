@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Typo-tolerant term lookup for the coordination KB
+A character-trigram index over the term dictionary proposes vocabulary terms
+sharing enough trigrams with a misspelled query term; a bounded edit
+distance then keeps those within the allowed number of typos. Term ids are
+ordered by length, so a lookup only counts terms whose length could be
+within the edit bound, and each lookup reads a bounded number of postings.
+
+Part of: Coordination KB Pipeline
+"""
+
+from bisect import bisect_left
+from collections import Counter
+from operator import itemgetter
+from typing import Iterable
+
+# Each insertion, deletion or substitution changes at most this many of a
+# term's padded trigrams (a swap of adjacent characters changes up to 4, so
+# single swaps are looked up directly instead)
+GRAMS_PER_EDIT = 3
+# A binary search costs about as much as scanning this many list entries in C
+SEARCH_COST = 16
+# Most trigram postings one candidates() call may read. Past this the
+# trigram filter is too weak to be worth finishing: on 100,000 terms it
+# gives up on about 1 in 13 two-typo corrections and keeps lookups under 1 ms
+MAX_POSTINGS = 6000
+EMPTY: list[int] = []
+
+
+def trigrams(term: str) -> set[str]:
+    """Character trigrams of term padded with two '$' on each side
+
+    The double padding gives a term of n characters n + 2 trigrams, so
+    short terms still have enough of them to filter on.
+    """
+    padded = f"$${term}$$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def letters(term: str) -> int:
+    """Bit mask of term's characters, with each repeat of a character counted apart
+
+    An edit removes at most one character occurrence and adds at most one,
+    so terms within k edits differ in at most k bits each way (characters
+    sharing a bit only make the test looser).
+    """
+    mask = 0
+    seen: dict[str, int] = {}
+    for char in term:
+        repeat = seen[char] = seen.get(char, -1) + 1
+        mask |= 1 << (ord(char) + 37 * repeat) % 64
+    return mask
+
+
+def max_edits(term: str) -> int:
+    """Typos tolerated for a term of this length: none under 3 characters, 2 from 8"""
+    if len(term) < 3:
+        return 0
+    return 1 if len(term) < 8 else 2
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Optimal string alignment distance of a and b, or limit + 1 once it exceeds limit
+
+    Counts insertions, deletions, substitutions and swaps of adjacent
+    characters. Only the diagonal band of width 2 * limit + 1 is computed.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    # Typos leave most of a term intact: only the differing middle needs the table
+    start, end_a, end_b = 0, len(a), len(b)
+    while start < end_a and start < end_b and a[start] == b[start]:
+        start += 1
+    while end_a > start and end_b > start and a[end_a - 1] == b[end_b - 1]:
+        end_a -= 1
+        end_b -= 1
+    a, b = a[start:end_a], b[start:end_b]
+    if not a or not b:
+        return min(len(a) + len(b), limit + 1)
+
+    over = limit + 1
+    previous2: list[int] = []
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [over] * (len(b) + 1)
+        current[0] = i
+        lo, hi = max(1, i - limit), min(len(b), i + limit)
+        char = a[i - 1]
+        for j in range(lo, hi + 1):
+            cost = 0 if char == b[j - 1] else 1
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if cost and i > 1 and j > 1 and char == b[j - 2] and a[i - 2] == b[j - 1]:
+                value = min(value, previous2[j - 2] + 1)
+            current[j] = value
+        if min(current[max(0, lo - 1):hi + 1]) > limit:
+            return over
+        previous2, previous = previous, current
+    return min(previous[len(b)], over)
+
+
+class TrigramIndex:
+    """Trigram -> term ids over a fixed vocabulary
+
+    Term ids are assigned in order of term length, so the terms within the
+    edit bound of a length form one id range, which two binary searches cut
+    out of each trigram's sorted id list.
+    """
+
+    def __init__(self, terms: Iterable[str]):
+        self.terms = sorted(terms, key=len)
+        self.known = set(self.terms)
+        self.letters = [letters(term) for term in self.terms]
+        lengths = [len(term) for term in self.terms]
+        # starts[n]: first id of a term with n or more characters
+        self.starts = [bisect_left(lengths, n) for n in range((lengths[-1] if lengths else 0) + 2)]
+        self.grams: dict[str, list[int]] = {}
+        for term_id, term in enumerate(self.terms):
+            for gram in trigrams(term):
+                ids = self.grams.get(gram)
+                if ids is None:
+                    ids = self.grams[gram] = []
+                ids.append(term_id)
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+    def _id_range(self, shortest: int, longest: int) -> tuple[int, int]:
+        """Ids of the terms with shortest to longest characters, as [first, end)"""
+        last = len(self.starts) - 1
+        return self.starts[min(max(shortest, 0), last)], self.starts[min(longest + 1, last)]
+
+    def candidates(self, term: str, limit: int) -> list[str]:
+        """Terms that share enough trigrams to be within limit edits of term
+
+        A term within limit edits keeps at least len(grams) - GRAMS_PER_EDIT
+        * limit of term's trigrams (and always at least one is required), so
+        it must appear in one of the rarest len(grams) - needed + 1 trigram
+        lists. Only those lists are counted; the terms found there are then
+        checked against the common lists, and the survivors screened by
+        letters(). Returns [] without finishing once more than MAX_POSTINGS
+        postings would have to be read.
+        """
+        grams = trigrams(term)
+        needed = max(1, len(grams) - GRAMS_PER_EDIT * limit)
+        first, end = self._id_range(len(term) - limit, len(term) + limit)
+        lists = []
+        for gram in grams:
+            ids = self.grams.get(gram, EMPTY)
+            lo = bisect_left(ids, first)
+            hi = bisect_left(ids, end, lo)
+            lists.append((hi - lo, ids, lo, hi))
+        lists.sort(key=itemgetter(0))
+
+        split = len(lists) - needed + 1
+        # The counted lists and the first common one are read whole
+        work = sum(size for size, *_ in lists[:split + 1])
+        if work > MAX_POSTINGS:
+            return []
+        # Most counted terms share a single trigram. Intersecting each list
+        # with the terms seen in the lists before it finds the rest in C,
+        # and only those are counted: extra holds each term's shared
+        # trigrams beyond the first, so a term qualifies at needed - 1.
+        seen: set[int] = set()
+        extra: Counter[int] = Counter()
+        for size, ids, lo, hi in lists[:split]:
+            part = ids[lo:hi]
+            extra.update(seen.intersection(part))
+            seen.update(part)
+        more = needed - 1
+        found = [term_id for term_id, shared in extra.items() if shared >= more] if more else list(seen)
+
+        # Every seen term can still qualify from the needed - 1 common lists;
+        # after the first of them only terms with extra trigrams can, so
+        # from there on just those are carried along.
+        pending = seen
+        low = 0
+        for size, ids, lo, hi in lists[split:]:
+            if not pending:
+                break
+            if pending is not seen:
+                work += min(size, len(pending) * SEARCH_COST)
+                if work > MAX_POSTINGS:
+                    return []
+            if len(pending) * SEARCH_COST < size:
+                hits = [term_id for term_id in pending
+                        if (i := bisect_left(ids, term_id, lo, hi)) < hi and ids[i] == term_id]
+            else:
+                hits = pending.intersection(ids[lo:hi])
+            extra.update(hits)
+            found += [term_id for term_id in hits if extra[term_id] == more]
+            low += 1
+            pending = {term_id for term_id in (extra if pending is seen else pending)
+                       if low <= extra[term_id] < more}
+        mask = letters(term)
+        return [self.terms[term_id] for term_id in found
+                if (mask & ~(other := self.letters[term_id])).bit_count() <= limit
+                and (other & ~mask).bit_count() <= limit]
+
+    def nearest(self, term: str, limit: int | None = None) -> tuple[int, list[str]]:
+        """(distance, terms) of the closest vocabulary terms within limit edits
+
+        limit defaults to max_edits(term). Distances are tried in increasing
+        order, as the trigram filter for one edit is much tighter than for
+        two. A swap combined with another typo is not corrected, nor is a
+        typo whose trigram lists exceed MAX_POSTINGS. Returns (0, []) when
+        nothing is close enough, including for terms too short to correct.
+        """
+        if limit is None:
+            limit = max_edits(term)
+        for distance in range(1, limit + 1):
+            found = {candidate for candidate in self.candidates(term, distance)
+                     if edit_distance(term, candidate, distance) == distance}
+            if distance == 1:
+                for i in range(len(term) - 1):
+                    swapped = term[:i] + term[i + 1] + term[i] + term[i + 2:]
+                    if swapped != term and swapped in self.known:
+                        found.add(swapped)
+            if found:
+                return distance, sorted(found)
+        return 0, []
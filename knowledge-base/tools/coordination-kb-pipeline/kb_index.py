@@ -0,0 +1,655 @@
+#!/usr/bin/env python3
+"""
+Persistent inverted index for the coordination KB
+Keeps term postings, IDF and document norms on disk next to the corpus so
+queries load a prebuilt index instead of re-reading every document. The
+term tables live in a mapped binary postings file, so loading decodes only
+document metadata and the vocabulary.
+
+Part of: Coordination KB Pipeline
+"""
+
+import hashlib
+import json
+import math
+import os
+import re
+import sys
+import threading
+from array import array
+from collections import Counter
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any
+
+from kb_positions import (PositionStore, block_terms, decode_passage_tfs, decode_positions, encode_passage_tfs,
+                          encode_positions, positions_path, remove_stale)
+from kb_postings import (ArrayFile, CompactPostings, DocValues, FieldPostings, TermDictionary, TermValues,
+                         write_arrays)
+
+INDEX_FILE = "kb_index.json"
+INDEX_VERSION = 7
+PARALLEL_MIN_DOCS = 64
+
+# Passages: heading-bounded windows of whole lines that overlap their neighbour
+PASSAGE_CHARS = 600
+PASSAGE_OVERLAP = 150
+PASSAGE_B = 0.75
+
+# BM25F fields (body is whatever is neither heading nor summary)
+FIELDS = ("heading", "summary", "body")
+FIELD_WEIGHTS = {"heading": 3.0, "summary": 2.0, "body": 1.0}
+FIELD_B = {"heading": 0.3, "summary": 0.5, "body": 0.75}
+BM25_K1 = 1.2
+
+# Per-term float tables, stored in the postings file by term id
+TERM_TABLES = ("idf", "bm25_idf", "cosine_max", "bm25_max")
+
+
+# Runs of word characters other than underscore. One pass, equivalent to the
+# original strip of #*`[]()_- followed by \b\w+\b (only "_" is a word char).
+TOKEN_RE = re.compile(r"[^\W_]+")
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase word tokens with markdown formatting stripped"""
+    return TOKEN_RE.findall(text.lower())
+
+
+def split_fields(content: str) -> dict[str, str]:
+    """Split markdown into heading lines, the first paragraph and the rest
+
+    Lines inside fenced code blocks are always body text, so shell comments
+    are not mistaken for headings.
+    """
+    fields: dict[str, list[str]] = {field: [] for field in FIELDS}
+    state = "before"  # before -> summary -> after
+    in_fence = False
+    for line in content.splitlines():
+        stripped = line.strip()
+        fence = stripped.startswith("```")
+        if fence:
+            in_fence = not in_fence
+
+        if in_fence or fence:
+            field = "body"
+        elif stripped.startswith("#"):
+            field = "heading"
+        elif not stripped:
+            field = None
+        else:
+            field = "summary" if state != "after" else "body"
+
+        if field == "summary":
+            state = "summary"
+        elif state == "summary":
+            state = "after"
+        if field:
+            fields[field].append(line)
+    return {field: "\n".join(lines) for field, lines in fields.items()}
+
+
+def split_passages(content: str) -> list[tuple[int, int, str]]:
+    """Split text into overlapping, heading-bounded passages
+
+    Every heading (outside code fences) starts a new section. Sections longer
+    than PASSAGE_CHARS become windows of whole lines, each overlapping the
+    previous one by up to PASSAGE_OVERLAP characters.
+
+    Returns:
+        (start_byte, end_byte, text) per passage, offsets into the UTF-8 file
+    """
+    sections: list[list[tuple[int, int, str]]] = []
+    current: list[tuple[int, int, str]] = []
+    offset = 0
+    in_fence = False
+    for line in content.splitlines(keepends=True):
+        stripped = line.strip()
+        fence = stripped.startswith("```")
+        if fence:
+            in_fence = not in_fence
+        if current and not in_fence and not fence and stripped.startswith("#"):
+            sections.append(current)
+            current = []
+        size = len(line.encode("utf-8"))
+        current.append((offset, offset + size, line))
+        offset += size
+    if current:
+        sections.append(current)
+
+    passages = []
+    for lines in sections:
+        i = 0
+        while True:
+            j, chars = i + 1, len(lines[i][2])
+            while j < len(lines) and chars + len(lines[j][2]) <= PASSAGE_CHARS:
+                chars += len(lines[j][2])
+                j += 1
+            passages.append((lines[i][0], lines[j - 1][1], "".join(line[2] for line in lines[i:j])))
+            if j >= len(lines):
+                break
+            # Step back so the next window repeats the tail of this one
+            k, overlap = j, 0
+            while k - 1 > i and overlap + len(lines[k - 1][2]) <= PASSAGE_OVERLAP:
+                k -= 1
+                overlap += len(lines[k][2])
+            i = k
+    return passages
+
+
+def read_passage(path: str, start: int, end: int) -> str:
+    """Read one passage from disk by byte offsets"""
+    with open(path, "rb") as f:
+        f.seek(start)
+        return f.read(end - start).decode("utf-8", errors="replace")
+
+
+def analyze(content: str, tokens: list[str] | None = None) -> dict[str, Any]:
+    """Everything the index stores about one document, computed from its text
+
+    Returns:
+        length, fields ([heading, summary] token counts), passages
+        ([start_byte, end_byte, tokens] each), postings (term -> tf),
+        field_tf (term -> [heading tf, summary tf]), and the encoded
+        positions and passage_tf (term -> [[passage number, tf], ...])
+        blocks for the positions sidecar
+    """
+    if tokens is None:
+        tokens = tokenize(content)
+    sections = split_fields(content)
+    heading = Counter(tokenize(sections["heading"]))
+    summary = Counter(tokenize(sections["summary"]))
+
+    passages: list[list[int]] = []
+    passage_tf: dict[str, list[list[int]]] = {}
+    for number, (start, end, text) in enumerate(split_passages(content)):
+        counts = Counter(tokenize(text))
+        passages.append([start, end, sum(counts.values())])
+        for term, freq in counts.items():
+            passage_tf.setdefault(term, []).append([number, freq])
+
+    return {
+        "length": len(tokens),
+        "fields": [sum(heading.values()), sum(summary.values())],
+        "passages": passages,
+        "postings": dict(Counter(tokens)),
+        "field_tf": {term: [heading[term], summary[term]] for term in heading.keys() | summary.keys()},
+        "passage_tf": encode_passage_tfs(passage_tf),
+        "positions": encode_positions(tokens),
+    }
+
+
+def bm25_doc_norms(docs: dict[str, dict[str, Any]]) -> dict[str, list[float]]:
+    """Per-field BM25 length normalization (1 - b + b * len / avg_len) per document"""
+    lengths = {}
+    for doc_id, meta in docs.items():
+        heading, summary = meta["fields"]
+        lengths[doc_id] = [heading, summary, meta["length"] - heading - summary]
+    averages = [sum(column) / len(docs) for column in zip(*lengths.values())] if docs else []
+    return {
+        doc_id: [
+            1 - FIELD_B[field] + FIELD_B[field] * (length / average if average else 0.0)
+            for field, length, average in zip(FIELDS, field_lengths, averages)
+        ]
+        for doc_id, field_lengths in lengths.items()
+    }
+
+
+def term_upper_bounds(plist: dict[str, int], field_tf: dict[str, list[int]], idf: float, bm25_idf: float,
+                      docs: dict[str, dict[str, Any]], norms: Mapping[str, float],
+                      bm25_norms: Mapping[str, list[float]]) -> tuple[float, float]:
+    """Highest per-term score contribution of any posting, for dynamic pruning
+
+    Returns:
+        (max TF-IDF weight divided by the document norm, max BM25F term score)
+    """
+    weights = [FIELD_WEIGHTS[field] for field in FIELDS]
+    cosine_max = bm25_max = 0.0
+    for doc_id, freq in plist.items():
+        if idf:
+            cosine_max = max(cosine_max, freq / docs[doc_id]["length"] * idf / norms[doc_id])
+        heading, summary = field_tf.get(doc_id, (0, 0))
+        field_freqs = (heading, summary, freq - heading - summary)
+        tf = sum(w * f / n for w, f, n in zip(weights, field_freqs, bm25_norms[doc_id]))
+        bm25_max = max(bm25_max, bm25_idf * tf * (BM25_K1 + 1) / (BM25_K1 + tf))
+    return cosine_max, bm25_max
+
+
+def passage_average(docs: dict[str, dict[str, Any]]) -> float:
+    """Mean passage length in tokens across the corpus"""
+    lengths = [p[2] for meta in docs.values() for p in meta["passages"]]
+    return sum(lengths) / len(lengths) if lengths else 0.0
+
+
+def postings_sections(postings: CompactPostings, fields: FieldPostings,
+                      values: dict[str, array]) -> dict[str, array | bytes]:
+    """The sections of a postings file: the vocabulary, postings, field tfs, then values
+
+    values holds the TERM_TABLES arrays by term id and the norms and
+    bm25_norms (len(FIELDS) per document) arrays by document number.
+    """
+    sections: dict[str, array | bytes] = {"terms": "\n".join(postings.terms).encode("utf-8")}
+    for name in ("offsets", "gaps", "tfs", "skip_offsets", "skips"):
+        sections[name] = getattr(postings, name)
+    sections.update(field_offsets=fields.offsets, field_docs=fields.docs, field_tfs=fields.tfs)
+    sections.update(values)
+    return sections
+
+
+def read_doc_list(doc_list_file: Path) -> list[str]:
+    """Read document paths from coordination_docs.txt (skips comments)"""
+    with open(doc_list_file) as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith("#")]
+
+
+class KBIndex:
+    """On-disk inverted index with per-file incremental updates
+
+    Layout of ``kb_index.json``:
+        docs:     doc_id -> {path, mtime_ns, size, sha256, length, fields, passages,
+                  positions, passage_tf}
+                  passages is a list of [start_byte, end_byte, token count];
+                  positions and passage_tf are the [offset, length] of the
+                  doc's position and passage blocks in the positions
+                  sidecar (see kb_positions.py)
+        postings_file: name of the postings sidecar holding the tables below
+        positions_file: name of the positions sidecar, positions_garbage:
+                  bytes of replaced blocks in it
+        passage_avg: mean passage length in tokens
+
+    Tables, in the postings sidecar by term id and document number (see
+    kb_postings.py):
+        postings: term -> {doc_id: tf}
+        fields:   term -> {doc_id: [heading tf, summary tf]} (body tf is the rest)
+        idf:      term -> log(N / df)
+        norms:    doc_id -> magnitude of the doc's TF-IDF vector
+        bm25_idf: term -> log(1 + (N - df + 0.5) / (df + 0.5))
+        bm25_norms: doc_id -> per-field BM25 length normalization
+        cosine_max: term -> highest tf-idf weight / doc norm of any posting
+        bm25_max: term -> highest BM25F term score of any posting
+
+    Document text is never stored; passages are read back by byte offset.
+    load() maps the postings sidecar and the tables stay array views until
+    the first write turns them back into dicts; save() then writes a new
+    sidecar. compact() moves unsaved dicts into arrays and makes the index
+    read-only once it will only be queried.
+    """
+
+    def __init__(self, index_file: Path | None):
+        self.index_file = Path(index_file) if index_file else None
+        self.docs: dict[str, dict[str, Any]] = {}
+        self.postings: dict[str, dict[str, int]] | CompactPostings = {}
+        self.fields: dict[str, dict[str, list[int]]] | FieldPostings = {}
+        self.passage_avg = 0.0
+        self.idf: Mapping[str, float] = {}
+        self.norms: Mapping[str, float] = {}
+        self.bm25_idf: Mapping[str, float] = {}
+        self.bm25_norms: Mapping[str, list[float]] = {}
+        self.cosine_max: Mapping[str, float] = {}
+        self.bm25_max: Mapping[str, float] = {}
+        self.postings_file: str | None = None
+        self.positions_file: str | None = None
+        self.positions_garbage = 0
+        # Opened on first use; an index without a file keeps positions in memory
+        self._positions = None if index_file else PositionStore(None)
+        self.read_only = False
+        self.dirty = False
+
+    @property
+    def compacted(self) -> bool:
+        return isinstance(self.postings, CompactPostings)
+
+    def _check_writable(self) -> None:
+        """Refuse writes to a read-only index and turn array tables back into dicts"""
+        if self.read_only:
+            raise RuntimeError("A compacted KB index is read-only")
+        if self.compacted:
+            self.postings = self.postings.to_dict()
+            self.fields = self.fields.to_dict()
+            for name in TERM_TABLES + ("norms", "bm25_norms"):
+                setattr(self, name, getattr(self, name).to_dict())
+
+    def _use_arrays(self, terms: TermDictionary, sections: Mapping[str, Any]) -> None:
+        """Point the tables at arrays laid out as in the postings file"""
+        doc_ids = list(self.docs)
+        self.postings = CompactPostings.from_arrays(doc_ids, terms, sections)
+        self.fields = FieldPostings.from_arrays(self.postings, sections)
+        for name in TERM_TABLES:
+            setattr(self, name, TermValues(terms, sections[name]))
+        self.norms = DocValues(doc_ids, sections["norms"])
+        self.bm25_norms = DocValues(doc_ids, sections["bm25_norms"], len(FIELDS))
+
+    def _map_postings(self) -> str | None:
+        """Map the postings sidecar into the tables, or return why it cannot be used"""
+        path = self.index_file.with_name(self.postings_file)
+        try:
+            tables = ArrayFile(path)
+        except FileNotFoundError:
+            return "postings file is missing"
+        except (OSError, ValueError, KeyError, json.JSONDecodeError) as e:
+            return f"unreadable postings file: {e}"
+        if tables.meta.get("docs") != len(self.docs):
+            return "postings file does not match the documents"
+        data = bytes(tables.sections["terms"])
+        self._use_arrays(TermDictionary(data.decode("utf-8").split("\n") if data else ()), tables.sections)
+        return None
+
+    @classmethod
+    def load(cls, index_file: Path) -> "KBIndex":
+        """Load an index, returning an empty one if missing or incompatible"""
+        # A save in another process may replace the postings sidecar between
+        # reading the JSON and mapping it, so read both again once
+        for _ in range(2):
+            index = cls(index_file)
+            try:
+                data = json.loads(index.index_file.read_text())
+            except FileNotFoundError:
+                return index
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"Warning: Ignoring unreadable index {index_file}: {e}", file=sys.stderr)
+                return index
+
+            if data.get("version") != INDEX_VERSION:
+                return index
+
+            index.docs = data["docs"]
+            index.passage_avg = data["passage_avg"]
+            index.postings_file = data["postings_file"]
+            index.positions_file = data["positions_file"]
+            index.positions_garbage = data["positions_garbage"]
+            problem = index._map_postings()
+            if problem is None:
+                break
+        else:
+            print(f"Warning: Ignoring index {index_file}: {problem}", file=sys.stderr)
+            return cls(index_file)
+
+        if index.docs and not (index.positions_file and index.index_file.with_name(index.positions_file).is_file()):
+            print(f"Warning: Ignoring index {index_file}: positions file is missing", file=sys.stderr)
+            return cls(index_file)
+        return index
+
+    def save(self) -> None:
+        """Atomically write the index next to the corpus
+
+        The positions sidecar is rewritten first when replaced blocks
+        outweigh live ones, and a new postings sidecar is written when the
+        tables changed since load. Old sidecars are removed once the index
+        pointing at the new ones is in place, and the tables are mapped
+        from the new postings sidecar.
+        """
+        if self.read_only:
+            raise RuntimeError("A compacted KB index is read-only")
+        spans = [span for meta in self.docs.values() for span in (meta["positions"], meta["passage_tf"])]
+        if self.positions_garbage > sum(length for _, length in spans):
+            path = positions_path(self.index_file)
+            self._positions = self.positions.rewrite(spans, path)
+            self.positions_file = path.name
+            self.positions_garbage = 0
+        elif self._positions is not None:
+            self._positions.flush()
+
+        changed = not self.compacted
+        if changed:
+            path = positions_path(self.index_file, "postings")
+            postings, sections = self._sections()
+            write_arrays(path, sections, {"docs": len(self.docs)})
+            self.postings_file = path.name
+
+        data = {
+            "version": INDEX_VERSION,
+            "docs": self.docs,
+            "postings_file": self.postings_file,
+            "positions_file": self.positions_file,
+            "positions_garbage": self.positions_garbage,
+            "passage_avg": self.passage_avg,
+        }
+        # One temp file per process and thread: concurrent CLI runs and the
+        # server's reload paths each save the index
+        tmp = self.index_file.with_name(f"{self.index_file.name}.tmp.{os.getpid()}.{threading.get_ident()}")
+        tmp.write_text(json.dumps(data, separators=(",", ":")))
+        os.replace(tmp, self.index_file)
+        remove_stale(self.index_file, self.positions_file)
+        remove_stale(self.index_file, self.postings_file, "postings")
+        if changed:
+            self._use_arrays(postings.terms, ArrayFile(self.index_file.with_name(self.postings_file)).sections)
+        self.dirty = False
+
+    def _sections(self) -> tuple[CompactPostings, dict[str, array | bytes]]:
+        """The dict tables as compact postings and postings file sections"""
+        postings = CompactPostings(self.docs, self.postings)
+        values = {name: array("d", map(getattr(self, name).__getitem__, postings.terms)) for name in TERM_TABLES}
+        values["norms"] = array("d", map(self.norms.__getitem__, self.docs))
+        values["bm25_norms"] = array("d", [norm for doc_id in self.docs for norm in self.bm25_norms[doc_id]])
+        return postings, postings_sections(postings, FieldPostings(postings, self.fields), values)
+
+    @property
+    def positions(self) -> PositionStore:
+        """The positions sidecar, created or opened on first use"""
+        if self._positions is None:
+            if self.positions_file is None:
+                self.positions_file = positions_path(self.index_file).name
+            self._positions = PositionStore(self.index_file.with_name(self.positions_file))
+        return self._positions
+
+    def doc_positions(self, doc_id: str, terms: list[str] | None = None) -> dict[str, list[int]]:
+        """Token positions of terms (default: all) in one document, read from the sidecar"""
+        return decode_positions(self.positions.read(*self.docs[doc_id]["positions"]), terms)
+
+    def passage_tfs(self, doc_id: str, terms: list[str] | None = None) -> dict[str, list[list[int]]]:
+        """[[passage number, tf], ...] of terms (default: all) in one document, read from the sidecar"""
+        return decode_passage_tfs(self.positions.read(*self.docs[doc_id]["passage_tf"]), terms)
+
+    def update(self, doc_paths: list[str]) -> dict[str, int]:
+        """Bring the index in line with doc_paths, re-indexing only changed files
+
+        A file is re-read when its mtime or size differs from the index and
+        re-tokenized only when its sha256 differs as well.
+
+        Args:
+            doc_paths: Document paths in load order (later duplicates win)
+
+        Returns:
+            Counts of added, updated, removed and unchanged documents
+        """
+        changes = {"added": 0, "updated": 0, "removed": 0, "unchanged": 0}
+
+        wanted: dict[str, str] = {}
+        for path in doc_paths:
+            wanted[Path(path).stem] = path
+
+        for doc_id in [d for d in self.docs if d not in wanted]:
+            self.remove_document(doc_id)
+            changes["removed"] += 1
+
+        for doc_id, path in wanted.items():
+            try:
+                st = os.stat(path)
+                meta = self.docs.get(doc_id)
+                if (meta and meta["path"] == path and meta["mtime_ns"] == st.st_mtime_ns
+                        and meta["size"] == st.st_size):
+                    changes["unchanged"] += 1
+                    continue
+
+                with open(path, "rb") as f:
+                    raw = f.read()
+                digest = hashlib.sha256(raw).hexdigest()
+                if meta and meta["path"] == path and meta["sha256"] == digest:
+                    meta["mtime_ns"] = st.st_mtime_ns
+                    meta["size"] = st.st_size
+                    self.dirty = True
+                    changes["unchanged"] += 1
+                    continue
+
+                content = raw.decode("utf-8")
+            except (OSError, UnicodeDecodeError) as e:
+                print(f"Error loading {path}: {e}")
+                if doc_id in self.docs:
+                    self.remove_document(doc_id)
+                    changes["removed"] += 1
+                continue
+
+            changes["updated" if meta else "added"] += 1
+            if meta:
+                self.remove_document(doc_id)
+            self.add_document(doc_id, path, content, st.st_mtime_ns, st.st_size, digest)
+
+        # Keep doc order identical to the document list
+        if list(self.docs) != list(wanted):
+            # Array tables are numbered in the old order
+            self._check_writable()
+            self.docs = {d: self.docs[d] for d in wanted if d in self.docs}
+            self.dirty = True
+
+        if changes["added"] or changes["updated"] or changes["removed"]:
+            self.finalize()
+        return changes
+
+    def add_document(self, doc_id: str, path: str, content: str, mtime_ns: int = 0,
+                     size: int = 0, digest: str = "", tokens: list[str] | None = None) -> None:
+        """Add a document's postings (call finalize() afterwards)"""
+        self._check_writable()
+        analysis = analyze(content, tokens)
+        self.docs[doc_id] = {
+            "path": path,
+            "mtime_ns": mtime_ns,
+            "size": size,
+            "sha256": digest,
+            "length": analysis["length"],
+            "fields": analysis["fields"],
+            "passages": analysis["passages"],
+            "positions": self.positions.append(analysis["positions"]),
+            "passage_tf": self.positions.append(analysis["passage_tf"]),
+        }
+        for term, freq in analysis["postings"].items():
+            self.postings.setdefault(term, {})[doc_id] = freq
+        for term, counts in analysis["field_tf"].items():
+            self.fields.setdefault(term, {})[doc_id] = counts
+        self.dirty = True
+
+    def remove_document(self, doc_id: str) -> None:
+        """Drop a document and its postings (call finalize() afterwards)"""
+        self._check_writable()
+        meta = self.docs.pop(doc_id, None)
+        if meta is None:
+            return
+        self.positions_garbage += meta["positions"][1] + meta["passage_tf"][1]
+        # The document's position block lists its terms, so only their postings are visited
+        for term in block_terms(self.positions.read(*meta["positions"])):
+            for table in (self.postings, self.fields):
+                plist = table.get(term, {})
+                plist.pop(doc_id, None)
+                if not plist:
+                    table.pop(term, None)
+        self.norms.pop(doc_id, None)
+        self.bm25_norms.pop(doc_id, None)
+        self.dirty = True
+
+    def finalize(self) -> None:
+        """Recompute IDF and document norms from the postings"""
+        self._check_writable()
+        doc_count = len(self.docs)
+        self.idf = {term: math.log(doc_count / len(plist)) for term, plist in self.postings.items()}
+
+        squares = dict.fromkeys(self.docs, 0.0)
+        for term, plist in self.postings.items():
+            idf = self.idf[term]
+            for doc_id, freq in plist.items():
+                weight = freq / self.docs[doc_id]["length"] * idf
+                squares[doc_id] += weight * weight
+        self.norms = {doc_id: math.sqrt(total) for doc_id, total in squares.items()}
+
+        # BM25F: idf and per-field length normalization, fixed until the corpus changes
+        self.bm25_idf = {
+            term: math.log(1 + (doc_count - len(plist) + 0.5) / (len(plist) + 0.5))
+            for term, plist in self.postings.items()
+        }
+        self.bm25_norms = bm25_doc_norms(self.docs)
+        self.passage_avg = passage_average(self.docs)
+
+        # Per-term score ceilings for WAND top-k
+        self.cosine_max = {}
+        self.bm25_max = {}
+        for term, plist in self.postings.items():
+            self.cosine_max[term], self.bm25_max[term] = term_upper_bounds(
+                plist, self.fields.get(term, {}), self.idf[term], self.bm25_idf[term],
+                self.docs, self.norms, self.bm25_norms)
+        self.dirty = True
+
+    def compact(self) -> None:
+        """Intern terms and move the tables into typed arrays (read-only from then on)
+
+        Called once the index is only queried; the dicts used for updates
+        cost several times the memory. A loaded index is already mapped.
+        """
+        if not self.compacted:
+            postings, sections = self._sections()
+            self._use_arrays(postings.terms, sections)
+        self.read_only = True
+
+    def corpus_checksum(self) -> str:
+        """sha256 over the indexed documents' paths and content hashes"""
+        hasher = hashlib.sha256(f"v{INDEX_VERSION}".encode())
+        for doc_id, meta in self.docs.items():
+            hasher.update(f"\0{doc_id}\0{meta['path']}\0{meta['sha256']}".encode())
+        return hasher.hexdigest()
+
+
+def open_index(doc_paths: list[str], index_file: Path,
+               workers: int | None = None) -> tuple[KBIndex, dict[str, int]]:
+    """Load the index, update it for changed documents and persist if needed
+
+    A missing index for a corpus of PARALLEL_MIN_DOCS or more documents is
+    first built with the parallel builder (kb_build.py) unless workers is 1.
+    """
+    index = KBIndex.load(index_file)
+    if not index.docs and workers != 1 and len(doc_paths) >= PARALLEL_MIN_DOCS:
+        from kb_build import build_parallel
+        stats = build_parallel(doc_paths, index_file, workers)
+        index = KBIndex.load(index_file)
+        changes = index.update(doc_paths)
+        changes["added"] += stats["documents"]
+        changes["unchanged"] -= stats["documents"]
+    else:
+        changes = index.update(doc_paths)
+    if index.dirty:
+        try:
+            index.save()
+        except OSError as e:
+            print(f"Warning: Could not save index: {e}", file=sys.stderr)
+    return index, changes
+
+
+def main() -> None:
+    import argparse
+
+    script_dir = Path(__file__).parent
+    parser = argparse.ArgumentParser(description="Build or refresh the coordination KB index")
+    parser.add_argument("--docs", type=Path, default=script_dir / "coordination_docs.txt",
+                        help="Document list (default: coordination_docs.txt)")
+    parser.add_argument("--index", type=Path, default=script_dir / INDEX_FILE,
+                        help=f"Index file (default: {INDEX_FILE})")
+    parser.add_argument("--rebuild", action="store_true", help="Discard the index and rebuild")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Worker processes for a full rebuild (default: CPU count; 1 builds serially)")
+    args = parser.parse_args()
+
+    if not args.docs.exists():
+        print(f"Error: {args.docs} not found", file=sys.stderr)
+        sys.exit(1)
+
+    if args.rebuild and args.index.exists():
+        args.index.unlink()
+
+    doc_paths = read_doc_list(args.docs)
+    if args.rebuild and args.workers != 1:
+        from kb_build import build_parallel
+        build_parallel(doc_paths, args.index, args.workers)
+    index, changes = open_index(doc_paths, args.index, args.workers)
+    print(f"Index: {args.index}")
+    print(f"Documents: {len(index.docs)}  Terms: {len(index.postings)}")
+    print("Changes: " + ", ".join(f"{k} {v}" for k, v in changes.items()))
+
+
+if __name__ == "__main__":
+    main()
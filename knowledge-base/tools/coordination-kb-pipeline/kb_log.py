@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Buffered, rotating writer for the coordination KB query log
+Events are serialized into an in-memory buffer and appended to
+coordination_queries.jsonl in one write when the buffer fills, when it gets
+old (a background thread checks), on flush() and at interpreter exit. Before
+each append the active file is rotated if it has reached the size limit or
+was last written on an earlier UTC day; rotated segments are gzip-compressed
+next to it as coordination_queries.<YYYYmmdd-HHMMSS>.jsonl.gz.
+
+read_log_lines() yields every line of the rotated segments, oldest first,
+followed by the active file, so readers see one continuous log.
+
+Part of: Coordination KB Pipeline
+"""
+
+import atexit
+import gzip
+import json
+import os
+import shutil
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Iterator
+
+DEFAULT_MAX_BYTES = 8 * 1024 * 1024
+DEFAULT_FLUSH_EVENTS = 64
+DEFAULT_FLUSH_SECONDS = 1.0
+
+_WRITERS: dict[str, "QueryLogWriter"] = {}
+_WRITERS_LOCK = threading.Lock()
+
+
+def log_segments(log_file: Path) -> list[Path]:
+    """Rotated segments of log_file, oldest first (the active file excluded)
+
+    A plain segment whose .gz copy is already in place is left out, so a
+    rotation that has not yet removed it is not read twice.
+    """
+    log_file = Path(log_file)
+    pattern = f"{log_file.stem}.*{log_file.suffix}*"
+    paths = sorted(p for p in log_file.parent.glob(pattern) if p != log_file)
+    names = {p.name for p in paths}
+    return [p for p in paths if p.suffix == ".gz" or p.name + ".gz" not in names]
+
+
+def read_log_lines(log_file: Path) -> Iterator[str]:
+    """Every line of the rotated segments and then the active log"""
+    log_file = Path(log_file)
+    for path in log_segments(log_file) + [log_file]:
+        opener = gzip.open if path.suffix == ".gz" else open
+        try:
+            with opener(path, "rt") as f:
+                yield from f
+        except FileNotFoundError:
+            # Rotated away by another process between listing and opening
+            continue
+        except (EOFError, gzip.BadGzipFile) as e:
+            # Left truncated by a writer that died while compressing
+            print(f"Warning: Skipping the rest of damaged log segment {path}: {e}", file=sys.stderr)
+
+
+class QueryLogWriter:
+    """Batches JSONL events and rotates the file they are appended to"""
+
+    def __init__(self, log_file: Path, max_bytes: int = DEFAULT_MAX_BYTES, rotate_daily: bool = True,
+                 flush_events: int = DEFAULT_FLUSH_EVENTS, flush_seconds: float = DEFAULT_FLUSH_SECONDS,
+                 compress: bool = True):
+        self.log_file = Path(log_file)
+        self.max_bytes = max_bytes
+        self.rotate_daily = rotate_daily
+        self.flush_events = flush_events
+        self.flush_seconds = flush_seconds
+        self.compress = compress
+        self.buffer: list[str] = []
+        self.oldest = 0.0
+        self.lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._flusher: threading.Thread | None = None
+
+    def write(self, event: dict[str, Any]) -> None:
+        """Queue one event; appends the batch once it is full"""
+        line = json.dumps(event) + "\n"
+        with self.lock:
+            if not self.buffer:
+                self.oldest = time.monotonic()
+            self.buffer.append(line)
+            if len(self.buffer) >= self.flush_events:
+                self._flush_locked()
+                return
+        self._start_flusher()
+
+    def flush(self) -> None:
+        """Append everything buffered now"""
+        with self.lock:
+            self._flush_locked()
+
+    def close(self) -> None:
+        """Stop the background flusher and flush"""
+        self._stopped.set()
+        self.flush()
+
+    def _start_flusher(self) -> None:
+        if self._flusher is None and self.flush_seconds > 0:
+            self._flusher = threading.Thread(target=self._flush_loop, name="kb-log-flush", daemon=True)
+            self._flusher.start()
+
+    def _flush_loop(self) -> None:
+        while not self._stopped.wait(self.flush_seconds / 2):
+            with self.lock:
+                if self.buffer and time.monotonic() - self.oldest >= self.flush_seconds:
+                    self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        if not self.buffer:
+            return
+        data = "".join(self.buffer)
+        try:
+            self._maybe_rotate(len(data))
+            # One append per batch; O_APPEND keeps concurrent writers' batches whole
+            with open(self.log_file, "a") as f:
+                f.write(data)
+        except OSError as e:
+            print(f"Warning: Could not log {len(self.buffer)} queries: {e}", file=sys.stderr)
+        self.buffer.clear()
+
+    def _maybe_rotate(self, incoming: int) -> None:
+        try:
+            st = os.stat(self.log_file)
+        except FileNotFoundError:
+            return
+        if not st.st_size:
+            return
+
+        now = datetime.now(timezone.utc)
+        last_write = datetime.fromtimestamp(st.st_mtime, timezone.utc)
+        too_big = st.st_size + incoming > self.max_bytes
+        new_day = self.rotate_daily and last_write.date() != now.date()
+        if too_big or new_day:
+            self.rotate(now)
+
+    def rotate(self, now: datetime | None = None) -> Path | None:
+        """Move the active log to a timestamped (compressed) segment
+
+        Returns:
+            The new segment, or None if there was nothing to rotate
+        """
+        now = now or datetime.now(timezone.utc)
+        stamp = now.strftime("%Y%m%d-%H%M%S")
+        segment = self.log_file.with_name(f"{self.log_file.stem}.{stamp}{self.log_file.suffix}")
+        n = 1
+        while segment.exists() or segment.with_name(segment.name + ".gz").exists():
+            segment = self.log_file.with_name(f"{self.log_file.stem}.{stamp}_{n}{self.log_file.suffix}")
+            n += 1
+
+        try:
+            os.rename(self.log_file, segment)
+        except FileNotFoundError:
+            # Another process rotated it first
+            return None
+        if not self.compress:
+            return segment
+
+        # Compress under a hidden name log_segments does not match, so readers
+        # never open a partial gzip; until the plain segment is removed they
+        # read only the finished copy
+        compressed = segment.with_name(segment.name + ".gz")
+        partial = segment.with_name(f".{compressed.name}.tmp.{os.getpid()}")
+        try:
+            with open(segment, "rb") as src, gzip.open(partial, "wb") as dst:
+                shutil.copyfileobj(src, dst)
+            os.replace(partial, compressed)
+        finally:
+            partial.unlink(missing_ok=True)
+        segment.unlink()
+        return compressed
+
+
+def get_writer(log_file: Path, **kwargs: Any) -> QueryLogWriter:
+    """The process-wide writer for log_file (created on first use)"""
+    key = str(Path(log_file).resolve())
+    with _WRITERS_LOCK:
+        writer = _WRITERS.get(key)
+        if writer is None:
+            writer = _WRITERS[key] = QueryLogWriter(log_file, **kwargs)
+        return writer
+
+
+def flush_all() -> None:
+    """Flush every writer in this process"""
+    with _WRITERS_LOCK:
+        writers = list(_WRITERS.values())
+    for writer in writers:
+        writer.flush()
+
+
+atexit.register(flush_all)
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Positional data for the coordination KB index
+Token positions are kept out of kb_index.json, in a binary sidecar file
+with one block per document. Each block lists the document's terms with
+their positions as variable-byte encoded gaps. The JSON index records only
+each block's [offset, length], and the sidecar is opened on the first phrase
+or proximity query, so term-only queries never load positions.
+
+Each document also has a passage block with the same framing, holding its
+per-passage term frequencies; only returned documents' blocks are read, to
+pick their best passage. A document's block terms double as its term list
+when the document is removed from the postings.
+
+Block layout, all integers varint-encoded:
+    per term: term byte length, term UTF-8 bytes, value count,
+              payload byte length, payload
+    positions payload: gaps between positions
+    passage payload: per passage, gap from the previous passage number and tf
+
+Part of: Coordination KB Pipeline
+"""
+
+import heapq
+import os
+import secrets
+from pathlib import Path
+from typing import Iterable, Iterator
+
+
+def encode_varint(value: int, out: bytearray) -> None:
+    """Append value as a little-endian base-128 varint"""
+    while value >= 0x80:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def decode_varint(data: bytes, pos: int) -> tuple[int, int]:
+    """(value, next position) of the varint starting at pos"""
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+def encode_block(entries: dict[str, tuple[int, bytes]]) -> bytes:
+    """A block from term -> (count, payload) pairs"""
+    block = bytearray()
+    for term, (count, payload) in entries.items():
+        name = term.encode("utf-8")
+        encode_varint(len(name), block)
+        block += name
+        encode_varint(count, block)
+        encode_varint(len(payload), block)
+        block += payload
+    return bytes(block)
+
+
+def block_entries(block: bytes, terms: Iterable[str] | None = None) -> Iterator[tuple[str, int, int]]:
+    """(term, value count, payload offset) per term of a block; with terms, only those"""
+    wanted = None if terms is None else {term.encode("utf-8") for term in terms}
+    pos = 0
+    while pos < len(block):
+        size, pos = decode_varint(block, pos)
+        name = block[pos:pos + size]
+        pos += size
+        count, pos = decode_varint(block, pos)
+        payload_size, pos = decode_varint(block, pos)
+        if wanted is None or name in wanted:
+            yield name.decode("utf-8"), count, pos
+        pos += payload_size
+
+
+def block_terms(block: bytes) -> list[str]:
+    """Every term of a block, without decoding payloads"""
+    return [term for term, _, _ in block_entries(block)]
+
+
+def encode_positions(tokens: list[str]) -> bytes:
+    """One document's block: every term's token positions, delta + varint encoded"""
+    positions: dict[str, list[int]] = {}
+    for position, term in enumerate(tokens):
+        positions.setdefault(term, []).append(position)
+
+    entries = {}
+    for term, where in positions.items():
+        payload = bytearray()
+        previous = 0
+        for position in where:
+            encode_varint(position - previous, payload)
+            previous = position
+        entries[term] = (len(where), payload)
+    return encode_block(entries)
+
+
+def decode_positions(block: bytes, terms: Iterable[str] | None = None) -> dict[str, list[int]]:
+    """Positions per term from a block; with terms, other terms' payloads are skipped"""
+    positions: dict[str, list[int]] = {}
+    for term, count, pos in block_entries(block, terms):
+        where = []
+        position = 0
+        for _ in range(count):
+            gap, pos = decode_varint(block, pos)
+            position += gap
+            where.append(position)
+        positions[term] = where
+    return positions
+
+
+def encode_passage_tfs(passage_tf: dict[str, list[list[int]]]) -> bytes:
+    """One document's passage block from term -> [[passage number, tf], ...]"""
+    entries = {}
+    for term, pairs in passage_tf.items():
+        payload = bytearray()
+        previous = 0
+        for number, freq in pairs:
+            encode_varint(number - previous, payload)
+            encode_varint(freq, payload)
+            previous = number
+        entries[term] = (len(pairs), payload)
+    return encode_block(entries)
+
+
+def decode_passage_tfs(block: bytes, terms: Iterable[str] | None = None) -> dict[str, list[list[int]]]:
+    """term -> [[passage number, tf], ...] from a passage block, optionally only for terms"""
+    passage_tf: dict[str, list[list[int]]] = {}
+    for term, count, pos in block_entries(block, terms):
+        pairs = []
+        number = 0
+        for _ in range(count):
+            gap, pos = decode_varint(block, pos)
+            freq, pos = decode_varint(block, pos)
+            number += gap
+            pairs.append([number, freq])
+        passage_tf[term] = pairs
+    return passage_tf
+
+
+def positions_path(index_file: Path, kind: str = "positions") -> Path:
+    """A fresh sidecar name next to index_file (a new one per rewrite)"""
+    index_file = Path(index_file)
+    return index_file.with_name(f"{index_file.stem}.{kind}.{secrets.token_hex(4)}.bin")
+
+
+def remove_stale(index_file: Path, keep: str | None, kind: str = "positions") -> None:
+    """Delete sidecars of index_file other than keep (left by rewrites and rebuilds)"""
+    index_file = Path(index_file)
+    for path in index_file.parent.glob(f"{index_file.stem}.{kind}.*.bin"):
+        if path.name != keep:
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+
+class PositionStore:
+    """A sidecar file of position blocks plus blocks appended since the last flush
+
+    New blocks are buffered in memory and written by flush() when the index
+    is saved, so an index that cannot be saved still answers phrase queries.
+    With no path every block stays in memory. The file is opened on the
+    first read of a flushed block.
+    """
+
+    def __init__(self, path: Path | None):
+        self.path = Path(path) if path else None
+        try:
+            self.flushed = os.path.getsize(self.path) if self.path else 0
+        except FileNotFoundError:
+            self.flushed = 0
+        self.pending = bytearray()
+        self._reader = None
+
+    def append(self, block: bytes) -> list[int]:
+        """Store a block and return its [offset, length]"""
+        offset = self.flushed + len(self.pending)
+        self.pending += block
+        return [offset, len(block)]
+
+    def read(self, offset: int, length: int) -> bytes:
+        if offset >= self.flushed:
+            start = offset - self.flushed
+            return bytes(self.pending[start:start + length])
+        if self._reader is None:
+            self._reader = open(self.path, "rb")
+        self._reader.seek(offset)
+        return self._reader.read(length)
+
+    def flush(self) -> None:
+        """Append the buffered blocks to the file"""
+        if not self.pending or self.path is None:
+            return
+        with open(self.path, "ab") as f:
+            if f.tell() != self.flushed:
+                raise OSError(f"{self.path} changed size since it was opened")
+            f.write(self.pending)
+        self.flushed += len(self.pending)
+        self.pending.clear()
+
+    def rewrite(self, spans: Iterable[list[int]], path: Path) -> "PositionStore":
+        """Copy the live blocks into a new file at path, updating spans in place"""
+        spans = list(spans)
+        offsets = []
+        with open(path, "wb") as out:
+            for span in spans:
+                offsets.append(out.tell())
+                out.write(self.read(*span))
+        # Only once the copy is complete
+        for span, offset in zip(spans, offsets):
+            span[0] = offset
+        self.close()
+        return PositionStore(path)
+
+    def close(self) -> None:
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
+
+
+def phrase_match(positions: dict[str, list[int]], phrase: list[str]) -> bool:
+    """True if the phrase's terms occur at consecutive positions, in order"""
+    starts = set(positions.get(phrase[0], ()))
+    for offset, term in enumerate(phrase[1:], 1):
+        if not starts:
+            break
+        starts &= {position - offset for position in positions.get(term, ())}
+    return bool(starts)
+
+
+def min_span(lists: list[list[int]]) -> int:
+    """Token length of the smallest window holding a position from every sorted list"""
+    heap = [(where[0], n, 0) for n, where in enumerate(lists)]
+    heapq.heapify(heap)
+    high = max(where[0] for where in lists)
+    best = high - heap[0][0] + 1
+    while True:
+        low, n, i = heapq.heappop(heap)
+        best = min(best, high - low + 1)
+        if i + 1 == len(lists[n]):
+            return best
+        following = lists[n][i + 1]
+        high = max(high, following)
+        heapq.heappush(heap, (following, n, i + 1))
@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""
+Compact postings for the coordination KB
+Terms are interned to dense integer ids and every term's postings are kept
+in flat typed arrays: document-number gaps and term frequencies, 4 bytes
+each, instead of a dict of str -> int per term. Every BLOCK_SIZE postings a
+skip entry records the absolute document number, so a PostingCursor can
+seek forward without decoding every gap. Field term frequencies and the
+per-term and per-document floats are arrays over the same term and
+document numbers.
+
+The arrays are persisted as-is in a postings file (see write_arrays) that
+ArrayFile maps read-only, so loading an index costs only the term
+dictionary. The mutable dicts in KBIndex remain the format for updates.
+
+Postings file layout:
+    MAGIC, 8-byte header length, JSON header {byteorder, sections:
+    {name: [typecode, item size, byte offset, item count]}, meta}, then each section's
+    raw native-order items, 8-byte aligned
+
+Part of: Coordination KB Pipeline
+"""
+
+import json
+import mmap
+import sys
+from array import array
+from bisect import bisect_right
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Sequence
+
+BLOCK_SIZE = 64
+# Past every document number (they are stored as uint32)
+NO_MORE_DOCS = 1 << 32
+MAGIC = b"KBPOST1\n"
+
+
+class TermDictionary:
+    """Interns terms to dense integer ids, in insertion order"""
+
+    def __init__(self, terms: Iterable[str] = ()):
+        self.ids: dict[str, int] = {term: i for i, term in enumerate(dict.fromkeys(terms))}
+        self.terms: list[str] = list(self.ids)
+
+    def add(self, term: str) -> int:
+        """Id of term, assigning the next one if it is new"""
+        term_id = self.ids.get(term)
+        if term_id is None:
+            term_id = self.ids[term] = len(self.terms)
+            self.terms.append(term)
+        return term_id
+
+    def get(self, term: str) -> int | None:
+        return self.ids.get(term)
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+    def __contains__(self, term: object) -> bool:
+        return term in self.ids
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.terms)
+
+
+class CompactPostings:
+    """Read-only postings over a TermDictionary, stored CSR-style
+
+    Term t's postings are positions offsets[t] .. offsets[t + 1] of gaps
+    and tfs. Document numbers follow the index's document order; each is
+    stored as the gap from the previous posting of the same term (the first
+    gap is the number itself), so postings are sorted by document. skips
+    holds the document number of every BLOCK_SIZE-th posting of a term,
+    from skip_offsets[t] to skip_offsets[t + 1].
+    """
+
+    def __init__(self, doc_ids: Iterable[str], postings: dict[str, dict[str, int]] | None = None):
+        self.doc_ids = list(doc_ids)
+        self.terms = TermDictionary()
+        self.offsets: Sequence[int] = array("Q", [0])
+        self.gaps: Sequence[int] = array("I")
+        self.tfs: Sequence[int] = array("I")
+        self.skip_offsets: Sequence[int] = array("Q", [0])
+        self.skips: Sequence[int] = array("I")
+        if postings:
+            numbers = {doc_id: n for n, doc_id in enumerate(self.doc_ids)}
+            for term, plist in postings.items():
+                self.append(term, sorted((numbers[doc_id], freq) for doc_id, freq in plist.items()))
+
+    @classmethod
+    def from_arrays(cls, doc_ids: Iterable[str], terms: TermDictionary,
+                    arrays: dict[str, Sequence[int]]) -> "CompactPostings":
+        """Postings over existing arrays, e.g. the views of an ArrayFile"""
+        postings = cls(doc_ids)
+        postings.terms = terms
+        for name in ("offsets", "gaps", "tfs", "skip_offsets", "skips"):
+            setattr(postings, name, arrays[name])
+        return postings
+
+    def append(self, term: str, numbered: Iterable[tuple[int, int]]) -> None:
+        """Add a new term's (document number, tf) postings, sorted by number"""
+        self.terms.add(term)
+        previous = 0
+        for i, (number, freq) in enumerate(numbered):
+            if i % BLOCK_SIZE == 0:
+                self.skips.append(number)
+            self.gaps.append(number - previous)
+            self.tfs.append(freq)
+            previous = number
+        self.offsets.append(len(self.gaps))
+        self.skip_offsets.append(len(self.skips))
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+    def __contains__(self, term: object) -> bool:
+        return term in self.terms
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.terms)
+
+    def doc_frequency(self, term: str) -> int:
+        term_id = self.terms.get(term)
+        return 0 if term_id is None else self.offsets[term_id + 1] - self.offsets[term_id]
+
+    def numbered(self, term: str) -> Iterator[tuple[int, int]]:
+        """(document number, tf) for each posting of term, in document order"""
+        term_id = self.terms.get(term)
+        if term_id is None:
+            return
+        number = 0
+        for i in range(self.offsets[term_id], self.offsets[term_id + 1]):
+            number += self.gaps[i]
+            yield number, self.tfs[i]
+
+    def items(self, term: str) -> Iterator[tuple[str, int]]:
+        """(doc_id, tf) for each posting of term, in document order"""
+        doc_ids = self.doc_ids
+        for number, freq in self.numbered(term):
+            yield doc_ids[number], freq
+
+    def cursor(self, term: str) -> "PostingCursor | None":
+        """A cursor over term's postings, or None for an unknown term"""
+        term_id = self.terms.get(term)
+        return None if term_id is None else PostingCursor(self, term_id)
+
+    def nbytes(self) -> int:
+        """Bytes held by the posting arrays (the term dictionary excluded)"""
+        arrays = (self.offsets, self.gaps, self.tfs, self.skip_offsets, self.skips)
+        return sum(a.itemsize * len(a) for a in arrays)
+
+    def to_dict(self) -> dict[str, dict[str, Any]]:
+        """Expand back to term -> {doc_id: tf}"""
+        return {term: dict(self.items(term)) for term in self.terms}
+
+
+class FieldPostings:
+    """Heading and summary tfs per posting, CSR-style over a CompactPostings' term ids
+
+    Term t's entries are offsets[t] .. offsets[t + 1] of docs (absolute
+    document numbers, ascending) and tfs, which holds [heading, summary]
+    pairs. Postings with no heading or summary occurrence have no entry.
+    """
+
+    def __init__(self, postings: CompactPostings, fields: dict[str, dict[str, list[int]]] | None = None):
+        self.doc_ids = postings.doc_ids
+        self.terms = postings.terms
+        self.offsets: Sequence[int] = array("Q", [0])
+        self.docs: Sequence[int] = array("I")
+        self.tfs: Sequence[int] = array("I")
+        if fields is not None:
+            numbers = {doc_id: n for n, doc_id in enumerate(self.doc_ids)}
+            for term in self.terms:
+                counts = fields.get(term, {})
+                self.append(sorted((numbers[doc_id], *pair) for doc_id, pair in counts.items()))
+
+    @classmethod
+    def from_arrays(cls, postings: CompactPostings, arrays: dict[str, Sequence[int]]) -> "FieldPostings":
+        fields = cls(postings)
+        fields.offsets = arrays["field_offsets"]
+        fields.docs = arrays["field_docs"]
+        fields.tfs = arrays["field_tfs"]
+        return fields
+
+    def append(self, entries: Iterable[tuple[int, int, int]]) -> None:
+        """Add the next term's (document number, heading tf, summary tf) entries"""
+        for number, heading, summary in entries:
+            self.docs.append(number)
+            self.tfs.append(heading)
+            self.tfs.append(summary)
+        self.offsets.append(len(self.docs))
+
+    def get(self, term: str, default: Any = None) -> dict[str, tuple[int, int]] | Any:
+        """doc_id -> (heading tf, summary tf) for term, like the dict layout's fields.get"""
+        term_id = self.terms.get(term)
+        if term_id is None:
+            return default
+        doc_ids, tfs = self.doc_ids, self.tfs
+        return {doc_ids[self.docs[i]]: (tfs[2 * i], tfs[2 * i + 1])
+                for i in range(self.offsets[term_id], self.offsets[term_id + 1])}
+
+    def to_dict(self) -> dict[str, dict[str, list[int]]]:
+        """Expand back to term -> {doc_id: [heading tf, summary tf]}"""
+        tables = {term: self.get(term) for term in self.terms}
+        return {term: {doc_id: list(pair) for doc_id, pair in table.items()} for term, table in tables.items() if table}
+
+
+class TermValues(Mapping):
+    """Read-only term -> float mapping over an array indexed by term id"""
+
+    def __init__(self, terms: TermDictionary, values: Sequence[float]):
+        self.terms = terms
+        self.values = values
+
+    def __getitem__(self, term: str) -> float:
+        return self.values[self.terms.ids[term]]
+
+    def __contains__(self, term: object) -> bool:
+        return term in self.terms
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.terms)
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+    def to_dict(self) -> dict[str, float]:
+        return dict(zip(self.terms, self.values))
+
+
+class DocValues(Mapping):
+    """Read-only doc_id -> float (or list of width floats) mapping over an array indexed by document number"""
+
+    def __init__(self, doc_ids: list[str], values: Sequence[float], width: int = 1):
+        self.numbers = {doc_id: n for n, doc_id in enumerate(doc_ids)}
+        self.values = values
+        self.width = width
+
+    def __getitem__(self, doc_id: str) -> Any:
+        number = self.numbers[doc_id]
+        if self.width == 1:
+            return self.values[number]
+        return list(self.values[number * self.width:(number + 1) * self.width])
+
+    def __contains__(self, doc_id: object) -> bool:
+        return doc_id in self.numbers
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.numbers)
+
+    def __len__(self) -> int:
+        return len(self.numbers)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {doc_id: self[doc_id] for doc_id in self.numbers}
+
+
+def write_arrays(path: Path, sections: dict[str, array | bytes], meta: dict[str, Any]) -> None:
+    """Write typed arrays (and byte strings) to a postings file ArrayFile can map"""
+    header: dict[str, Any] = {"byteorder": sys.byteorder, "sections": {}, "meta": meta}
+    offset = 0
+    for name, data in sections.items():
+        typecode = data.typecode if isinstance(data, array) else "B"
+        size = len(data) * (data.itemsize if isinstance(data, array) else 1)
+        header["sections"][name] = [typecode, array(typecode).itemsize, offset, len(data)]
+        offset += -(-size // 8) * 8
+    encoded = json.dumps(header, separators=(",", ":")).encode()
+    encoded += b" " * (-len(encoded) % 8)
+    with open(path, "wb") as f:
+        f.write(MAGIC + len(encoded).to_bytes(8, "little") + encoded)
+        for data in sections.values():
+            raw = data.tobytes() if isinstance(data, array) else data
+            f.write(raw + b"\0" * (-len(raw) % 8))
+
+
+class ArrayFile:
+    """A postings file mapped read-only, its sections exposed as typed memoryviews
+
+    Pages are read by the OS as queries touch them; nothing is decoded up
+    front. Raises ValueError for a file written by another format or a
+    machine with a different byte order or item sizes.
+    """
+
+    def __init__(self, path: Path):
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._map)
+        if view[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a postings file")
+        start = len(MAGIC) + 8
+        length = int.from_bytes(view[len(MAGIC):start], "little")
+        header = json.loads(bytes(view[start:start + length]))
+        if header["byteorder"] != sys.byteorder:
+            raise ValueError(f"{path} was written with {header['byteorder']}-endian arrays")
+        self.meta: dict[str, Any] = header["meta"]
+        self.sections: dict[str, memoryview] = {}
+        base = start + length
+        for name, (typecode, itemsize, offset, count) in header["sections"].items():
+            if array(typecode).itemsize != itemsize:
+                raise ValueError(f"{path} was written with {itemsize}-byte '{typecode}' items")
+            section = view[base + offset:base + offset + count * itemsize]
+            if len(section) != count * itemsize:
+                raise ValueError(f"{path} is truncated")
+            self.sections[name] = section.cast(typecode)
+
+
+class PostingCursor:
+    """Forward iterator over one term's postings for document-at-a-time scoring
+
+    doc is the current document number (NO_MORE_DOCS once exhausted) and
+    tf its term frequency.
+    """
+
+    __slots__ = ("gaps", "tfs", "skips", "start", "end", "skip_lo", "skip_hi", "pos", "doc")
+
+    def __init__(self, postings: CompactPostings, term_id: int):
+        self.gaps = postings.gaps
+        self.tfs = postings.tfs
+        self.skips = postings.skips
+        self.start = postings.offsets[term_id]
+        self.end = postings.offsets[term_id + 1]
+        self.skip_lo = postings.skip_offsets[term_id]
+        self.skip_hi = postings.skip_offsets[term_id + 1]
+        self.pos = self.start
+        self.doc = self.gaps[self.start] if self.start < self.end else NO_MORE_DOCS
+
+    def __len__(self) -> int:
+        return self.end - self.start
+
+    @property
+    def tf(self) -> int:
+        return self.tfs[self.pos]
+
+    def next(self) -> None:
+        """Move to the following posting"""
+        self.pos += 1
+        if self.pos < self.end:
+            self.doc += self.gaps[self.pos]
+        else:
+            self.doc = NO_MORE_DOCS
+
+    def seek(self, target: int) -> None:
+        """Move to the first posting at or after document number target"""
+        if self.doc >= target:
+            return
+        # Jump to the last block starting at or before target if it is ahead
+        block = bisect_right(self.skips, target, self.skip_lo, self.skip_hi) - 1
+        block_pos = self.start + (block - self.skip_lo) * BLOCK_SIZE
+        if block_pos > self.pos:
+            self.pos = block_pos
+            self.doc = self.skips[block]
+        while self.doc < target:
+            self.next()
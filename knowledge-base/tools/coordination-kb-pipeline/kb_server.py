@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""
+Resident coordination KB query server
+Holds a warm SimpleRetrieval index in memory and answers queries over a Unix
+domain socket, so agents skip the interpreter start, imports and index load
+that a fresh simple_retrieval.py process pays on every query. A background
+thread polls the document list and file stats and swaps in a reloaded index
+when the corpus changes; queries keep being served from the old index while
+the new one loads.
+
+Protocol: one JSON object per line in each direction on a persistent
+connection. Requests carry an "op" ("query", "status", "reload" or
+"shutdown"); responses carry "ok" and either the payload or "error".
+
+Part of: Coordination KB Pipeline
+"""
+
+import json
+import os
+import socket
+import socketserver
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+from kb_index import read_doc_list
+from kb_log import flush_all
+from query_cache import CACHE_FILE, DEFAULT_TTL_SECONDS, QueryCache
+from simple_retrieval import SCORERS, SimpleRetrieval, clear_version_info
+
+SOCKET_FILE = "kb_server.sock"
+DEFAULT_POLL_SECONDS = 2.0
+CLIENT_TIMEOUT_SECONDS = 30.0
+
+
+def corpus_signature(doc_list: Path) -> tuple[Any, ...]:
+    """Cheap fingerprint of the corpus: the document list plus each file's size and mtime"""
+    paths = read_doc_list(doc_list)
+    stats = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+            stats.append((path, st.st_size, st.st_mtime_ns))
+        except OSError:
+            stats.append((path, None, None))
+    return tuple(stats)
+
+
+class KBServer:
+    """A warm index plus the background reload thread"""
+
+    def __init__(self, docs_dir: Path, doc_list: Path | None = None, engine: str = "python",
+                 scorer: str = "tfidf", cache: QueryCache | None = None,
+                 poll_seconds: float = DEFAULT_POLL_SECONDS, enable_logging: bool = True):
+        self.docs_dir = Path(docs_dir)
+        self.doc_list = Path(doc_list) if doc_list else self.docs_dir / "coordination_docs.txt"
+        self.engine = engine
+        self.scorer = scorer
+        self.cache = cache
+        self.poll_seconds = poll_seconds
+        self.enable_logging = enable_logging
+        # Serializes queries (cache and last_cache_status are shared) and index swaps
+        self.lock = threading.Lock()
+        # Serializes reloads (poll thread vs. client "reload"), which run
+        # load() and save the index outside self.lock
+        self.reload_lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.started = time.time()
+        self.queries = 0
+        self.reloads = 0
+        self.signature = corpus_signature(self.doc_list)
+        self.retrieval = self.load()
+
+    def load(self) -> SimpleRetrieval:
+        """Open (and incrementally update) the persistent index"""
+        retrieval = SimpleRetrieval(self.docs_dir, enable_logging=self.enable_logging,
+                                    engine=self.engine, scorer=self.scorer, cache=self.cache)
+        retrieval.load_index(read_doc_list(self.doc_list))
+        if self.engine == "sparse":
+            retrieval._sparse_engine()
+        return retrieval
+
+    def check_reload(self, force: bool = False) -> bool:
+        """Reload the index if the document list or any file's size/mtime changed
+
+        The new index is built outside the query lock and swapped in
+        atomically; only one reload runs at a time.
+        """
+        with self.reload_lock:
+            signature = corpus_signature(self.doc_list)
+            if signature == self.signature and not force:
+                return False
+
+            retrieval = self.load()
+            with self.lock:
+                self.retrieval = retrieval
+                self.signature = signature
+                self.reloads += 1
+                # The protocol checksum in the log must describe the new corpus
+                clear_version_info()
+            return True
+
+    def poll(self) -> None:
+        """Reload thread: watch the corpus and persist the result cache"""
+        while not self.stopped.wait(self.poll_seconds):
+            try:
+                self.check_reload()
+            except Exception as e:
+                print(f"Warning: Reload failed: {e}", file=sys.stderr)
+            self.save_cache()
+
+    def save_cache(self) -> None:
+        if self.cache is None:
+            return
+        with self.lock:
+            try:
+                self.cache.save()
+            except OSError as e:
+                print(f"Warning: Could not save query cache: {e}", file=sys.stderr)
+
+    def handle(self, request: dict[str, Any]) -> dict[str, Any]:
+        """Answer one protocol request"""
+        op = request.get("op", "query")
+        if op == "query":
+            return self.query(request)
+        if op == "status":
+            return {"ok": True, **self.status()}
+        if op == "reload":
+            return {"ok": True, "reloaded": self.check_reload(force=bool(request.get("force")))}
+        if op == "shutdown":
+            self.stopped.set()
+            return {"ok": True}
+        return {"ok": False, "error": f"Unknown op: {op}"}
+
+    def query(self, request: dict[str, Any]) -> dict[str, Any]:
+        text = request.get("query")
+        if not isinstance(text, str):
+            return {"ok": False, "error": "query must be a string"}
+        scorer = request.get("scorer") or self.scorer
+        if scorer not in SCORERS:
+            return {"ok": False, "error": f"Unknown scorer: {scorer} (expected one of {', '.join(SCORERS)})"}
+        top_k = request.get("top_k", 5)
+        if not isinstance(top_k, int) or top_k < 1:
+            return {"ok": False, "error": "top_k must be a positive integer"}
+
+        with self.lock:
+            retrieval = self.retrieval
+            start_time = time.time()
+            results = retrieval.query(text, top_k=top_k, scorer=scorer, proximity=bool(request.get("proximity")))
+            latency_ms = int((time.time() - start_time) * 1000)
+            retrieval.log_query(text, results, latency_ms,
+                                origin_agent=request.get("origin_agent", "unknown"), scorer=scorer)
+            self.queries += 1
+            return {
+                "ok": True,
+                "results": results,
+                "latency_ms": latency_ms,
+                "cache": retrieval.last_cache_status,
+                "expansions": retrieval.last_expansions,
+                "log_file": str(retrieval.log_file),
+            }
+
+    def status(self) -> dict[str, Any]:
+        with self.lock:
+            retrieval = self.retrieval
+            status = {
+                "documents": len(retrieval.documents),
+                "terms": len(retrieval.idf),
+                "corpus_checksum": retrieval.corpus_checksum,
+                "queries": self.queries,
+                "reloads": self.reloads,
+                "uptime_s": round(time.time() - self.started, 1),
+                "engine": self.engine,
+                "scorer": self.scorer,
+            }
+            if self.cache is not None:
+                status["cache"] = self.cache.stats()
+        return status
+
+
+class _QueryHandler(socketserver.StreamRequestHandler):
+    """One JSON request per line; the connection stays open for more"""
+
+    def handle(self) -> None:
+        kb: KBServer = self.server.kb  # type: ignore[attr-defined]
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+                if not isinstance(request, dict):
+                    raise ValueError("request must be a JSON object")
+                response = kb.handle(request)
+            except ValueError as e:
+                response = {"ok": False, "error": f"Bad request: {e}"}
+            except Exception as e:
+                response = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+            self.wfile.write((json.dumps(response) + "\n").encode("utf-8"))
+            self.wfile.flush()
+            if kb.stopped.is_set():
+                threading.Thread(target=self.server.shutdown, daemon=True).start()
+                return
+
+
+class _UnixServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+
+def make_server(kb: KBServer, socket_path: Path) -> socketserver.BaseServer:
+    """Bind the socket, replacing a stale one left by a dead server"""
+    socket_path = Path(socket_path)
+    if socket_path.exists():
+        if ping(socket_path):
+            raise OSError(f"A KB server is already listening on {socket_path}")
+        socket_path.unlink()
+    server = _UnixServer(str(socket_path), _QueryHandler)
+    server.kb = kb  # type: ignore[attr-defined]
+    return server
+
+
+def serve(kb: KBServer, socket_path: Path) -> None:
+    """Run until a shutdown request or KeyboardInterrupt, then clean up"""
+    server = make_server(kb, socket_path)
+    poller = threading.Thread(target=kb.poll, name="kb-reload", daemon=True)
+    poller.start()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        kb.stopped.set()
+        server.server_close()
+        kb.save_cache()
+        flush_all()
+        try:
+            Path(socket_path).unlink()
+        except FileNotFoundError:
+            pass
+
+
+class KBClient:
+    """Persistent connection to a running KB server"""
+
+    def __init__(self, socket_path: Path, timeout: float = CLIENT_TIMEOUT_SECONDS):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(timeout)
+        try:
+            self.sock.connect(str(socket_path))
+        except OSError:
+            self.sock.close()
+            raise
+        self.reader = self.sock.makefile("rb")
+
+    def request(self, payload: dict[str, Any]) -> dict[str, Any]:
+        """Send one request and wait for its response
+
+        Raises:
+            OSError: The server closed the connection or timed out
+        """
+        self.sock.sendall((json.dumps(payload) + "\n").encode("utf-8"))
+        line = self.reader.readline()
+        if not line:
+            raise ConnectionError("KB server closed the connection")
+        return json.loads(line)
+
+    def query(self, text: str, top_k: int = 5, scorer: str | None = None,
+              origin_agent: str = "unknown", proximity: bool = False) -> dict[str, Any]:
+        return self.request({"op": "query", "query": text, "top_k": top_k,
+                             "scorer": scorer, "origin_agent": origin_agent, "proximity": proximity})
+
+    def close(self) -> None:
+        self.reader.close()
+        self.sock.close()
+
+    def __enter__(self) -> "KBClient":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+def ping(socket_path: Path) -> bool:
+    """True if a server answers on socket_path"""
+    try:
+        with KBClient(socket_path, timeout=1.0) as client:
+            return client.request({"op": "status"}).get("ok", False)
+    except (OSError, ValueError):
+        return False
+
+
+def main() -> None:
+    import argparse
+
+    script_dir = Path(__file__).parent
+    parser = argparse.ArgumentParser(description="Serve coordination KB queries from a warm index")
+    parser.add_argument("--socket", type=Path, default=script_dir / SOCKET_FILE,
+                        help=f"Unix socket path (default: {SOCKET_FILE})")
+    parser.add_argument("--poll", type=float, default=DEFAULT_POLL_SECONDS, metavar="SECONDS",
+                        help=f"Corpus change poll interval (default: {DEFAULT_POLL_SECONDS})")
+    parser.add_argument("--engine", choices=("python", "sparse"), default="python",
+                        help="Scoring engine (sparse needs numpy and scipy)")
+    parser.add_argument("--scorer", choices=SCORERS, default="tfidf", help="Default ranking function")
+    parser.add_argument("--no-cache", action="store_true", help="Disable the persistent result cache")
+    parser.add_argument("--cache-ttl", type=float, default=DEFAULT_TTL_SECONDS, metavar="SECONDS",
+                        help=f"Result cache time-to-live (default: {DEFAULT_TTL_SECONDS})")
+    parser.add_argument("--status", action="store_true", help="Print a running server's status and exit")
+    parser.add_argument("--stop", action="store_true", help="Ask a running server to shut down")
+    args = parser.parse_args()
+
+    if args.status or args.stop:
+        try:
+            with KBClient(args.socket) as client:
+                response = client.request({"op": "shutdown" if args.stop else "status"})
+        except OSError as e:
+            print(f"Error: No KB server on {args.socket}: {e}", file=sys.stderr)
+            sys.exit(1)
+        print(json.dumps(response, indent=2))
+        return
+
+    doc_list = script_dir / "coordination_docs.txt"
+    if not doc_list.exists():
+        print(f"Error: {doc_list} not found", file=sys.stderr)
+        sys.exit(1)
+
+    try:
+        cache = None if args.no_cache else QueryCache.load(script_dir / CACHE_FILE, ttl_seconds=args.cache_ttl)
+        kb = KBServer(script_dir, doc_list, engine=args.engine, scorer=args.scorer, cache=cache,
+                      poll_seconds=args.poll)
+    except ImportError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    print(f"Serving {len(kb.retrieval.documents)} documents on {args.socket} (pid {os.getpid()})")
+    serve(kb, args.socket)
+
+
+if __name__ == "__main__":
+    main()
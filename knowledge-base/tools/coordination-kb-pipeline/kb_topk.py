@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+WAND top-k evaluation over the coordination KB postings
+Scores documents one at a time across the query terms' posting cursors and
+skips every document whose summed per-term upper bounds cannot beat the
+current k-th best score, so common-term queries fully score only a few
+documents. Returns exactly the top-k of exhaustive scoring, ties included.
+
+Part of: Coordination KB Pipeline
+"""
+
+import heapq
+from typing import Callable
+
+from kb_postings import NO_MORE_DOCS, PostingCursor
+
+# Bounds are inflated slightly so float rounding in a document's summed
+# score can never push it past the bound that let it be skipped
+BOUND_SLACK = 1e-9
+
+
+def _cursor_doc(entry: tuple[PostingCursor, float, int]) -> int:
+    return entry[0].doc
+
+
+def wand_top_k(cursors: list[PostingCursor], bounds: list[float],
+               score: Callable[[int, list[tuple[int, int]]], float], top_k: int,
+               stats: dict[str, int] | None = None) -> list[tuple[int, float]]:
+    """Top-k documents by score, skipping those that cannot enter the top-k
+
+    Args:
+        cursors: One posting cursor per query term
+        bounds: Upper bound of each term's contribution to any document's score
+        score: score(doc number, [(term index, tf), ...]) -> full score, given
+            every query term the document contains in term order
+        top_k: Number of results
+        stats: Optional dict that receives the number of documents scored
+
+    Returns:
+        (doc number, score) pairs, best first, ties in document order; only
+        positive scores are returned
+    """
+    # Min-heap of (score, -doc): the root is the result to beat. Documents
+    # arrive in increasing order, so an equal score never displaces it.
+    heap: list[tuple[float, int]] = []
+    scored = 0
+    threshold = 0.0
+    live = [(cursor, bound * (1 + BOUND_SLACK), i) for i, (cursor, bound) in enumerate(zip(cursors, bounds))
+            if cursor.doc != NO_MORE_DOCS and top_k > 0]
+
+    while live:
+        live.sort(key=_cursor_doc)
+        # Exhausted cursors sort last
+        while live and live[-1][0].doc == NO_MORE_DOCS:
+            live.pop()
+        if not live:
+            break
+
+        # Pivot: the first cursor at which the bounds so far could beat the threshold
+        reach = 0.0
+        pivot = -1
+        for n, entry in enumerate(live):
+            reach += entry[1]
+            if reach > threshold:
+                pivot = n
+                break
+        if pivot < 0:
+            break
+
+        doc = live[pivot][0].doc
+        if live[0][0].doc != doc:
+            # Nothing before the pivot document can reach the threshold
+            for entry in live[:pivot]:
+                entry[0].seek(doc)
+        else:
+            matched = []
+            for cursor, _, i in live:
+                if cursor.doc != doc:
+                    break
+                matched.append((i, cursor.tf))
+                cursor.next()
+            if len(matched) > 1:
+                matched.sort()
+            value = score(doc, matched)
+            scored += 1
+            if value > threshold:
+                if len(heap) >= top_k:
+                    heapq.heapreplace(heap, (value, -doc))
+                else:
+                    heapq.heappush(heap, (value, -doc))
+                if len(heap) >= top_k:
+                    threshold = heap[0][0]
+
+    if stats is not None:
+        stats["scored"] = scored
+    return [(-neg_doc, value) for value, neg_doc in sorted(heap, key=lambda e: (-e[0], -e[1]))]
@@ -2,44 +2,161 @@
 """
 Calculate checksum of coordination protocol corpus
 Provides grounding reference for self-referential claims
+
+A manifest of per-file (path, size, mtime, sha256) entries is kept next to
+the document list so unchanged files are never re-read; the per-file hashes
+are combined into a Merkle root that identifies the corpus state.
 """
 
 import hashlib
+import json
+import os
 from pathlib import Path
 
-def calculate_corpus_checksum(doc_list_file):
+MANIFEST_FILE = "checksum_manifest.json"
+MANIFEST_VERSION = 1
+
+def read_doc_paths(doc_list_file):
+    """Sorted document paths from coordination_docs.txt"""
+    with open(doc_list_file, 'r') as f:
+        doc_paths = [line.strip() for line in f if line.strip() and not line.startswith('#')]
+
+    # Sort for deterministic order
+    doc_paths.sort()
+    return doc_paths
+
+def merkle_root(leaf_hashes):
+    """
+    Combine hex leaf hashes pairwise with SHA256 up to a single root
+
+    An odd node at any level is paired with itself. The root of no leaves
+    is the hash of the empty string.
+    """
+    level = [bytes.fromhex(h) for h in leaf_hashes]
+    if not level:
+        return hashlib.sha256().hexdigest()
+
+    while len(level) > 1:
+        if len(level) % 2:
+            level.append(level[-1])
+        level = [hashlib.sha256(level[i] + level[i + 1]).digest() for i in range(0, len(level), 2)]
+    return level[0].hex()
+
+def load_manifest(manifest_file):
+    """Load a manifest, or an empty one if missing/unreadable"""
+    try:
+        with open(manifest_file) as f:
+            manifest = json.load(f)
+        if manifest.get('version') == MANIFEST_VERSION:
+            return manifest
+    except (OSError, json.JSONDecodeError):
+        pass
+    return {'version': MANIFEST_VERSION, 'files': {}, 'merkle_root': None, 'corpus_sha256': None}
+
+def update_manifest(doc_paths, manifest):
+    """
+    Refresh manifest entries, hashing only files whose size or mtime changed
+
+    Args:
+        doc_paths: Sorted document paths
+        manifest: Manifest dict from load_manifest (updated in place)
+
+    Returns:
+        bool: True if any entry was added, removed or refreshed
+    """
+    files = {}
+    changed = False
+    for doc_path in doc_paths:
+        try:
+            st = os.stat(doc_path)
+            entry = manifest['files'].get(doc_path)
+            if not (entry and entry['size'] == st.st_size and entry['mtime_ns'] == st.st_mtime_ns):
+                hasher = hashlib.sha256()
+                with open(doc_path, 'rb') as f:
+                    for chunk in iter(lambda: f.read(1 << 20), b''):
+                        hasher.update(chunk)
+                entry = {'size': st.st_size, 'mtime_ns': st.st_mtime_ns, 'sha256': hasher.hexdigest()}
+                changed = True
+            files[doc_path] = entry
+        except Exception as e:
+            print(f"Warning: Could not read {doc_path}: {e}")
+
+    if list(files) != list(manifest['files']):
+        changed = True
+    manifest['files'] = files
+    return changed
+
+def concatenated_checksum(doc_paths):
+    """SHA256 of the documents' bytes concatenated in order (the published checksum)"""
+    hasher = hashlib.sha256()
+    for doc_path in doc_paths:
+        with open(doc_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                hasher.update(chunk)
+    return hasher.hexdigest()
+
+def calculate_corpus_checksum(doc_list_file, manifest_file=None, use_manifest=True):
     """
     Calculate SHA256 hash of entire coordination document corpus
 
+    The value is the SHA256 of all documents concatenated in sorted path
+    order. With the manifest, only files whose size or mtime changed are
+    rehashed, and while the Merkle root of the per-file hashes is unchanged
+    the stored value is reused without reading any document. A content
+    change requires one pass over the corpus to recompute the concatenated
+    hash, since SHA256 state cannot be resumed mid-stream.
+
     Args:
         doc_list_file: Path to coordination_docs.txt
+        manifest_file: Manifest path (default: checksum_manifest.json beside the list)
+        use_manifest: False hashes every file directly (original behaviour)
 
     Returns:
         tuple: (checksum_hex, file_count, total_bytes)
     """
-    hasher = hashlib.sha256()
-    file_count = 0
-    total_bytes = 0
+    doc_paths = read_doc_paths(doc_list_file)
 
-    # Read document list
-    with open(doc_list_file, 'r') as f:
-        doc_paths = [line.strip() for line in f if line.strip() and not line.startswith('#')]
+    if not use_manifest:
+        hasher = hashlib.sha256()
+        file_count = 0
+        total_bytes = 0
 
-    # Sort for deterministic order
-    doc_paths.sort()
+        # Hash each document in order
+        for doc_path in doc_paths:
+            try:
+                with open(doc_path, 'rb') as f:
+                    content = f.read()
+                    hasher.update(content)
+                    total_bytes += len(content)
+                    file_count += 1
+            except Exception as e:
+                print(f"Warning: Could not read {doc_path}: {e}")
 
-    # Hash each document in order
-    for doc_path in doc_paths:
+        return hasher.hexdigest(), file_count, total_bytes
+
+    manifest_file = Path(manifest_file) if manifest_file else Path(doc_list_file).with_name(MANIFEST_FILE)
+    manifest = load_manifest(manifest_file)
+    changed = update_manifest(doc_paths, manifest)
+
+    # Duplicate list entries are hashed twice, as in the original
+    files = manifest['files']
+    readable = [doc_path for doc_path in doc_paths if doc_path in files]
+    root = merkle_root(files[doc_path]['sha256'] for doc_path in readable)
+    if root != manifest['merkle_root'] or not manifest['corpus_sha256']:
+        manifest['merkle_root'] = root
+        manifest['corpus_sha256'] = concatenated_checksum(readable)
+        changed = True
+
+    if changed:
         try:
-            with open(doc_path, 'rb') as f:
-                content = f.read()
-                hasher.update(content)
-                total_bytes += len(content)
-                file_count += 1
-        except Exception as e:
-            print(f"Warning: Could not read {doc_path}: {e}")
+            tmp = manifest_file.with_name(f'{manifest_file.name}.tmp.{os.getpid()}')
+            tmp.write_text(json.dumps(manifest, indent=1))
+            os.replace(tmp, manifest_file)
+        except OSError as e:
+            print(f"Warning: Could not save {manifest_file}: {e}")
 
-    return hasher.hexdigest(), file_count, total_bytes
+    total_bytes = sum(files[doc_path]['size'] for doc_path in readable)
+    return manifest['corpus_sha256'], len(readable), total_bytes
 
 def main():
     import sys
@@ -52,10 +169,12 @@ def main():
         sys.exit(1)
 
     checksum, file_count, total_bytes = calculate_corpus_checksum(doc_list_file)
+    root = load_manifest(doc_list_file.with_name(MANIFEST_FILE))['merkle_root']
 
     print(f"Coordination Protocol Corpus Checksum")
     print(f"=====================================")
     print(f"SHA256: {checksum}")
+    print(f"Merkle: {root}")
     print(f"Files:  {file_count}")
     print(f"Bytes:  {total_bytes:,}")
     print()
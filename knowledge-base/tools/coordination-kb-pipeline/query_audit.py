@@ -13,19 +13,18 @@ from datetime import datetime
 from pathlib import Path
 from typing import Any
 
+from kb_log import log_segments, read_log_lines
+
 
 def load_query_log(log_file: Path) -> list[dict[str, Any]]:
     """Load queries from JSONL log"""
     queries: list[dict[str, Any]] = []
-    if not log_file.exists():
-        return queries
-
-    with log_file.open() as f:
-        for line in f:
-            try:
-                queries.append(json.loads(line.strip()))
-            except json.JSONDecodeError:
-                pass
+    # Rotated (gzipped) segments first, then the active file
+    for line in read_log_lines(log_file):
+        try:
+            queries.append(json.loads(line.strip()))
+        except json.JSONDecodeError:
+            pass
 
     return queries
 
@@ -91,6 +90,11 @@ def analyze_queries(queries: list[dict[str, Any]]) -> dict[str, Any]:
             top_scores.append(q["top_results"][0]["score"])
     avg_top_score = sum(top_scores) / len(top_scores) if top_scores else 0
 
+    # Result cache effectiveness (only queries logged with a cache status)
+    cache_status = Counter(q["cache"] for q in queries if "cache" in q)
+    cache_lookups = cache_status["hit"] + cache_status["miss"]
+    cache_hit_rate = cache_status["hit"] / cache_lookups if cache_lookups else 0.0
+
     # Query drift detection (change in vocabulary over time)
     # Split into early/late halves
     mid_point = len(queries) // 2
@@ -128,6 +132,10 @@ def analyze_queries(queries: list[dict[str, Any]]) -> dict[str, Any]:
             "vocab_drift_score": round(vocab_drift, 3),
             "avg_latency_ms": round(avg_latency, 1),
             "avg_top_result_score": round(avg_top_score, 3),
+            "cache_lookups": cache_lookups,
+            "cache_hits": cache_status["hit"],
+            "cache_misses": cache_status["miss"],
+            "cache_hit_rate": round(cache_hit_rate, 3),
         },
         "agent_distribution": dict(agent_dist),
         "top_queries": top_queries,
@@ -142,7 +150,7 @@ def main() -> None:
 
     log_file = Path(__file__).parent / "coordination_queries.jsonl"
 
-    if not log_file.exists():
+    if not log_file.exists() and not log_segments(log_file):
         print(f"No query log found at {log_file}")
         print("Run some queries first to generate audit data")
         sys.exit(1)
@@ -187,7 +195,12 @@ def main() -> None:
     # Interpret metrics
     summary = analysis["summary"]
 
-    if summary["query_repetition_rate"] > 0.5:
+    if summary["cache_lookups"]:
+        print(
+            f"✓ CACHE: {summary['cache_hit_rate']:.0%} hit rate "
+            f"({summary['cache_hits']} hits / {summary['cache_misses']} misses)"
+        )
+    elif summary["query_repetition_rate"] > 0.5:
         print("⚠️  HIGH: Query repetition rate suggests caching opportunity")
 
     if summary["vocab_drift_score"] > 0.5:
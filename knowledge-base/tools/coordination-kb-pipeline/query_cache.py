@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Persistent LRU/TTL result cache for coordination KB queries
+Entries are keyed on the normalized query tokens, top_k, scorer and the
+corpus checksum, so any change to an indexed document invalidates them.
+
+Part of: Coordination KB Pipeline
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+
+CACHE_FILE = "kb_query_cache.json"
+CACHE_VERSION = 1
+DEFAULT_MAX_ENTRIES = 256
+DEFAULT_TTL_SECONDS = 24 * 3600
+
+
+def cache_key(tokens: list[str], top_k: int, scorer: str, checksum: str) -> str:
+    """Normalized key: word order and case do not matter, repeats do"""
+    return json.dumps([checksum, scorer, top_k, sorted(tokens)], separators=(",", ":"))
+
+
+class QueryCache:
+    """LRU cache of query results with a time-to-live, saved as JSON"""
+
+    def __init__(self, cache_file: Path | None, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 ttl_seconds: float = DEFAULT_TTL_SECONDS):
+        self.cache_file = Path(cache_file) if cache_file else None
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.entries: OrderedDict[str, dict[str, Any]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.dirty = False
+
+    @classmethod
+    def load(cls, cache_file: Path, **kwargs: Any) -> "QueryCache":
+        """Load a saved cache, starting empty if missing or unreadable"""
+        cache = cls(cache_file, **kwargs)
+        try:
+            data = json.loads(cache.cache_file.read_text())
+        except FileNotFoundError:
+            return cache
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"Warning: Ignoring unreadable cache {cache_file}: {e}", file=sys.stderr)
+            return cache
+
+        if data.get("version") == CACHE_VERSION:
+            cache.entries = OrderedDict(data["entries"])
+        return cache
+
+    def save(self) -> None:
+        """Atomically write the cache if it changed"""
+        if not self.dirty or self.cache_file is None:
+            return
+        data = {"version": CACHE_VERSION, "entries": list(self.entries.items())}
+        tmp = self.cache_file.with_name(f"{self.cache_file.name}.tmp.{os.getpid()}.{threading.get_ident()}")
+        tmp.write_text(json.dumps(data, separators=(",", ":")))
+        os.replace(tmp, self.cache_file)
+        self.dirty = False
+
+    def get(self, key: str, now: float | None = None) -> list[dict[str, Any]] | None:
+        """Cached results for key, or None on a miss or expired entry"""
+        now = time.time() if now is None else now
+        entry = self.entries.get(key)
+        if entry is not None and now - entry["ts"] > self.ttl_seconds:
+            del self.entries[key]
+            self.dirty = True
+            entry = None
+
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry["results"]
+
+    def put(self, key: str, checksum: str, results: list[dict[str, Any]],
+            now: float | None = None) -> None:
+        """Store results, dropping entries for other corpus checksums and the least recently used"""
+        now = time.time() if now is None else now
+        for stale in [k for k, e in self.entries.items() if e["checksum"] != checksum]:
+            del self.entries[stale]
+
+        self.entries[key] = {"ts": now, "checksum": checksum, "results": results}
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        self.dirty = True
+
+    def stats(self) -> dict[str, Any]:
+        """Hit/miss counts for this process"""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "entries": len(self.entries),
+        }
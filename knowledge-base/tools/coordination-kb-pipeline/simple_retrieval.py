@@ -4,38 +4,115 @@ Simple coordination knowledge base retrieval system
 Uses TF-IDF for document similarity (no heavy dependencies)
 """
 
+import hashlib
+import heapq
 import json
 import re
+import sys
 from pathlib import Path
 from collections import Counter
 import math
 import time
 from datetime import datetime, timezone
 
+from kb_index import (
+    BM25_K1,
+    FIELD_WEIGHTS,
+    FIELDS,
+    INDEX_FILE,
+    PASSAGE_B,
+    PASSAGE_CHARS,
+    PASSAGE_OVERLAP,
+    KBIndex,
+    open_index,
+    read_doc_list,
+    read_passage,
+    tokenize,
+)
+from kb_fuzzy import TrigramIndex
+from kb_log import get_writer, read_log_lines
+from kb_positions import min_span, phrase_match
+from kb_topk import wand_top_k
+from query_cache import CACHE_FILE, DEFAULT_TTL_SECONDS, QueryCache, cache_key
+
+ENGINES = ('python', 'sparse')
+SCORERS = ('tfidf', 'bm25')
+WORD = re.compile(r'[^\W_]+')
+PHRASE = re.compile(r'"([^"]+)"')
+# A document whose query terms sit in a window of exactly their own length
+# scores (1 + PROXIMITY_WEIGHT) times its term score; looser windows less
+PROXIMITY_WEIGHT = 0.5
+# An unknown query term is replaced by up to FUZZY_MAX_TERMS of the closest
+# vocabulary terms (most common first), each weighted FUZZY_WEIGHT per edit
+FUZZY_WEIGHT = 0.5
+FUZZY_MAX_TERMS = 3
+FUZZY_MEMO_SIZE = 4096
+
+# docs_dir -> (pipeline version, protocol checksum), memoized per process
+_VERSION_INFO = {}
+
+def clear_version_info():
+    """Forget memoized version/checksum so the next query recomputes them"""
+    _VERSION_INFO.clear()
+
+def highlight(text, query_terms):
+    """Collapse whitespace and locate query terms in a passage
+
+    Returns:
+        (excerpt, highlights) where highlights are [start, end] character
+        spans in the excerpt. Passages longer than PASSAGE_CHARS are cut to a
+        window starting shortly before the first match.
+    """
+    excerpt = ' '.join(text.split())
+
+    def spans(value):
+        return [[m.start(), m.end()] for m in WORD.finditer(value) if m.group().lower() in query_terms]
+
+    found = spans(excerpt)
+    if len(excerpt) > PASSAGE_CHARS:
+        start = max(0, found[0][0] - PASSAGE_OVERLAP) if found else 0
+        excerpt = excerpt[start:start + PASSAGE_CHARS]
+        found = spans(excerpt)
+    return excerpt, found
+
 class SimpleRetrieval:
-    def __init__(self, docs_dir, enable_logging=True):
+    def __init__(self, docs_dir, enable_logging=True, engine='python', scorer='tfidf', cache=None,
+                 pruning=True, fuzzy=True):
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine: {engine} (expected one of {', '.join(ENGINES)})")
+        self._check_scorer(scorer)
         self.docs_dir = Path(docs_dir)
+        self.engine = engine
+        self.scorer = scorer
+        self.cache = cache
+        # WAND top-k on the python engine; False scores every matching document
+        self.pruning = pruning
+        # Expand unknown query terms to their nearest vocabulary terms
+        self.fuzzy = fuzzy
+        self.last_expansions = {}
+        self._trigrams = None
+        self._expansions = {}
+        self.last_cache_status = None
+        self.corpus_checksum = None
+        self._sparse = None
         self.documents = {}
         self.idf = {}
-        self.doc_vectors = {}
+        self.index = None
         self.enable_logging = enable_logging
         self.log_file = self.docs_dir / "coordination_queries.jsonl"
+        self.log_writer = get_writer(self.log_file)
 
     def tokenize(self, text):
-        """Simple tokenization"""
-        text = text.lower()
-        # Remove markdown formatting
-        text = re.sub(r'[#*`\[\]()_-]', ' ', text)
-        # Split on whitespace and punctuation
-        tokens = re.findall(r'\b\w+\b', text)
-        return tokens
+        """Simple tokenization (single regex pass, see kb_index.tokenize)"""
+        return tokenize(text)
 
     def load_documents(self, file_list):
         """Load documents from file paths"""
         print(f"Loading {len(file_list)} documents...")
         for file_path in file_list:
             try:
-                with open(file_path, 'r', encoding='utf-8') as f:
+                # newline='' keeps passage byte offsets aligned with the file
+                with open(file_path, 'r', encoding='utf-8', newline='') as f:
                     content = f.read()
                     doc_id = Path(file_path).stem
                     self.documents[doc_id] = {
@@ -53,97 +130,403 @@ class SimpleRetrieval:
         """Build TF-IDF index"""
         print("Building TF-IDF index...")
 
-        # Calculate IDF
-        doc_count = len(self.documents)
-        term_doc_count = Counter()
-
+        index = KBIndex(None)
         for doc_id, doc in self.documents.items():
-            unique_tokens = set(doc['tokens'])
-            for token in unique_tokens:
-                term_doc_count[token] += 1
-
-        # Calculate IDF scores
-        for term, count in term_doc_count.items():
-            self.idf[term] = math.log(doc_count / count)
-
-        # Calculate TF-IDF vectors for each document
-        for doc_id, doc in self.documents.items():
-            term_freq = Counter(doc['tokens'])
-            total_terms = len(doc['tokens'])
-
-            vector = {}
-            for term, freq in term_freq.items():
-                tf = freq / total_terms
-                vector[term] = tf * self.idf.get(term, 0)
-
-            self.doc_vectors[doc_id] = vector
+            content = doc.pop('content')
+            digest = hashlib.sha256(content.encode('utf-8')).hexdigest()
+            index.add_document(doc_id, doc['path'], content, digest=digest, tokens=doc.pop('tokens'))
+        index.finalize()
+        self._use_index(index)
 
         print(f"Index built with {len(self.idf)} unique terms")
 
-    def query(self, query_text, top_k=5):
-        """Query the knowledge base"""
-        query_tokens = self.tokenize(query_text)
-        query_freq = Counter(query_tokens)
-        total_query_terms = len(query_tokens)
-
-        # Build query vector
-        query_vector = {}
-        for term, freq in query_freq.items():
-            tf = freq / total_query_terms
-            query_vector[term] = tf * self.idf.get(term, 0)
+    def load_index(self, file_list, index_file=None, workers=None):
+        """Load the persistent index, re-indexing only documents that changed
+
+        A missing index for a large corpus is built in parallel (see kb_build.py).
+        """
+        index_file = Path(index_file) if index_file else self.docs_dir / INDEX_FILE
+        index, changes = open_index(file_list, index_file, workers)
+        self._use_index(index)
+        self.documents = {
+            doc_id: {'path': meta['path']}
+            for doc_id, meta in index.docs.items()
+        }
 
-        # Calculate cosine similarity with each document
-        scores = {}
-        for doc_id, doc_vector in self.doc_vectors.items():
-            score = self.cosine_similarity(query_vector, doc_vector)
-            if score > 0:
-                scores[doc_id] = score
+        print(f"Index loaded: {len(self.documents)} documents, {len(self.idf)} unique terms "
+              f"({changes['added']} added, {changes['updated']} updated, {changes['removed']} removed)")
+        return len(self.documents)
 
-        # Sort by score
-        ranked = sorted(scores.items(), key=lambda x: x[1], reverse=True)[:top_k]
+    def _use_index(self, index):
+        # Query-only from here on: interned terms and array postings
+        index.compact()
+        self.index = index
+        self.idf = index.idf
+        # Ties rank in document-list order, as the original stable sort did
+        self._doc_order = {doc_id: i for i, doc_id in enumerate(index.docs)}
+        self._sparse = None
+        self._trigrams = None
+        self._expansions = {}
+        self.corpus_checksum = index.corpus_checksum()
+
+    def _sparse_engine(self):
+        if self._sparse is None:
+            from sparse_engine import SparseEngine
+            self._sparse = SparseEngine(self.index)
+        return self._sparse
+
+    @staticmethod
+    def _check_scorer(scorer):
+        if scorer not in SCORERS:
+            raise ValueError(f"Unknown scorer: {scorer} (expected one of {', '.join(SCORERS)})")
+
+    def query(self, query_text, top_k=5, scorer=None, proximity=False):
+        """Query the knowledge base
+
+        Unknown words are expanded to their nearest vocabulary terms at
+        reduced weight (see expand_query); self.last_expansions lists them.
+
+        Args:
+            query_text: Free-text query; "quoted words" must appear as a phrase
+            top_k: Number of results
+            scorer: 'tfidf' (cosine) or 'bm25' (BM25F); defaults to self.scorer
+            proximity: Boost documents whose query terms occur close together
+                (always on for phrase queries)
+        """
+        query_tokens = self.tokenize(query_text)
+        phrases = self.parse_phrases(query_text)
+        query_terms = self.expand_query(query_tokens)
+        if self.cache is None:
+            self.last_cache_status = None
+            return self._results(self._rank_query(query_terms, phrases, proximity, top_k, scorer), query_terms)
+
+        # Keyed on the corpus checksum, so any document change is a miss.
+        # Tokens never contain quotes or '~', so the markers cannot collide.
+        key_tokens = query_tokens + ['"' + ' '.join(phrase) + '"' for phrase in phrases]
+        if proximity:
+            key_tokens.append('~proximity')
+        if not self.fuzzy:
+            key_tokens.append('~exact')
+        key = cache_key(key_tokens, top_k, scorer or self.scorer, self.corpus_checksum)
+        results = self.cache.get(key)
+        if results is not None:
+            self.last_cache_status = 'hit'
+            return results
+
+        self.last_cache_status = 'miss'
+        results = self._results(self._rank_query(query_terms, phrases, proximity, top_k, scorer), query_terms)
+        self.cache.put(key, self.corpus_checksum, results)
+        return results
 
-        # Return results with excerpts
+    def query_batch(self, query_texts, top_k=5, scorer=None):
+        """Query many texts at once (one sparse matrix product with engine='sparse')"""
+        scorer = scorer or self.scorer
+        term_lists = [self.expand_query(self.tokenize(text)) for text in query_texts]
+        phrase_lists = [self.parse_phrases(text) for text in query_texts]
+        if self.engine == 'sparse' and scorer == 'tfidf':
+            ranked = self._sparse_engine().search_batch(term_lists, top_k)
+        else:
+            ranked = [None] * len(term_lists)
+        ranked = [
+            self._rank_query(terms, phrases, False, top_k, scorer) if phrases or r is None else r
+            for r, terms, phrases in zip(ranked, term_lists, phrase_lists)
+        ]
+        return [self._results(r, terms) for r, terms in zip(ranked, term_lists)]
+
+    def expand_query(self, query_tokens):
+        """Query terms with each unknown token replaced by its nearest vocabulary terms
+
+        Returns query_tokens unchanged when nothing was expanded, otherwise
+        a Counter of term weights: 1 per known token and FUZZY_WEIGHT per
+        edit for each replacement. Every scorer accepts either form.
+        """
+        self.last_expansions = {}
+        if not self.fuzzy or all(token in self.idf for token in query_tokens):
+            return query_tokens
+
+        weights = Counter()
+        for token in query_tokens:
+            if token in self.idf:
+                weights[token] += 1
+                continue
+            distance, terms = self.nearest_terms(token)
+            if terms:
+                self.last_expansions[token] = terms
+            for term in terms:
+                weights[term] += FUZZY_WEIGHT ** distance
+        return weights if self.last_expansions else query_tokens
+
+    def nearest_terms(self, token):
+        """(edits, terms) of the vocabulary terms closest to token, most common first
+
+        The trigram index over the vocabulary is built on first use, and
+        lookups are memoized until the index changes.
+        """
+        expansion = self._expansions.get(token)
+        if expansion is not None:
+            return expansion
+        if self._trigrams is None:
+            self._trigrams = TrigramIndex(self.idf)
+        distance, terms = self._trigrams.nearest(token)
+        postings = self.index.postings
+        terms = sorted(terms, key=lambda term: -postings.doc_frequency(term))[:FUZZY_MAX_TERMS]
+        if len(self._expansions) >= FUZZY_MEMO_SIZE:
+            self._expansions.clear()
+        expansion = self._expansions[token] = (distance, terms)
+        return expansion
+
+    def parse_phrases(self, query_text):
+        """Token lists of the quoted phrases of two or more words in a query"""
+        phrases = [self.tokenize(match) for match in PHRASE.findall(query_text)]
+        return [phrase for phrase in phrases if len(phrase) > 1]
+
+    def _rank_query(self, query_tokens, phrases, proximity, top_k, scorer):
+        # Plain term queries never touch the positions sidecar
+        if phrases or proximity:
+            return self.positional_rank(query_tokens, phrases, top_k, scorer)
+        return self.rank(query_tokens, top_k, scorer)
+
+    def positional_rank(self, query_tokens, phrases, top_k=5, scorer=None):
+        """Top (doc_id, score) pairs requiring phrases and boosting term proximity
+
+        Documents must contain every phrase with its words adjacent and in
+        order. Each score is multiplied by 1 + PROXIMITY_WEIGHT / (1 + span - n)
+        for the smallest window of span tokens holding all n distinct query
+        terms the document contains (no boost below two terms). Candidates
+        are verified best term score first, stopping once no remaining
+        document could reach the top-k even with the full boost, so only
+        those documents' positions are read.
+        """
+        scorer = scorer or self.scorer
+        self._check_scorer(scorer)
+        index = self.index
+        scores = self.bm25_scores(query_tokens) if scorer == 'bm25' else self.cosine_scores(query_tokens)
+
+        required = {term for phrase in phrases for term in phrase}
+        for term in required:
+            if term not in index.postings:
+                return []
+            containing = {doc_id for doc_id, _ in index.postings.items(term)}
+            scores = {doc_id: score for doc_id, score in scores.items() if doc_id in containing}
+        terms = sorted(set(query_tokens))
+        order = self._doc_order
+        candidates = sorted(scores.items(), key=lambda x: (-x[1], order[x[0]]))
+
+        heap = []
+        for doc_id, score in candidates:
+            if len(heap) >= top_k and score * (1 + PROXIMITY_WEIGHT) < heap[0][0]:
+                break
+            positions = index.doc_positions(doc_id, terms)
+            if not all(phrase_match(positions, phrase) for phrase in phrases):
+                continue
+            lists = [positions[term] for term in terms if term in positions]
+            if len(lists) > 1:
+                score *= 1 + PROXIMITY_WEIGHT / (1 + min_span(lists) - len(lists))
+            entry = (score, -order[doc_id], doc_id)
+            if len(heap) < top_k:
+                heapq.heappush(heap, entry)
+            elif entry > heap[0]:
+                heapq.heapreplace(heap, entry)
+        return [(doc_id, score) for score, _, doc_id in sorted(heap, reverse=True)]
+
+    def rank(self, query_tokens, top_k=5, scorer=None):
+        """Top (doc_id, score) pairs for a tokenized query
+
+        The sparse engine covers cosine TF-IDF only; BM25F always scores
+        from the postings. With pruning, WAND returns the same top-k as
+        scoring every matching document.
+        """
+        scorer = scorer or self.scorer
+        self._check_scorer(scorer)
+        if self.engine == 'sparse' and scorer == 'tfidf':
+            return self._sparse_engine().search(query_tokens, top_k)
+        # One term's bound is its best score, so WAND could skip nothing
+        if self.pruning and len(set(query_tokens)) > 1:
+            return self.wand_rank(query_tokens, top_k, scorer)
+
+        if scorer == 'bm25':
+            scores = self.bm25_scores(query_tokens)
+        else:
+            scores = self.cosine_scores(query_tokens)
+
+        # Bounded heap instead of sorting every score
+        order = self._doc_order
+        return heapq.nlargest(top_k, scores.items(), key=lambda x: (x[1], -order[x[0]]))
+
+    def _results(self, ranked, query_tokens):
+        """Attach paths, best-passage excerpts and highlights to ranked (doc_id, score) pairs
+
+        Only the winning passage of each returned document is read from disk.
+        """
+        query_terms = set(query_tokens)
         results = []
         for doc_id, score in ranked:
             doc = self.documents[doc_id]
-            # Get excerpt (first 200 chars)
-            excerpt = doc['content'][:200].replace('\n', ' ')
+            start, end = self.best_passage(doc_id, query_terms)
+            try:
+                excerpt, highlights = highlight(read_passage(doc['path'], start, end), query_terms)
+            except OSError:
+                excerpt, highlights = '', []
             results.append({
                 'doc_id': doc_id,
                 'path': doc['path'],
                 'score': score,
-                'excerpt': excerpt
+                'excerpt': excerpt,
+                'passage': {'start': start, 'end': end},
+                'highlights': highlights
             })
 
         return results
 
-    def cosine_similarity(self, vec1, vec2):
-        """Calculate cosine similarity between two vectors"""
-        # Get common terms
-        common_terms = set(vec1.keys()) & set(vec2.keys())
-        if not common_terms:
-            return 0.0
+    def best_passage(self, doc_id, query_terms):
+        """Byte range of the document passage scoring highest for the query terms
 
-        # Calculate dot product
-        dot_product = sum(vec1[term] * vec2[term] for term in common_terms)
+        Passages are scored with BM25 over their own term frequencies and
+        lengths; ties go to the earlier passage. Only this document's passage
+        block is read from the sidecar.
+        """
+        index = self.index
+        passages = index.docs[doc_id]['passages']
+        if not passages:
+            return 0, 0
 
-        # Calculate magnitudes
-        mag1 = math.sqrt(sum(v**2 for v in vec1.values()))
-        mag2 = math.sqrt(sum(v**2 for v in vec2.values()))
+        average = index.passage_avg or 1.0
+        scores = {}
+        for term, entries in index.passage_tfs(doc_id, query_terms).items():
+            idf = index.bm25_idf[term]
+            for number, freq in entries:
+                norm = 1 - PASSAGE_B + PASSAGE_B * passages[number][2] / average
+                scores[number] = scores.get(number, 0.0) + idf * freq * (BM25_K1 + 1) / (freq + BM25_K1 * norm)
+
+        number = max(scores, key=lambda n: (scores[n], -n)) if scores else 0
+        return passages[number][0], passages[number][1]
+
+    def _query_vector(self, query_tokens):
+        """TF-IDF weights of the query terms and their norm"""
+        if not query_tokens:
+            return {}, 0
+
+        counts = Counter(query_tokens)
+        total_query_terms = sum(counts.values())
+        query_vector = {}
+        for term, freq in counts.items():
+            weight = freq / total_query_terms * self.idf.get(term, 0)
+            if weight:
+                query_vector[term] = weight
+        return query_vector, math.sqrt(sum(w * w for w in query_vector.values()))
+
+    def wand_rank(self, query_tokens, top_k=5, scorer='tfidf', stats=None):
+        """Top (doc_id, score) pairs by WAND over the per-term score upper bounds
+
+        Sums each document's term contributions in the same order as
+        cosine_scores/bm25_scores, so scores are bit-identical to theirs.
+        """
+        index = self.index
+        docs = index.docs
+        doc_ids = index.postings.doc_ids
+        if scorer == 'bm25':
+            weights = [FIELD_WEIGHTS[field] for field in FIELDS]
+            terms = [(term, index.bm25_idf[term] * freq)
+                     for term, freq in Counter(query_tokens).items() if term in index.postings]
+            bounds = [index.bm25_max[term] * idf / index.bm25_idf[term] for term, idf in terms]
+            field_tfs = [index.fields.get(term, {}) for term, _ in terms]
+
+            def score(number, matched):
+                doc_id = doc_ids[number]
+                norms = index.bm25_norms[doc_id]
+                total = 0.0
+                for i, freq in matched:
+                    idf = terms[i][1]
+                    heading, summary = field_tfs[i].get(doc_id, (0, 0))
+                    field_freqs = (heading, summary, freq - heading - summary)
+                    tf = sum(w * f / n for w, f, n in zip(weights, field_freqs, norms))
+                    total += idf * tf * (BM25_K1 + 1) / (BM25_K1 + tf)
+                return total
+        else:
+            query_vector, query_norm = self._query_vector(query_tokens)
+            if query_norm == 0:
+                return []
+            terms = [(term, weight, self.idf[term]) for term, weight in query_vector.items()]
+            bounds = [weight / query_norm * index.cosine_max[term] for term, weight, _ in terms]
+
+            def score(number, matched):
+                doc_id = doc_ids[number]
+                length = docs[doc_id]['length']
+                dot_product = 0.0
+                for i, freq in matched:
+                    _, query_weight, idf = terms[i]
+                    dot_product += query_weight * (freq / length * idf)
+                return dot_product / (query_norm * index.norms[doc_id])
+
+        cursors = [index.postings.cursor(term[0]) for term in terms]
+        ranked = wand_top_k(cursors, bounds, score, top_k, stats)
+        return [(doc_ids[number], value) for number, value in ranked]
+
+    def cosine_scores(self, query_tokens):
+        """Cosine similarity for every document sharing a query term
+
+        Accumulates term-at-a-time over the query terms' postings and divides
+        by the document norms precomputed at index time, so the cost scales
+        with the postings touched rather than the corpus size.
+        """
+        query_vector, query_norm = self._query_vector(query_tokens)
+        if query_norm == 0:
+            return {}
+
+        docs = self.index.docs
+        accumulators = {}
+        for term, query_weight in query_vector.items():
+            idf = self.idf[term]
+            for doc_id, freq in self.index.postings.items(term):
+                doc_weight = freq / docs[doc_id]['length'] * idf
+                accumulators[doc_id] = accumulators.get(doc_id, 0.0) + query_weight * doc_weight
+
+        norms = self.index.norms
+        scores = {}
+        for doc_id, dot_product in accumulators.items():
+            score = dot_product / (query_norm * norms[doc_id])
+            if score > 0:
+                scores[doc_id] = score
+        return scores
 
-        if mag1 == 0 or mag2 == 0:
-            return 0.0
+    def bm25_scores(self, query_tokens):
+        """BM25F score for every document containing a query term
 
-        return dot_product / (mag1 * mag2)
+        Field term frequencies are weighted and divided by the per-field
+        length normalization precomputed at index time, then saturated once
+        per term, so a query costs the same postings walk as cosine scoring.
+        """
+        weights = [FIELD_WEIGHTS[field] for field in FIELDS]
+        index = self.index
+        scores = {}
+        for term, query_freq in Counter(query_tokens).items():
+            if term not in index.postings:
+                continue
+            idf = index.bm25_idf[term] * query_freq
+            field_tf = index.fields.get(term, {})
+            for doc_id, freq in index.postings.items(term):
+                heading, summary = field_tf.get(doc_id, (0, 0))
+                field_freqs = (heading, summary, freq - heading - summary)
+                tf = sum(w * f / n for w, f, n in zip(weights, field_freqs, index.bm25_norms[doc_id]))
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (BM25_K1 + 1) / (BM25_K1 + tf)
+        return scores
 
     def get_version_info(self):
-        """Get pipeline version and protocol checksum"""
+        """Get pipeline version and protocol checksum
+
+        Computed once per docs_dir for the life of the process; call
+        clear_version_info() after the corpus changes.
+        """
+        key = str(self.docs_dir)
+        if key in _VERSION_INFO:
+            return _VERSION_INFO[key]
+
         version = "unknown"
         version_file = self.docs_dir / "VERSION"
         if version_file.exists():
             version = version_file.read_text().strip()
 
-        # Calculate protocol checksum
+        # Calculate protocol checksum (manifest-backed: only changed files are rehashed)
         checksum = "unknown"
         try:
             from protocol_checksum import calculate_corpus_checksum
@@ -154,9 +537,10 @@ class SimpleRetrieval:
         except Exception:
             pass
 
+        _VERSION_INFO[key] = (version, checksum)
         return version, checksum
 
-    def log_query(self, query_text, results, latency_ms, origin_agent="unknown"):
+    def log_query(self, query_text, results, latency_ms, origin_agent="unknown", scorer=None):
         """Log query event to JSONL file"""
         if not self.enable_logging:
             return
@@ -179,60 +563,161 @@ class SimpleRetrieval:
             "pipeline_version": version,
             "protocol_checksum": checksum,
             "query_latency_ms": latency_ms,
-            "result_count": len(results)
+            "result_count": len(results),
+            "scorer": scorer or self.scorer
         }
-
-        # Append to JSONL log
+        if self.last_cache_status:
+            event["cache"] = self.last_cache_status
+            event["cache_hit_rate"] = self.cache.stats()["hit_rate"]
+
+        # Buffered; appended in batches and rotated by kb_log
+        self.log_writer.write(event)
+
+    def flush_log(self):
+        """Append any buffered query events to the log now"""
+        self.log_writer.flush()
+
+def mark_highlights(excerpt, highlights, marker='**'):
+    """Wrap highlighted spans in a markdown bold marker"""
+    out, last = [], 0
+    for start, end in highlights:
+        out.append(excerpt[last:start] + marker + excerpt[start:end] + marker)
+        last = end
+    return ''.join(out) + excerpt[last:]
+
+def replay_queries(log_file):
+    """Query texts recorded in a coordination_queries.jsonl log and its rotated segments"""
+    queries = []
+    for line in read_log_lines(log_file):
         try:
-            with open(self.log_file, 'a') as f:
-                f.write(json.dumps(event) + '\n')
-        except Exception as e:
-            print(f"Warning: Could not log query: {e}", file=sys.stderr)
+            queries.append(json.loads(line)['query'])
+        except (json.JSONDecodeError, KeyError):
+            pass
+    return queries
+
+def query_server(socket_path, query, scorer, proximity=False):
+    """Ask a running kb_server.py; None if no server answers (the caller falls back)"""
+    from kb_server import KBClient
+    try:
+        with KBClient(socket_path) as client:
+            return client.query(query, scorer=scorer, origin_agent="code", proximity=proximity)
+    except (OSError, ValueError):
+        return None
+
+def print_results(query, results, log_file, cache_status, expansions=None):
+    """CLI output for one query, identical in-process and via the server"""
+    print(f"\nQuery: {query}")
+    for token, terms in (expansions or {}).items():
+        print(f"Expanded: {token} -> {', '.join(terms)}")
+    print("=" * 80)
 
-def main():
-    import sys
+    if not results:
+        print("No results found")
+    else:
+        for i, result in enumerate(results, 1):
+            print(f"\n{i}. {result['doc_id']} (score: {result['score']:.4f})")
+            print(f"   Path: {result['path']}")
+            print(f"   Passage: bytes {result['passage']['start']}-{result['passage']['end']}")
+            print(f"   Excerpt: {mark_highlights(result['excerpt'], result['highlights'])}")
 
-    if len(sys.argv) < 2:
-        print("Usage: simple_retrieval.py <query>")
+    cache_note = f", cache {cache_status}" if cache_status else ""
+    print(f"\n[Query logged to {log_file}{cache_note}]")
+
+def main():
+    import argparse
+
+    script_dir = Path(__file__).parent
+    parser = argparse.ArgumentParser(description="Query the coordination knowledge base")
+    parser.add_argument("query", nargs="*", help="Query text")
+    parser.add_argument("--no-index", action="store_true",
+                        help="Rebuild the model from the raw documents instead of kb_index.json")
+    parser.add_argument("--engine", choices=ENGINES, default="python",
+                        help="Scoring engine (sparse needs numpy and scipy)")
+    parser.add_argument("--scorer", choices=SCORERS, default="tfidf",
+                        help="Ranking function: cosine TF-IDF or BM25F with heading/summary boosts")
+    parser.add_argument("--batch", nargs="?", const=script_dir / "coordination_queries.jsonl", type=Path,
+                        metavar="LOG", help="Replay every query in a query log (default: coordination_queries.jsonl)")
+    parser.add_argument("--proximity", action="store_true",
+                        help='Boost documents whose query terms occur close together ("quoted phrases" always are)')
+    parser.add_argument("--exact", action="store_true",
+                        help="Do not expand unknown (misspelled) words to similar indexed terms")
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the persistent result cache")
+    parser.add_argument("--cache-ttl", type=float, default=DEFAULT_TTL_SECONDS, metavar="SECONDS",
+                        help=f"Result cache time-to-live (default: {DEFAULT_TTL_SECONDS})")
+    parser.add_argument("--socket", type=Path, default=script_dir / "kb_server.sock",
+                        help="Ask the resident KB server on this socket first (see kb_server.py)")
+    parser.add_argument("--no-server", action="store_true", help="Always load the index in-process")
+    args = parser.parse_args()
+
+    if not args.query and args.batch is None:
+        parser.print_usage()
         print("Example: simple_retrieval.py 'coordination patterns'")
         sys.exit(1)
 
-    query = ' '.join(sys.argv[1:])
+    query = ' '.join(args.query)
+
+    # A running kb_server.py answers from a warm index; its engine and cache settings apply
+    in_process_only = args.no_server or args.no_index or args.no_cache or args.exact or args.batch is not None
+    if not in_process_only and args.socket.exists():
+        response = query_server(args.socket, query, args.scorer, args.proximity)
+        if response is not None:
+            if not response['ok']:
+                print(f"Error: {response['error']}")
+                sys.exit(1)
+            print_results(query, response['results'], response['log_file'], response['cache'],
+                          response.get('expansions'))
+            return
 
     # Load document list
-    docs_file = Path(__file__).parent / "coordination_docs.txt"
+    docs_file = script_dir / "coordination_docs.txt"
     if not docs_file.exists():
         print(f"Error: {docs_file} not found")
         sys.exit(1)
 
-    with open(docs_file) as f:
-        doc_paths = [line.strip() for line in f if line.strip() and not line.startswith('#')]
+    doc_paths = read_doc_list(docs_file)
+
+    # Initialize retrieval system from the persistent index
+    try:
+        cache = None if args.no_cache else QueryCache.load(script_dir / CACHE_FILE, ttl_seconds=args.cache_ttl)
+        retrieval = SimpleRetrieval(script_dir, engine=args.engine, scorer=args.scorer, cache=cache,
+                                    fuzzy=not args.exact)
+        if args.no_index:
+            retrieval.load_documents(doc_paths)
+            retrieval.build_index()
+        else:
+            retrieval.load_index(doc_paths)
+        if args.engine == 'sparse':
+            retrieval._sparse_engine()
+    except ImportError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
 
-    # Initialize retrieval system
-    retrieval = SimpleRetrieval(Path(__file__).parent)
-    retrieval.load_documents(doc_paths)
-    retrieval.build_index()
+    if args.batch is not None:
+        queries = replay_queries(args.batch)
+        start_time = time.time()
+        batch_results = retrieval.query_batch(queries)
+        elapsed_ms = (time.time() - start_time) * 1000
 
-    # Query with timing
-    print(f"\nQuery: {query}")
-    print("=" * 80)
+        for text, results in zip(queries, batch_results):
+            top = ', '.join(f"{r['doc_id']} ({r['score']:.4f})" for r in results[:3]) or "no results"
+            print(f"{text}\n    {top}")
+        print(f"\n[{len(queries)} queries in {elapsed_ms:.1f} ms with the {args.engine} engine, {args.scorer} scorer]")
+        return
 
+    # Query with timing
     start_time = time.time()
-    results = retrieval.query(query)
+    results = retrieval.query(query, proximity=args.proximity)
     latency_ms = int((time.time() - start_time) * 1000)
 
     # Log query
     retrieval.log_query(query, results, latency_ms, origin_agent="code")
+    if retrieval.cache is not None:
+        try:
+            retrieval.cache.save()
+        except OSError as e:
+            print(f"Warning: Could not save query cache: {e}", file=sys.stderr)
 
-    if not results:
-        print("No results found")
-    else:
-        for i, result in enumerate(results, 1):
-            print(f"\n{i}. {result['doc_id']} (score: {result['score']:.4f})")
-            print(f"   Path: {result['path']}")
-            print(f"   Excerpt: {result['excerpt']}...")
-
-    print(f"\n[Query logged to {retrieval.log_file}]")
+    print_results(query, results, retrieval.log_file, retrieval.last_cache_status, retrieval.last_expansions)
 
 if __name__ == '__main__':
     main()
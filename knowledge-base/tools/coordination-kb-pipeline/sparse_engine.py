@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Vectorized TF-IDF engine for the coordination KB
+Stores the corpus as a CSR matrix with L2-normalized rows and scores a batch
+of queries with a single sparse matrix product. Cosine scores match the
+pure-Python postings scorer in simple_retrieval.py.
+
+Requires numpy and scipy (optional dependencies of the pipeline).
+
+Part of: Coordination KB Pipeline
+"""
+
+import math
+from collections import Counter
+from typing import Any
+
+from kb_postings import CompactPostings
+
+try:
+    import numpy as np
+    from scipy import sparse
+except ImportError:  # pragma: no cover - exercised only without numpy/scipy
+    np = None
+    sparse = None
+
+
+def available() -> bool:
+    """True when numpy and scipy can be imported"""
+    return np is not None and sparse is not None
+
+
+class SparseEngine:
+    """CSR TF-IDF matrix over a KBIndex"""
+
+    def __init__(self, index: Any):
+        if not available():
+            raise ImportError("The sparse engine needs numpy and scipy: pip install numpy scipy")
+
+        postings = index.postings
+        if not isinstance(postings, CompactPostings):
+            postings = CompactPostings(index.docs, postings)
+        self.doc_ids = postings.doc_ids
+        self.term_ids = postings.terms.ids
+        self.idf = index.idf
+
+        # Decode every term's document gaps at once: a running sum over all
+        # gaps, minus the running sum where each term's postings start
+        offsets = np.frombuffer(postings.offsets, dtype=np.uint64).astype(np.int64)
+        counts = np.diff(offsets)
+        running = np.cumsum(np.frombuffer(postings.gaps, dtype=np.uint32), dtype=np.int64)
+        before = np.concatenate(([0], running))[offsets[:-1]]
+        rows = running - np.repeat(before, counts)
+        cols = np.repeat(np.arange(len(counts)), counts)
+
+        idf = np.array([index.idf[term] for term in postings.terms], dtype=np.float64)
+        lengths = np.array([index.docs[doc_id]["length"] for doc_id in self.doc_ids], dtype=np.float64)
+        norms = np.array([index.norms[doc_id] for doc_id in self.doc_ids], dtype=np.float64)
+        tfs = np.frombuffer(postings.tfs, dtype=np.uint32)
+        keep = idf[cols] != 0
+        rows, cols = rows[keep], cols[keep]
+        data = tfs[keep] / lengths[rows] * idf[cols] / norms[rows]
+
+        shape = (len(self.doc_ids), len(self.term_ids))
+        self.matrix = sparse.csr_matrix((data, (rows, cols)), shape=shape, dtype=np.float64)
+        # Transposed once so each batch is a single CSR x CSC product
+        self._matrix_t = self.matrix.T.tocsc()
+
+    def query_matrix(self, token_lists: list[list[str]]) -> Any:
+        """Build a CSR matrix of L2-normalized query vectors (one row per query)
+
+        Each query is a token list or a Counter of term weights (an expanded query).
+        """
+        rows: list[int] = []
+        cols: list[int] = []
+        data: list[float] = []
+        for row, tokens in enumerate(token_lists):
+            if not tokens:
+                continue
+            weights = {}
+            counts = Counter(tokens)
+            total = sum(counts.values())
+            for term, freq in counts.items():
+                weight = freq / total * self.idf.get(term, 0)
+                if weight:
+                    weights[term] = weight
+            norm = math.sqrt(sum(w * w for w in weights.values()))
+            for term, weight in weights.items():
+                rows.append(row)
+                cols.append(self.term_ids[term])
+                data.append(weight / norm)
+
+        shape = (len(token_lists), len(self.term_ids))
+        return sparse.csr_matrix((data, (rows, cols)), shape=shape, dtype=np.float64)
+
+    def search_batch(self, token_lists: list[list[str]], top_k: int = 5) -> list[list[tuple[str, float]]]:
+        """Score every query in one product and return top_k (doc_id, score) per query
+
+        Ties are broken by document order, like the postings scorer.
+        """
+        scores = (self.query_matrix(token_lists) @ self._matrix_t).tocsr()
+        results = []
+        for row in range(scores.shape[0]):
+            start, end = scores.indptr[row], scores.indptr[row + 1]
+            values = scores.data[start:end]
+            docs = scores.indices[start:end]
+            keep = values > 0
+            values, docs = values[keep], docs[keep]
+            if len(values) > top_k:
+                # Everything scoring at least the k-th best, then an exact sort
+                threshold = np.partition(values, -top_k)[-top_k]
+                keep = values >= threshold
+                values, docs = values[keep], docs[keep]
+            order = np.lexsort((docs, -values))[:top_k]
+            results.append([(self.doc_ids[docs[i]], float(values[i])) for i in order])
+        return results
+
+    def search(self, tokens: list[str], top_k: int = 5) -> list[tuple[str, float]]:
+        """Score a single query"""
+        return self.search_batch([tokens], top_k)[0]
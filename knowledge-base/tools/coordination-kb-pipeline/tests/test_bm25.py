@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Test suite for BM25F ranking
+
+Tests:
+- Markdown field splitting (headings, first paragraph, body, code fences)
+- BM25F scores against a hand-computed reference
+- Heading/summary boosts versus long boilerplate documents
+- Per-query scorer selection and persistence through the index
+"""
+
+import json
+import math
+import sys
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+# Add paths
+pipeline_root = Path(__file__).parent.parent
+sys.path.insert(0, str(pipeline_root))
+
+from kb_index import BM25_K1, FIELD_B, FIELD_WEIGHTS, FIELDS, split_fields, tokenize
+from simple_retrieval import SimpleRetrieval
+from test_kb_index import CORPUS, QUERIES, write_corpus
+
+BOILERPLATE = "# Notes\n\nGeneral notes.\n\n" + "See the routing appendix and the usual status footer text. " * 12
+
+
+def reference_bm25(paths: list, query: str) -> dict:
+    """Textbook BM25F over split_fields, computed from scratch"""
+    docs = {}
+    for path in paths:
+        fields = split_fields(Path(path).read_text())
+        docs[Path(path).stem] = {f: tokenize(fields[f]) for f in FIELDS}
+    n = len(docs)
+    avg = {f: sum(len(d[f]) for d in docs.values()) / n for f in FIELDS}
+
+    scores = {}
+    for term in tokenize(query):
+        df = sum(1 for d in docs.values() if any(term in d[f] for f in FIELDS))
+        if not df:
+            continue
+        idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+        for doc_id, d in docs.items():
+            tf = sum(
+                FIELD_WEIGHTS[f] * d[f].count(term) / (1 - FIELD_B[f] + FIELD_B[f] * len(d[f]) / avg[f])
+                for f in FIELDS if avg[f]
+            )
+            if tf:
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (BM25_K1 + 1) / (BM25_K1 + tf)
+    return scores
+
+
+class TestFields:
+    """Test markdown field extraction"""
+
+    def test_split(self) -> None:
+        """Test headings, the first paragraph and fenced comments"""
+        fields = split_fields("# Title\n\nFirst para\ncontinues.\n\n## Part\nBody text\n```sh\n# not a heading\n```\n")
+        assert fields["heading"] == "# Title\n## Part"
+        assert fields["summary"] == "First para\ncontinues."
+        assert fields["body"] == "Body text\n```sh\n# not a heading\n```"
+
+    def test_fields_partition_tokens(self) -> None:
+        """Test field token counts add up to the document length"""
+        for text in list(CORPUS.values()) + [BOILERPLATE]:
+            fields = split_fields(text)
+            assert sum(len(tokenize(fields[f])) for f in FIELDS) == len(tokenize(text))
+
+
+class TestBM25:
+    """Test the BM25F scorer"""
+
+    def test_matches_reference(self, tmp_path: Any) -> None:
+        """Test postings scoring equals the from-scratch formula"""
+        paths = write_corpus(tmp_path / "docs", CORPUS | {"boilerplate": BOILERPLATE})
+        retrieval = SimpleRetrieval(tmp_path, enable_logging=False)
+        retrieval.load_index(paths)
+
+        for query in QUERIES + ["routing bridge bridge"]:
+            expected = reference_bm25(paths, query)
+            actual = retrieval.bm25_scores(tokenize(query))
+            assert actual.keys() == expected.keys()
+            for doc_id, score in expected.items():
+                assert abs(actual[doc_id] - score) < 1e-9
+
+    def test_heading_beats_boilerplate(self, tmp_path: Any) -> None:
+        """Test a heading match outranks repeated body boilerplate"""
+        corpus = CORPUS | {"boilerplate": BOILERPLATE, "routing": "# Message Routing\n\nHow agents pick recipients.\n"}
+        paths = write_corpus(tmp_path / "docs", corpus)
+        retrieval = SimpleRetrieval(tmp_path, enable_logging=False)
+        retrieval.load_index(paths)
+
+        results = retrieval.query("routing", scorer="bm25")
+        assert [r["doc_id"] for r in results] == ["routing", "boilerplate"]
+
+    def test_persisted_index_scores_the_same(self, tmp_path: Any) -> None:
+        """Test BM25 statistics survive a save/load round trip"""
+        paths = write_corpus(tmp_path / "docs")
+        built = SimpleRetrieval(tmp_path, enable_logging=False, scorer="bm25")
+        built.load_documents(paths)
+        built.build_index()
+        SimpleRetrieval(tmp_path, enable_logging=False).load_index(paths)
+        loaded = SimpleRetrieval(tmp_path, enable_logging=False, scorer="bm25")
+        loaded.load_index(paths)
+
+        for query in QUERIES:
+            assert built.query(query) == loaded.query(query)
+
+    def test_scorer_selection(self, tmp_path: Any) -> None:
+        """Test unknown scorers fail and the scorer is logged"""
+        with pytest.raises(ValueError):
+            SimpleRetrieval(tmp_path, scorer="pagerank")
+
+        paths = write_corpus(tmp_path / "docs")
+        retrieval = SimpleRetrieval(tmp_path)
+        retrieval.load_index(paths)
+        with pytest.raises(ValueError):
+            retrieval.query("bridge", scorer="pagerank")
+
+        retrieval.log_query("bridge", retrieval.query("bridge", scorer="bm25"), 1, scorer="bm25")
+        retrieval.flush_log()
+        event = json.loads(retrieval.log_file.read_text())
+        assert event["scorer"] == "bm25"
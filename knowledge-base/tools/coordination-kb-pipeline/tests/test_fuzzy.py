@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Test suite for typo-tolerant query expansion
+
+Tests:
+- Bounded edit distance (insertions, deletions, substitutions, swaps)
+- Trigram candidates find exactly the brute-force nearest terms
+- Unknown query terms expand to nearby terms at reduced weight
+- Known-term queries are unchanged and never build the trigram index
+- Lookups give up once their trigram lists exceed the postings budget
+- Benchmark report and latency budget on a synthetic vocabulary
+"""
+
+import random
+import sys
+from pathlib import Path
+from typing import Any
+
+# Add paths
+pipeline_root = Path(__file__).parent.parent
+sys.path.insert(0, str(pipeline_root))
+
+import kb_fuzzy
+from bench_kb_fuzzy import benchmark, synthetic_vocabulary
+from kb_fuzzy import TrigramIndex, edit_distance, letters, max_edits
+from query_cache import QueryCache
+from simple_retrieval import FUZZY_WEIGHT, SimpleRetrieval
+from test_kb_index import CORPUS, QUERIES, indexed, write_corpus
+
+
+def levenshtein_typo(word: str, rng: random.Random) -> str:
+    """word with one random insertion, deletion or substitution"""
+    i = rng.randrange(len(word))
+    edit = rng.randrange(3)
+    if edit == 0:
+        return word[:i] + word[i + 1:]
+    letter = rng.choice("aeiourstn")
+    return word[:i] + letter + word[i + (edit == 1):]
+
+
+class TestEditDistance:
+    """Test the banded optimal string alignment distance"""
+
+    def test_distances(self) -> None:
+        """Test each kind of edit counts once"""
+        assert edit_distance("queue", "queue", 2) == 0
+        assert edit_distance("cordination", "coordination", 2) == 1
+        assert edit_distance("bridge", "brdige", 2) == 1
+        assert edit_distance("bridge", "bridges", 2) == 1
+        assert edit_distance("bridge", "fridge", 2) == 1
+        assert edit_distance("cordiantion", "coordination", 2) == 2
+        assert edit_distance("", "ab", 2) == 2
+
+    def test_limit(self) -> None:
+        """Test distances past the limit are reported as limit + 1"""
+        assert edit_distance("kitten", "sitting", 2) == 3
+        assert edit_distance("kitten", "sitting", 3) == 3
+        assert edit_distance("provenance", "pro", 2) == 3
+        assert edit_distance("abcdef", "badcfe", 2) == 3
+
+    def test_max_edits(self) -> None:
+        """Test short terms allow fewer typos"""
+        assert [max_edits("x" * n) for n in (2, 3, 7, 8)] == [0, 1, 1, 2]
+
+
+class TestTrigramIndex:
+    """Test candidate generation and verification"""
+
+    def test_single_typos(self) -> None:
+        """Test every kind of single typo finds the original term"""
+        index = TrigramIndex(["coordination", "coordinate", "bridge", "queue", "queues", "provenance"])
+        assert index.nearest("cordination") == (1, ["coordination"])
+        assert index.nearest("brdige") == (1, ["bridge"])
+        assert index.nearest("bridgee") == (1, ["bridge"])
+        assert index.nearest("qeue") == (1, ["queue"])
+        assert index.nearest("queus") == (1, ["queue", "queues"])
+        assert index.nearest("provenanse") == (1, ["provenance"])
+        assert index.nearest("cordinatoin") == (2, ["coordination"])
+
+    def test_nothing_close(self) -> None:
+        """Test unrelated and too-short terms are left alone"""
+        index = TrigramIndex(["coordination", "bridge", "qu"])
+        assert index.nearest("zebra") == (0, [])
+        assert index.nearest("qv") == (0, [])
+        assert index.nearest("brdgx") == (0, [])
+
+    def test_letters_screen(self) -> None:
+        """Test terms within k edits never differ in more than k letter bits each way"""
+        terms = synthetic_vocabulary(500, seed=3)
+        rng = random.Random(4)
+        for term in terms:
+            typo = levenshtein_typo(levenshtein_typo(term, rng), rng)
+            distance = edit_distance(term, typo, 2)
+            if distance <= 2:
+                a, b = letters(term), letters(typo)
+                assert (a & ~b).bit_count() <= distance and (b & ~a).bit_count() <= distance
+
+    def test_postings_budget(self, monkeypatch: Any) -> None:
+        """Test a lookup whose lists exceed MAX_POSTINGS returns no candidates"""
+        index = TrigramIndex(["coordination", "coordinate", "bridge"])
+        assert index.candidates("cordination", 1) == ["coordination"]
+        monkeypatch.setattr(kb_fuzzy, "MAX_POSTINGS", 2)
+        assert index.candidates("cordination", 1) == []
+        assert index.nearest("cordination") == (0, [])
+
+    def test_matches_brute_force(self) -> None:
+        """Test lookups equal a scan of the whole vocabulary"""
+        terms = synthetic_vocabulary(3000, seed=5)
+        index = TrigramIndex(terms)
+        rng = random.Random(9)
+        checked = 0
+        while checked < 200:
+            query = levenshtein_typo(rng.choice(terms), rng)
+            if rng.random() < 0.5:
+                query = levenshtein_typo(query, rng)
+            if query in index.known or len(query) < 3:
+                continue
+            limit = max_edits(query)
+            distances = {term: edit_distance(query, term, limit) for term in terms}
+            best = min(distances.values())
+            expected = (best, sorted(t for t, d in distances.items() if d == best)) if best <= limit else (0, [])
+            assert index.nearest(query) == expected
+            checked += 1
+
+
+class TestQueryExpansion:
+    """Test SimpleRetrieval expands unknown terms"""
+
+    def test_misspelled_query_finds_document(self, tmp_path: Any) -> None:
+        """Test a misspelling returns the document the correct spelling does"""
+        retrieval = indexed(tmp_path, write_corpus(tmp_path / "docs"))
+        for scorer in ("tfidf", "bm25"):
+            results = retrieval.query("cordination", scorer=scorer)
+            assert retrieval.last_expansions == {"cordination": ["coordination"]}
+            assert [r["doc_id"] for r in results] == ["patterns"]
+            assert results[0]["highlights"]
+
+        exact = SimpleRetrieval(tmp_path, enable_logging=False, fuzzy=False)
+        exact.load_index(write_corpus(tmp_path / "docs"))
+        assert exact.query("cordination") == []
+
+    def test_reduced_weight(self, tmp_path: Any) -> None:
+        """Test an expanded term counts FUZZY_WEIGHT per edit against a known term"""
+        retrieval = indexed(tmp_path, write_corpus(tmp_path / "docs"))
+        assert retrieval.expand_query(["bridge", "provenanse"]) == {"bridge": 1, "provenance": FUZZY_WEIGHT}
+        typo = {r["doc_id"]: r["score"] for r in retrieval.query("bridge provenanse", scorer="bm25")}
+        exact = {r["doc_id"]: r["score"] for r in retrieval.query("bridge provenance", scorer="bm25")}
+        assert typo["provenance"] < exact["provenance"]
+        assert abs(typo["bridge"] - exact["bridge"]) < 1e-12
+
+    def test_known_terms_unchanged(self, tmp_path: Any) -> None:
+        """Test queries of indexed terms rank as before and build no trigram index"""
+        paths = write_corpus(tmp_path / "docs")
+        retrieval = indexed(tmp_path, paths)
+        exact = SimpleRetrieval(tmp_path, enable_logging=False, fuzzy=False)
+        exact.load_index(paths)
+        for query in QUERIES[:-1]:
+            assert retrieval.query(query) == exact.query(query)
+        assert retrieval._trigrams is None
+        assert retrieval.expand_query(["bridge", "bridge"]) == ["bridge", "bridge"]
+
+    def test_batch_and_cache(self, tmp_path: Any) -> None:
+        """Test batch queries expand too and exact results are cached apart"""
+        paths = write_corpus(tmp_path / "docs")
+        retrieval = indexed(tmp_path, paths)
+        [batch] = retrieval.query_batch(["cordination"])
+        assert batch == retrieval.query("cordination")
+
+        cache = QueryCache(None)
+        retrieval.cache = cache
+        assert retrieval.query("cordination")
+        exact = SimpleRetrieval(tmp_path, enable_logging=False, fuzzy=False, cache=cache)
+        exact.load_index(paths)
+        assert exact.query("cordination") == []
+        assert exact.last_cache_status == "miss"
+
+    def test_sparse_engine(self, tmp_path: Any) -> None:
+        """Test the sparse engine scores expanded queries like the postings scorer"""
+        paths = write_corpus(tmp_path / "docs", dict(CORPUS, extra="# Bridge Notes\n\nMore bridge coordination.\n"))
+        python = indexed(tmp_path, paths)
+        sparse = SimpleRetrieval(tmp_path, enable_logging=False, engine="sparse")
+        sparse.load_index(paths)
+        for query in ("cordination brigde", "bridge provenanse"):
+            expected = python.query(query)
+            actual = sparse.query_batch([query])[0]
+            assert [r["doc_id"] for r in actual] == [r["doc_id"] for r in expected]
+            for want, got in zip(expected, actual):
+                assert abs(want["score"] - got["score"]) < 1e-9
+
+
+class TestBenchmark:
+    """Test the lookup benchmark report"""
+
+    def test_report(self) -> None:
+        """Test a small run corrects every single typo"""
+        report = benchmark(vocabulary=2000, queries=20)
+        assert report["vocabulary"] == 2000
+        assert report["lookups"]["one typo"]["corrected"] == 20
+        assert set(report["lookups"]) == {"one typo", "two typos", "unseen"}
+
+    def test_latency_budget(self) -> None:
+        """Test lookups on 100,000 terms average under 1 ms (p95 under 2 ms on a busy machine)"""
+        report = benchmark(vocabulary=100000, queries=100)
+        for name, stats in report["lookups"].items():
+            assert stats["mean_ms"] < 1.0, (name, stats)
+            assert stats["p95_ms"] < 2.0, (name, stats)
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Test suite for the parallel KB index builder
+
+Tests:
+- Single-pass tokenizer matches the original two-pass tokenizer
+- Process-pool build equals the serial incremental index
+- Spill files are cleaned up and unreadable documents skipped
+"""
+
+import math
+import re
+import sys
+from pathlib import Path
+from typing import Any
+
+# Add paths
+pipeline_root = Path(__file__).parent.parent
+sys.path.insert(0, str(pipeline_root))
+
+from kb_build import build_parallel
+from kb_index import INDEX_FILE, KBIndex, open_index, tokenize
+from simple_retrieval import SimpleRetrieval
+from test_kb_index import CORPUS, QUERIES, assert_same_results, write_corpus
+
+repo_root = pipeline_root.parent.parent.parent
+
+
+def two_pass_tokenize(text: str) -> list:
+    text = text.lower()
+    text = re.sub(r"[#*`\[\]()_-]", " ", text)
+    return re.findall(r"\b\w+\b", text)
+
+
+def corpus(n: int) -> dict:
+    docs = dict(CORPUS)
+    for i in range(n):
+        docs[f"note{i:03d}"] = f"# Note {i}\n\nAgent note {i} about queue_{i % 7} and bridge-{i % 3}.\n\n## Body\n" + (
+            f"Line {i} mentions provenance café {i % 5}.\n" * (i % 9 + 1))
+    return docs
+
+
+class TestTokenizer:
+    """Test the single-pass tokenizer"""
+
+    def test_matches_two_pass(self) -> None:
+        """Test tricky strings and the repository's own markdown"""
+        samples = [
+            "snake_case kebab-case **bold** `code` [link](url) #tag",
+            "Ünïcödé ÉCOLE naïve façade 東京 ٣٤٥ x²",
+            "__init__ a_b_c 3_000 -- ## ### ...",
+        ]
+        samples += [p.read_text(errors="replace") for p in sorted(repo_root.glob("*.md"))[:10]]
+        for text in samples:
+            assert tokenize(text) == two_pass_tokenize(text)
+
+
+class TestParallelBuild:
+    """Test the process-pool builder"""
+
+    def test_equals_serial_index(self, tmp_path: Any) -> None:
+        """Test every table matches the incremental builder's"""
+        paths = write_corpus(tmp_path / "docs", corpus(40))
+        serial, _ = open_index(paths, tmp_path / "serial.json", workers=1)
+
+        stats = build_parallel(paths, tmp_path / INDEX_FILE, workers=3)
+        parallel = KBIndex.load(tmp_path / INDEX_FILE)
+
+        assert stats["documents"] == len(paths)
+        assert stats["chunks"] > 3
+        assert list(parallel.docs) == list(serial.docs)
+        assert parallel.docs == serial.docs
+        for table in ("postings", "fields", "idf", "bm25_idf", "bm25_norms"):
+            assert getattr(parallel, table).to_dict() == getattr(serial, table).to_dict(), table
+        for doc_id in serial.docs:
+            assert parallel.passage_tfs(doc_id) == serial.passage_tfs(doc_id)
+        for doc_id, norm in serial.norms.items():
+            assert math.isclose(parallel.norms[doc_id], norm, rel_tol=1e-12)
+        assert math.isclose(parallel.passage_avg, serial.passage_avg)
+
+    def test_queries_match(self, tmp_path: Any) -> None:
+        """Test retrieval over a parallel-built index ranks like a serial one"""
+        paths = write_corpus(tmp_path / "docs", corpus(70))
+        serial = SimpleRetrieval(tmp_path, enable_logging=False)
+        serial.load_index(paths, tmp_path / "serial.json", workers=1)
+
+        parallel = SimpleRetrieval(tmp_path, enable_logging=False)
+        parallel.load_index(paths)  # 74 documents: built by the process pool
+        for query in QUERIES + ["queue bridge note", "café provenance"]:
+            for scorer in ("tfidf", "bm25"):
+                assert_same_results(serial.query(query, scorer=scorer), parallel.query(query, scorer=scorer))
+
+    def test_skips_unreadable_and_cleans_up(self, tmp_path: Any) -> None:
+        """Test missing files are reported and no spill files remain"""
+        paths = write_corpus(tmp_path / "docs")
+        stats = build_parallel(paths + [str(tmp_path / "gone.md")], tmp_path / INDEX_FILE, workers=2)
+
+        assert stats["skipped"] == 1
+        names = sorted(p.name for p in tmp_path.iterdir())
+        assert names[:2] == ["docs", INDEX_FILE] and len(names) == 4
+        assert names[2].startswith("kb_index.positions.") and names[3].startswith("kb_index.postings.")
+        _, changes = open_index(paths, tmp_path / INDEX_FILE)
+        assert changes == {"added": 0, "updated": 0, "removed": 0, "unchanged": len(paths)}
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Test suite for the Coordination KB index
+
+Tests:
+- Postings-driven scoring matches full-vector cosine similarity
+- Indexed retrieval matches the in-memory TF-IDF build
+- Incremental updates (added, edited, touched, removed documents)
+- Index persistence and version handling
+- Concurrent processes saving the same index
+"""
+
+import json
+import math
+import os
+import subprocess
+import sys
+import textwrap
+from collections import Counter
+from pathlib import Path
+from typing import Any
+
+# Add paths
+pipeline_root = Path(__file__).parent.parent
+sys.path.insert(0, str(pipeline_root))
+
+from kb_index import INDEX_FILE, INDEX_VERSION, KBIndex, open_index, tokenize
+from simple_retrieval import SimpleRetrieval
+
+CORPUS = {
+    "bridge": "# Bridge\n\nThe bridge delivers messages between agents.\n\n## Queue\nPriority queue ordering.\n",
+    "provenance": "# Scientific Provenance\n\nTrack provenance of every specimen record.\n",
+    "patterns": "# Coordination Patterns\n\nAgents coordinate via the bridge and shared patterns.\n",
+    "exploration": "# Autonomous Exploration\n\nAgents explore autonomously within bounds.\n",
+}
+
+QUERIES = ["bridge messages", "provenance", "coordination patterns agents", "autonomous", "nothing matches"]
+
+
+def write_corpus(root: Path, corpus: dict = CORPUS) -> list:
+    root.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for name, text in corpus.items():
+        path = root / f"{name}.md"
+        path.write_text(text)
+        paths.append(str(path))
+    return paths
+
+
+def reference_query(paths: list, query: str, top_k: int = 5) -> list:
+    """The original algorithm: full TF-IDF vectors, cosine against every document"""
+    docs = {Path(p).stem: tokenize(Path(p).read_text()) for p in paths}
+    df = Counter(t for tokens in docs.values() for t in set(tokens))
+    idf = {t: math.log(len(docs) / n) for t, n in df.items()}
+
+    def vector(tokens: list) -> dict:
+        return {t: n / len(tokens) * idf.get(t, 0) for t, n in Counter(tokens).items()}
+
+    def cosine(a: dict, b: dict) -> float:
+        common = set(a) & set(b)
+        mag = math.sqrt(sum(v * v for v in a.values())) * math.sqrt(sum(v * v for v in b.values()))
+        return sum(a[t] * b[t] for t in common) / mag if common and mag else 0.0
+
+    qvec = vector(tokenize(query)) if tokenize(query) else {}
+    scores = {d: cosine(qvec, vector(tokens)) for d, tokens in docs.items()}
+    ranked = sorted(((d, s) for d, s in scores.items() if s > 0), key=lambda x: x[1], reverse=True)
+    return [{"doc_id": d, "score": s} for d, s in ranked[:top_k]]
+
+
+def baseline(tmp_path: Path, paths: list) -> SimpleRetrieval:
+    retrieval = SimpleRetrieval(tmp_path, enable_logging=False)
+    retrieval.load_documents(paths)
+    retrieval.build_index()
+    return retrieval
+
+
+def indexed(tmp_path: Path, paths: list) -> SimpleRetrieval:
+    retrieval = SimpleRetrieval(tmp_path, enable_logging=False)
+    retrieval.load_index(paths)
+    return retrieval
+
+
+def assert_same_results(expected: list, actual: list) -> None:
+    assert [r["doc_id"] for r in actual] == [r["doc_id"] for r in expected]
+    for want, got in zip(expected, actual):
+        assert abs(want["score"] - got["score"]) < 1e-12
+        if "excerpt" in want:
+            assert want["excerpt"] == got["excerpt"]
+
+
+class TestEquivalence:
+    """Test indexed queries score like the original full rebuild"""
+
+    def test_matches_full_rebuild(self, tmp_path: Any) -> None:
+        """Test every query returns the same ranking, scores and excerpts"""
+        paths = write_corpus(tmp_path / "docs")
+        expected = baseline(tmp_path, paths)
+        actual = indexed(tmp_path, paths)
+
+        for query in QUERIES:
+            assert_same_results(expected.query(query), actual.query(query))
+
+    def test_matches_full_vector_cosine(self, tmp_path: Any) -> None:
+        """Test postings accumulation equals cosine against every document vector"""
+        paths = write_corpus(tmp_path / "docs")
+        retrieval = baseline(tmp_path, paths)
+
+        for query in QUERIES + ["agents agents bridge", "the", ""]:
+            for top_k in (1, 2, 5):
+                assert_same_results(reference_query(paths, query, top_k), retrieval.query(query, top_k))
+
+    def test_ties_keep_document_order(self, tmp_path: Any) -> None:
+        """Test equal scores rank in document-list order like the stable sort"""
+        paths = write_corpus(tmp_path / "docs", {f"twin{i}": "alpha beta" for i in range(6)}
+                             | {"other": "gamma"})
+        results = baseline(tmp_path, paths).query("alpha", top_k=3)
+        assert [r["doc_id"] for r in results] == ["twin0", "twin1", "twin2"]
+
+
+class TestIncremental:
+    """Test per-file index maintenance"""
+
+    def test_second_open_reads_nothing(self, tmp_path: Any) -> None:
+        """Test an unchanged corpus is served from the saved index"""
+        paths = write_corpus(tmp_path / "docs")
+        open_index(paths, tmp_path / INDEX_FILE)
+
+        index, changes = open_index(paths, tmp_path / INDEX_FILE)
+        assert changes == {"added": 0, "updated": 0, "removed": 0, "unchanged": 4}
+        assert not index.dirty
+
+    def test_edit_touch_and_remove(self, tmp_path: Any) -> None:
+        """Test edited files re-index, touched files only refresh metadata"""
+        paths = write_corpus(tmp_path / "docs")
+        open_index(paths, tmp_path / INDEX_FILE)
+
+        Path(paths[0]).write_text("# Bridge\n\nCompletely rewritten bridge provenance notes.\n")
+        os.utime(paths[1], ns=(1, 1))
+        _, changes = open_index(paths[:3], tmp_path / INDEX_FILE)
+        assert changes == {"added": 0, "updated": 1, "removed": 1, "unchanged": 2}
+
+        expected = baseline(tmp_path, paths[:3])
+        actual = indexed(tmp_path, paths[:3])
+        assert "exploration" not in actual.index.docs
+        assert actual.index.docs["provenance"]["mtime_ns"] == 1
+        for query in QUERIES:
+            assert_same_results(expected.query(query), actual.query(query))
+
+    def test_add_document(self, tmp_path: Any) -> None:
+        """Test new documents update IDF for the whole corpus"""
+        paths = write_corpus(tmp_path / "docs")
+        open_index(paths[:2], tmp_path / INDEX_FILE)
+
+        _, changes = open_index(paths, tmp_path / INDEX_FILE)
+        assert changes["added"] == 2
+
+        expected = baseline(tmp_path, paths)
+        actual = indexed(tmp_path, paths)
+        assert list(actual.index.docs) == list(expected.documents)
+        for query in QUERIES:
+            assert_same_results(expected.query(query), actual.query(query))
+
+    def test_missing_file_is_dropped(self, tmp_path: Any) -> None:
+        """Test unreadable documents are skipped like the original loader"""
+        paths = write_corpus(tmp_path / "docs")
+        open_index(paths, tmp_path / INDEX_FILE)
+
+        os.unlink(paths[2])
+        index, changes = open_index(paths, tmp_path / INDEX_FILE)
+        assert changes["removed"] == 1
+        assert "patterns" not in index.docs
+
+
+class TestPersistence:
+    """Test the index file"""
+
+    def test_incompatible_version_rebuilds(self, tmp_path: Any) -> None:
+        """Test an index from another version is ignored"""
+        paths = write_corpus(tmp_path / "docs")
+        open_index(paths, tmp_path / INDEX_FILE)
+
+        data = json.loads((tmp_path / INDEX_FILE).read_text())
+        assert data["version"] == INDEX_VERSION
+        data["version"] = -1
+        (tmp_path / INDEX_FILE).write_text(json.dumps(data))
+
+        assert KBIndex.load(tmp_path / INDEX_FILE).docs == {}
+        _, changes = open_index(paths, tmp_path / INDEX_FILE)
+        assert changes["added"] == 4
+
+    def test_concurrent_saves(self, tmp_path: Any) -> None:
+        """Test processes saving at once each use their own temp file"""
+        paths = write_corpus(tmp_path / "docs")
+        script = textwrap.dedent(f"""
+            import sys
+            from pathlib import Path
+            sys.path.insert(0, {str(pipeline_root)!r})
+            from kb_index import open_index
+
+            doc = Path({str(tmp_path / "docs")!r}) / (sys.argv[1] + ".md")
+            paths = {paths!r} + [str(doc)]
+            for i in range(15):
+                doc.write_text(f"# Worker {{sys.argv[1]}}\\n\\nRevision {{i}} of the worker notes.\\n")
+                open_index(paths, Path({str(tmp_path / INDEX_FILE)!r}))
+        """)
+        workers = [subprocess.Popen([sys.executable, "-c", script, f"w{n}"], stderr=subprocess.DEVNULL)
+                   for n in range(3)]
+        assert all(worker.wait(timeout=60) == 0 for worker in workers)
+
+        data = json.loads((tmp_path / INDEX_FILE).read_text())
+        assert data["version"] == INDEX_VERSION
+        assert any(doc_id.startswith("w") for doc_id in data["docs"])
+        assert list(tmp_path.glob("*.tmp*")) == []
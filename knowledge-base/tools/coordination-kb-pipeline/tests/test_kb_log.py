@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Test suite for the buffered, rotating query log writer
+
+Tests:
+- Events are batched and flushed on size, age and explicit flush
+- Size and date rotation into gzip segments
+- Segments mid-compression or truncated are read once, without errors
+- query_audit, generate_digest and batch replay read across segments
+"""
+
+import gzip
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+# Add paths
+pipeline_root = Path(__file__).parent.parent
+sys.path.insert(0, str(pipeline_root))
+
+import generate_digest
+import query_audit
+from kb_log import QueryLogWriter, get_writer, log_segments, read_log_lines
+from simple_retrieval import SimpleRetrieval, replay_queries
+from test_kb_index import write_corpus
+
+
+def events(n: int, start: int = 0) -> list[dict[str, Any]]:
+    return [{"query": f"q{i}", "timestamp": "2026-10-18T00:00:00+00:00"} for i in range(start, start + n)]
+
+
+class TestBuffering:
+    """Test when buffered events reach the file"""
+
+    def test_flush_on_batch_size(self, tmp_path: Any) -> None:
+        """Test nothing is written until the batch fills"""
+        log = tmp_path / "coordination_queries.jsonl"
+        writer = QueryLogWriter(log, flush_events=3, flush_seconds=0)
+        for event in events(2):
+            writer.write(event)
+        assert not log.exists()
+        writer.write(events(1, 2)[0])
+        assert [json.loads(line)["query"] for line in log.read_text().splitlines()] == ["q0", "q1", "q2"]
+
+    def test_flush_on_age(self, tmp_path: Any) -> None:
+        """Test the background thread appends a batch once it is old enough"""
+        log = tmp_path / "coordination_queries.jsonl"
+        writer = QueryLogWriter(log, flush_events=100, flush_seconds=0.05)
+        writer.write(events(1)[0])
+        for _ in range(100):
+            if log.exists():
+                break
+            time.sleep(0.01)
+        writer.close()
+        assert len(log.read_text().splitlines()) == 1
+
+    def test_retrieval_shares_writer(self, tmp_path: Any) -> None:
+        """Test instances logging to the same file share one buffer"""
+        paths = write_corpus(tmp_path / "docs")
+        first, second = SimpleRetrieval(tmp_path), SimpleRetrieval(tmp_path)
+        assert first.log_writer is second.log_writer is get_writer(tmp_path / "coordination_queries.jsonl")
+        second.load_index(paths)
+        second.log_query("bridge", second.query("bridge"), 1)
+        first.flush_log()
+        assert json.loads(second.log_file.read_text())["query"] == "bridge"
+
+
+class TestRotation:
+    """Test segment rotation and reading"""
+
+    def test_size_rotation(self, tmp_path: Any) -> None:
+        """Test segments stay under the size limit and read back in order"""
+        log = tmp_path / "coordination_queries.jsonl"
+        writer = QueryLogWriter(log, max_bytes=200, flush_events=2, flush_seconds=0)
+        for event in events(10):
+            writer.write(event)
+
+        segments = log_segments(log)
+        assert len(segments) >= 2
+        assert all(p.name.endswith(".jsonl.gz") for p in segments)
+        with gzip.open(segments[0], "rt") as f:
+            assert json.loads(f.readline())["query"] == "q0"
+        assert all(len(gzip.decompress(p.read_bytes())) <= 200 for p in segments)
+        assert [json.loads(line)["query"] for line in read_log_lines(log)] == [f"q{i}" for i in range(10)]
+
+    def test_date_rotation(self, tmp_path: Any) -> None:
+        """Test a log last written on an earlier day is rotated before appending"""
+        log = tmp_path / "coordination_queries.jsonl"
+        log.write_text(json.dumps(events(1)[0]) + "\n")
+        yesterday = time.time() - 86400
+        os.utime(log, (yesterday, yesterday))
+
+        writer = QueryLogWriter(log, flush_events=1, compress=False)
+        writer.write(events(1, 1)[0])
+        segments = log_segments(log)
+        assert len(segments) == 1 and segments[0].suffix == ".jsonl"
+        assert json.loads(log.read_text())["query"] == "q1"
+
+    def test_same_second_rotations(self, tmp_path: Any) -> None:
+        """Test rotations within one second get distinct, ordered names"""
+        log = tmp_path / "coordination_queries.jsonl"
+        writer = QueryLogWriter(log)
+        for i in range(3):
+            log.write_text(f"{i}\n")
+            writer.rotate()
+        assert [line for line in read_log_lines(log)] == ["0\n", "1\n", "2\n"]
+
+    def test_compression_in_progress(self, tmp_path: Any) -> None:
+        """Test a segment being compressed, or compressed but not yet removed, is read once"""
+        log = tmp_path / "coordination_queries.jsonl"
+        log.write_text("active\n")
+        segment = tmp_path / "coordination_queries.20261018-000000.jsonl"
+        segment.write_text("rotated\n")
+        partial = tmp_path / f".{segment.name}.gz.tmp.123"
+        partial.write_bytes(gzip.compress(b"rotated\n")[:10])
+        assert list(read_log_lines(log)) == ["rotated\n", "active\n"]
+
+        partial.rename(segment.with_name(segment.name + ".gz"))
+        segment.with_name(segment.name + ".gz").write_bytes(gzip.compress(b"rotated\n"))
+        assert list(read_log_lines(log)) == ["rotated\n", "active\n"]
+        assert log_segments(log) == [segment.with_name(segment.name + ".gz")]
+
+    def test_truncated_segment_is_skipped(self, tmp_path: Any) -> None:
+        """Test readers survive a gzip segment cut short by a crash"""
+        log = tmp_path / "coordination_queries.jsonl"
+        log.write_text(json.dumps(events(1, 5)[0]) + "\n")
+        data = gzip.compress("".join(json.dumps(e) + "\n" for e in events(50)).encode())
+        (tmp_path / "coordination_queries.20261018-000000.jsonl.gz").write_bytes(data[:len(data) // 2])
+
+        assert list(read_log_lines(log))[-1] == log.read_text()
+        assert query_audit.load_query_log(log)[-1]["query"] == "q5"
+        assert generate_digest.load_query_log(log)[-1]["query"] == "q5"
+
+
+class TestReaders:
+    """Test log consumers see rotated segments"""
+
+    def test_readers_span_segments(self, tmp_path: Any) -> None:
+        """Test the audit, digest and replay loaders read every segment"""
+        log = tmp_path / "coordination_queries.jsonl"
+        writer = QueryLogWriter(log, flush_events=1)
+        for event in events(2):
+            writer.write(event)
+        writer.rotate()
+        writer.write(events(1, 2)[0])
+
+        expected = ["q0", "q1", "q2"]
+        assert [q["query"] for q in query_audit.load_query_log(log)] == expected
+        assert [q["query"] for q in generate_digest.load_query_log(log)] == expected
+        assert replay_queries(log) == expected
+
+        log.unlink()
+        assert [q["query"] for q in query_audit.load_query_log(log)] == expected[:2]
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Test suite for the compact postings
+
+Tests:
+- Term interning and gap/tf encoding round trip
+- Postings files map back to the arrays they were written from
+- Postings stay in document order after incremental updates
+- Loaded indexes map the postings file and thaw on update
+- Removing a document visits only its own terms
+- Compacted indexes are read-only and still rank identically
+- Memory benchmark shows the compact and loaded indexes are smaller
+"""
+
+import json
+import sys
+from array import array
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+# Add paths
+pipeline_root = Path(__file__).parent.parent
+sys.path.insert(0, str(pipeline_root))
+
+from bench_kb_memory import benchmark
+from kb_index import INDEX_FILE, KBIndex, open_index
+from kb_postings import ArrayFile, CompactPostings, FieldPostings, TermDictionary, write_arrays
+from test_kb_index import QUERIES, assert_same_results, baseline, indexed, write_corpus
+
+
+class TestCompactPostings:
+    """Test the array encoding"""
+
+    def test_term_dictionary(self) -> None:
+        """Test terms get dense ids in first-seen order"""
+        terms = TermDictionary(["bridge", "queue", "bridge"])
+        assert terms.add("agents") == 2
+        assert terms.get("queue") == 1 and terms.get("missing") is None
+        assert list(terms) == ["bridge", "queue", "agents"] and len(terms) == 3
+
+    def test_round_trip(self) -> None:
+        """Test decoding returns the original postings, sorted by document"""
+        postings = {"bridge": {"c": 2, "a": 1}, "queue": {"b": 7}, "the": {"a": 3, "b": 1, "c": 70000}}
+        compact = CompactPostings(["a", "b", "c"], postings)
+        assert compact.to_dict() == postings
+        assert list(compact.items("bridge")) == [("a", 1), ("c", 2)]
+        assert list(compact.numbered("the")) == [(0, 3), (1, 1), (2, 70000)]
+        assert list(compact.gaps) == [0, 2, 1, 0, 1, 1]
+        assert compact.doc_frequency("the") == 3 and compact.doc_frequency("missing") == 0
+        assert list(compact.items("missing")) == []
+        assert "queue" in compact and len(compact) == 3
+        assert list(compact.skips) == [0, 1, 0]
+        assert compact.nbytes() == 4 * 8 + 6 * 4 + 6 * 4 + 4 * 8 + 3 * 4
+
+    def test_field_postings(self) -> None:
+        """Test field tfs are stored per term id, sorted by document"""
+        compact = CompactPostings(["a", "b", "c"], {"bridge": {"c": 2, "a": 1}, "queue": {"b": 7}})
+        fields = FieldPostings(compact, {"bridge": {"c": [1, 0], "a": [0, 1]}})
+        assert fields.get("bridge") == {"a": (0, 1), "c": (1, 0)}
+        assert fields.get("queue") == {} and fields.get("missing") is None
+        assert fields.to_dict() == {"bridge": {"a": [0, 1], "c": [1, 0]}}
+
+    def test_array_file_round_trip(self, tmp_path: Any) -> None:
+        """Test mapped sections equal the written arrays and bytes"""
+        sections = {"terms": b"bridge\nqueue", "gaps": array("I", [0, 2, 70000]),
+                    "idf": array("d", [0.5, 1.25]), "empty": array("Q")}
+        write_arrays(tmp_path / "postings.bin", sections, {"docs": 3})
+        mapped = ArrayFile(tmp_path / "postings.bin")
+        assert mapped.meta == {"docs": 3}
+        assert bytes(mapped.sections["terms"]) == b"bridge\nqueue"
+        for name in ("gaps", "idf", "empty"):
+            assert mapped.sections[name].tolist() == sections[name].tolist()
+
+        (tmp_path / "bad.bin").write_bytes(b"not a postings file")
+        with pytest.raises(ValueError):
+            ArrayFile(tmp_path / "bad.bin")
+
+    def test_document_order_after_update(self, tmp_path: Any) -> None:
+        """Test a re-indexed document keeps its place in the postings"""
+        paths = write_corpus(tmp_path / "docs")
+        index = KBIndex(tmp_path / INDEX_FILE)
+        index.update(paths)
+        Path(paths[0]).write_text("# Bridge\n\nAgents use the bridge.\n")
+        index.update(paths)
+        assert list(index.postings["agents"]) == ["patterns", "exploration", "bridge"]
+
+        index.compact()
+        assert [doc for doc, _ in index.postings.items("agents")] == ["bridge", "patterns", "exploration"]
+
+
+class TestMappedIndex:
+    """Test indexes loaded from the postings file"""
+
+    def test_load_maps_postings(self, tmp_path: Any) -> None:
+        """Test kb_index.json holds no tables and loading maps them"""
+        paths = write_corpus(tmp_path / "docs")
+        built, _ = open_index(paths, tmp_path / INDEX_FILE)
+        data = json.loads((tmp_path / INDEX_FILE).read_text())
+        assert set(data) == {"version", "docs", "postings_file", "positions_file", "positions_garbage", "passage_avg"}
+
+        index = KBIndex.load(tmp_path / INDEX_FILE)
+        assert index.compacted and not index.read_only
+        assert isinstance(index.postings.gaps, memoryview) and isinstance(index.idf.values, memoryview)
+        assert index.postings.to_dict() == built.postings.to_dict()
+        assert dict(index.bm25_norms) == dict(built.bm25_norms)
+
+        # An update thaws the tables; the save writes and maps a new postings file
+        Path(paths[0]).write_text("# Bridge\n\nAgents use the bridge.\n")
+        index.update(paths)
+        assert isinstance(index.postings, dict) and isinstance(index.idf, dict)
+        first = index.postings_file
+        index.save()
+        assert index.compacted and index.postings_file != first
+        assert [p.name for p in tmp_path.glob("kb_index.postings.*.bin")] == [index.postings_file]
+        assert [doc for doc, _ in index.postings.items("agents")] == ["bridge", "patterns", "exploration"]
+
+    def test_mismatched_postings_file_rebuilds(self, tmp_path: Any) -> None:
+        """Test a postings file for other documents is not trusted"""
+        paths = write_corpus(tmp_path / "docs")
+        index, _ = open_index(paths, tmp_path / INDEX_FILE)
+        write_arrays(tmp_path / index.postings_file, {}, {"docs": 1})
+        assert KBIndex.load(tmp_path / INDEX_FILE).docs == {}
+
+    def test_removal_visits_only_document_terms(self, tmp_path: Any) -> None:
+        """Test remove_document looks up the document's terms instead of scanning the vocabulary"""
+        class NoScan(dict):
+            def items(self) -> Any:
+                raise AssertionError("scanned the vocabulary")
+            __iter__ = keys = values = items
+
+        index = KBIndex(tmp_path / INDEX_FILE)
+        index.update(write_corpus(tmp_path / "docs"))
+        index.postings, index.fields = NoScan(index.postings), NoScan(index.fields)
+        index.remove_document("bridge")
+        assert "bridge" not in dict.get(index.postings, "agents")
+        assert not dict.__contains__(index.postings, "messages")
+        assert all("bridge" not in plist for plist in dict.values(index.fields))
+
+
+class TestCompactedIndex:
+    """Test SimpleRetrieval on the compact layout"""
+
+    def test_read_only(self, tmp_path: Any) -> None:
+        """Test writes to a compacted index are refused"""
+        retrieval = indexed(tmp_path, write_corpus(tmp_path / "docs"))
+        assert retrieval.index.compacted
+        with pytest.raises(RuntimeError):
+            retrieval.index.remove_document("bridge")
+        with pytest.raises(RuntimeError):
+            retrieval.index.save()
+
+    def test_same_results(self, tmp_path: Any) -> None:
+        """Test the in-memory and persistent paths still agree for both scorers"""
+        paths = write_corpus(tmp_path / "docs")
+        memory, persistent = baseline(tmp_path, paths), indexed(tmp_path, paths)
+        for query in QUERIES:
+            for scorer in ("tfidf", "bm25"):
+                assert_same_results(memory.query(query, scorer=scorer), persistent.query(query, scorer=scorer))
+
+
+class TestMemoryBenchmark:
+    """Test the benchmark report"""
+
+    def test_compact_is_smallest(self) -> None:
+        """Test the compact and loaded indexes beat both dict layouts on a small corpus"""
+        report = benchmark(docs=200, words=100, vocabulary=2000)
+        layouts = report["layouts"]
+        assert layouts["loaded"]["bytes"] < layouts["compact index"]["bytes"] < layouts["dict index"]["bytes"]
+        assert layouts["compact index"]["bytes"] < layouts["tokens+vectors"]["bytes"]
+        assert layouts["tokens+vectors"]["vs_original"] == 1.0
+        assert report["load"]["mapped"]["file_bytes"] < report["load"]["json tables"]["file_bytes"]
+        assert all(stats["peak_rss_bytes"] >= 0 for stats in report["load"].values())
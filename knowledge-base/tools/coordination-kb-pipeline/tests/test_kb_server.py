@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Test suite for the resident KB query server
+
+Tests:
+- Socket queries match in-process results and are logged the same way
+- Background reload after a document edit, with the old index served meanwhile
+- Concurrent reloads run one at a time
+- Protocol errors, status and shutdown
+- CLI client output matches the in-process CLI, with fallback when no server runs
+"""
+
+import json
+import os
+import sys
+import threading
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+# Add paths
+pipeline_root = Path(__file__).parent.parent
+sys.path.insert(0, str(pipeline_root))
+
+import simple_retrieval
+from kb_server import SOCKET_FILE, KBClient, KBServer, ping, serve
+from test_kb_index import QUERIES, assert_same_results, indexed, write_corpus
+
+
+def start_server(tmp_path: Path, **kwargs: Any) -> tuple[KBServer, Path, threading.Thread]:
+    paths = write_corpus(tmp_path / "docs")
+    doc_list = tmp_path / "coordination_docs.txt"
+    doc_list.write_text("\n".join(paths) + "\n")
+    kb = KBServer(tmp_path, doc_list, poll_seconds=kwargs.pop("poll_seconds", 60), **kwargs)
+    socket_path = tmp_path / SOCKET_FILE
+    thread = threading.Thread(target=serve, args=(kb, socket_path), daemon=True)
+    thread.start()
+    for _ in range(200):
+        if ping(socket_path):
+            break
+        threading.Event().wait(0.01)
+    return kb, socket_path, thread
+
+
+def stop_server(socket_path: Path, thread: threading.Thread) -> None:
+    with KBClient(socket_path) as client:
+        assert client.request({"op": "shutdown"})["ok"]
+    thread.join(timeout=5)
+    assert not thread.is_alive()
+
+
+class TestKBServer:
+    """Test the socket protocol"""
+
+    def test_queries_match_in_process(self, tmp_path: Any) -> None:
+        """Test one persistent connection answers many queries like SimpleRetrieval"""
+        kb, socket_path, thread = start_server(tmp_path)
+        try:
+            reference = indexed(tmp_path / "ref", write_corpus(tmp_path / "docs"))
+            with KBClient(socket_path) as client:
+                for query in QUERIES:
+                    response = client.query(query, origin_agent="test")
+                    assert response["ok"]
+                    assert_same_results(reference.query(query), response["results"])
+                    assert response["results"] == reference.query(query)
+                bm25 = client.query("bridge queue", top_k=1, scorer="bm25")
+            assert [r["doc_id"] for r in bm25["results"]] == ["bridge"]
+        finally:
+            stop_server(socket_path, thread)
+
+        events = [json.loads(line) for line in (tmp_path / "coordination_queries.jsonl").read_text().splitlines()]
+        assert [e["query"] for e in events] == QUERIES + ["bridge queue"]
+        assert events[0]["origin_agent"] == "test"
+        assert events[-1]["scorer"] == "bm25"
+        assert not socket_path.exists()
+
+    def test_errors_and_status(self, tmp_path: Any) -> None:
+        """Test bad requests get an error response without closing the connection"""
+        kb, socket_path, thread = start_server(tmp_path, enable_logging=False)
+        try:
+            with KBClient(socket_path) as client:
+                client.sock.sendall(b"not json\n")
+                assert client.reader.readline().startswith(b'{"ok": false, "error": "Bad request')
+                assert client.request({"op": "launch"}) == {"ok": False, "error": "Unknown op: launch"}
+                assert not client.query("bridge", scorer="pagerank")["ok"]
+                assert not client.query("bridge", top_k=0)["ok"]
+                client.query("bridge")
+                status = client.request({"op": "status"})
+            assert status["ok"] and status["documents"] == 4 and status["queries"] == 1
+        finally:
+            stop_server(socket_path, thread)
+
+    def test_refuses_second_server(self, tmp_path: Any) -> None:
+        """Test a live socket is not replaced but a stale one is"""
+        kb, socket_path, thread = start_server(tmp_path, enable_logging=False)
+        try:
+            with pytest.raises(OSError):
+                serve(kb, socket_path)
+        finally:
+            stop_server(socket_path, thread)
+
+        socket_path.write_text("")
+        kb, socket_path, thread = start_server(tmp_path, enable_logging=False)
+        assert ping(socket_path)
+        stop_server(socket_path, thread)
+
+
+class TestReload:
+    """Test corpus change detection"""
+
+    def test_reload_on_edit(self, tmp_path: Any) -> None:
+        """Test an edited document is picked up and the version info recomputed"""
+        kb, socket_path, thread = start_server(tmp_path, enable_logging=False)
+        try:
+            assert not kb.check_reload()
+            doc = tmp_path / "docs" / "exploration.md"
+            doc.write_text("# Autonomous Exploration\n\nAgents explore the bridge telemetry.\n")
+            os.utime(doc, ns=(1, 1))
+            simple_retrieval._VERSION_INFO["sentinel"] = ("v", "c")
+
+            with KBClient(socket_path) as client:
+                assert client.query("telemetry")["results"] == []
+                assert kb.check_reload()
+                results = client.query("telemetry")["results"]
+                status = client.request({"op": "status"})
+            assert [r["doc_id"] for r in results] == ["exploration"]
+            assert status["reloads"] == 1
+            assert "sentinel" not in simple_retrieval._VERSION_INFO
+        finally:
+            stop_server(socket_path, thread)
+
+    def test_poll_thread_reloads(self, tmp_path: Any) -> None:
+        """Test the background thread notices a document added to the list"""
+        kb, socket_path, thread = start_server(tmp_path, enable_logging=False, poll_seconds=0.05)
+        try:
+            extra = tmp_path / "docs" / "telemetry.md"
+            extra.write_text("# Telemetry\n\nHeartbeat telemetry from agents.\n")
+            doc_list = tmp_path / "coordination_docs.txt"
+            doc_list.write_text(doc_list.read_text() + f"{extra}\n")
+            for _ in range(200):
+                if kb.reloads:
+                    break
+                threading.Event().wait(0.01)
+            with KBClient(socket_path) as client:
+                results = client.query("heartbeat")["results"]
+            assert [r["doc_id"] for r in results] == ["telemetry"]
+        finally:
+            stop_server(socket_path, thread)
+
+    def test_concurrent_reloads_are_serialized(self, tmp_path: Any) -> None:
+        """Test a client reload and the poll thread never run load() at once"""
+        kb, socket_path, thread = start_server(tmp_path, enable_logging=False)
+        active, overlaps = [], []
+        real_load = kb.load
+
+        def load() -> Any:
+            active.append(1)
+            overlaps.append(len(active))
+            threading.Event().wait(0.05)
+            try:
+                return real_load()
+            finally:
+                active.pop()
+
+        kb.load = load  # type: ignore[method-assign]
+        try:
+            reloaders = [threading.Thread(target=kb.check_reload, args=(True,)) for _ in range(3)]
+            for reloader in reloaders:
+                reloader.start()
+            for reloader in reloaders:
+                reloader.join(timeout=10)
+            assert overlaps == [1, 1, 1]
+            assert kb.reloads == 3
+            assert not list(tmp_path.glob("*.tmp.*"))
+        finally:
+            stop_server(socket_path, thread)
+
+
+class TestClientCLI:
+    """Test simple_retrieval.py as a thin client"""
+
+    def run_cli(self, monkeypatch: Any, capsys: Any, *argv: str) -> str:
+        monkeypatch.setattr(sys, "argv", ["simple_retrieval.py", *argv])
+        simple_retrieval.main()
+        return capsys.readouterr().out
+
+    def test_same_output_via_server(self, tmp_path: Any, monkeypatch: Any, capsys: Any) -> None:
+        """Test the CLI prints exactly what the in-process path prints for the same results"""
+        kb, socket_path, thread = start_server(tmp_path)
+        capsys.readouterr()  # server startup output
+        try:
+            served = self.run_cli(monkeypatch, capsys, "--socket", str(socket_path), "bridge", "queue")
+            assert kb.queries == 1
+        finally:
+            stop_server(socket_path, thread)
+
+        simple_retrieval.print_results("bridge queue", kb.retrieval.query("bridge queue"),
+                                       kb.retrieval.log_file, None)
+        assert served == capsys.readouterr().out
+        assert "1. bridge" in served
+
+    def test_fallback_without_server(self, tmp_path: Any) -> None:
+        """Test a stale socket file makes the client report no server"""
+        stale = tmp_path / SOCKET_FILE
+        stale.write_text("")
+        assert simple_retrieval.query_server(stale, "bridge", "tfidf") is None
+        assert simple_retrieval.query_server(tmp_path / "missing.sock", "bridge", "tfidf") is None
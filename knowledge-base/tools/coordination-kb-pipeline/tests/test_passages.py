@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Test suite for passage-level excerpts
+
+Tests:
+- Heading-bounded, overlapping passages with exact byte offsets
+- Best-passage selection and matched-term highlights
+- Document text is not kept in memory
+"""
+
+import sys
+from pathlib import Path
+from typing import Any
+
+# Add paths
+pipeline_root = Path(__file__).parent.parent
+sys.path.insert(0, str(pipeline_root))
+
+from kb_index import PASSAGE_CHARS, split_passages
+from simple_retrieval import SimpleRetrieval, highlight, mark_highlights
+from test_kb_index import CORPUS, write_corpus
+
+LONG = (
+    "# Handbook\n\nIntro paragraph about the handbook.\n\n## Setup\n"
+    + "".join(f"Setup step {i} installs a package.\n" for i in range(40))
+    + "## Recovery\nWhen the bridge queue stalls, restart the queue processor.\n"
+    + "```sh\n# restart queue\n```\n"
+    + "## Naïve Notes\nUnicode café text.\n"
+)
+
+
+class TestSplitPassages:
+    """Test passage boundaries"""
+
+    def test_offsets_slice_the_file(self) -> None:
+        """Test every byte range decodes to the passage text"""
+        raw = LONG.encode("utf-8")
+        for start, end, text in split_passages(LONG):
+            assert raw[start:end].decode("utf-8") == text
+
+    def test_heading_bounded_and_overlapping(self) -> None:
+        """Test sections start at headings and long ones overlap"""
+        passages = split_passages(LONG)
+        texts = [text for _, _, text in passages]
+        assert texts[0].startswith("# Handbook")
+        assert any(t.startswith("## Recovery") for t in texts)
+        assert not any(t.startswith("# restart") for t in texts)
+
+        setup = [p for p in passages if "Setup step" in p[2]]
+        assert len(setup) > 1
+        for (_, prev_end, prev_text), (start, _, text) in zip(setup, setup[1:]):
+            assert start < prev_end
+            assert len(prev_text) <= PASSAGE_CHARS
+
+    def test_covers_whole_document(self) -> None:
+        """Test passages leave no gaps"""
+        passages = split_passages(LONG)
+        assert passages[0][0] == 0
+        assert passages[-1][1] == len(LONG.encode("utf-8"))
+        for (_, prev_end, _), (start, _, _) in zip(passages, passages[1:]):
+            assert start <= prev_end
+
+
+class TestBestPassage:
+    """Test excerpts from the best passage"""
+
+    def test_returns_matching_section(self, tmp_path: Any) -> None:
+        """Test the excerpt comes from the section about the query"""
+        paths = write_corpus(tmp_path / "docs", CORPUS | {"handbook": LONG})
+        retrieval = SimpleRetrieval(tmp_path, enable_logging=False)
+        retrieval.load_index(paths)
+
+        result = next(r for r in retrieval.query("queue stalls restart") if r["doc_id"] == "handbook")
+        raw = Path(result["path"]).read_bytes()
+        passage = raw[result["passage"]["start"]:result["passage"]["end"]].decode("utf-8")
+        assert passage.startswith("## Recovery")
+
+        words = {result["excerpt"][s:e].lower() for s, e in result["highlights"]}
+        assert words == {"queue", "stalls", "restart"}
+        assert "**stalls**" in mark_highlights(result["excerpt"], result["highlights"])
+
+    def test_unicode_and_crlf_offsets(self, tmp_path: Any) -> None:
+        """Test byte ranges stay exact for non-ASCII text and CRLF files"""
+        text = LONG.replace("\n", "\r\n")
+        paths = write_corpus(tmp_path / "docs", {"handbook": text, "other": "unrelated"})
+        Path(paths[0]).write_bytes(text.encode("utf-8"))
+        for use_index in (True, False):
+            retrieval = SimpleRetrieval(tmp_path, enable_logging=False)
+            if use_index:
+                retrieval.load_index(paths)
+            else:
+                retrieval.load_documents(paths)
+                retrieval.build_index()
+            result = retrieval.query("café")[0]
+            assert result["excerpt"] == "## Naïve Notes Unicode café text."
+            assert [result["excerpt"][s:e] for s, e in result["highlights"]] == ["café"]
+
+    def test_no_text_in_memory(self, tmp_path: Any) -> None:
+        """Test neither load path keeps document content or tokens"""
+        paths = write_corpus(tmp_path / "docs")
+        retrieval = SimpleRetrieval(tmp_path, enable_logging=False)
+        retrieval.load_documents(paths)
+        retrieval.build_index()
+        assert all(set(doc) == {"path"} for doc in retrieval.documents.values())
+
+    def test_long_line_excerpt_window(self) -> None:
+        """Test a single huge line is cut to a window around the first match"""
+        text = "filler " * 500 + "needle " + "filler " * 500
+        excerpt, spans = highlight(text, {"needle"})
+        assert len(excerpt) == PASSAGE_CHARS
+        assert [excerpt[s:e] for s, e in spans] == ["needle"]
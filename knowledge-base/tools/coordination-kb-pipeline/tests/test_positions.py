@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Test suite for the positional index
+
+Tests:
+- Varint and delta position encoding round trip
+- Quoted phrases require adjacent words, in order
+- Proximity boosts documents whose terms are close together
+- Passage tf blocks round trip and block terms skip payloads
+- Term queries read only returned documents' passage blocks, never positions
+- Updated documents leave garbage that a save rewrites away
+- The parallel builder writes the same positions
+"""
+
+import sys
+from pathlib import Path
+from typing import Any
+
+# Add paths
+pipeline_root = Path(__file__).parent.parent
+sys.path.insert(0, str(pipeline_root))
+
+from kb_build import build_parallel
+from kb_index import INDEX_FILE, KBIndex, open_index
+from kb_positions import (block_terms, decode_passage_tfs, decode_positions, decode_varint, encode_passage_tfs,
+                          encode_positions, encode_varint, min_span)
+from query_cache import QueryCache
+from test_kb_index import baseline, indexed, write_corpus
+
+CORPUS = {
+    "adjacent": "# Defer Queue\n\nWork goes on the defer queue until agents are free.\n",
+    "apart": "# Queue Notes\n\nA queue of tasks that agents may defer when busy.\n",
+    "reversed": "# Ordering\n\nItems in the queue defer delivery of low priority work.\n",
+    "hyphen": "# Messaging\n\nCollision-free messaging keeps agents apart.\n",
+}
+
+
+def doc_ids(results: list) -> list:
+    return [r["doc_id"] for r in results]
+
+
+class TestEncoding:
+    """Test the sidecar block format"""
+
+    def test_varint_round_trip(self) -> None:
+        """Test varints of every width decode to the original values"""
+        values = [0, 1, 127, 128, 300, 16383, 16384, 2 ** 32 + 5]
+        data = bytearray()
+        for value in values:
+            encode_varint(value, data)
+        assert len(data) == 1 + 1 + 1 + 2 + 2 + 2 + 3 + 5
+
+        pos, decoded = 0, []
+        while pos < len(data):
+            value, pos = decode_varint(data, pos)
+            decoded.append(value)
+        assert decoded == values
+
+    def test_positions_round_trip(self) -> None:
+        """Test blocks decode to every term's positions, optionally filtered"""
+        tokens = ["the", "queue", "the", "défer"] + ["x"] * 200 + ["queue"]
+        block = encode_positions(tokens)
+        assert decode_positions(block) == {"the": [0, 2], "queue": [1, 204], "défer": [3], "x": list(range(4, 204))}
+        assert decode_positions(block, ["queue", "missing"]) == {"queue": [1, 204]}
+
+    def test_passage_tfs_round_trip(self) -> None:
+        """Test passage blocks decode to every term's [passage, tf] pairs, optionally filtered"""
+        passage_tf = {"queue": [[0, 2], [3, 1], [200, 7]], "défer": [[1, 300]]}
+        block = encode_passage_tfs(passage_tf)
+        assert decode_passage_tfs(block) == passage_tf
+        assert decode_passage_tfs(block, ["défer", "missing"]) == {"défer": [[1, 300]]}
+
+    def test_block_terms(self) -> None:
+        """Test a block's terms are listed in first-seen order"""
+        assert block_terms(encode_positions(["the", "queue", "the", "défer"])) == ["the", "queue", "défer"]
+        assert block_terms(b"") == []
+
+    def test_min_span(self) -> None:
+        """Test the smallest window covering one position of each term"""
+        assert min_span([[3], [4]]) == 2
+        assert min_span([[0, 10], [5, 11], [20]]) == 11
+        assert min_span([[1, 9], [8, 30]]) == 2
+
+
+class TestPhraseQueries:
+    """Test quoted phrases in SimpleRetrieval.query"""
+
+    def test_phrase_requires_adjacency(self, tmp_path: Any) -> None:
+        """Test only documents with the words adjacent and in order match"""
+        retrieval = indexed(tmp_path, write_corpus(tmp_path / "docs", CORPUS))
+        assert set(doc_ids(retrieval.query("defer queue"))) == {"adjacent", "apart", "reversed"}
+        for scorer in ("tfidf", "bm25"):
+            assert doc_ids(retrieval.query('"defer queue"', scorer=scorer)) == ["adjacent"]
+            assert doc_ids(retrieval.query('"queue defer"', scorer=scorer)) == ["reversed"]
+        assert doc_ids(retrieval.query('"collision-free messaging"')) == ["hyphen"]
+        assert retrieval.query('"defer bridge"') == []
+
+    def test_phrase_with_other_terms(self, tmp_path: Any) -> None:
+        """Test unquoted words still score but are not required"""
+        retrieval = indexed(tmp_path, write_corpus(tmp_path / "docs", CORPUS))
+        assert doc_ids(retrieval.query('"defer queue" agents')) == ["adjacent"]
+        assert retrieval.parse_phrases('"defer queue" "agents" x') == [["defer", "queue"]]
+
+    def test_in_memory_build_matches(self, tmp_path: Any) -> None:
+        """Test the in-memory index answers phrases like the persistent one"""
+        paths = write_corpus(tmp_path / "docs", CORPUS)
+        memory, persistent = baseline(tmp_path, paths), indexed(tmp_path, paths)
+        for query in ('"defer queue"', '"queue defer" work', '"agents are free"'):
+            assert memory.query(query) == persistent.query(query)
+
+    def test_cache_keys_phrases(self, tmp_path: Any) -> None:
+        """Test a phrase query is not answered from the plain query's cache entry"""
+        paths = write_corpus(tmp_path / "docs", CORPUS)
+        retrieval = indexed(tmp_path, paths)
+        retrieval.cache = QueryCache(None)
+        plain = retrieval.query("defer queue")
+        assert retrieval.query('"defer queue"') != plain
+        assert retrieval.last_cache_status == "miss"
+        assert retrieval.query("defer queue", proximity=True) != plain
+        assert retrieval.last_cache_status == "miss"
+
+
+class TestProximity:
+    """Test the proximity boost"""
+
+    def test_closer_terms_rank_higher(self, tmp_path: Any) -> None:
+        """Test the boost is largest for adjacent terms and absent for one term"""
+        retrieval = indexed(tmp_path, write_corpus(tmp_path / "docs", CORPUS))
+        plain = dict((r["doc_id"], r["score"]) for r in retrieval.query("defer queue"))
+        boosted = dict((r["doc_id"], r["score"]) for r in retrieval.query("defer queue", proximity=True))
+        assert abs(boosted["adjacent"] - plain["adjacent"] * 1.5) < 1e-12
+        assert abs(boosted["reversed"] - plain["reversed"] * 1.5) < 1e-12
+        assert plain["apart"] < boosted["apart"] < plain["apart"] * 1.5
+
+        single = retrieval.query("agents", proximity=True)
+        assert single == retrieval.query("agents")
+
+    def test_top_k_matches_full_ranking(self, tmp_path: Any) -> None:
+        """Test early termination returns the head of the full boosted ranking"""
+        retrieval = indexed(tmp_path, write_corpus(tmp_path / "docs", CORPUS))
+        full = retrieval.query("agents queue defer work", top_k=10, proximity=True)
+        for top_k in (1, 2, 3):
+            assert retrieval.query("agents queue defer work", top_k=top_k, proximity=True) == full[:top_k]
+
+
+class TestLazyLoading:
+    """Test positions are read only when a query needs them"""
+
+    def test_term_queries_skip_positions(self, tmp_path: Any) -> None:
+        """Test term queries read only the returned documents' passage blocks"""
+        paths = write_corpus(tmp_path / "docs", CORPUS)
+        indexed(tmp_path, paths)
+        retrieval = indexed(tmp_path, paths)
+        index = retrieval.index
+        assert index._positions is None
+        read = index.positions.read
+        spans = []
+        index.positions.read = lambda offset, length: spans.append([offset, length]) or read(offset, length)
+
+        returned = [index.docs[result["doc_id"]]["passage_tf"]
+                    for scorer in ("tfidf", "bm25")
+                    for result in retrieval.query("defer queue agents", scorer=scorer, top_k=1)]
+        assert spans and all(span in returned for span in spans)
+
+        retrieval.query('"defer queue"')
+        assert any(span == meta["positions"] for meta in index.docs.values() for span in spans)
+
+
+class TestUpdates:
+    """Test the sidecar across incremental updates"""
+
+    def test_garbage_is_rewritten(self, tmp_path: Any) -> None:
+        """Test replaced blocks are counted and compacted into a fresh sidecar"""
+        paths = write_corpus(tmp_path / "docs", CORPUS)
+        index, _ = open_index(paths, tmp_path / INDEX_FILE)
+        first = index.positions_file
+        for n in range(8):
+            Path(paths[0]).write_text(f"# Defer Queue\n\nEdit {n} puts the defer queue first.\n")
+            index, changes = open_index(paths, tmp_path / INDEX_FILE)
+            assert changes["updated"] == 1
+
+        # Once replaced blocks outweigh live ones the save moved to a new file
+        assert index.positions_file != first
+        sidecars = list(tmp_path.glob("kb_index.positions.*.bin"))
+        assert [p.name for p in sidecars] == [index.positions_file]
+        live = sum(meta[name][1] for meta in index.docs.values() for name in ("positions", "passage_tf"))
+        assert sidecars[0].stat().st_size == live + index.positions_garbage
+        assert index.positions_garbage <= live
+        assert index.doc_positions("adjacent", ["defer", "queue"]) == {"defer": [0, 6], "queue": [1, 7]}
+
+        retrieval = indexed(tmp_path, paths)
+        assert doc_ids(retrieval.query('"edit 7 puts"')) == ["adjacent"]
+
+    def test_unsaved_index_keeps_positions(self, tmp_path: Any) -> None:
+        """Test blocks added to an index that cannot be saved are still readable"""
+        paths = write_corpus(tmp_path / "docs", CORPUS)
+        retrieval = indexed(tmp_path / "missing", paths)
+        assert doc_ids(retrieval.query('"defer queue"')) == ["adjacent"]
+
+    def test_missing_sidecar_rebuilds(self, tmp_path: Any) -> None:
+        """Test an index whose sidecar was deleted is rebuilt rather than trusted"""
+        paths = write_corpus(tmp_path / "docs", CORPUS)
+        index, _ = open_index(paths, tmp_path / INDEX_FILE)
+        (tmp_path / index.positions_file).unlink()
+        _, changes = open_index(paths, tmp_path / INDEX_FILE)
+        assert changes["added"] == len(paths)
+
+
+class TestParallelBuild:
+    """Test the builder's concatenated sidecar"""
+
+    def test_same_positions_as_serial(self, tmp_path: Any) -> None:
+        """Test every document decodes to the serial index's positions"""
+        corpus = {f"{name}{n}": text for n in range(5) for name, text in CORPUS.items()}
+        paths = write_corpus(tmp_path / "docs", corpus)
+        serial, _ = open_index(paths, tmp_path / "serial.json", workers=1)
+        build_parallel(paths, tmp_path / INDEX_FILE, workers=3)
+        parallel = KBIndex.load(tmp_path / INDEX_FILE)
+        assert parallel.docs.keys() == serial.docs.keys()
+        for doc_id in serial.docs:
+            assert parallel.doc_positions(doc_id) == serial.doc_positions(doc_id)
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Test suite for the manifest-based corpus checksum
+
+Tests:
+- Manifest checksum equals the original full-corpus SHA256
+- Only changed files are read; unchanged corpora read nothing
+- Merkle root construction
+- Per-process memoization of version info
+"""
+
+import builtins
+import hashlib
+import os
+import sys
+from pathlib import Path
+from typing import Any
+
+# Add paths
+pipeline_root = Path(__file__).parent.parent
+sys.path.insert(0, str(pipeline_root))
+
+import protocol_checksum
+import simple_retrieval
+from protocol_checksum import MANIFEST_FILE, calculate_corpus_checksum, load_manifest, merkle_root
+from test_kb_index import CORPUS, write_corpus
+
+
+def write_doc_list(tmp_path: Path, paths: list) -> Path:
+    doc_list = tmp_path / "coordination_docs.txt"
+    doc_list.write_text("# Test corpus\n" + "\n".join(paths + [str(tmp_path / "missing.md"), paths[0]]) + "\n")
+    return doc_list
+
+
+def count_reads(monkeypatch: Any) -> list:
+    """Record document paths opened by protocol_checksum"""
+    opened = []
+
+    def counting_open(path: Any, *args: Any, **kwargs: Any) -> Any:
+        if str(path).endswith(".md"):
+            opened.append(Path(path).name)
+        return builtins.open(path, *args, **kwargs)
+
+    monkeypatch.setattr(protocol_checksum, "open", counting_open, raising=False)
+    return opened
+
+
+class TestManifestChecksum:
+    """Test the incremental checksum"""
+
+    def test_identical_to_full_hash(self, tmp_path: Any) -> None:
+        """Test the manifest path returns the original value, count and bytes"""
+        doc_list = write_doc_list(tmp_path, write_corpus(tmp_path / "docs"))
+        expected = calculate_corpus_checksum(doc_list, use_manifest=False)
+
+        assert calculate_corpus_checksum(doc_list) == expected
+        assert calculate_corpus_checksum(doc_list) == expected
+        assert expected[1] == len(CORPUS) + 1
+
+    def test_only_changed_files_rehashed(self, tmp_path: Any, monkeypatch: Any) -> None:
+        """Test unchanged files are never opened and touched files keep the checksum"""
+        paths = write_corpus(tmp_path / "docs")
+        doc_list = write_doc_list(tmp_path, paths)
+        calculate_corpus_checksum(doc_list)
+
+        opened = count_reads(monkeypatch)
+        first = calculate_corpus_checksum(doc_list)
+        assert opened == []
+
+        os.utime(paths[1], ns=(1, 1))
+        assert calculate_corpus_checksum(doc_list) == first
+        assert opened == ["provenance.md"]
+
+        opened.clear()
+        Path(paths[2]).write_text("# Changed\n")
+        changed = calculate_corpus_checksum(doc_list)
+        assert changed[0] != first[0]
+        assert opened.count("patterns.md") == 2  # manifest rehash + concatenated pass
+        assert opened.count("bridge.md") == 2  # concatenated pass only (listed twice)
+        assert changed == calculate_corpus_checksum(doc_list, use_manifest=False)
+
+    def test_merkle_root(self) -> None:
+        """Test pairing, odd-node duplication and the empty root"""
+        a, b, c = (hashlib.sha256(x).hexdigest() for x in (b"a", b"b", b"c"))
+
+        def node(x: str, y: str) -> str:
+            return hashlib.sha256(bytes.fromhex(x) + bytes.fromhex(y)).hexdigest()
+
+        assert merkle_root([]) == hashlib.sha256().hexdigest()
+        assert merkle_root([a]) == a
+        assert merkle_root([a, b]) == node(a, b)
+        assert merkle_root([a, b, c]) == node(node(a, b), node(c, c))
+
+    def test_manifest_records_root(self, tmp_path: Any) -> None:
+        """Test the saved manifest holds per-file entries and the Merkle root"""
+        paths = write_corpus(tmp_path / "docs")
+        calculate_corpus_checksum(write_doc_list(tmp_path, paths))
+
+        manifest = load_manifest(tmp_path / MANIFEST_FILE)
+        assert sorted(manifest["files"]) == sorted(paths)
+        leaves = [manifest["files"][p]["sha256"] for p in sorted(paths + [paths[0]])]
+        assert manifest["merkle_root"] == merkle_root(leaves)
+
+
+class TestVersionInfo:
+    """Test memoization in SimpleRetrieval"""
+
+    def test_memoized_per_process(self, tmp_path: Any, monkeypatch: Any) -> None:
+        """Test the checksum is computed once until cleared"""
+        write_doc_list(tmp_path, write_corpus(tmp_path / "docs"))
+        (tmp_path / "VERSION").write_text("9.9.9\n")
+        calls = []
+        real = protocol_checksum.calculate_corpus_checksum
+        monkeypatch.setattr(protocol_checksum, "calculate_corpus_checksum",
+                            lambda *a, **k: calls.append(1) or real(*a, **k))
+
+        simple_retrieval.clear_version_info()
+        retrieval = simple_retrieval.SimpleRetrieval(tmp_path)
+        version, checksum = retrieval.get_version_info()
+        assert version == "9.9.9"
+        assert checksum == f"sha256:{real(tmp_path / 'coordination_docs.txt')[0][:16]}..."
+        simple_retrieval.SimpleRetrieval(tmp_path).get_version_info()
+        assert len(calls) == 1
+
+        simple_retrieval.clear_version_info()
+        retrieval.get_version_info()
+        assert len(calls) == 2
+        simple_retrieval.clear_version_info()
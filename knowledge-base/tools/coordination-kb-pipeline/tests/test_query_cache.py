@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Test suite for the KB query result cache
+
+Tests:
+- LRU eviction, TTL expiry and persistence
+- Key normalization (token order) and checksum invalidation
+- Cache status in the query log and query_audit summary
+"""
+
+import json
+import sys
+from pathlib import Path
+from typing import Any
+
+# Add paths
+pipeline_root = Path(__file__).parent.parent
+sys.path.insert(0, str(pipeline_root))
+
+from query_audit import analyze_queries, load_query_log
+from query_cache import CACHE_FILE, QueryCache, cache_key
+from simple_retrieval import SimpleRetrieval
+from test_kb_index import write_corpus
+
+
+def cached_retrieval(tmp_path: Path, paths: list, **kwargs: Any) -> SimpleRetrieval:
+    cache = QueryCache.load(tmp_path / CACHE_FILE, **kwargs)
+    retrieval = SimpleRetrieval(tmp_path, cache=cache)
+    retrieval.load_index(paths)
+    return retrieval
+
+
+class TestQueryCache:
+    """Test cache mechanics"""
+
+    def test_lru_eviction(self) -> None:
+        """Test the least recently used entry goes first"""
+        cache = QueryCache(None, max_entries=2)
+        for name in ("a", "b"):
+            cache.put(name, "c1", [name])
+        assert cache.get("a") == ["a"]
+        cache.put("c", "c1", ["c"])
+        assert cache.get("b") is None
+        assert list(cache.entries) == ["a", "c"]
+
+    def test_ttl_expiry(self) -> None:
+        """Test entries older than the TTL are misses"""
+        cache = QueryCache(None, ttl_seconds=10)
+        cache.put("k", "c1", [1], now=100)
+        assert cache.get("k", now=105) == [1]
+        assert cache.get("k", now=111) is None
+        assert cache.stats() == {"hits": 1, "misses": 1, "hit_rate": 0.5, "entries": 0}
+
+    def test_key_normalization(self) -> None:
+        """Test token order is ignored but top_k, scorer and checksum are not"""
+        base = cache_key(["bridge", "queue"], 5, "tfidf", "c1")
+        assert cache_key(["queue", "bridge"], 5, "tfidf", "c1") == base
+        assert cache_key(["bridge", "queue"], 3, "tfidf", "c1") != base
+        assert cache_key(["bridge", "queue"], 5, "bm25", "c1") != base
+        assert cache_key(["bridge", "queue"], 5, "tfidf", "c2") != base
+
+
+class TestRetrievalCache:
+    """Test the cache inside SimpleRetrieval"""
+
+    def test_hit_across_runs(self, tmp_path: Any) -> None:
+        """Test a saved cache answers the same query in a new process"""
+        paths = write_corpus(tmp_path / "docs")
+        first = cached_retrieval(tmp_path, paths)
+        expected = first.query("bridge messages")
+        assert first.last_cache_status == "miss"
+        first.cache.save()
+
+        second = cached_retrieval(tmp_path, paths)
+        assert second.query("Messages bridge") == expected
+        assert second.last_cache_status == "hit"
+
+    def test_document_change_invalidates(self, tmp_path: Any) -> None:
+        """Test editing an indexed document turns hits into misses"""
+        paths = write_corpus(tmp_path / "docs")
+        first = cached_retrieval(tmp_path, paths)
+        first.query("provenance")
+        first.cache.save()
+
+        Path(paths[1]).write_text("# Provenance\n\nRewritten provenance notes.\n")
+        second = cached_retrieval(tmp_path, paths)
+        results = second.query("provenance")
+        assert second.last_cache_status == "miss"
+        assert "Rewritten" in results[0]["excerpt"]
+
+        second.cache.save()
+        assert len(QueryCache.load(tmp_path / CACHE_FILE).entries) == 1
+
+    def test_logged_and_audited(self, tmp_path: Any) -> None:
+        """Test cache status reaches the log and the audit summary"""
+        paths = write_corpus(tmp_path / "docs")
+        retrieval = cached_retrieval(tmp_path, paths)
+        for text in ("bridge", "bridge", "agents", "bridge"):
+            retrieval.log_query(text, retrieval.query(text), 1)
+        retrieval.flush_log()
+
+        events = load_query_log(retrieval.log_file)
+        assert [e["cache"] for e in events] == ["miss", "hit", "miss", "hit"]
+        assert events[-1]["cache_hit_rate"] == 0.5
+
+        summary = analyze_queries(events)["summary"]
+        assert summary["cache_lookups"] == 4
+        assert summary["cache_hit_rate"] == 0.5
+
+    def test_disabled_cache_not_logged(self, tmp_path: Any) -> None:
+        """Test queries without a cache log no cache fields"""
+        paths = write_corpus(tmp_path / "docs")
+        retrieval = SimpleRetrieval(tmp_path)
+        retrieval.load_index(paths)
+        retrieval.log_query("bridge", retrieval.query("bridge"), 1)
+        retrieval.flush_log()
+        assert "cache" not in json.loads(retrieval.log_file.read_text())
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Test suite for the sparse TF-IDF engine
+
+Tests:
+- Single and batch queries match the postings scorer
+- Row normalization of the CSR matrix
+- Engine selection and batch replay
+"""
+
+import json
+import sys
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+pytest.importorskip("scipy")
+
+# Add paths
+pipeline_root = Path(__file__).parent.parent
+sys.path.insert(0, str(pipeline_root))
+
+from simple_retrieval import SimpleRetrieval, replay_queries
+from sparse_engine import SparseEngine
+from test_kb_index import CORPUS, QUERIES, assert_same_results, write_corpus
+
+
+def engines(tmp_path: Path, corpus: dict = CORPUS) -> tuple:
+    paths = write_corpus(tmp_path / "docs", corpus)
+    python = SimpleRetrieval(tmp_path, enable_logging=False)
+    python.load_index(paths)
+    sparse = SimpleRetrieval(tmp_path, enable_logging=False, engine="sparse")
+    sparse.load_index(paths)
+    return python, sparse
+
+
+class TestSparseEngine:
+    """Test the CSR engine against the postings scorer"""
+
+    def test_single_queries_match(self, tmp_path: Any) -> None:
+        """Test each query ranks and scores like the python engine"""
+        python, sparse = engines(tmp_path)
+        for query in QUERIES + ["agents agents bridge", "the", ""]:
+            for top_k in (1, 3, 5):
+                assert_same_results(python.query(query, top_k), sparse.query(query, top_k))
+
+    def test_batch_matches(self, tmp_path: Any) -> None:
+        """Test one matrix product gives the per-query results"""
+        python, sparse = engines(tmp_path)
+        expected = [python.query(q) for q in QUERIES]
+        for want, got in zip(expected, sparse.query_batch(QUERIES)):
+            assert_same_results(want, got)
+
+    def test_rows_are_normalized(self, tmp_path: Any) -> None:
+        """Test every document row has unit length"""
+        python, _ = engines(tmp_path)
+        matrix = SparseEngine(python.index).matrix
+        norms = matrix.multiply(matrix).sum(axis=1)
+        assert all(abs(n - 1.0) < 1e-12 for n in norms.A1)
+
+    def test_ties_keep_document_order(self, tmp_path: Any) -> None:
+        """Test equal scores rank in document-list order"""
+        corpus = {f"twin{i}": "alpha beta" for i in range(6)} | {"other": "gamma"}
+        python, sparse = engines(tmp_path, corpus)
+        assert_same_results(python.query("alpha", 3), sparse.query("alpha", 3))
+
+
+class TestSelection:
+    """Test engine selection"""
+
+    def test_unknown_engine(self, tmp_path: Any) -> None:
+        """Test an unknown engine name is rejected"""
+        with pytest.raises(ValueError):
+            SimpleRetrieval(tmp_path, engine="gpu")
+
+    def test_replay_queries(self, tmp_path: Any) -> None:
+        """Test batch mode reads query texts from the log"""
+        log = tmp_path / "coordination_queries.jsonl"
+        log.write_text(json.dumps({"query": "bridge"}) + "\nnot json\n" + json.dumps({"query": "agents"}) + "\n")
+        assert replay_queries(log) == ["bridge", "agents"]
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Test suite for WAND top-k retrieval
+
+Tests:
+- Posting cursors seek across skip blocks
+- WAND returns exactly the exhaustive top-k (oracle) for both scorers
+- Ties keep document order
+- Common-term queries score only a fraction of the matching documents
+"""
+
+import random
+import sys
+from pathlib import Path
+from typing import Any
+
+# Add paths
+pipeline_root = Path(__file__).parent.parent
+sys.path.insert(0, str(pipeline_root))
+
+from kb_postings import BLOCK_SIZE, NO_MORE_DOCS, CompactPostings
+from simple_retrieval import SimpleRetrieval
+from test_kb_index import write_corpus
+
+
+def random_corpus(docs: int, seed: int) -> dict[str, str]:
+    """Markdown documents with Zipf-distributed words, headings and summaries"""
+    rng = random.Random(seed)
+    words = [f"w{i}" for i in range(300)]
+    weights = [1 / (rank + 1) for rank in range(len(words))]
+    corpus = {}
+    for n in range(docs):
+        heading = " ".join(rng.choices(words, weights, k=3))
+        summary = " ".join(rng.choices(words, weights, k=8))
+        body = " ".join(rng.choices(words, weights, k=rng.randint(20, 120)))
+        corpus[f"doc{n:03d}"] = f"# {heading}\n\n{summary}\n\n## Details\n{body}\n"
+    return corpus
+
+
+def retrievals(tmp_path: Path, corpus: dict[str, str]) -> tuple[SimpleRetrieval, SimpleRetrieval]:
+    paths = write_corpus(tmp_path / "docs", corpus)
+    wand = SimpleRetrieval(tmp_path, enable_logging=False)
+    wand.load_index(paths)
+    exhaustive = SimpleRetrieval(tmp_path, enable_logging=False, pruning=False)
+    exhaustive.load_index(paths)
+    return wand, exhaustive
+
+
+class TestPostingCursor:
+    """Test document-at-a-time cursors"""
+
+    def test_seek_across_blocks(self) -> None:
+        """Test seek lands on the first posting at or after the target"""
+        numbers = list(range(0, 3 * BLOCK_SIZE * 2, 2))
+        postings = CompactPostings(range(max(numbers) + 1), {"t": {n: n + 1 for n in numbers}})
+        for target in (0, 1, 2, 127, 128, 129, 250, max(numbers)):
+            cursor = postings.cursor("t")
+            cursor.seek(target)
+            assert cursor.doc == min(n for n in numbers if n >= target)
+            assert cursor.tf == cursor.doc + 1
+
+        cursor = postings.cursor("t")
+        cursor.seek(max(numbers) + 1)
+        assert cursor.doc == NO_MORE_DOCS
+        assert postings.cursor("missing") is None
+
+
+class TestWandOracle:
+    """Test WAND against exhaustive scoring"""
+
+    def test_matches_exhaustive(self, tmp_path: Any) -> None:
+        """Test random queries return identical doc ids and scores"""
+        wand, exhaustive = retrievals(tmp_path, random_corpus(150, seed=7))
+        rng = random.Random(3)
+        vocabulary = list(wand.idf)
+        queries = [rng.sample(vocabulary[:40], rng.randint(1, 4)) + rng.sample(vocabulary, rng.randint(0, 3))
+                   for _ in range(60)]
+        queries += [["w0"], ["w0", "w0", "w1"], ["unknown"], []]
+        for tokens in queries:
+            for scorer in ("tfidf", "bm25"):
+                for top_k in (1, 5, 20):
+                    expected = exhaustive.rank(tokens, top_k, scorer)
+                    assert wand.rank(tokens, top_k, scorer) == expected
+                    assert wand.wand_rank(tokens, top_k, scorer) == expected
+
+    def test_ties_keep_document_order(self, tmp_path: Any) -> None:
+        """Test identical documents rank in document-list order"""
+        corpus = {f"copy{n}": "# Bridge\n\nQueue the bridge messages.\n" for n in range(12)}
+        corpus["other"] = "# Other\n\nUnrelated text about agents.\n"
+        wand, exhaustive = retrievals(tmp_path, corpus)
+        for scorer in ("tfidf", "bm25"):
+            ranked = wand.rank(["bridge", "queue"], 5, scorer)
+            assert ranked == exhaustive.rank(["bridge", "queue"], 5, scorer)
+            assert [doc for doc, _ in ranked] == [f"copy{n}" for n in range(5)]
+
+
+class TestPruning:
+    """Test documents are skipped"""
+
+    def test_common_terms_skip_documents(self, tmp_path: Any) -> None:
+        """Test a query mixing common and rare terms scores few documents"""
+        wand, _ = retrievals(tmp_path, random_corpus(400, seed=11))
+        tokens = ["w0", "w1", "w2", "w150"]
+        matching = len({doc for term in tokens for doc, _ in wand.index.postings.items(term)})
+        for scorer in ("tfidf", "bm25"):
+            stats: dict[str, int] = {}
+            wand.wand_rank(tokens, 5, scorer, stats)
+            assert stats["scored"] < matching / 2
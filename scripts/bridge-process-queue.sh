@@ -8,10 +8,12 @@
 
 set -euo pipefail
 
-BRIDGE_ROOT="$HOME/infrastructure/agent-bridge/bridge"
+BRIDGE_ROOT="${BRIDGE_ROOT:-$HOME/infrastructure/agent-bridge/bridge}"
 QUEUE_DIR="$BRIDGE_ROOT/queue/pending"
 PROCESSING_DIR="$BRIDGE_ROOT/queue/processing"
 
+source "$(dirname "$0")/bridge-trace.sh"
+
 log() {
     echo "[BRIDGE-QUEUE $(date +%H:%M:%S)] $1"
 }
@@ -52,6 +54,7 @@ for message in "$QUEUE_DIR"/*.md; do
 
     INBOX_FILE="$INBOX_DIR/$filename"
     mv "$PROCESSING_FILE" "$INBOX_FILE"
+    bridge_trace_file "$INBOX_FILE" dispatched "$RECIPIENT"
 
     log "✅ Delivered to $RECIPIENT: $filename"
     PROCESSED=$((PROCESSED + 1))
@@ -4,11 +4,16 @@
 
 set -euo pipefail
 
-BRIDGE_ROOT="/Users/devvynmurphy/infrastructure/agent-bridge/bridge"
+BRIDGE_ROOT="${BRIDGE_ROOT:-/Users/devvynmurphy/infrastructure/agent-bridge/bridge}"
 LOCK_TIMEOUT=30
+SCRIPT_DIR="$(cd "$(dirname "$0")" && pwd)"
+INBOX_INDEX="$SCRIPT_DIR/../bridge/registry/inbox_index.py"
+
+source "$SCRIPT_DIR/bridge-trace.sh"
 
 usage() {
     echo "Usage: $0 <agent> [message_id]"
+    echo "       $0 --list <agent> [--limit N] [--after CURSOR]"
     echo ""
     echo "Arguments:"
     echo "  agent:      Agent namespace (chat, code, gpt, codex, human)"
@@ -17,10 +22,13 @@ usage() {
     echo "Behavior:"
     echo "  - Without message_id: Process next available message for agent"
     echo "  - With message_id: Process specific message if addressed to agent"
+    echo "  - With --list: Print one page of the inbox in (priority, queue) order;"
+    echo "    pass the printed cursor to --after to fetch the next page"
     echo ""
     echo "Example:"
     echo "  $0 code                           # Process next message for code agent"
     echo "  $0 chat 2025-09-27T17:30-uuid    # Process specific message"
+    echo "  $0 --list code --limit 20         # First 20 pending messages"
     exit 1
 }
 
@@ -66,7 +74,13 @@ get_next_message() {
         return 1
     fi
 
-    # Find oldest message in inbox (FIFO order)
+    # Highest priority, lowest queue number first (indexed, no full glob)
+    if [ -f "$INBOX_INDEX" ]; then
+        python3 "$INBOX_INDEX" --bridge-root "$BRIDGE_ROOT" next "$agent"
+        return $?
+    fi
+
+    # Fallback: oldest message in inbox (FIFO order)
     for message_file in $(ls "$inbox_dir"/*.md 2>/dev/null | sort); do
         if [ -f "$message_file" ]; then
             # Skip example files
@@ -87,7 +101,12 @@ find_message_by_id() {
     local agent="$2"
     local inbox_dir="$BRIDGE_ROOT/inbox/$agent"
 
-    # Search in agent's inbox first
+    # O(1) lookup by exact Message-ID (inbox, then queue/pending)
+    if [ -f "$INBOX_INDEX" ] && python3 "$INBOX_INDEX" --bridge-root "$BRIDGE_ROOT" find "$agent" "$message_id" 2>/dev/null; then
+        return 0
+    fi
+
+    # Partial IDs: search in agent's inbox first
     for message_file in $(ls "$inbox_dir"/*.md 2>/dev/null); do
         if [[ "$(basename "$message_file")" == *"$message_id"* ]]; then
             echo "$message_file"
@@ -124,10 +143,13 @@ process_message() {
         return 1
     fi
 
-    local message_id=$(head -20 "$message_file" | grep "^\\*\\*Message-ID\\*\\*:" | head -1 | cut -d: -f2 | xargs)
+    # Message IDs contain ISO timestamps, so strip the label rather than cut on ':'
+    local message_id=$(head -20 "$message_file" | grep "^\\*\\*Message-ID\\*\\*:" | head -1 | sed 's/^\*\*Message-ID\*\*: *//' | xargs)
     local sender=$(head -20 "$message_file" | grep "^\\*\\*From\\*\\*:" | head -1 | cut -d: -f2 | xargs)
     local priority=$(grep "^# \\[PRIORITY:" "$message_file" | head -1 | sed 's/.*PRIORITY: *\\([^\\]]*\\).*/\\1/')
 
+    bridge_trace "$message_id" received "$agent"
+
     echo "📨 Processing message: $message_id"
     echo "👤 From: $sender"
     echo "⚡ Priority: $priority"
@@ -147,12 +169,14 @@ process_message() {
     cat "$processing_file"
     echo "=================="
     echo ""
+    bridge_trace "$message_id" processed "$agent"
 
     # Archive processed message
     local archive_dir="$BRIDGE_ROOT/archive/$agent"
     mkdir -p "$archive_dir"
     local archive_file="$archive_dir/$(basename "$message_file")"
     mv "$processing_file" "$archive_file"
+    bridge_trace "$message_id" archived "$agent"
 
     # Update processing statistics
     local stats_file="$BRIDGE_ROOT/registry/queue_stats.json"
@@ -168,7 +192,20 @@ process_message() {
     return 0
 }
 
+list_messages() {
+    local agent="$1"
+    shift
+    python3 "$INBOX_INDEX" --bridge-root "$BRIDGE_ROOT" list "$agent" "$@"
+}
+
 # Main execution
+if [ "${1:-}" = "--list" ]; then
+    [ $# -ge 2 ] || usage
+    validate_agent "$2" || exit 1
+    list_messages "${@:2}"
+    exit $?
+fi
+
 if [ $# -lt 1 ] || [ $# -gt 2 ]; then
     usage
 fi
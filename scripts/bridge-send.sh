@@ -4,9 +4,11 @@
 
 set -euo pipefail
 
-BRIDGE_ROOT="/Users/devvynmurphy/infrastructure/agent-bridge/bridge"
+BRIDGE_ROOT="${BRIDGE_ROOT:-/Users/devvynmurphy/infrastructure/agent-bridge/bridge}"
 SCRIPT_DIR="$(dirname "$0")"
 
+source "$SCRIPT_DIR/bridge-trace.sh"
+
 # Configuration
 UUID_CMD="uuidgen"
 TIMESTAMP_CMD="date -Iseconds"
@@ -69,6 +71,7 @@ create_message() {
     local content_file="${5:-}"
 
     local message_id=$(generate_message_id "$sender")
+    bridge_trace "$message_id" created "$sender"
     local queue_number=$(get_next_queue_number)
     local timestamp=$($TIMESTAMP_CMD)
 
@@ -115,6 +118,7 @@ EOF
 
     # Atomic move to final location
     mv "$temp_file" "$final_file"
+    bridge_trace "$message_id" queued "$sender"
 
     # Update queue statistics
     local stats_file="$BRIDGE_ROOT/registry/queue_stats.json"
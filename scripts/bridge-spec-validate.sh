@@ -192,7 +192,7 @@ validate_specification() {
     done
 
     # Check for acceptance criteria format
-    if ! grep -q "- \[ \]" "$spec_file"; then
+    if ! grep -q -- "- \[ \]" "$spec_file"; then
         violations+=("LOW: No checkboxes found in acceptance criteria")
     fi
 
@@ -381,10 +381,18 @@ EOF
 }
 
 # Artifact-specific validation
+# Uses the single-pass Python validator when available; set
+# BSPEC_VALIDATE_SHELL=1 to force the shell rules below.
 validate_artifact() {
     local artifact_type="$1"
     local artifact_path="$2"
 
+    if [[ "${BSPEC_VALIDATE_SHELL:-0}" != "1" ]] && command -v python3 >/dev/null 2>&1; then
+        python3 "$SCRIPT_DIR/bspec_validator.py" artifact "$artifact_type" "$artifact_path" | tr '\n' ' ' | sed 's/ $//'
+        echo
+        return
+    fi
+
     case "$artifact_type" in
         "specification")
             validate_specification "$artifact_path"
@@ -416,13 +424,17 @@ main() {
         "pipeline")
             validate_pipeline_integrity "${2:-}"
             ;;
+        "tree")
+            exec python3 "$SCRIPT_DIR/bspec_validator.py" tree "${@:2}"
+            ;;
         *)
-            echo "Usage: $0 {constitutional|artifact|pipeline} [args...]"
+            echo "Usage: $0 {constitutional|artifact|pipeline|tree} [args...]"
             echo ""
             echo "Commands:"
             echo "  constitutional <project> <authority> <action>  - Validate constitutional compliance"
             echo "  artifact <type> <path>                        - Validate specific artifact"
             echo "  pipeline <project_path>                       - Validate entire pipeline"
+            echo "  tree <dir> [--workers N] [--json]             - Validate every .bspec project under dir"
             echo ""
             echo "Artifact types: specification, plan, tasks, implementation"
             exit 1
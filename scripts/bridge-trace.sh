@@ -0,0 +1,77 @@
+#!/bin/bash
+# Bridge Lifecycle Tracing
+# Appends span timestamps to registry/traces/lifecycle.jsonl and reports latency
+#
+# Source it from bridge scripts:
+#   source "$SCRIPT_DIR/bridge-trace.sh"
+#   bridge_trace "$message_id" queued "$sender" bridge-send.sh
+#
+# Or run it directly:
+#   bridge-trace.sh report [--agent AGENT] [--json]
+#   bridge-trace.sh record MESSAGE_ID STAGE [AGENT]
+#
+# Set BRIDGE_TRACE=0 to disable recording.
+
+BRIDGE_TRACE_ROOT="${BRIDGE_ROOT:-/Users/devvynmurphy/infrastructure/agent-bridge/bridge}"
+BRIDGE_TRACE_PY="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)/../bridge/registry/lifecycle_trace.py"
+
+# Epoch seconds with microseconds (BSD date has no %N)
+bridge_trace_now() {
+    local now
+    now=$(date +%s.%N 2>/dev/null) || true
+    if [[ "$now" == *N* || -z "$now" ]]; then
+        perl -MTime::HiRes=time -e 'printf "%.6f\n", time'
+    else
+        echo "${now:0:17}"
+    fi
+}
+
+# bridge_trace MESSAGE_ID STAGE [AGENT] [COMPONENT]
+# One printf >> append per span, matching lifecycle_trace.record_span.
+# Never fails the calling script.
+bridge_trace() {
+    [[ "${BRIDGE_TRACE:-1}" == "0" ]] && return 0
+    local message_id="$1" stage="$2" agent="${3:-}" component="${4:-$(basename "$0")}"
+    local trace_dir="$BRIDGE_TRACE_ROOT/registry/traces"
+    local agent_json="null"
+    [[ -n "$agent" ]] && agent_json="\"$agent\""
+
+    mkdir -p "$trace_dir" 2>/dev/null || return 0
+    printf '{"message_id": "%s", "stage": "%s", "ts": %s, "agent": %s, "component": "%s"}\n' \
+        "$message_id" "$stage" "$(bridge_trace_now)" "$agent_json" "$component" \
+        >> "$trace_dir/lifecycle.jsonl" 2>/dev/null || true
+}
+
+# bridge_trace_file PATH STAGE [AGENT] [COMPONENT]
+# Same as bridge_trace, reading the Message-ID from the message header.
+# A message without one is not traced; under set -euo pipefail the failed
+# grep must not end the caller.
+bridge_trace_file() {
+    local file="$1"
+    shift
+    local message_id
+    message_id=$(grep -m1 "^\*\*Message-ID\*\*:" "$file" 2>/dev/null | sed 's/\*\*Message-ID\*\*: *//' | tr -d ' ') || true
+    if [[ -n "$message_id" ]]; then
+        bridge_trace "$message_id" "$@"
+    fi
+    return 0
+}
+
+if [[ "${BASH_SOURCE[0]}" == "$0" ]]; then
+    set -euo pipefail
+    case "${1:-}" in
+        record)
+            shift
+            [[ $# -ge 2 ]] || { echo "Usage: $0 record MESSAGE_ID STAGE [AGENT]" >&2; exit 1; }
+            bridge_trace "$1" "$2" "${3:-}" cli
+            ;;
+        report)
+            shift
+            exec python3 "$BRIDGE_TRACE_PY" --bridge-root "$BRIDGE_TRACE_ROOT" report "$@"
+            ;;
+        *)
+            echo "Usage: $0 {record MESSAGE_ID STAGE [AGENT] | report [--agent AGENT] [--json]}" >&2
+            exit 1
+            ;;
+    esac
+fi
@@ -0,0 +1,529 @@
+#!/usr/bin/env python3
+"""
+BSPEC Validator - single-pass validation for BSPEC v1.0 artifacts
+
+Python counterpart of bridge-spec-validate.sh. Each artifact is read once
+into a small model (headings, checkbox presence, word and heading counts,
+parsed JSON) and every rule is checked against that model, instead of one
+grep/sed/jq process per rule. Diagnostics use the same "SEVERITY: message"
+strings as the shell validator.
+
+Usage:
+    bspec_validator.py artifact <type> <path>
+    bspec_validator.py constitutional <project> <authority> <action>
+    bspec_validator.py pipeline <project>
+    bspec_validator.py tree <dir> [--workers N] [--json]
+
+`tree` finds every .bspec/ directory below <dir>, validates all artifacts in
+parallel and caches results by content hash in <dir>/.bspec-validate-cache.json.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+BRIDGE_DIR = SCRIPT_DIR.parent / "bridge"
+
+VALIDATOR_VERSION = "BSPEC-1.0"
+# Bump when rules change so cached results are not reused
+RULES_REVISION = 1
+
+AUTHORITY_DOMAINS = {
+    "specification": ("can_define_requirements", "can_approve_plans"),
+    "implementation": ("can_write_code", "can_modify_implementations"),
+    "validation": ("can_run_tests", "can_approve_releases"),
+    "coordination": ("can_manage_tasks", "can_orchestrate_workflows"),
+}
+PIPELINE_STAGES = ("specify", "plan", "tasks", "implement", "validate")
+
+SPEC_SECTIONS = ("Requirements", "Acceptance Criteria", "Technical Constraints")
+PLAN_SECTIONS = ("Architecture Overview", "Implementation Phases", "Dependencies", "Risk Assessment")
+TASK_FIELDS = ("tasks", "total_estimated_hours", "critical_path")
+KNOWN_SECTIONS = SPEC_SECTIONS + PLAN_SECTIONS
+IMPLEMENTATION_SUFFIXES = (".py", ".js", ".sh", ".md")
+
+# Artifact locations inside a .bspec directory, as used by the pipeline
+PROJECT_ARTIFACTS = (
+    ("specification", "specs/specification.md"),
+    ("plan", "plans/implementation_plan.md"),
+    ("tasks", "tasks/task_breakdown.json"),
+    ("implementation", "implementations"),
+)
+
+CACHE_FILE = ".bspec-validate-cache.json"
+
+
+@dataclass
+class Violation:
+    """One diagnostic, printed as 'SEVERITY: message'"""
+    severity: str
+    message: str
+
+    def __str__(self) -> str:
+        return f"{self.severity}: {self.message}"
+
+
+@dataclass
+class MarkdownModel:
+    """Everything the markdown rules need, gathered in one pass"""
+    sections: set = field(default_factory=set)
+    word_count: int = 0
+    heading_count: int = 0
+    has_checkbox: bool = False
+
+    @classmethod
+    def parse(cls, text: str) -> "MarkdownModel":
+        model = cls()
+        for line in text.splitlines():
+            if "## " in line:
+                # Same match as `grep -q "## $title"`: anywhere on the line
+                model.sections.update(t for t in KNOWN_SECTIONS if f"## {t}" in line)
+            model.word_count += len(line.split())
+            if line.startswith("#"):
+                model.heading_count += 1
+            if "- [ ]" in line:
+                model.has_checkbox = True
+        return model
+
+    def has_section(self, title: str) -> bool:
+        return title in self.sections
+
+
+# ---------------------------------------------------------------------------
+# Artifact rules
+# ---------------------------------------------------------------------------
+
+def check_specification(text: str) -> List[Violation]:
+    model = MarkdownModel.parse(text)
+    violations = [
+        Violation("MEDIUM", f"Missing required section: {section}")
+        for section in SPEC_SECTIONS if not model.has_section(section)
+    ]
+    if not model.has_checkbox:
+        violations.append(Violation("LOW", "No checkboxes found in acceptance criteria"))
+    if model.word_count < 50:
+        violations.append(Violation("HIGH", f"Specification too brief ({model.word_count} words)"))
+    return violations
+
+
+def check_plan(text: str) -> List[Violation]:
+    model = MarkdownModel.parse(text)
+    violations = [
+        Violation("MEDIUM", f"Missing required section: {section}")
+        for section in PLAN_SECTIONS if not model.has_section(section)
+    ]
+    if model.heading_count < 4:
+        violations.append(Violation("HIGH", "Implementation plan lacks sufficient detail"))
+    return violations
+
+
+def check_tasks(text: str) -> List[Violation]:
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError:
+        return [Violation("CRITICAL", "Invalid JSON in tasks file")]
+
+    violations = [
+        Violation("HIGH", f"Missing required field: {name}")
+        for name in TASK_FIELDS if not isinstance(data, dict) or name not in data
+    ]
+    tasks = data.get("tasks") if isinstance(data, dict) else None
+    if not tasks:
+        violations.append(Violation("CRITICAL", "No tasks defined"))
+        return violations
+
+    task_ids = {task.get("id") for task in tasks if isinstance(task, dict)}
+    invalid = [
+        str(task.get("id"))
+        for task in tasks
+        if isinstance(task, dict)
+        and any(dep not in task_ids for dep in task.get("dependencies") or [])
+    ]
+    if invalid:
+        violations.append(Violation("HIGH", f"Tasks with invalid dependencies: {' '.join(invalid)}"))
+    return violations
+
+
+def _implementation_digest(impl_dir: Path) -> Tuple[str, Optional[bytes], int]:
+    """(cache key material, implementation log bytes or None, implementation file count)"""
+    log_file = impl_dir / "implementation_log.json"
+    log_bytes = log_file.read_bytes() if log_file.is_file() else None
+    count = 0
+    for _, _, files in os.walk(impl_dir):
+        count += sum(1 for name in files if name.endswith(IMPLEMENTATION_SUFFIXES))
+    digest = hashlib.sha256(log_bytes if log_bytes is not None else b"\0missing").hexdigest()
+    return f"{digest}:{count}", log_bytes, count
+
+
+def check_implementation(log_bytes: Optional[bytes], file_count: int) -> List[Violation]:
+    violations = []
+    if log_bytes is None:
+        violations.append(Violation("HIGH", "No implementation log found"))
+    else:
+        try:
+            json.loads(log_bytes)
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            violations.append(Violation("CRITICAL", "Invalid JSON in implementation log"))
+    if file_count == 0:
+        violations.append(Violation("HIGH", "No implementation files found"))
+    return violations
+
+
+TEXT_CHECKS = {
+    "specification": check_specification,
+    "plan": check_plan,
+    "tasks": check_tasks,
+}
+ARTIFACT_TYPES = tuple(TEXT_CHECKS) + ("implementation",)
+
+
+def artifact_key(artifact_type: str, path: Path) -> Tuple[str, object]:
+    """
+    Read an artifact once and return (content hash key, payload for checking).
+
+    Raises:
+        FileNotFoundError: If the artifact does not exist
+    """
+    if artifact_type == "implementation":
+        if not path.is_dir():
+            raise FileNotFoundError(f"Implementation directory not found: {path}")
+        digest, log_bytes, count = _implementation_digest(path)
+        return f"{RULES_REVISION}:implementation:{digest}", (log_bytes, count)
+
+    if not path.is_file():
+        raise FileNotFoundError(f"{artifact_type.capitalize()} file not found: {path}")
+    data = path.read_bytes()
+    digest = hashlib.sha256(data).hexdigest()
+    return f"{RULES_REVISION}:{artifact_type}:{digest}", data.decode("utf-8", errors="replace")
+
+
+def check_payload(artifact_type: str, payload: object) -> List[Violation]:
+    if artifact_type == "implementation":
+        return check_implementation(*payload)
+    if artifact_type not in TEXT_CHECKS:
+        raise ValueError(f"Unknown artifact type: {artifact_type}")
+    return TEXT_CHECKS[artifact_type](payload)
+
+
+def validate_artifact(artifact_type: str, path: Path) -> List[Violation]:
+    """
+    Validate one artifact.
+
+    Args:
+        artifact_type: specification, plan, tasks or implementation
+        path: Artifact file (directory for implementation)
+
+    Raises:
+        ValueError: Unknown artifact type
+        FileNotFoundError: Missing artifact
+    """
+    if artifact_type not in ARTIFACT_TYPES:
+        raise ValueError(f"Unknown artifact type: {artifact_type}")
+    _, payload = artifact_key(artifact_type, Path(path))
+    return check_payload(artifact_type, payload)
+
+
+# ---------------------------------------------------------------------------
+# Constitutional rules
+# ---------------------------------------------------------------------------
+
+def load_manifest(project_path: Path) -> Optional[Dict]:
+    manifest_file = project_path / ".bspec" / "manifest.json"
+    if not manifest_file.is_file():
+        return None
+    try:
+        return json.loads(manifest_file.read_text())
+    except json.JSONDecodeError:
+        return {}
+
+
+def check_authority(authority: str, action: str) -> bool:
+    return action in AUTHORITY_DOMAINS.get(authority, ())
+
+
+def check_pipeline_consistency(manifest: Optional[Dict]) -> bool:
+    """Stages must complete in order with at most one in progress"""
+    if manifest is None:
+        return True
+    stages = manifest.get("stages") or {}
+    found_incomplete = False
+    for stage in PIPELINE_STAGES:
+        # Absent stages read as jq's "null" and are ignored, as in the shell version
+        status = (stages.get(stage) or {}).get("status")
+        if status == "completed" and found_incomplete:
+            return False
+        if status == "in_progress":
+            if found_incomplete:
+                return False
+            found_incomplete = True
+        elif status == "pending":
+            found_incomplete = True
+    return True
+
+
+def check_message_integrity(manifest: Optional[Dict], bridge_dir: Path = BRIDGE_DIR) -> bool:
+    """Fewer than six inbox JSON messages from this namespace lack an outbox copy"""
+    namespace = (manifest or {}).get("bridge_namespace") or "unknown"
+    inbox_dir = bridge_dir / "inbox"
+    if not inbox_dir.is_dir():
+        return True
+    orphaned = 0
+    for message_file in inbox_dir.rglob("*.json"):
+        try:
+            sender = json.loads(message_file.read_text()).get("sender") or "unknown"
+        except (json.JSONDecodeError, AttributeError, OSError):
+            sender = "unknown"
+        outbox_copy = Path(str(message_file).replace("inbox", "outbox", 1))
+        if sender.startswith(namespace) and not outbox_copy.exists():
+            orphaned += 1
+    return orphaned <= 5
+
+
+def validate_constitutional(project_path: Path,
+                            authority: str,
+                            action: str,
+                            bridge_dir: Path = BRIDGE_DIR) -> Tuple[str, List[Violation], Dict[str, bool]]:
+    """
+    Check authority, pipeline stage order and message queue integrity.
+
+    Returns:
+        (PASS or FAIL, violations, per-check results)
+    """
+    manifest = load_manifest(project_path)
+    checks = {
+        "authority_checks": check_authority(authority, action),
+        "pipeline_consistency": check_pipeline_consistency(manifest),
+        "message_integrity": check_message_integrity(manifest, bridge_dir),
+    }
+    violations = []
+    if not checks["authority_checks"]:
+        violations.append(Violation("CRITICAL", f"Agent lacks authority for action: {action}"))
+    if not checks["pipeline_consistency"]:
+        violations.append(Violation("HIGH", "Pipeline stages are inconsistent"))
+    if not checks["message_integrity"]:
+        violations.append(Violation("MEDIUM", "Message queue integrity issues detected"))
+    result = "PASS" if checks["authority_checks"] and checks["pipeline_consistency"] else "FAIL"
+    return result, violations, checks
+
+
+def write_report(project_path: Path, result: str, violations: List[Violation],
+                 checks: Dict[str, bool], notify: bool = True) -> Path:
+    """Write .bspec/validation_report.json and announce it over the bridge like the shell validator"""
+    timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    report_file = project_path / ".bspec" / "validation_report.json"
+    report_file.parent.mkdir(parents=True, exist_ok=True)
+    report_file.write_text(json.dumps({
+        "validated_at": timestamp,
+        "overall_result": result,
+        "validator_version": VALIDATOR_VERSION,
+        "constitutional_compliance": checks,
+        "violations": [
+            {"severity": v.severity, "message": v.message, "detected_at": timestamp}
+            for v in violations
+        ],
+        "recommendations": [
+            "Review authority domain assignments",
+            "Ensure proper stage sequencing",
+            "Monitor message queue health",
+        ],
+    }, indent=4))
+
+    if notify and (project_path / ".bspec" / "manifest.json").is_file():
+        with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as f:
+            json.dump({"result": result, "violations_count": len(violations),
+                       "report_file": str(report_file), "timestamp": timestamp}, f, indent=4)
+        try:
+            subprocess.run([str(SCRIPT_DIR / "bridge-send.sh"), "bspec", "code", "NORMAL",
+                            "VALIDATION_COMPLETE", f.name], check=False)
+        finally:
+            os.unlink(f.name)
+    return report_file
+
+
+def validate_pipeline(project_path: Path,
+                      bridge_dir: Path = BRIDGE_DIR,
+                      notify: bool = True) -> Tuple[str, List[Violation]]:
+    """
+    Validate a whole project: constitutional checks plus every artifact present.
+
+    Returns:
+        (PASS or FAIL, all violations)
+    """
+    result, violations, checks = validate_constitutional(
+        project_path, "coordination", "can_orchestrate_workflows", bridge_dir)
+    for artifact_type, rel in PROJECT_ARTIFACTS:
+        path = project_path / ".bspec" / rel
+        if path.exists():
+            found = validate_artifact(artifact_type, path)
+            violations.extend(found)
+            if any(v.severity == "CRITICAL" for v in found):
+                result = "FAIL"
+    write_report(project_path, result, violations, checks, notify)
+    return result, violations
+
+
+# ---------------------------------------------------------------------------
+# Directory validation
+# ---------------------------------------------------------------------------
+
+def discover(root: Path) -> List[Tuple[str, Path]]:
+    """Every (artifact type, path) below root's .bspec directories"""
+    artifacts = []
+    for dirpath, dirnames, _ in os.walk(root):
+        if ".bspec" in dirnames:
+            bspec = Path(dirpath) / ".bspec"
+            for md in sorted((bspec / "specs").glob("*.md")):
+                artifacts.append(("specification", md))
+            for md in sorted((bspec / "plans").glob("*.md")):
+                artifacts.append(("plan", md))
+            for js in sorted((bspec / "tasks").glob("*.json")):
+                artifacts.append(("tasks", js))
+            if (bspec / "implementations").is_dir():
+                artifacts.append(("implementation", bspec / "implementations"))
+        dirnames[:] = [d for d in dirnames if d != ".bspec" and not d.startswith(".git")]
+    return artifacts
+
+
+_cached_keys: frozenset = frozenset()
+
+
+def _init_worker(cached_keys: frozenset):
+    global _cached_keys
+    _cached_keys = cached_keys
+
+
+def _check_job(job: Tuple[str, str]) -> Tuple[str, str, Optional[List[Tuple[str, str]]]]:
+    """Read, hash and (unless cached) check one artifact in a worker process"""
+    artifact_type, path = job
+    key, payload = artifact_key(artifact_type, Path(path))
+    if key in _cached_keys:
+        return path, key, None
+    return path, key, [(v.severity, v.message) for v in check_payload(artifact_type, payload)]
+
+
+def validate_tree(root: Path,
+                  workers: Optional[int] = None,
+                  cache_file: Optional[Path] = None) -> Dict[str, List[Violation]]:
+    """
+    Validate every artifact under root, in parallel, reusing cached results.
+
+    Workers are given paths and do the reading and hashing themselves; the
+    parent only walks the tree and merges results.
+
+    Args:
+        root: Directory to search for .bspec/ directories
+        workers: Worker processes (default: CPU count; 1 = inline)
+        cache_file: Result cache (default: <root>/.bspec-validate-cache.json)
+
+    Returns:
+        Path (as string) → violations, in discovery order
+    """
+    root = Path(root)
+    cache_file = cache_file or root / CACHE_FILE
+    try:
+        cache = json.loads(cache_file.read_text())
+    except (FileNotFoundError, json.JSONDecodeError):
+        cache = {}
+
+    jobs = [(artifact_type, str(path)) for artifact_type, path in discover(root)]
+    cached = frozenset(cache)
+    if workers == 1 or len(jobs) <= 1:
+        _init_worker(cached)
+        results = list(map(_check_job, jobs))
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(cached,)) as pool:
+            results = list(pool.map(_check_job, jobs, chunksize=16))
+
+    keys: Dict[str, str] = {}
+    for path, key, violations in results:
+        keys[path] = key
+        if violations is not None:
+            cache[key] = violations
+
+    live = set(keys.values())
+    if live != cached:
+        tmp_file = cache_file.with_name(f"{cache_file.name}.tmp.{os.getpid()}")
+        tmp_file.write_text(json.dumps({k: v for k, v in cache.items() if k in live}))
+        os.replace(tmp_file, cache_file)
+
+    return {path: [Violation(*v) for v in cache[key]] for path, key in keys.items()}
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="BSPEC v1.0 validator")
+    parser.add_argument("--bridge-dir", type=Path, default=BRIDGE_DIR,
+                        help="Bridge directory for message integrity checks")
+    parser.add_argument("--no-notify", action="store_true",
+                        help="Do not send VALIDATION_COMPLETE over the bridge")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    artifact_cmd = sub.add_parser("artifact", help="Validate one artifact")
+    artifact_cmd.add_argument("type", choices=ARTIFACT_TYPES)
+    artifact_cmd.add_argument("path", type=Path)
+
+    const_cmd = sub.add_parser("constitutional", help="Validate constitutional compliance")
+    const_cmd.add_argument("project", type=Path)
+    const_cmd.add_argument("authority")
+    const_cmd.add_argument("action")
+
+    pipeline_cmd = sub.add_parser("pipeline", help="Validate an entire pipeline")
+    pipeline_cmd.add_argument("project", type=Path)
+
+    tree_cmd = sub.add_parser("tree", help="Validate every .bspec project under a directory")
+    tree_cmd.add_argument("root", type=Path)
+    tree_cmd.add_argument("--workers", type=int, help="Worker processes (default: CPU count)")
+    tree_cmd.add_argument("--json", action="store_true", help="Machine-readable output")
+
+    args = parser.parse_args(argv)
+    notify = not args.no_notify
+
+    try:
+        if args.command == "artifact":
+            for violation in validate_artifact(args.type, args.path):
+                print(violation)
+            return 0
+
+        if args.command == "constitutional":
+            result, violations, checks = validate_constitutional(
+                args.project, args.authority, args.action, args.bridge_dir)
+            write_report(args.project, result, violations, checks, notify)
+            return 0 if result == "PASS" else 1
+
+        if args.command == "pipeline":
+            result, violations = validate_pipeline(args.project, args.bridge_dir, notify)
+            for violation in violations:
+                print(violation)
+            return 0 if result == "PASS" else 1
+
+        results = validate_tree(args.root, args.workers)
+        if args.json:
+            print(json.dumps({path: [str(v) for v in found] for path, found in results.items()}, indent=2))
+        else:
+            for path, found in results.items():
+                for violation in found:
+                    print(f"{path}: {violation}")
+        critical = any(v.severity == "CRITICAL" for found in results.values() for v in found)
+        return 1 if critical else 0
+
+    except (FileNotFoundError, ValueError) as e:
+        print(f"BSPEC-VALIDATE: ERROR: {e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the BSPEC validator
+
+Run with: python3 test_bspec_validator.py
+"""
+
+import json
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# Import module under test
+SCRIPT_DIR = Path(__file__).parent
+sys.path.insert(0, str(SCRIPT_DIR))
+
+import bspec_validator
+from bspec_validator import (
+    check_pipeline_consistency,
+    validate_artifact,
+    validate_constitutional,
+    validate_pipeline,
+    validate_tree,
+)
+
+GOOD_SPEC = """# Feature
+
+## Requirements
+The bridge must deliver every message exactly once to its recipient agent,
+in priority order, and record each delivery in the registry so that
+operators can audit message flow across all namespaces at any time.
+
+## Acceptance Criteria
+- [ ] Messages are delivered once
+- [ ] Delivery order follows priority
+
+## Technical Constraints
+Must run on macOS and Linux with only the standard library available.
+"""
+
+GOOD_TASKS = {
+    "tasks": [{"id": "t1"}, {"id": "t2", "dependencies": ["t1"]}],
+    "total_estimated_hours": 3,
+    "critical_path": ["t1", "t2"],
+}
+
+
+def make_project(root: Path, name: str = "proj") -> Path:
+    project = root / name
+    bspec = project / ".bspec"
+    for sub in ("specs", "plans", "tasks", "implementations"):
+        (bspec / sub).mkdir(parents=True)
+    (bspec / "specs" / "specification.md").write_text(GOOD_SPEC)
+    (bspec / "plans" / "implementation_plan.md").write_text("# Plan\n\n## Architecture Overview\n")
+    (bspec / "tasks" / "task_breakdown.json").write_text(json.dumps(GOOD_TASKS))
+    (bspec / "implementations" / "main.py").write_text("print('hi')\n")
+    (bspec / "implementations" / "implementation_log.json").write_text("{}")
+    (bspec / "manifest.json").write_text(json.dumps({
+        "bridge_namespace": f"bspec-{name}",
+        "stages": {"specify": {"status": "completed"}, "plan": {"status": "in_progress"},
+                   "tasks": {"status": "pending"}},
+    }))
+    return project
+
+
+class TestArtifactRules(unittest.TestCase):
+    """Test per-artifact diagnostics"""
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def write(self, name, content):
+        path = self.temp_dir / name
+        path.write_text(content)
+        return path
+
+    def test_good_specification(self):
+        path = self.write("spec.md", GOOD_SPEC)
+        self.assertEqual(validate_artifact("specification", path), [])
+
+    def test_brief_specification(self):
+        path = self.write("spec.md", "## Requirements\nshort\n")
+        found = [str(v) for v in validate_artifact("specification", path)]
+        self.assertEqual(found, [
+            "MEDIUM: Missing required section: Acceptance Criteria",
+            "MEDIUM: Missing required section: Technical Constraints",
+            "LOW: No checkboxes found in acceptance criteria",
+            "HIGH: Specification too brief (3 words)",
+        ])
+
+    def test_plan_detail(self):
+        path = self.write("plan.md", "# Plan\n## Architecture Overview\n")
+        found = [str(v) for v in validate_artifact("plan", path)]
+        self.assertIn("HIGH: Implementation plan lacks sufficient detail", found)
+        self.assertIn("MEDIUM: Missing required section: Risk Assessment", found)
+
+    def test_tasks(self):
+        self.assertEqual(validate_artifact("tasks", self.write("t.json", json.dumps(GOOD_TASKS))), [])
+        self.assertEqual([str(v) for v in validate_artifact("tasks", self.write("bad.json", "{"))],
+                         ["CRITICAL: Invalid JSON in tasks file"])
+
+        broken = {"tasks": [{"id": "a", "dependencies": ["zzz"]}]}
+        found = [str(v) for v in validate_artifact("tasks", self.write("dep.json", json.dumps(broken)))]
+        self.assertEqual(found, [
+            "HIGH: Missing required field: total_estimated_hours",
+            "HIGH: Missing required field: critical_path",
+            "HIGH: Tasks with invalid dependencies: a",
+        ])
+
+    def test_implementation(self):
+        impl = self.temp_dir / "impl"
+        impl.mkdir()
+        found = [str(v) for v in validate_artifact("implementation", impl)]
+        self.assertEqual(found, ["HIGH: No implementation log found", "HIGH: No implementation files found"])
+
+    def test_unknown_type(self):
+        with self.assertRaises(ValueError):
+            validate_artifact("poem", self.write("x.md", ""))
+
+    @unittest.skipUnless(shutil.which("bash") and shutil.which("jq"), "needs bash and jq")
+    def test_matches_shell_diagnostics(self):
+        """Every Python diagnostic appears in the shell validator's output"""
+        cases = [
+            ("specification", self.write("s.md", "## Requirements\nshort spec\n")),
+            ("specification", self.write("g.md", GOOD_SPEC)),
+            ("plan", self.write("p.md", "# Plan\n## Dependencies\n")),
+            ("tasks", self.write("t.json", json.dumps({"tasks": []}))),
+        ]
+        for artifact_type, path in cases:
+            shell = subprocess.run(
+                ["bash", str(SCRIPT_DIR / "bridge-spec-validate.sh"), "artifact", artifact_type, str(path)],
+                capture_output=True, text=True, env={"BSPEC_VALIDATE_SHELL": "1", "PATH": "/usr/bin:/bin"},
+            ).stdout.strip()
+            python = [str(v) for v in validate_artifact(artifact_type, path)]
+            self.assertEqual(" ".join(python), shell, artifact_type)
+
+
+class TestConstitutional(unittest.TestCase):
+    """Test authority and pipeline rules"""
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_authority(self):
+        project = make_project(self.temp_dir)
+        result, violations, _ = validate_constitutional(project, "implementation", "can_approve_releases",
+                                                        self.temp_dir / "bridge")
+        self.assertEqual(result, "FAIL")
+        self.assertEqual([str(v) for v in violations],
+                         ["CRITICAL: Agent lacks authority for action: can_approve_releases"])
+
+    def test_stage_order(self):
+        self.assertTrue(check_pipeline_consistency(None))
+        self.assertTrue(check_pipeline_consistency({"stages": {"specify": {"status": "completed"}}}))
+        self.assertFalse(check_pipeline_consistency({"stages": {
+            "specify": {"status": "pending"}, "plan": {"status": "completed"}}}))
+        self.assertFalse(check_pipeline_consistency({"stages": {
+            "specify": {"status": "in_progress"}, "plan": {"status": "in_progress"}}}))
+
+    def test_pipeline_report(self):
+        project = make_project(self.temp_dir)
+        result, violations = validate_pipeline(project, self.temp_dir / "bridge", notify=False)
+        report = json.loads((project / ".bspec" / "validation_report.json").read_text())
+        self.assertEqual(result, "PASS")
+        self.assertEqual(report["overall_result"], "PASS")
+        self.assertEqual(len(report["violations"]), len(violations))
+        self.assertTrue(report["constitutional_compliance"]["pipeline_consistency"])
+
+
+class TestTree(unittest.TestCase):
+    """Test directory validation and the content-hash cache"""
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_parallel_matches_inline(self):
+        for i in range(3):
+            make_project(self.temp_dir, f"p{i}")
+        inline = validate_tree(self.temp_dir, workers=1, cache_file=self.temp_dir / "a.json")
+        parallel = validate_tree(self.temp_dir, workers=2, cache_file=self.temp_dir / "b.json")
+        self.assertEqual(len(inline), 12)
+        self.assertEqual(inline, parallel)
+
+    def test_cache_reused_until_content_changes(self):
+        project = make_project(self.temp_dir)
+        validate_tree(self.temp_dir, workers=1)
+
+        calls = []
+        original = bspec_validator.check_payload
+        bspec_validator.check_payload = lambda t, p: calls.append(t) or original(t, p)
+        try:
+            validate_tree(self.temp_dir, workers=1)
+            self.assertEqual(calls, [])
+
+            (project / ".bspec" / "tasks" / "task_breakdown.json").write_text("{")
+            results = validate_tree(self.temp_dir, workers=1)
+            self.assertEqual(calls, ["tasks"])
+        finally:
+            bspec_validator.check_payload = original
+
+        tasks_path = str(project / ".bspec" / "tasks" / "task_breakdown.json")
+        self.assertEqual([str(v) for v in results[tasks_path]], ["CRITICAL: Invalid JSON in tasks file"])
+
+
+if __name__ == "__main__":
+    unittest.main()